@@ -105,7 +105,11 @@ def api_book_detail(request, book_uuid):
 
     Example:
         GET /api/books/<uuid>/
+
+    contents[].audio_file: 서명된 만료 URL (권한(성인/구독)이 없으면 null — book.media_signing)
     """
+    from book import media_delivery, media_signing
+
     book = get_object_or_404(
         Books.objects.select_related('user')
         .prefetch_related('genres', 'tags', 'contents')
@@ -119,6 +123,7 @@ def api_book_detail(request, book_uuid):
 
     # 최근 5개 리뷰
     recent_reviews = book.reviews.select_related('user').order_by('-created_at')[:5]
+    user = media_delivery.request_user(request)
 
     data = {
         'id': str(book.public_uuid),  # UUID
@@ -157,11 +162,11 @@ def api_book_detail(request, book_uuid):
                 'number': content.number,
                 'text': content.text,
                 'episode_image': request.build_absolute_uri(content.episode_image.url) if content.episode_image else None,
-                'audio_file': request.build_absolute_uri(content.audio_file.url) if content.audio_file else None,
+                'audio_file': media_signing.content_audio_url(request, content, user=user),  # 권한이 없으면 null
                 'duration_seconds': content.duration_seconds,
                 'duration_formatted': content.get_duration_formatted(),
                 'audio_timestamps': content.audio_timestamps
-            }  for content in book.contents.filter(is_deleted=False).order_by('number')
+            }  for content in book.contents.filter(is_deleted=False).select_related('book').order_by('number')
 
         ],
         'recent_reviews': [
@@ -192,10 +197,18 @@ def api_contents_list(request, book_uuid):
     Query Parameters:
         - page: 페이지 번호 (기본: 1)
         - per_page: 페이지당 아이템 수 (기본: 20)
+        - rendition: audio_url 렌디션 (예: low — 모바일 저비트레이트, 없으면 standard)
+
+    audio_url: signed_urls.audio_url과 같은 서명 URL (기존 앱 호환 — 헤더 없이 재생). 권한이 없으면 null
+    stream_url: 권한 확인(성인/구독) 후 전송하는 스트림 URL (X-API-Key 헤더와 함께 요청)
+    signed_urls: 서명된 만료 URL {audio_url, hls_url, expires} — 헤더 없이 재생 가능, 서버는 DB 조회 없이 검증.
+                 권한이 없으면 null
 
     Example:
-        GET /api/books/<uuid>/contents/
+        GET /api/books/<uuid>/contents/?rendition=low
     """
+    from book import media_delivery, media_signing, renditions
+
     # 책 조회
     book = get_object_or_404(Books, public_uuid=book_uuid)
 
@@ -204,7 +217,9 @@ def api_contents_list(request, book_uuid):
     per_page = request.GET.get('per_page', 20)
 
     # 에피소드 조회
-    contents = Content.objects.filter(book=book, is_deleted=False).order_by('number')
+    contents = Content.objects.filter(book=book, is_deleted=False).select_related('book').prefetch_related('renditions').order_by('number')
+    rendition = renditions.requested(request)
+    user = media_delivery.request_user(request)
 
     # 페이지네이션 적용
     result = paginate(contents, page, per_page)
@@ -212,12 +227,15 @@ def api_contents_list(request, book_uuid):
     # 데이터 직렬화
     contents_data = []
     for content in result['items']:
+        signed = media_signing.content_signed_urls(request, content, rendition, user=user)
         contents_data.append({
             'id': str(content.public_uuid),  # UUID
             'title': content.title,
             'number': content.number,
             'episode_image': request.build_absolute_uri(content.episode_image.url) if content.episode_image else None,
-            'audio_url': request.build_absolute_uri(content.audio_file.url) if content.audio_file else None,
+            'audio_url': signed['audio_url'] if signed else None,
+            'stream_url': media_delivery.content_stream_url(request, content, rendition) if content.audio_file else None,
+            'signed_urls': signed,
             'duration_seconds': content.duration_seconds,
             'duration_formatted': content.get_duration_formatted(),
             'created_at': content.created_at.isoformat(),
@@ -239,11 +257,24 @@ def api_content_detail(request, content_uuid):
     """
     에피소드 상세 정보 API (UUID 기반)
 
+    Query Parameters:
+        - rendition: audio_url 렌디션 (예: low). audio_renditions에 사용 가능한 렌디션 목록
+
+    audio_url: signed_urls.audio_url과 같은 서명 URL (기존 앱 호환). 권한(성인/구독)이 없으면 null
+    audio_renditions: 렌디션별 서명 URL, 권한이 없으면 null
+    stream_url: 권한 확인(성인/구독) 후 전송하는 스트림 URL (X-API-Key 헤더와 함께 요청, Range/ETag 지원)
+    signed_urls: 서명된 만료 URL {audio_url, hls_url, expires} (권한이 없으면 null).
+                 navigation.next에도 포함 → 다음 에피소드를 미리 받아 둘 수 있음
+    hls: HLS 패키지가 있으면 {url(마스터 플레이리스트), segment_ms, segment_starts,
+         timestamp_segments(audio_timestamps 각 대사가 시작되는 세그먼트 번호)}, 없으면 null
+
     Example:
-        GET /api/contents/<uuid>/
+        GET /api/contents/<uuid>/?rendition=low
     """
+    from book import hls, media_delivery, media_signing, renditions
+
     content = get_object_or_404(
-        Content.objects.select_related('book', 'book__user'),
+        Content.objects.select_related('book', 'book__user').prefetch_related('renditions'),
         public_uuid=content_uuid
     )
 
@@ -256,7 +287,12 @@ def api_content_detail(request, content_uuid):
     next_content = Content.objects.filter(
         book=content.book,
         number__gt=content.number,is_deleted=False
-    ).order_by('number').first()
+    ).select_related('book').prefetch_related('renditions').order_by('number').first()
+
+    rendition = renditions.requested(request)
+    user = media_delivery.request_user(request)
+    sign = media_signing.content_signer(request, content, user=user)
+    signed = media_signing.content_signed_urls(request, content, rendition, sign=sign) if sign else None
 
     data = {
         'id': str(content.public_uuid),  # UUID
@@ -264,8 +300,12 @@ def api_content_detail(request, content_uuid):
         'number': content.number,
         'text': content.text,
         'episode_image': request.build_absolute_uri(content.episode_image.url) if content.episode_image else None,
-        'audio_url': request.build_absolute_uri(content.audio_file.url) if content.audio_file else None,
+        'audio_url': signed['audio_url'] if signed else None,
+        'stream_url': media_delivery.content_stream_url(request, content, rendition) if content.audio_file else None,
+        'signed_urls': signed,
+        'audio_renditions': renditions.describe(request, content, sign=sign) if sign else None,
         'audio_timestamps': content.audio_timestamps,
+        'hls': hls.describe(request, content),
         'duration_seconds': content.duration_seconds,
         'duration_formatted': content.get_duration_formatted(),
         'created_at': content.created_at.isoformat(),
@@ -287,7 +327,8 @@ def api_content_detail(request, content_uuid):
             'next': {
                 'id': str(next_content.public_uuid),
                 'title': next_content.title,
-                'number': next_content.number
+                'number': next_content.number,
+                'signed_urls': media_signing.content_signed_urls(request, next_content, rendition, user=user),
             } if next_content else None
         }
     }
@@ -295,6 +336,52 @@ def api_content_detail(request, content_uuid):
     return api_response(data)
 
 
+@require_api_key
+def api_content_seek_index(request, content_uuid):
+    """
+    에피소드 오디오 탐색 인덱스 (시간 → MP3 프레임 byte offset)
+
+    Example:
+        GET /api/contents/<uuid>/seek-index/          → 전체 테이블 (interval_ms 간격)
+        GET /api/contents/<uuid>/seek-index/?t=95.5   → 해당 시각(초)의 탐색 지점 1개
+        GET /api/contents/<uuid>/seek-index/?rendition=low → 해당 렌디션 파일 기준
+
+    클라이언트는 offset으로 Range 요청(bytes=<offset>-)을 보내거나
+    stream_audio의 ?t= 파라미터를 사용할 수 있음.
+    """
+    from book import mp3_index, renditions
+
+    content = get_object_or_404(Content, public_uuid=content_uuid, is_deleted=False)
+    if not content.audio_file:
+        return api_response(error='오디오 파일이 없습니다.', status=404)
+
+    index = mp3_index.load_index(renditions.select(content, renditions.requested(request)).path)
+    if index is None:
+        return api_response(error='탐색 인덱스를 만들 수 없는 오디오 형식입니다.', status=404)
+
+    t = request.GET.get('t')
+    if t is not None:
+        try:
+            ms = float(t) * 1000
+        except ValueError:
+            return api_response(error='t는 초 단위 숫자여야 합니다.', status=400)
+        time_ms, offset = mp3_index.seek(index, ms)
+        return api_response({
+            'time_ms': time_ms,
+            'offset': offset,
+            'duration_ms': index['duration_ms'],
+        })
+
+    return api_response({
+        'duration_ms': index['duration_ms'],
+        'interval_ms': index['interval_ms'],
+        'sample_rate': index['sample_rate'],
+        'size': index['source_size'],
+        'times': index['times'],
+        'offsets': index['offsets'],
+    })
+
+
 # ==================== ⭐ Reviews API ====================
 
 @require_api_key
@@ -479,11 +566,16 @@ def api_my_listening_history(request):
 
     Example:
         GET /api/my/listening-history/
+
+    content.audio_file: 서명된 만료 URL (권한이 없으면 null)
     """
+    from book import media_signing
+
+    user = request.api_user
     qs = ListeningHistory.objects.filter(
-        user=request.api_user,
+        user=user,
         last_position__gt=0
-    ).select_related('book', 'content', 'book__user').order_by('-last_listened_at')
+    ).select_related('book', 'content', 'content__book', 'book__user').order_by('-last_listened_at')
 
     seen_books = set()
     history = []
@@ -516,7 +608,7 @@ def api_my_listening_history(request):
                 'title': h.content.title if h.content else None,
                 'number': h.content.number if h.content else None,
                 'text': h.content.text if h.content else None,
-                'audio_file': request.build_absolute_uri(h.content.audio_file.url) if h.content and h.content.audio_file else None,
+                'audio_file': media_signing.content_audio_url(request, h.content, user=user) if h.content else None,
                 'episode_image': request.build_absolute_uri(h.content.episode_image.url) if h.content and h.content.episode_image else None,
             } if h.content else None
         })
@@ -1620,7 +1712,6 @@ def api_content_snippets(request, content_uuid):
         if len(sentence) > 500:
             return JsonResponse({"error": "문장은 500자 이하여야 합니다"}, status=400)
 
-        import os, tempfile
         from django.core.files.base import ContentFile
 
         snippet = BookSnippet(
@@ -1635,20 +1726,15 @@ def api_content_snippets(request, content_uuid):
 
         if start_sec is not None and end_sec is not None and content.audio_file:
             try:
-                from pydub import AudioSegment
-                audio = AudioSegment.from_file(content.audio_file.path)
-                start_ms = int(float(start_sec) * 1000)
-                end_ms   = int(float(end_sec)   * 1000)
-                clip = audio[start_ms:end_ms]
-                buf = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-                clip.export(buf.name, format='mp3', bitrate='128k')
-                buf.close()
-                with open(buf.name, 'rb') as f:
+                # 구간 프레임만 복사 (전체 디코딩/재인코딩 없음)
+                from book.utils import clip_episode_audio
+                clip = clip_episode_audio(content.audio_file.path, start_sec, end_sec)
+                if clip:
+                    start_ms = int(float(start_sec) * 1000)
                     snippet.audio_file.save(
                         f'snippet_{content_uuid}_{start_ms}.mp3',
-                        ContentFile(f.read()), save=False
+                        ContentFile(clip), save=False
                     )
-                os.unlink(buf.name)
             except Exception as e:
                 pass
 
@@ -0,0 +1,758 @@
+"""
+스트리밍 오디오 엔진
+- 페이지 오디오를 하나씩 디코딩하여 단일 인코더 프로세스의 stdin으로 PCM 전달
+- 페이지 사이 침묵은 0 프레임으로 직접 기록 (AudioSegment 누적 연결 없음)
+- 메모리 사용량은 가장 긴 페이지 1개 분량으로 고정
+
+중간 포맷 정책:
+- 페이지/듀엣/무음/효과/병합 마스터는 무손실 WAV로 전달 (INTERMEDIATE_FORMAT)
+- 게시되는 최종 파일만 MP3로 1회 인코딩 (transcode / PCMEncoder)
+
+코덱: 디코딩과 무손실 인코딩은 book.codec(libsndfile, 인프로세스)으로 처리.
+MP3 인코딩은 출력 파일당 ffmpeg 1개(PCM 파이프) — 이유는 book.codec 참고
+"""
+import os
+import re
+import subprocess
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+
+import numpy as np
+from pydub import AudioSegment
+
+from book import codec
+
+SAMPLE_WIDTH = 2  # s16le 고정
+SILENCE_CHUNK_FRAMES = 44100  # 침묵 기록 시 한 번에 쓰는 프레임 수
+RENDER_BLOCK_FRAMES = 65536  # EDL 렌더러가 한 번에 처리하는 프레임 수
+
+INTERMEDIATE_FORMAT = 'wav'  # pydub가 ffmpeg 없이 직접 기록하는 무손실 포맷
+INTERMEDIATE_EXT = '.wav'
+LOSSLESS_EXTS = ('.wav', '.flac')
+PUBLISH_FORMAT = 'mp3'
+PUBLISH_BITRATE = '128k'
+
+
+def is_lossless(path):
+    return os.path.splitext(str(path))[1].lower() in LOSSLESS_EXTS
+
+
+def export_intermediate(segment, path):
+    """AudioSegment를 무손실 중간 포맷으로 저장"""
+    segment.export(path, format=INTERMEDIATE_FORMAT)
+    return path
+
+
+def _output_args(path, bitrate, format, channels=None):
+    args = []
+    if channels:
+        args += ["-ac", str(channels)]
+    if bitrate:
+        args += ["-b:a", bitrate]
+    return args + ["-f", format, path]
+
+
+def transcode(src_path, dst_path, bitrate=PUBLISH_BITRATE, format=PUBLISH_FORMAT, renditions=None):
+    """
+    파일 → 파일 인코딩 (블록 단위, 파이썬 메모리에 전체를 디코딩하지 않음).
+    무손실 마스터를 게시용 MP3로 만드는 용도. 인프로세스 코덱으로 불가능할 때만 ffmpeg 1회 실행.
+
+    renditions: [{path, format, bitrate, channels}] — 같은 ffmpeg 실행(디코딩 1회)에서 함께 기록 (book.renditions)
+    """
+    if not renditions and codec.transcode(src_path, dst_path, bitrate=bitrate, format=format):
+        return dst_path
+    cmd = [AudioSegment.converter, "-y", "-hide_banner", "-loglevel", "error", "-i", src_path]
+    cmd += _output_args(dst_path, bitrate, format)
+    for r in renditions or []:
+        cmd += _output_args(r['path'], r.get('bitrate'), r.get('format', PUBLISH_FORMAT), r.get('channels'))
+    proc = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        for path in [dst_path] + [r['path'] for r in renditions or []]:
+            if os.path.exists(path):
+                os.remove(path)
+        raise RuntimeError(f"ffmpeg 인코딩 실패 (code={proc.returncode}): {proc.stderr.decode('utf-8', 'ignore').strip()[-500:]}")
+    return dst_path
+
+
+class StageTimer:
+    """
+    파이프라인 단계별 소요 시간 누적 (초)
+
+    timer = StageTimer()
+    with timer.stage('merge'):
+        ...
+    timer.report()  # {'merge': 1.23}
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def report(self):
+        return {name: round(sec, 2) for name, sec in self.timings.items()}
+
+
+class PCMEncoder:
+    """
+    raw PCM(s16le)을 받아 인코딩하는 스트리밍 인코더.
+    book.codec이 출력 포맷을 지원하면 인프로세스(libsndfile)로, 아니면 하나의 ffmpeg 프로세스로 인코딩.
+
+    with PCMEncoder(path, 44100, 2) as enc:
+        enc.write_segment(seg)
+        enc.write_silence(500)
+    """
+
+    def __init__(self, output_path, frame_rate, channels, bitrate="128k", format="mp3", out_channels=None):
+        self.output_path = output_path
+        self.frame_rate = int(frame_rate)
+        self.channels = int(channels)
+        self.out_channels = int(out_channels) if out_channels and int(out_channels) != int(channels) else None
+        self.bitrate = bitrate
+        self.format = format
+        self.frames_written = 0
+        self._proc = None
+        self._stderr = None
+        self._writer = None
+
+    @property
+    def frame_width(self):
+        return self.channels * SAMPLE_WIDTH
+
+    @property
+    def duration_ms(self):
+        return round(self.frames_written * 1000 / self.frame_rate)
+
+    def start(self):
+        if codec.can_encode(self.format):
+            self._writer = codec.StreamWriter(self.output_path, self.frame_rate, self.out_channels or self.channels,
+                                              format=self.format, bitrate=self.bitrate).open()
+            return self
+        self._stderr = tempfile.TemporaryFile()
+        cmd = [
+            AudioSegment.converter, "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(self.frame_rate), "-ac", str(self.channels),
+            "-i", "pipe:0",
+        ]
+        cmd += _output_args(self.output_path, self.bitrate, self.format, self.out_channels)
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        return self
+
+    def conform(self, segment):
+        """세그먼트를 인코더 포맷(frame_rate/channels/16bit)에 맞춤"""
+        if segment.frame_rate != self.frame_rate:
+            segment = segment.set_frame_rate(self.frame_rate)
+        if segment.channels != self.channels:
+            segment = segment.set_channels(self.channels)
+        if segment.sample_width != SAMPLE_WIDTH:
+            segment = segment.set_sample_width(SAMPLE_WIDTH)
+        return segment
+
+    def write_pcm(self, data):
+        """interleaved s16le 바이트를 그대로 기록. 기록한 프레임 수 반환"""
+        frames = len(data) // self.frame_width
+        if frames:
+            self._write(data[:frames * self.frame_width])
+            self.frames_written += frames
+        return frames
+
+    def _write(self, data):
+        if self._writer is not None:
+            block = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+            self._writer.write(codec.conform_channels(block, self.out_channels))
+        else:
+            self._proc.stdin.write(data)
+
+    def write_segment(self, segment):
+        """AudioSegment 하나를 포맷 정규화 후 기록. 기록한 길이(ms) 반환"""
+        segment = self.conform(segment)
+        self.write_pcm(segment.raw_data)
+        return len(segment)
+
+    def write_silence(self, duration_ms):
+        """duration_ms 만큼 0 프레임 기록"""
+        frames = int(self.frame_rate * duration_ms / 1000.0)
+        chunk = b"\x00" * (min(frames, SILENCE_CHUNK_FRAMES) * self.frame_width)
+        remaining = frames
+        while remaining > 0:
+            n = min(remaining, SILENCE_CHUNK_FRAMES)
+            self._write(chunk[:n * self.frame_width])
+            remaining -= n
+        self.frames_written += frames
+        return duration_ms
+
+    def close(self):
+        """stdin을 닫고 인코더 종료 대기. 실패 시 RuntimeError"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            return
+        if not self._proc:
+            return
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._proc.wait()
+        self._stderr.seek(0)
+        err = self._stderr.read().decode("utf-8", "ignore")
+        self._stderr.close()
+        self._proc = None
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg 인코딩 실패 (code={returncode}): {err.strip()[-500:]}")
+
+    def abort(self):
+        """인코더 강제 종료 + 불완전한 출력 파일 삭제"""
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        if self._proc:
+            try:
+                self._proc.kill()
+                self._proc.wait()
+            except Exception:
+                pass
+            self._proc = None
+        if self._stderr:
+            self._stderr.close()
+            self._stderr = None
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class EncoderGroup:
+    """
+    같은 PCM을 여러 PCMEncoder(게시 파일 + 렌디션)에 동시에 기록 — 디코딩/믹싱은 1회.
+    PCMEncoder와 같은 인터페이스 (start / write_pcm / write_silence / close / abort).
+    """
+
+    def __init__(self, encoders):
+        self.encoders = encoders
+
+    @property
+    def frame_rate(self):
+        return self.encoders[0].frame_rate
+
+    @property
+    def channels(self):
+        return self.encoders[0].channels
+
+    @property
+    def frames_written(self):
+        return self.encoders[0].frames_written
+
+    def start(self):
+        for encoder in self.encoders:
+            encoder.start()
+        return self
+
+    def write_pcm(self, data):
+        for encoder in self.encoders:
+            frames = encoder.write_pcm(data)
+        return frames
+
+    def write_silence(self, duration_ms):
+        for encoder in self.encoders:
+            encoder.write_silence(duration_ms)
+        return duration_ms
+
+    def close(self):
+        """모든 인코더 종료. 하나라도 실패하면 전부 정리 후 첫 오류를 다시 던짐"""
+        error = None
+        for encoder in self.encoders:
+            try:
+                encoder.close()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            self.abort()
+            raise error
+
+    def abort(self):
+        for encoder in self.encoders:
+            encoder.abort()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def open_encoder(output_path, frame_rate, channels, bitrate=PUBLISH_BITRATE, format=PUBLISH_FORMAT, renditions=None):
+    """출력 1개면 PCMEncoder, renditions([{path, format, bitrate, channels}])가 있으면 EncoderGroup (시작 전 상태)"""
+    encoder = PCMEncoder(output_path, frame_rate, channels, bitrate=bitrate, format=format)
+    if not renditions:
+        return encoder
+    return EncoderGroup([encoder] + [
+        PCMEncoder(r['path'], frame_rate, channels, bitrate=r.get('bitrate'), format=r.get('format', PUBLISH_FORMAT),
+                   out_channels=r.get('channels'))
+        for r in renditions
+    ])
+
+
+def strip_tts_tags(text):
+    """TTS용 [] 감정 태그 제거"""
+    return re.sub(r'\[[^\]]*\]', '', text or '').strip()
+
+
+def stream_concat(audio_paths, output_path, pages_text=None, intro_ms=3000, gap_ms=500,
+                  outro_ms=3000, bitrate=PUBLISH_BITRATE, format=PUBLISH_FORMAT):
+    """
+    페이지 오디오들을 순서대로 디코딩하여 하나의 인코더로 바로 흘려보냄.
+    각 페이지는 한 번만 디코딩되고, 디코딩된 PCM은 인코더에 전달된 직후 해제됨.
+
+    인코더 포맷은 첫 페이지의 frame_rate/channels를 따르고
+    이후 페이지는 그 포맷으로 변환하여 기록함.
+    format=INTERMEDIATE_FORMAT(bitrate=None)이면 무손실 마스터를 만듦.
+
+    Returns:
+        tuple: (timestamps_info, total_duration_ms)
+    """
+    if not audio_paths:
+        raise ValueError("합칠 오디오 파일이 없습니다.")
+
+    encoder = None
+    timestamps_info = []
+    cumulative_time = intro_ms
+
+    try:
+        for idx, path in enumerate(audio_paths):
+            if encoder is None:
+                data, rate = codec.decode(path)
+                encoder = PCMEncoder(output_path, rate, data.shape[1], bitrate=bitrate, format=format).start()
+                encoder.write_silence(intro_ms)
+            else:
+                data, _ = codec.decode(path, frame_rate=encoder.frame_rate, channels=encoder.channels)
+
+            if idx > 0:
+                encoder.write_silence(gap_ms)
+                cumulative_time += gap_ms
+
+            page_start = cumulative_time
+            encoder.write_pcm(data.tobytes())
+            duration = round(len(data) * 1000 / encoder.frame_rate)
+            del data
+            cumulative_time += duration
+
+            timestamp_data = {
+                'pageIndex': idx,
+                'startTime': page_start,
+                'endTime': cumulative_time,
+            }
+            if pages_text and idx < len(pages_text):
+                timestamp_data['text'] = strip_tts_tags(pages_text[idx])
+            timestamps_info.append(timestamp_data)
+
+        encoder.write_silence(outro_ms)
+        encoder.close()
+    except Exception:
+        if encoder is not None:
+            encoder.abort()
+        raise
+
+    return timestamps_info, cumulative_time + outro_ms
+
+
+# ==================== EDL(편집 결정 목록) 렌더러 ====================
+#
+# plan = {
+#     'sequence': [   # 순서대로 이어 붙는 항목 (뒤 항목의 위치를 밀어냄)
+#         {'type': 'audio', 'path': ..., 'start_ms': 0, 'end_ms': None, 'gain_db': 0,
+#          'timestamp': {'pageIndex': 0, 'text': ...}},   # timestamp가 있으면 audio_timestamps 항목 생성
+#         {'type': 'silence', 'ms': 500},
+#     ],
+#     'beds': [       # 타임라인 위에 겹쳐 재생 (BGM, 오버레이 SFX) — 위치를 밀지 않음
+#         {'path': ..., 'gain_db': -12, 'start_page': 0, 'end_page': 3, 'fade_ms': 500, 'loop': True},
+#         {'path': ..., 'gain_db': -3, 'at_page': 2, 'loop': False, 'timestamp': {'type': 'sfx', ...}},
+#     ],
+# }
+#
+# bed 위치: start_ms/end_ms(출력 기준 ms)가 우선,
+#   start_page → 이전 페이지 endTime (0이면 처음부터), end_page → 해당 페이지 endTime (-1이면 마지막 페이지),
+#   at_page → 해당 페이지 startTime, loop=False이고 끝이 없으면 소스 길이만큼.
+#
+# source_loader(path, frame_rate=None) → ((frames, ch) int16 배열, frame_rate)를 넘기면
+# 모든 소스를 디코딩 대신 그 배열(예: book.pcm_cache의 메모리 매핑 사이드카)에서 읽음.
+
+def probe_audio(path):
+    """
+    (frames, frame_rate, channels). 헤더만 읽어서 측정 (book.audio_probe — WAV 헤더, MP3 Xing/LAME/프레임 스캔).
+    """
+    from book.audio_probe import probe
+    info = probe(path)
+    return info['samples'], info['sample_rate'], info['channels']
+
+
+def _source_reader(path, frame_rate, decoded=None, streams=None):
+    """스트리밍 소스 (codec.Reader). streams(dict)가 있으면 경로별로 재사용 — 같은 마스터의 연속 구간은 seek 없이 이어 읽음"""
+    if decoded is not None and path in decoded:
+        return None
+    if streams is not None and path in streams:
+        return streams[path]
+    reader = codec.open_reader(path, frame_rate)
+    if streams is not None and reader is not None:
+        streams[path] = reader
+    return reader
+
+
+def _iter_source_frames(path, start_frame, n_frames, frame_rate, channels, decoded=None, streams=None):
+    """
+    소스 오디오의 [start_frame, start_frame+n_frames) 구간을 출력 포맷 (n, ch) int16 블록으로 yield.
+    WAV(16bit, 같은 frame_rate)와 book.codec이 읽을 수 있는 포맷(MP3/FLAC/OGG, 같은 frame_rate)은
+    파일에서 블록 단위로 읽음 — 메모리는 블록 1개 분량.
+    리샘플이 필요하거나 인프로세스로 읽을 수 없는 소스만 한 번 디코딩 후 잘라서 전달.
+    decoded(dict)를 넘기면 그 디코딩 결과를 경로별로 보관 (같은 소스의 여러 구간을 읽을 때 1회만 디코딩),
+    streams(dict)를 넘기면 열린 Reader를 재사용 (닫는 것은 호출자 몫).
+    길이가 모자라면 0으로 채움.
+    """
+    remaining = n_frames
+    wav_ok = False
+    if str(path).lower().endswith('.wav'):
+        try:
+            w = wave.open(str(path), 'rb')
+            wav_ok = w.getsampwidth() == SAMPLE_WIDTH and w.getframerate() == frame_rate
+            if not wav_ok:
+                w.close()
+        except (wave.Error, EOFError):
+            wav_ok = False
+
+    if wav_ok:
+        with w:
+            src_channels = w.getnchannels()
+            if start_frame < w.getnframes():
+                w.setpos(start_frame)
+                while remaining > 0:
+                    raw = w.readframes(min(remaining, RENDER_BLOCK_FRAMES))
+                    if not raw:
+                        break
+                    block = np.frombuffer(raw, dtype=np.int16).reshape(-1, src_channels)
+                    remaining -= len(block)
+                    yield codec.conform_channels(block, channels)
+    elif (reader := _source_reader(path, frame_rate, decoded, streams)) is not None:
+        try:
+            end = min(start_frame + n_frames, len(reader))
+            for i in range(start_frame, end, RENDER_BLOCK_FRAMES):
+                block = reader[i:min(i + RENDER_BLOCK_FRAMES, end)]
+                remaining -= len(block)
+                yield codec.conform_channels(block, channels)
+        finally:
+            if streams is None:
+                reader.close()
+    else:
+        data = decoded.get(path) if decoded is not None else None
+        if data is None:
+            data, _ = codec.decode(path, frame_rate=frame_rate, channels=channels)
+            if decoded is not None:
+                decoded[path] = data
+        data = data[start_frame:start_frame + n_frames]
+        for i in range(0, len(data), RENDER_BLOCK_FRAMES):
+            block = data[i:i + RENDER_BLOCK_FRAMES]
+            remaining -= len(block)
+            yield block
+
+    while remaining > 0:
+        n = min(remaining, RENDER_BLOCK_FRAMES)
+        remaining -= n
+        yield np.zeros((n, channels), dtype=np.int16)
+
+
+def _iter_array_frames(data, start_frame, n_frames, channels):
+    """디코딩된 (n, ch) int16 배열의 구간을 블록 단위로 yield (모자라면 0으로 채움)"""
+    end = min(start_frame + n_frames, len(data))
+    for i in range(start_frame, end, RENDER_BLOCK_FRAMES):
+        yield codec.conform_channels(np.asarray(data[i:min(i + RENDER_BLOCK_FRAMES, end)]), channels)
+    remaining = n_frames - max(0, end - start_frame)
+    while remaining > 0:
+        n = min(remaining, RENDER_BLOCK_FRAMES)
+        remaining -= n
+        yield np.zeros((n, channels), dtype=np.int16)
+
+
+def _db_to_gain(db):
+    return float(10 ** ((db or 0.0) / 20.0))
+
+
+class _Bed:
+    """
+    bed 소스 + 출력 타임라인상의 위치 [start, end) (프레임).
+    소스는 (n, ch) int16 배열(메모리 매핑 포함) 또는 codec.Reader — 블록마다 필요한 조각만 읽으므로
+    루프 BGM도 전체 길이 복사본을 만들지 않음.
+    """
+
+    def __init__(self, spec, data, start, end):
+        self.spec = spec
+        self.data = data  # 배열 또는 codec.Reader (슬라이스 읽기) — gain은 겹치는 구간에만 적용
+        self.gain = np.float32(_db_to_gain(spec.get('gain_db')))
+        self.start = start
+        self.end = end
+        self.loop = spec.get('loop', True)
+        self.fade = 0
+
+    def set_fade(self, fade_frames):
+        """페이드 인/아웃 길이 (구간 길이의 1/4 이하)"""
+        self.fade = max(0, min(fade_frames, (self.end - self.start) // 4))
+
+    def mix_into(self, out, pos):
+        """out[(n, ch) float32] 블록(출력 위치 pos)에 겹치는 구간을 더함 (소스는 연속 구간 슬라이스로 읽음)"""
+        lo = max(pos, self.start)
+        hi = min(pos + len(out), self.end)
+        length = len(self.data)
+        if lo >= hi or not length:
+            return
+        offset = lo - self.start
+        if not self.loop:
+            hi = min(hi, self.start + length)
+            if lo >= hi:
+                return
+        count = hi - lo
+
+        # 루프 경계에서 나뉘는 조각 단위로 복사 (블록당 보통 1~2개)
+        target = out[lo - pos:hi - pos]
+        env = None
+        if self.fade:
+            span = self.end - self.start
+            if offset < self.fade or offset + count > span - self.fade:
+                rel = np.arange(offset, offset + count, dtype=np.float32)
+                env = np.minimum(1.0, np.minimum(rel / self.fade, (span - rel) / self.fade))
+        done = 0
+        while done < count:
+            src_pos = (offset + done) % length
+            take = min(count - done, length - src_pos)
+            piece = codec.conform_channels(np.asarray(self.data[src_pos:src_pos + take]), out.shape[1]).astype(np.float32)
+            piece *= self.gain
+            if env is not None:
+                piece *= env[done:done + take, None]
+            target[done:done + take] += piece
+            done += take
+
+
+def master_sequence(master_path, timestamps, inserts=None):
+    """
+    병합된 마스터 + 페이지 타임스탬프 → sequence.
+    인트로/페이지 간격/아웃트로는 마스터의 해당 구간 그대로, 페이지 구간에는 timestamp 지정.
+
+    inserts: {페이지 위치(0-based): [sequence 항목, ...]} — 해당 페이지 직전에 삽입 (SFX 등)
+    """
+    inserts = inserts or {}
+    pages = sorted((t for t in timestamps or [] if t.get('type') != 'sfx'), key=lambda t: t.get('startTime', 0))
+    items = []
+    pos = 0
+    for idx, ts in enumerate(pages):
+        start, end = int(ts.get('startTime', 0)), int(ts.get('endTime', 0))
+        if start > pos:
+            items.append({'type': 'audio', 'path': master_path, 'start_ms': pos, 'end_ms': start})
+        items.extend(inserts.get(idx, []))
+        marker = {k: v for k, v in ts.items() if k not in ('startTime', 'endTime')}
+        items.append({'type': 'audio', 'path': master_path, 'start_ms': start, 'end_ms': end, 'timestamp': marker})
+        pos = max(pos, end)
+    items.append({'type': 'audio', 'path': master_path, 'start_ms': pos, 'end_ms': None})
+    return items
+
+
+def render_plan(plan, output_path, bitrate=PUBLISH_BITRATE, format=PUBLISH_FORMAT, source_loader=None, renditions=None):
+    """
+    EDL을 단일 스트리밍 패스로 렌더링하여 하나의 인코더로 기록.
+
+    1) 레이아웃: 각 sequence 항목의 길이(WAV는 헤더)로 위치를 계산 → 타임스탬프/bed 위치를 해석적으로 결정
+    2) 렌더: 항목을 블록 단위로 읽으면서 해당 블록과 겹치는 bed만 더해 인코더에 전달
+    SFX 삽입 시 잘라 붙이기/타임스탬프 후처리가 없고, 작업량은 출력 샘플 수에 비례함.
+    sequence/bed 소스는 블록마다 필요한 구간만 파일에서 읽고(codec.Reader, 루프 BGM은 소스 위치만 되감음)
+    페이드는 블록별 envelope로 적용 → 메모리는 에피소드 길이/bed 개수와 무관하게 블록 몇 개 분량.
+    리샘플이 필요한 소스만 예외적으로 전체 디코딩.
+
+    출력 포맷은 plan의 frame_rate/channels, 없으면 첫 audio 항목의 frame_rate와
+    sequence/bed 중 최대 채널 수를 따름.
+
+    source_loader가 있으면 소스를 디코딩하지 않고 로더가 주는 PCM 배열을 잘라 씀
+    (재믹싱: 마스터/BGM/SFX 모두 메모리 매핑 → float 합산 + 인코딩 1회).
+
+    renditions([{path, format, bitrate, channels}])가 있으면 같은 PCM 블록을 렌디션 인코더에도 기록 (book.renditions).
+
+    Returns:
+        tuple: (timestamps, total_ms) — timestamps는 startTime 순으로 정렬된
+        timestamp 지정 항목들 ({..., 'startTime', 'endTime'})
+    """
+    sequence = plan.get('sequence') or []
+    bed_specs = plan.get('beds') or []
+    if not any(item.get('type', 'audio') == 'audio' for item in sequence):
+        raise ValueError("렌더링할 오디오 항목이 없습니다.")
+
+    probes = {}
+    arrays = {}
+
+    def _probe(path):
+        if path not in probes:
+            if source_loader is not None:
+                data, rate = source_loader(path)
+                arrays[(path, rate)] = data
+                probes[path] = (len(data), rate, data.shape[1])
+            else:
+                probes[path] = probe_audio(path)
+        return probes[path]
+
+    def _array(path, rate):
+        """source_loader 배열 (출력 frame_rate 기준)"""
+        if (path, rate) not in arrays:
+            arrays[(path, rate)] = source_loader(path, rate)[0]
+        return arrays[(path, rate)]
+
+    first_audio = next(item for item in sequence if item.get('type', 'audio') == 'audio')
+    _, first_rate, first_channels = _probe(first_audio['path'])
+    frame_rate = int(plan.get('frame_rate') or first_rate)
+    channels = plan.get('channels')
+    if not channels:
+        if source_loader is not None:  # bed는 출력 frame_rate 배열만 필요 (원본 rate 사이드카 생략)
+            channels = max([first_channels] + [_array(b['path'], frame_rate).shape[1] for b in bed_specs])
+        else:
+            channels = max([first_channels] + [_probe(b['path'])[2] for b in bed_specs])
+    channels = int(channels)
+
+    def ms_to_frames(ms):
+        return int(round((ms or 0) * frame_rate / 1000.0))
+
+    def frames_to_ms(frames):
+        return int(round(frames * 1000.0 / frame_rate))
+
+    # 1) 레이아웃
+    layout = []  # (item, out_start, out_frames, src_start)
+    pos = 0
+    for item in sequence:
+        if item.get('type', 'audio') == 'silence':
+            frames = ms_to_frames(item.get('ms', 0))
+            layout.append((item, pos, frames, 0))
+        else:
+            src_frames, src_rate, _ = _probe(item['path'])
+            total_src = int(round(src_frames * frame_rate / src_rate))
+            start = min(ms_to_frames(item.get('start_ms', 0)), total_src)
+            end = total_src if item.get('end_ms') is None else min(ms_to_frames(item['end_ms']), total_src)
+            frames = max(0, end - start)
+            layout.append((item, pos, frames, start))
+        pos += frames
+    total_frames = pos
+
+    timestamps = []
+    pages = {}
+    for item, start, frames, _ in layout:
+        marker = item.get('timestamp')
+        if marker is not None:
+            entry = dict(marker, startTime=frames_to_ms(start), endTime=frames_to_ms(start + frames))
+            timestamps.append(entry)
+            if 'pageIndex' in marker and marker.get('type') != 'sfx':
+                pages[marker['pageIndex']] = (start, start + frames)
+    page_order = sorted(pages)
+
+    def page_edge(page_idx, edge):
+        """페이지 시작/끝 프레임. 범위 밖(-1 포함)이면 마지막 페이지 기준"""
+        if not page_order:
+            return 0 if edge == 'start' else total_frames
+        if page_idx not in pages:
+            page_idx = page_order[-1] if page_idx < 0 or page_idx > page_order[-1] else \
+                min(page_order, key=lambda p: abs(p - page_idx))
+        return pages[page_idx][0 if edge == 'start' else 1]
+
+    beds = []
+    streams = {}  # sequence 스트리밍 소스 (경로별 1개)
+    bed_readers = []  # bed 스트리밍 소스 (bed마다 읽기 위치가 달라 별도로 엶)
+    for spec in bed_specs:
+        if source_loader is not None:
+            data = _array(spec['path'], frame_rate)
+        else:
+            data = codec.open_reader(spec['path'], frame_rate)
+            if data is not None:
+                bed_readers.append(data)
+            else:
+                data, _ = codec.decode(spec['path'], frame_rate=frame_rate, channels=channels)
+
+        if spec.get('start_ms') is not None:
+            start = ms_to_frames(spec['start_ms'])
+        elif spec.get('at_page') is not None:
+            start = page_edge(spec['at_page'], 'start')
+        elif spec.get('start_page'):
+            start = page_edge(spec['start_page'] - 1, 'end')
+        else:
+            start = 0
+
+        if spec.get('end_ms') is not None:
+            end = ms_to_frames(spec['end_ms'])
+        elif not spec.get('loop', True):
+            end = start + len(data)
+        elif spec.get('end_page') is not None:
+            end = page_edge(spec['end_page'], 'end')
+        else:
+            end = total_frames
+        end = min(end, total_frames)
+        if start >= end:
+            print(f"⚠️ bed 구간이 비어 있어 건너뜀: {os.path.basename(str(spec['path']))}")
+            continue
+
+        bed = _Bed(spec, data, start, end)
+        bed.set_fade(ms_to_frames(spec.get('fade_ms', 500)))
+        beds.append(bed)
+        marker = spec.get('timestamp')
+        if marker is not None:
+            timestamps.append(dict(marker, startTime=frames_to_ms(start), endTime=frames_to_ms(end)))
+
+    # 2) 렌더 (블록 단위, 겹치는 bed만 합산)
+    decoded = {}  # 스트리밍할 수 없는(리샘플 필요 등) 소스의 디코딩 결과 (렌더 1회 동안만 보관)
+    encoder = open_encoder(output_path, frame_rate, channels, bitrate=bitrate, format=format, renditions=renditions)
+    try:
+        encoder.start()
+        for item, start, frames, src_start in layout:
+            if not frames:
+                continue
+            if item.get('type', 'audio') == 'silence':
+                blocks = (np.zeros((min(RENDER_BLOCK_FRAMES, frames - i), channels), dtype=np.int16)
+                          for i in range(0, frames, RENDER_BLOCK_FRAMES))
+            elif source_loader is not None:
+                blocks = _iter_array_frames(_array(item['path'], frame_rate), src_start, frames, channels)
+            else:
+                blocks = _iter_source_frames(item['path'], src_start, frames, frame_rate, channels, decoded, streams)
+            gain = _db_to_gain(item.get('gain_db'))
+            block_pos = start
+            for block in blocks:
+                active = [b for b in beds if b.start < block_pos + len(block) and b.end > block_pos]
+                if active or gain != 1.0:
+                    mixed = block.astype(np.float32)
+                    if gain != 1.0:
+                        mixed *= gain
+                    for bed in active:
+                        bed.mix_into(mixed, block_pos)
+                    block = np.clip(mixed, -32768, 32767).astype(np.int16)
+                encoder.write_pcm(block.tobytes())
+                block_pos += len(block)
+        encoder.close()
+    except Exception:
+        encoder.abort()
+        raise
+    finally:
+        for reader in bed_readers + list(streams.values()):
+            reader.close()
+
+    timestamps.sort(key=lambda t: t.get('startTime', 0))
+    return timestamps, frames_to_ms(total_frames)
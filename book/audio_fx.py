@@ -0,0 +1,191 @@
+"""
+서버 사이드 WebAudio 효과 엔진 (webaudio-effects.js 프리셋 재현)
+- 모든 채널을 (channels, frames) float32 2-D 배열 하나로 처리 (채널별 연속 메모리 → 블록 슬라이스가 빠름)
+- 필터 계수(SOS)와 트레몰로 변조 테이블은 (프리셋, sample_rate)별로 캐시
+- 딜레이/피드백은 재귀 comb 필터 하나로 처리 (기존 최대 8탭 합과 동일한 응답)
+"""
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import butter, sosfilt
+
+DELAY_MAX_TAPS = 8  # 피드백 반복 최대 횟수
+DELAY_MIN_GAIN = 0.01  # 이보다 작은 피드백 탭은 생략
+DELAY_DIRECT_MAX_SAMPLES = 2048  # 이보다 짧은 딜레이는 재귀 블록 대신 탭 합 직접 계산
+TREMOLO_TABLE_MAX_SECONDS = 30  # 변조 테이블 반복 단위가 이보다 길면 캐시하지 않고 직접 계산
+
+# 31개 프리셋 파라미터 (webaudio-effects.js와 1:1 매칭)
+WEBAUDIO_PRESETS = {
+    "normal": {"filter_type": "allpass", "freq": 1000, "Q": 1, "delay": 0, "feedback": 0, "tremolo_rate": 0, "tremolo_depth": 0},
+    "phone": {"filter_type": "highpass", "freq": 2000, "Q": 8, "delay": 0, "feedback": 0, "tremolo_rate": 0, "tremolo_depth": 0},
+    "cave": {"filter_type": "lowpass", "freq": 600, "Q": 6, "delay": 0.45, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
+    "underwater": {"filter_type": "lowpass", "freq": 400, "Q": 2, "delay": 0.15, "feedback": 0.3, "tremolo_rate": 5, "tremolo_depth": 0.6},
+    "robot": {"filter_type": "highpass", "freq": 1200, "Q": 1, "delay": 0, "feedback": 0, "tremolo_rate": 30, "tremolo_depth": 1.0},
+    "ghost": {"filter_type": "bandpass", "freq": 500, "Q": 9, "delay": 0.5, "feedback": 0.8, "tremolo_rate": 3, "tremolo_depth": 0.7},
+    "child": {"filter_type": "allpass", "freq": 1500, "Q": 2, "delay": 0, "feedback": 0, "tremolo_rate": 15, "tremolo_depth": 0.3},
+    "old": {"filter_type": "lowpass", "freq": 700, "Q": 3, "delay": 0.2, "feedback": 0.5, "tremolo_rate": 2, "tremolo_depth": 0.2},
+    "echo": {"filter_type": "allpass", "freq": 1000, "Q": 1, "delay": 0.6, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
+    "protoss": {"filter_type": "allpass", "freq": 1100, "Q": 6, "delay": 0.09, "feedback": 0.42, "tremolo_rate": 0, "tremolo_depth": 0},
+    "whisper": {"filter_type": "bandpass", "freq": 1800, "Q": 4, "delay": 0.03, "feedback": 0.2, "tremolo_rate": 4, "tremolo_depth": 0.4},
+    "radio": {"filter_type": "bandpass", "freq": 1800, "Q": 2, "delay": 0, "feedback": 0, "tremolo_rate": 6.5, "tremolo_depth": 0.7},
+    "megaphone": {"filter_type": "highpass", "freq": 900, "Q": 5, "delay": 0.05, "feedback": 0.35, "tremolo_rate": 0, "tremolo_depth": 0},
+    "demon": {"filter_type": "lowpass", "freq": 800, "Q": 3, "delay": 0.07, "feedback": 0.6, "tremolo_rate": 120, "tremolo_depth": 0.9},
+    "angel": {"filter_type": "highpass", "freq": 800, "Q": 5, "delay": 0.35, "feedback": 0.65, "tremolo_rate": 1.5, "tremolo_depth": 0.4},
+    "vader": {"filter_type": "bandpass", "freq": 400, "Q": 8, "delay": 0.04, "feedback": 0.4, "tremolo_rate": 80, "tremolo_depth": 0.6},
+    "giant": {"filter_type": "lowpass", "freq": 300, "Q": 4, "delay": 0.6, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
+    "tiny": {"filter_type": "highpass", "freq": 2200, "Q": 6, "delay": 0.02, "feedback": 0.3, "tremolo_rate": 8, "tremolo_depth": 0.4},
+    "possessed": {"filter_type": "bandpass", "freq": 600, "Q": 5, "delay": 0.07, "feedback": 0.7, "tremolo_rate": 100, "tremolo_depth": 0.9},
+    "horror": {"filter_type": "bandpass", "freq": 620, "Q": 14, "delay": 0.38, "feedback": 0.78, "tremolo_rate": 2.8, "tremolo_depth": 0.85},
+    "helium": {"filter_type": "highpass", "freq": 2900, "Q": 7, "delay": 0.015, "feedback": 0.18, "tremolo_rate": 12, "tremolo_depth": 0.5},
+    "timewarp": {"filter_type": "lowpass", "freq": 580, "Q": 9, "delay": 0.42, "feedback": 0.89, "tremolo_rate": 0.25, "tremolo_depth": 0.8},
+    "glitch": {"filter_type": "bandpass", "freq": 1300, "Q": 22, "delay": 0.008, "feedback": 0.35, "tremolo_rate": 280, "tremolo_depth": 0.98},
+    "choir": {"filter_type": "allpass", "freq": 1600, "Q": 5, "delay": 0.28, "feedback": 0.72, "tremolo_rate": 1.1, "tremolo_depth": 0.5},
+    "hyperpop": {"filter_type": "highpass", "freq": 3200, "Q": 14, "delay": 0.018, "feedback": 0.42, "tremolo_rate": 220, "tremolo_depth": 0.9},
+    "vaporwave": {"filter_type": "lowpass", "freq": 3400, "Q": 2, "delay": 0.38, "feedback": 0.78, "tremolo_rate": 0.35, "tremolo_depth": 0.8},
+    "darksynth": {"filter_type": "bandpass", "freq": 950, "Q": 11, "delay": 0.24, "feedback": 0.70, "tremolo_rate": 130, "tremolo_depth": 0.55},
+    "lofi-girl": {"filter_type": "lowpass", "freq": 4200, "Q": 1.8, "delay": 0.45, "feedback": 0.62, "tremolo_rate": 0.12, "tremolo_depth": 0.35},
+    "bitcrush-voice": {"filter_type": "bandpass", "freq": 2200, "Q": 28, "delay": 0.004, "feedback": 0.25, "tremolo_rate": 420, "tremolo_depth": 0.98},
+    "portal": {"filter_type": "allpass", "freq": 750, "Q": 18, "delay": 0.65, "feedback": 0.94, "tremolo_rate": 0.7, "tremolo_depth": 0.9},
+    "neoncity": {"filter_type": "bandpass", "freq": 1150, "Q": 9, "delay": 0.52, "feedback": 0.80, "tremolo_rate": 2.8, "tremolo_depth": 0.45},
+    "ghost-in-machine": {"filter_type": "bandpass", "freq": 780, "Q": 20, "delay": 0.09, "feedback": 0.58, "tremolo_rate": 190, "tremolo_depth": 0.88},
+}
+
+
+@lru_cache(maxsize=256)
+def preset_sos(effect_name, sample_rate):
+    """프리셋의 2차 Butterworth 필터 계수 (scipy butter, WebAudio BiquadFilter 재현). allpass면 None"""
+    preset = WEBAUDIO_PRESETS[effect_name]
+    filter_type, Q = preset["filter_type"], preset["Q"]
+    nyq = sample_rate / 2.0
+    freq = min(preset["freq"], nyq - 1)
+
+    if filter_type == "lowpass":
+        sos = butter(2, freq / nyq, btype='low', output='sos')
+    elif filter_type == "highpass":
+        sos = butter(2, freq / nyq, btype='high', output='sos')
+    elif filter_type == "bandpass":
+        low = max(freq / (Q if Q > 0 else 1), 20) / nyq
+        high = min(freq * (Q if Q > 0 else 1), nyq - 1) / nyq
+        if low >= high:
+            low = max(20 / nyq, 0.001)
+            high = min(0.999, freq * 2 / nyq)
+        sos = butter(2, [low, high], btype='band', output='sos')
+    else:
+        return None  # allpass = 통과
+
+    return sos  # float64 유지 (고 Q bandpass는 float32 계수로 불안정)
+
+
+@lru_cache(maxsize=64)
+def _delay_taps(feedback_gain):
+    """사용할 피드백 탭 수: gain^i >= 0.01 인 i (최대 DELAY_MAX_TAPS)"""
+    taps = 0
+    for i in range(1, DELAY_MAX_TAPS + 1):
+        if feedback_gain ** i < DELAY_MIN_GAIN:
+            break
+        taps = i
+    return taps
+
+
+def apply_delay(samples, sample_rate, delay_time, feedback_gain):
+    """
+    딜레이 + 피드백: y[n] = sum_{i=0..K} g^i * x[n - i*D] 를 재귀식으로 계산
+        y[n] = x[n] - g^(K+1) * x[n - (K+1)*D] + g * y[n - D]
+    D 길이 블록 단위로 진행하므로 탭마다 전체 길이 버퍼를 만들지 않음.
+    D가 아주 짧으면(블록 수 과다) 탭 합을 scratch 버퍼 하나로 직접 계산.
+    채널별 최대값이 1을 넘으면 정규화 (클리핑 방지).
+    """
+    delay_samples = int(delay_time * sample_rate)
+    taps = _delay_taps(feedback_gain) if delay_samples > 0 else 0
+    if not taps:
+        return samples
+
+    n = samples.shape[1]
+    if delay_samples < DELAY_DIRECT_MAX_SAMPLES:
+        # 짧은 딜레이는 블록 수가 너무 많아지므로 탭 합을 직접 계산 (최대 K번의 전체 길이 연산)
+        output = samples.copy()
+        scratch = np.empty_like(samples)
+        for i in range(1, taps + 1):
+            offset = i * delay_samples
+            if offset >= n:
+                break
+            tap = scratch[:, :n - offset]
+            np.multiply(samples[:, :n - offset], np.float32(feedback_gain ** i), out=tap)
+            output[:, offset:] += tap
+        return _normalize_peak(output)
+
+    g = np.float32(feedback_gain)
+    g_cancel = np.float32(feedback_gain ** (taps + 1))
+    cancel = (taps + 1) * delay_samples  # D의 배수 → 블록 경계와 일치
+    output = samples.copy()
+    for start in range(delay_samples, n, delay_samples):
+        end = min(start + delay_samples, n)
+        block = output[:, start:end]
+        block += g * output[:, start - delay_samples:end - delay_samples]
+        if start >= cancel:
+            block -= g_cancel * samples[:, start - cancel:end - cancel]
+    return _normalize_peak(output)
+
+
+def _normalize_peak(output):
+    """클리핑 방지: 채널별 최대값이 1을 넘으면 그 채널만 정규화"""
+    peak = np.maximum(output.max(axis=1), -output.min(axis=1))
+    if (peak > 1.0).any():
+        output /= np.maximum(peak, 1.0)[:, None]
+    return output
+
+
+@lru_cache(maxsize=256)
+def tremolo_table(rate, depth, sample_rate):
+    """
+    트레몰로 변조값 1 - depth*0.5*(1+sin(2π·rate·t))의 반복 단위 테이블.
+    rate/sample_rate로 정확히 되풀이되는 최소 샘플 길이만큼만 계산. 너무 길면 None
+    """
+    frac = Fraction(rate).limit_denominator(1000)
+    period = sample_rate * frac.denominator // math.gcd(frac.numerator, sample_rate * frac.denominator)
+    if period > TREMOLO_TABLE_MAX_SECONDS * sample_rate:
+        return None
+    t = np.arange(period) / sample_rate
+    table = (1.0 - depth * 0.5 * (1.0 + np.sin(2 * np.pi * float(frac) * t))).astype(np.float32)
+    table.setflags(write=False)
+    return table
+
+
+def apply_tremolo(samples, sample_rate, rate, depth):
+    """트레몰로 (AM 변조) — 캐시된 테이블을 (채널, 반복 횟수, 테이블 길이)로 브로드캐스트하여 in-place 곱"""
+    if rate <= 0 or depth <= 0:
+        return samples
+
+    n = samples.shape[1]
+    table = tremolo_table(rate, depth, sample_rate)
+    if table is None:
+        t = np.arange(n) / sample_rate
+        samples *= (1.0 - depth * 0.5 * (1.0 + np.sin(2 * np.pi * rate * t))).astype(np.float32)
+        return samples
+
+    period = len(table)
+    full = n - n % period
+    if full:
+        view = samples[:, :full].reshape(samples.shape[0], -1, period)  # 연속 배열이므로 view
+        view *= table
+    if n > full:
+        samples[:, full:] *= table[:n - full]
+    return samples
+
+
+def apply_preset(samples, sample_rate, effect_name):
+    """
+    (channels, frames) float32 (-1~1) 배열에 프리셋 체인 적용: 필터 → 딜레이 → 트레몰로.
+    입력 배열은 변경하지 않음.
+    """
+    preset = WEBAUDIO_PRESETS[effect_name]
+    sos = preset_sos(effect_name, sample_rate)
+    if sos is not None:
+        output = sosfilt(sos, samples, axis=-1).astype(np.float32)
+    else:
+        output = np.array(samples, dtype=np.float32, copy=True)
+
+    output = apply_delay(output, sample_rate, preset["delay"], preset["feedback"])
+    return apply_tremolo(output, sample_rate, preset["tremolo_rate"], preset["tremolo_depth"])
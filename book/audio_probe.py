@@ -0,0 +1,172 @@
+"""
+오디오 길이/포맷 조회 (디코딩 없음)
+- WAV: RIFF 헤더
+- MP3: Xing/Info(+LAME 태그의 encoder delay/padding) 또는 VBRI 헤더의 프레임 수,
+       헤더가 없으면 프레임 헤더만 따라가며 샘플 수 합산 (book.mp3_index.iter_frames)
+- 그 외 포맷: libsndfile 헤더(book.codec) → ffprobe(mediainfo) → 실패 시에만 디코딩
+"""
+import mmap
+import os
+import struct
+import wave
+
+from book import mp3_index
+
+
+def _probe_wav(path):
+    with wave.open(str(path), 'rb') as w:
+        frames, rate = w.getnframes(), w.getframerate()
+        return {
+            'format': 'wav',
+            'sample_rate': rate,
+            'channels': w.getnchannels(),
+            'samples': frames,
+            'duration_ms': int(frames * 1000 // rate) if rate else 0,
+            'method': 'header',
+        }
+
+
+def _xing_info(buf, pos, header):
+    """첫 프레임의 Xing/Info 또는 VBRI 헤더 → (frames, delay, padding). 없으면 None"""
+    _, samples, _, channels = header
+    mpeg1 = samples == 1152
+    side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+    xing = pos + 4 + side_info
+    tag = bytes(buf[xing:xing + 4])
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', buf[xing + 4:xing + 8])[0]
+        cursor = xing + 8
+        frames = None
+        if flags & 0x1:
+            frames = struct.unpack('>I', buf[cursor:cursor + 4])[0]
+            cursor += 4
+        if flags & 0x2:
+            cursor += 4
+        if flags & 0x4:
+            cursor += 100
+        if flags & 0x8:
+            cursor += 4
+        if frames is None:
+            return None
+        delay = padding = 0
+        # LAME 태그 (인코더 문자열 9byte 이후 21byte 지점에 12bit delay + 12bit padding)
+        if bytes(buf[cursor:cursor + 4]) in (b'LAME', b'Lavf', b'Lavc') and cursor + 24 <= len(buf):
+            d = buf[cursor + 21:cursor + 24]
+            delay = (d[0] << 4) | (d[1] >> 4)
+            padding = ((d[1] & 0x0F) << 8) | d[2]
+        return frames, delay, padding
+    vbri = pos + 36
+    if bytes(buf[vbri:vbri + 4]) == b'VBRI':
+        delay = struct.unpack('>H', buf[vbri + 6:vbri + 8])[0]
+        frames = struct.unpack('>I', buf[vbri + 14:vbri + 18])[0]
+        return frames, delay, 0
+    return None
+
+
+def _probe_mp3(path):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        start = mp3_index.audio_start(buf)
+        first = next(mp3_index.iter_frames(buf, start=start), None)
+        if first is None:
+            return None
+        pos, header = first[0], first[1:]
+        _, spf, rate, channels = header
+        info = _xing_info(buf, pos, header)
+        if info:
+            frames, delay, padding = info
+            samples = max(0, frames * spf - delay - padding)
+            method = 'xing'
+        else:
+            samples = sum(frame[2] for frame in mp3_index.iter_frames(buf))
+            method = 'scan'
+    return {
+        'format': 'mp3',
+        'sample_rate': rate,
+        'channels': channels,
+        'samples': samples,
+        'duration_ms': int(samples * 1000 // rate),
+        'method': method,
+    }
+
+
+def _probe_soundfile(path):
+    from book import codec
+    if not codec.can_decode(path):
+        return None
+    info = codec.sf.info(str(path))
+    if not info.samplerate or not info.frames:
+        return None
+    return {
+        'format': info.format.lower(),
+        'sample_rate': info.samplerate,
+        'channels': info.channels,
+        'samples': info.frames,
+        'duration_ms': int(info.frames * 1000 // info.samplerate),
+        'method': 'header',
+    }
+
+
+def _probe_ffprobe(path):
+    from pydub.utils import mediainfo
+    info = mediainfo(str(path))
+    rate = int(info.get('sample_rate') or 0)
+    duration = float(info.get('duration') or 0)
+    if not rate or not duration:
+        return None
+    return {
+        'format': info.get('format_name', '').split(',')[0],
+        'sample_rate': rate,
+        'channels': int(info.get('channels') or 0),
+        'samples': int(round(duration * rate)),
+        'duration_ms': int(duration * 1000),
+        'method': 'ffprobe',
+    }
+
+
+def _probe_decode(path):
+    from book import codec
+    data, rate = codec.decode(path)
+    return {
+        'format': os.path.splitext(str(path))[1].lstrip('.').lower(),
+        'sample_rate': rate,
+        'channels': data.shape[1],
+        'samples': len(data),
+        'duration_ms': round(len(data) * 1000 / rate),
+        'method': 'decode',
+    }
+
+
+def probe(path):
+    """
+    오디오 파일 정보 dict:
+    {format, sample_rate, channels, samples, duration_ms, method('header'|'xing'|'scan'|'ffprobe'|'decode')}
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    result = None
+    try:
+        if ext == '.wav':
+            result = _probe_wav(path)
+        elif ext == '.mp3':
+            result = _probe_mp3(path)
+    except (wave.Error, EOFError, ValueError, struct.error):
+        result = None
+    if result is None:
+        try:
+            result = _probe_soundfile(path)
+        except Exception:
+            result = None
+    if result is None:
+        try:
+            result = _probe_ffprobe(path)
+        except Exception:
+            result = None
+    return result or _probe_decode(path)
+
+
+def duration_ms(path):
+    return probe(path)['duration_ms']
+
+
+def duration_seconds(path):
+    """Content.duration_seconds 형식 (초, 버림)"""
+    return probe(path)['duration_ms'] // 1000
@@ -1,79 +1,142 @@
 """
 오디오 파일 스트리밍 최적화
-- Range Request 지원
-- Chunked Transfer
+- 권한 확인(작가 본인, 성인 작품, 구독 전용 회차) 후 전송은 book.media_delivery에 위임
+  (MEDIA_DELIVERY='sendfile': os.sendfile / 'accel': nginx X-Accel-Redirect — 워커가 다운로드 내내 묶이지 않음)
+- Range(단일/다중), If-None-Match/If-Modified-Since/If-Range 지원
+- ?t=<초> 시작 위치 지정 (MP3 탐색 인덱스로 해당 프레임부터 전송, 디코딩 없음)
+- ?rendition=<name> 렌디션 선택 (low 등, book.renditions — 없으면 standard)
+- HLS 마스터 플레이리스트 (book.hls 패키지 — 세그먼트/미디어 플레이리스트는 서명 URL)
+- 서명된 만료 URL 전송 (book.media_signing — DB 조회 없이 HMAC만 검증)
 """
-import os
 import mimetypes
-from django.http import StreamingHttpResponse, HttpResponse
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from book.models import Content
+from book import hls, media_delivery, media_signing, mp3_index, renditions, storage
+
+
+def _authorized_content(request, content_id, queryset=None):
+    """(content, 오류 응답) — 권한이 없으면 content는 None"""
+    content = get_object_or_404(queryset if queryset is not None else Content.objects.select_related('book'),
+                                id=content_id)
+    allowed, status, reason = media_delivery.authorize_content(media_delivery.request_user(request), content)
+    if not allowed:
+        return None, HttpResponse(reason, status=status, content_type='text/plain; charset=utf-8')
+    return content, None
+
+
+def _cache_control(content, max_age=3600):
+    """성인/구독 전용 에피소드는 공유 캐시(CDN)에 저장하지 않음"""
+    from django.conf import settings
+    gated = content.book.adult_choice or (
+        getattr(settings, 'MEDIA_SUBSCRIPTION_REQUIRED', False)
+        and content.number > getattr(settings, 'MEDIA_FREE_EPISODES', 1)
+    )
+    return f"{'private' if gated else 'public'}, max-age={max_age}"
 
 
 def stream_audio(request, content_id):
     """
     오디오 파일을 스트리밍으로 제공
     Range Request를 지원하여 탐색 가능
+
+    ?t=95.5 → 95.5초를 포함하는 MP3 프레임부터 전송 (X-Seek-Time-Ms 헤더에 실제 시작 시각).
+    이때 Range는 잘린 스트림 기준으로 해석함 (accel 모드에서도 이 경우만 Django가 sendfile로 전송).
+    ?rendition=low → 해당 렌디션 파일 (X-Rendition 헤더에 실제 제공한 렌디션 이름)
     """
-    content = get_object_or_404(Content, id=content_id)
+    content, denied = _authorized_content(
+        request, content_id, Content.objects.select_related('book').prefetch_related('renditions'))
+    if denied:
+        return denied
 
     if not content.audio_file:
         return HttpResponse('Audio file not found', status=404)
 
-    audio_path = content.audio_file.path
-    file_size = os.path.getsize(audio_path)
+    audio_file = renditions.select(content, renditions.requested(request))
+    rendition_name = renditions.STANDARD if audio_file == content.audio_file else renditions.requested(request)
+    audio_path = audio_file.path
     content_type = mimetypes.guess_type(audio_path)[0] or 'audio/mpeg'
 
-    # Range 헤더 확인
-    range_header = request.META.get('HTTP_RANGE', '').strip()
-    range_match = None
-
-    if range_header:
-        import re
-        range_match = re.search(r'bytes=(\d+)-(\d*)', range_header)
-
-    if range_match:
-        # Range Request 처리
-        start = int(range_match.group(1))
-        end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
-        length = end - start + 1
-
-        # 파일 청크로 읽기
-        def file_iterator(file_path, offset, chunk_size=8192):
-            with open(file_path, 'rb') as f:
-                f.seek(offset)
-                remaining = length
-                while remaining > 0:
-                    chunk = f.read(min(chunk_size, remaining))
-                    if not chunk:
-                        break
-                    remaining -= len(chunk)
-                    yield chunk
-
-        response = StreamingHttpResponse(
-            file_iterator(audio_path, start),
-            status=206,
-            content_type=content_type
-        )
-        response['Content-Length'] = str(length)
-        response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
-    else:
-        # 전체 파일 스트리밍
-        def file_iterator(file_path, chunk_size=8192):
-            with open(file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
-
-        response = StreamingHttpResponse(
-            file_iterator(audio_path),
-            content_type=content_type
-        )
-        response['Content-Length'] = str(file_size)
-
-    response['Accept-Ranges'] = 'bytes'
-    response['Cache-Control'] = 'public, max-age=3600'  # 1시간 캐싱
+    # ?t= 시작 위치 → 프레임 경계 byte offset
+    base_offset = 0
+    seek_time_ms = None
+    t = request.GET.get('t')
+    if t:
+        try:
+            seek_ms = float(t) * 1000
+        except ValueError:
+            return HttpResponse('Invalid t', status=400)
+        index = mp3_index.load_index(audio_path)
+        if index is not None:
+            seek_time_ms, base_offset = mp3_index.seek(index, seek_ms)
+
+    response = media_delivery.serve_file(request, audio_path, offset=base_offset, content_type=content_type,
+                                         cache_control=_cache_control(content))
+    if seek_time_ms is not None:
+        response['X-Seek-Time-Ms'] = str(seek_time_ms)
+    response['X-Rendition'] = rendition_name
+    return response
+
+def hls_master_playlist(request, content_id):
+    """
+    에피소드 HLS 마스터 플레이리스트 (standard + 패키징된 MP3 렌디션)
+    각 variant는 오디오 옆 '<파일명>.hls/index.m3u8'의 서명 URL → 세그먼트도 같은 서명으로 signed_media가 제공
+    (uploads/audio는 nginx internal — 공개 작품도 /media/ 직접 URL 없음).
+    패키지가 하나도 없으면 404 (AUDIO_HLS_ENABLED=False 이거나 MP3가 아닌 업로드)
+    """
+    from book.audio_engine import PUBLISH_BITRATE
+
+    content, denied = _authorized_content(
+        request, content_id, Content.objects.select_related('book').prefetch_related('renditions'))
+    if denied:
+        return denied
+
+    # 공개 작품도 서명 URL (public 등급 → Cache-Control public, CDN 캐시 가능). 세그먼트도 같은 서명
+    user = media_delivery.request_user(request)
+    tier = media_signing.tier_for(user, content)
+    expires = media_signing.expires_at()
+
+    def variant_url(audio_file):
+        return media_signing.signed_url(request, audio_file, tier, expires,
+                                        suffix=f'{hls.HLS_SUFFIX}/{hls.PLAYLIST_NAME}')
+
+    variants = []
+    if content.audio_file and hls.load_manifest(content.audio_file.path):
+        variants.append((renditions.STANDARD, content.audio_file, renditions.kbps(PUBLISH_BITRATE)))
+    for rendition in content.renditions.all():
+        if rendition.format == 'mp3' and rendition.audio_file and hls.load_manifest(rendition.audio_file.path):
+            variants.append((rendition.name, rendition.audio_file, rendition.bitrate_kbps))
+    if not variants:
+        return HttpResponse('HLS package not found', status=404)
+
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for name, audio_file, kbps in variants:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={max(1, kbps) * 1000},CODECS="{hls.MP3_CODECS}",NAME="{name}"')
+        lines.append(variant_url(audio_file))
 
+    response = HttpResponse('\n'.join(lines) + '\n', content_type='application/vnd.apple.mpegurl')
+    response['Cache-Control'] = _cache_control(content, max_age=60)  # 렌디션이 바뀌면 곧바로 반영
     return response
+
+
+def signed_media(request, expires, tier, sig, path):
+    """
+    서명된 만료 URL로 MEDIA 파일 전송 (/api/media/<expires>/<tier>/<sig>/<path>)
+    - DB 조회 없음: HMAC 서명/만료만 확인 (권한은 URL 발급 시 확인됨)
+    - 전송은 media_delivery.serve_file (sendfile 또는 nginx X-Accel-Redirect, Range/ETag 지원)
+    - URL 자체가 만료되므로 Cache-Control max-age는 남은 유효 시간 이하
+      (내용 해시 파일은 URL이 같으면 내용도 같으므로 immutable — 유효 시간 동안 재검증 요청 없음)
+    """
+    import time
+
+    ok, reason = media_signing.verify(path, expires, tier, sig)
+    if not ok:
+        return HttpResponse(reason, status=403, content_type='text/plain; charset=utf-8')
+    full_path = media_signing.resolve(path)
+    if full_path is None:
+        return HttpResponse('Not found', status=404)
+    remaining = max(0, int(expires - time.time()))
+    cache_control = f"{'public' if tier == 'public' else 'private'}, max-age={min(3600, remaining)}"
+    if storage.is_hashed_name(path):
+        cache_control = f"{'public' if tier == 'public' else 'private'}, max-age={remaining}, immutable"
+    return media_delivery.serve_file(request, full_path, cache_control=cache_control)
@@ -0,0 +1,222 @@
+"""
+배치 오디오북 JSON → Celery 태스크 (멀티 에피소드 배치를 워커 전체에 분산)
+
+단계 의존성 그래프(book.batch_graph)를 따라 의존성이 풀린 단계부터 동시에 실행:
+    create_bgm / create_sfx     → batch_asset_task                      # 서로, 그리고 페이지 TTS와 동시에
+    create_episode              → chord(group(batch_page_task × 페이지), # 페이지 TTS — 아무 워커에서나
+                                        batch_merge_task)               # 병합 → 무손실 마스터 → PageAudio (+ 믹스가 없으면 게시)
+    mix_bgm                     → batch_mix_task                        # 대상 에피소드 + 참조하는 $bgm_N / $sfx_N만 기다림
+    (모든 단계 완료)            → batch_finalize_task                   # 결과/경고/단계별 시간 취합 → BatchJob.result
+각 단계 태스크는 끝나면 체크포인트를 남기고 advance()를 호출 → 새로 실행 가능해진 단계를 예약(claim)해 실행.
+전체 소요 시간 ≈ 그래프의 최장 경로 (보통 가장 긴 에피소드의 TTS + 병합 + 믹싱)
+
+- 모든 태스크는 사용자의 bulk 샤드 큐로 (book.task_queues.bulk_queue — 사용자 간 공정 스케줄링)
+- 진행률: 각 태스크가 BatchJob 한 행의 카운터(pages_done, steps_done)를 올림 → audiobook_task_status가 하나의 작업으로 표시
+  갱신할 때마다 status_payload를 book.progress_stream으로 발행 → audiobook_task_stream 구독자에게 푸시
+- 단계 구현은 book.batch_pipeline (단일 워커 process_batch_audiobook과 공용)
+- 페이지 임시 파일은 MEDIA_ROOT/audio에 기록 → 워커들이 같은 MEDIA_ROOT를 공유해야 함 (기존 배포와 동일)
+- 완료된 단계/페이지는 book.batch_checkpoints에 기록 → resume()이 같은 job_id로 다시 실행하면 건너뜀
+  (BATCH_CANVAS_ENABLED=False면 단일 워커 process_batch_audiobook이 같은 BatchJob/체크포인트를 사용)
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.db.models import F
+
+from book.batch_pipeline import ASSET_ACTIONS, BatchStepError, mix_targets
+
+PAGE_WEIGHT = 80  # 진행률 중 페이지 TTS 비중(%) — 나머지는 에셋/병합/믹싱 단계
+
+
+def enabled():
+    return getattr(settings, 'BATCH_CANVAS_ENABLED', True)
+
+
+# ==================== 진행률 ====================
+
+def _publish(job_id):
+    from book import progress_stream
+    from book.models import BatchJob
+
+    job = BatchJob.objects.filter(job_id=job_id).first()
+    if job:
+        progress_stream.publish(job_id, status_payload(job))
+
+
+def _update(job_id, **fields):
+    from book.models import BatchJob
+    if BatchJob.objects.filter(job_id=job_id).exclude(state__in=('SUCCESS', 'FAILURE')).update(**fields):
+        _publish(job_id)
+
+
+def page_done(job_id, count=1):
+    _update(job_id, pages_done=F('pages_done') + count, state='PROGRESS', status='TTS 생성 중...')
+
+
+def step_done(job_id, status):
+    _update(job_id, steps_done=F('steps_done') + 1, state='PROGRESS', status=status)
+
+
+def set_status(job_id, status):
+    _update(job_id, state='PROGRESS', status=status)
+
+
+def finish(job_id, response):
+    """최종 결과 기록 (실패 결과도 SUCCESS 상태 + success False — 기존 응답과 동일). 성공이면 체크포인트 삭제"""
+    from book import batch_checkpoints
+    from book.models import BatchJob
+
+    BatchJob.objects.filter(job_id=job_id).update(
+        state='SUCCESS', status='완료' if response.get('success') else '실패', result=response,
+        steps_done=F('steps_total'))
+    _publish(job_id)
+    if response.get('success'):
+        batch_checkpoints.clear(job_id)
+
+
+def fail(job_id, error):
+    from book.models import BatchJob
+    if BatchJob.objects.filter(job_id=job_id).exclude(state='SUCCESS').update(state='FAILURE', error=error):
+        _publish(job_id)
+
+
+def progress(job):
+    if job.state == 'SUCCESS':
+        return 100
+    steps = job.steps_done / job.steps_total if job.steps_total else 1
+    if not job.pages_total:
+        return min(99, int(steps * 100))
+    pages = job.pages_done / job.pages_total
+    return min(99, int(pages * PAGE_WEIGHT + steps * (100 - PAGE_WEIGHT)))
+
+
+def status_payload(job):
+    """audiobook_task_status 응답 (AsyncResult 기반 응답과 같은 키)"""
+    if job.state == 'SUCCESS':
+        info = job.result or {}
+        response = {'state': 'SUCCESS', 'success': info.get('success', False), 'progress': 100}
+        if info.get('success'):
+            response['redirect_url'] = info.get('redirect_url', '')
+            response['episode'] = info.get('episode', {})
+            response['steps_completed'] = info.get('steps_completed', 0)
+            if info.get('warnings'):
+                response['warnings'] = info['warnings']
+        else:
+            response['error'] = info.get('error', '알 수 없는 오류')
+        return response
+    if job.state == 'FAILURE':
+        return {'state': 'FAILURE', 'error': job.error or '태스크 실패', 'progress': 0}
+    if job.state == 'PENDING':
+        return {'state': 'PENDING', 'status': job.status or '대기 중...', 'progress': 0}
+    return {
+        'state': 'PROGRESS',
+        'status': job.status or '처리 중...',
+        'progress': progress(job),
+        'current_step': min(job.steps_total, job.steps_done + 1),
+        'total_steps': job.steps_total,
+        'pages_completed': job.pages_done,
+        'pages_total': job.pages_total,
+    }
+
+
+# ==================== 실행 ====================
+
+def validate(data, book):
+    """실행 전에 알 수 있는 오류 (단일 워커 경로에서는 해당 단계에서 실패하던 것)"""
+    for step in data.get('steps', []):
+        action = step.get('action', '')
+        if action in ('create_episode', 'mix_bgm') and not book:
+            raise BatchStepError('book_uuid가 필요합니다')
+        if action == 'create_episode' and not step.get('pages'):
+            raise BatchStepError('페이지가 비어있습니다')
+
+
+def _run_step(job_id, user_id, steps, step_idx):
+    from celery import chord, group
+    from book.task_queues import bulk_queue
+    from book.tasks import batch_asset_task, batch_failed_task, batch_merge_task, batch_mix_task, batch_page_task
+
+    step = steps[step_idx]
+    action = step.get('action', '')
+    queue = bulk_queue(user_id)
+    on_error = batch_failed_task.s(job_id).set(queue=queue)
+    if action in ASSET_ACTIONS:
+        batch_asset_task.apply_async((job_id, step_idx), queue=queue, link_error=on_error)
+    elif action == 'create_episode':
+        pages = group(batch_page_task.si(job_id, step_idx, page_idx, page).set(queue=queue)
+                      for page_idx, page in enumerate(step.get('pages', [])))
+        defer_publish = bool(mix_targets(steps).get(step_idx))
+        merge = batch_merge_task.s(job_id, step_idx, defer_publish).set(queue=queue).on_error(on_error)
+        chord(pages, merge).apply_async()
+    elif action == 'mix_bgm':
+        batch_mix_task.apply_async((job_id, step_idx), queue=queue, link_error=on_error)
+    else:
+        from book import batch_checkpoints
+        batch_checkpoints.save_step(job_id, step_idx, {})  # 알 수 없는 action — 건너뜀 (단일 워커 경로와 동일)
+        advance(job_id)
+
+
+def advance(job_id):
+    """의존성이 모두 끝난 단계를 예약(claim)해 실행. 모든 단계가 끝나면 batch_finalize_task (단계 태스크가 끝날 때마다 호출)"""
+    from book import batch_checkpoints, batch_graph
+    from book.models import BatchJob
+
+    job = BatchJob.objects.filter(job_id=job_id).only('state', 'data', 'user_id').first()
+    if job is None or job.state in ('SUCCESS', 'FAILURE'):
+        return
+    steps = job.data.get('steps', [])
+    done = batch_checkpoints.completed_steps(job_id)
+    for step_idx in batch_graph.ready(batch_graph.dependencies(steps), done):
+        if batch_checkpoints.claim(job_id, step_idx):
+            _run_step(job_id, job.user_id, steps, step_idx)
+    if len(done) >= len(steps) and batch_checkpoints.claim(job_id, len(steps)):
+        from book.task_queues import bulk_queue
+        from book.tasks import batch_failed_task, batch_finalize_task
+        queue = bulk_queue(job.user_id)
+        batch_finalize_task.apply_async((job_id,), queue=queue, link_error=batch_failed_task.s(job_id).set(queue=queue))
+
+
+def create_job(data, user, book=None, job_id=None):
+    from book.models import BatchJob
+
+    steps = data.get('steps', [])
+    return BatchJob.objects.create(
+        job_id=job_id or uuid4().hex,
+        user=user,
+        book=book,
+        data=data,
+        status='대기 중...',
+        steps_total=len(steps),
+        pages_total=sum(len(s.get('pages', [])) for s in steps if s.get('action') == 'create_episode'),
+    )
+
+
+def dispatch(job):
+    """의존성 그래프 실행 (BATCH_CANVAS_ENABLED=False면 단일 워커 태스크) — 체크포인트가 있으면 그 이후부터"""
+    if enabled():
+        print(f"🧩 배치 작업 실행: {job.job_id} (단계 {job.steps_total}개, 페이지 {job.pages_total}개)")
+        advance(job.job_id)
+    else:
+        from book.task_queues import bulk_queue
+        from book.tasks import process_batch_audiobook
+        process_batch_audiobook.apply_async((job.data, job.user_id, job.job_id), queue=bulk_queue(job.user_id))
+
+
+def start(data, user, book=None):
+    """BatchJob 생성 + 실행 → BatchJob (job_id로 audiobook_task_status 조회)"""
+    validate(data, book)
+    job = create_job(data, user, book)
+    dispatch(job)
+    return job
+
+
+def resume(job):
+    """실패/중단된 작업을 같은 job_id로 다시 실행 (완료된 단계/페이지는 체크포인트로 건너뜀) → 재개 여부"""
+    from book import batch_checkpoints
+
+    if not batch_checkpoints.resumable(job) or not batch_checkpoints.reset(job):
+        return False
+    job.refresh_from_db()
+    print(f"🔁 배치 작업 재개: {job.job_id} (체크포인트 {job.checkpoints.count()}개)")
+    dispatch(job)
+    return True
@@ -0,0 +1,167 @@
+"""
+배치 작업 체크포인트 — 완료된 단계/페이지 결과를 BatchCheckpoint 행으로 기록 → 재개 시 건너뜀
+- 페이지(page_index >= 0): TTS 렌더가 끝난 페이지 결과 (MEDIA_ROOT/audio 임시 파일 경로) — 에피소드 병합이 끝나면 삭제
+- 단계(page_index = STEP): create_bgm/create_sfx → {'id'}, create_episode → {'content_id', 'episode', 'deferred'},
+  mix_bgm → {'content_id'}. $bgm_N / $sfx_N 바인딩은 같은 트랜잭션에서 BatchJob.variables에 기록
+- 행 단위 기록이라 canvas 태스크들이 서로 다른 워커에서 동시에 써도 충돌 없음 (워커들은 같은 DB/MEDIA_ROOT 공유)
+- 실행 예약(page_index = CLAIM): 의존성이 풀린 단계를 정확히 한 번만 실행 (batch_canvas.advance)
+- 작업이 성공으로 끝나면 모두 삭제. 실패한 작업의 체크포인트는 BATCH_CHECKPOINT_MAX_AGE_HOURS 동안 유지 (blobs.sweep)
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+STEP = -1  # page_index: 단계 전체 결과
+CLAIM = -2  # page_index: 단계 실행 예약 (batch_canvas.advance — 같은 단계를 두 번 실행하지 않도록)
+
+
+def _job_pk(job_id):
+    from book.models import BatchJob
+    return BatchJob.objects.filter(job_id=job_id).values_list('pk', flat=True).first()
+
+
+def _rows(job_id, step_idx=None):
+    from book.models import BatchCheckpoint
+    rows = BatchCheckpoint.objects.filter(job__job_id=job_id)
+    return rows if step_idx is None else rows.filter(step_index=step_idx)
+
+
+# ==================== 페이지 ====================
+
+def _usable(result):
+    return bool(result) and os.path.exists(result.get('audio') or '')
+
+
+def page_result(job_id, step_idx, page_idx):
+    """렌더가 끝난 페이지 결과 (임시 파일이 남아 있을 때만) 또는 None"""
+    result = _rows(job_id, step_idx).filter(page_index=page_idx).values_list('result', flat=True).first()
+    return result if _usable(result) else None
+
+
+def page_results(job_id, step_idx):
+    """{page_idx: 페이지 결과} — 임시 파일이 남아 있는 것만"""
+    rows = _rows(job_id, step_idx).filter(page_index__gte=0).values_list('page_index', 'result')
+    return {page_idx: result for page_idx, result in rows if _usable(result)}
+
+
+def save_page(job_id, step_idx, page_idx, result):
+    """실패한 페이지(None)는 기록하지 않음 → 재개 시 다시 렌더"""
+    from book.models import BatchCheckpoint
+
+    job_pk = _job_pk(job_id)
+    if not result or job_pk is None:
+        return
+    BatchCheckpoint.objects.update_or_create(
+        job_id=job_pk, step_index=step_idx, page_index=page_idx, defaults={'result': result})
+
+
+# ==================== 단계 ====================
+
+def step_result(job_id, step_idx):
+    return _rows(job_id, step_idx).filter(page_index=STEP).values_list('result', flat=True).first()
+
+
+def completed_steps(job_id):
+    """{step_idx: 단계 결과}"""
+    return dict(_rows(job_id).filter(page_index=STEP).values_list('step_index', 'result'))
+
+
+def save_step(job_id, step_idx, output, variables=None, warnings=None):
+    """
+    단계 완료 기록 + 그 단계의 페이지 체크포인트 삭제.
+    variables(추가할 $bgm_N / $sfx_N 바인딩)와 warnings(추가할 경고)는 BatchJob 행을 잠근 채 병합
+    — 동시에 끝나는 에셋 단계들이 서로의 바인딩을 덮어쓰지 않음
+    """
+    from book.models import BatchCheckpoint, BatchJob
+
+    job_pk = _job_pk(job_id)
+    if job_pk is None:
+        return
+    with transaction.atomic():
+        BatchCheckpoint.objects.update_or_create(
+            job_id=job_pk, step_index=step_idx, page_index=STEP, defaults={'result': output})
+        BatchCheckpoint.objects.filter(job_id=job_pk, step_index=step_idx, page_index__gte=0).delete()
+        if variables or warnings:
+            job = BatchJob.objects.select_for_update().only('variables', 'warnings').get(pk=job_pk)
+            job.variables = {**job.variables, **(variables or {})}
+            job.warnings = job.warnings + list(warnings or [])
+            job.save(update_fields=['variables', 'warnings'])
+
+
+def claim(job_id, step_idx):
+    """단계 실행 예약 — 처음 예약한 호출만 True (행 unique 제약)"""
+    from book.models import BatchCheckpoint
+
+    job_pk = _job_pk(job_id)
+    if job_pk is None:
+        return False
+    try:
+        with transaction.atomic():
+            BatchCheckpoint.objects.create(job_id=job_pk, step_index=step_idx, page_index=CLAIM)
+    except IntegrityError:
+        return False
+    return True
+
+
+def clear(job_id):
+    """작업 성공 후 정리 — 실행 예약은 남김 (늦게 끝난 advance()가 단계를 다시 예약하지 않도록, 작업과 함께 삭제)"""
+    _rows(job_id).exclude(page_index=CLAIM).delete()
+
+
+# ==================== 재개 ====================
+
+def resumable(job):
+    """실패(예외/실패 결과)했거나 진행 기록이 BATCH_RESUME_STALE_MINUTES 넘게 멈춘(워커 종료) 작업"""
+    if job.state == 'FAILURE':
+        return True
+    if job.state == 'SUCCESS':
+        return not (job.result or {}).get('success')
+    stale = timedelta(minutes=getattr(settings, 'BATCH_RESUME_STALE_MINUTES', 15))
+    return job.updated_at < timezone.now() - stale
+
+
+def reset(job):
+    """
+    재개 직전 상태 초기화 — 실행 예약 삭제, 진행률 카운터는 체크포인트로 다시 계산 (건너뛴 단계/페이지는 세지 않음).
+    동시 재개 요청은 하나만 성공
+    """
+    from book.models import BatchJob
+
+    steps = job.data.get('steps', [])
+    done = completed_steps(job.job_id)
+    pages_done = _rows(job.job_id).filter(page_index__gte=0).count() + sum(
+        len(steps[idx].get('pages', [])) for idx in done
+        if idx < len(steps) and steps[idx].get('action') == 'create_episode')
+    with transaction.atomic():
+        if not BatchJob.objects.filter(pk=job.pk, state=job.state, updated_at=job.updated_at).update(
+                state='PENDING', status='재개 대기 중...', result=None, error='', steps_done=len(done),
+                pages_done=pages_done, updated_at=timezone.now()):
+            return False
+        _rows(job.job_id).filter(page_index=CLAIM).delete()
+    return True
+
+
+# ==================== 정리 (blobs.sweep) ====================
+
+def expire(max_age_hours=None, dry_run=False):
+    """BATCH_CHECKPOINT_MAX_AGE_HOURS 동안 재개되지 않은 작업의 체크포인트 삭제 → 삭제 수"""
+    from book.models import BatchCheckpoint
+
+    hours = float(max_age_hours if max_age_hours is not None
+                  else getattr(settings, 'BATCH_CHECKPOINT_MAX_AGE_HOURS', 72))
+    old = BatchCheckpoint.objects.filter(job__updated_at__lt=timezone.now() - timedelta(hours=hours))
+    if dry_run:
+        return old.count()
+    return old.delete()[0]
+
+
+def protected_paths():
+    """재개를 위해 남겨 둘 페이지 임시 파일 경로"""
+    from book.models import BatchCheckpoint
+
+    rows = BatchCheckpoint.objects.filter(page_index__gte=0).values_list('result', flat=True)
+    return {os.path.abspath(result['audio']) for result in rows.iterator(chunk_size=500)
+            if result and result.get('audio')}
@@ -0,0 +1,76 @@
+"""
+배치 JSON 단계 의존성 그래프 — book.batch_canvas가 의존성이 풀린 단계부터 동시에 실행
+- create_bgm / create_sfx: 의존성 없음. 결과 변수는 같은 종류 안의 선언 순서 ($bgm_N = N번째 create_bgm)
+  → 실행 순서와 무관하게 미리 정해짐 (실패한 단계의 변수는 미해결로 남고 mix_bgm에서 그 트랙만 건너뜀)
+- create_episode: 의존성 없음 (페이지 TTS가 BGM/SFX 생성과 동시에 진행)
+  단, 앞쪽에 이 배치에서 만들지 않은 같은 번호 에피소드를 대상으로 하는 mix_bgm이 있으면 그 뒤에
+  (그 믹스는 실행 시점의 최신 에피소드를 대상으로 하므로)
+- mix_bgm: 대상 create_episode + 같은 에피소드의 앞선 mix_bgm + 참조하는 $bgm_N / $sfx_N 생성 단계
+"""
+import re
+
+from book.batch_pipeline import ASSET_ACTIONS, mix_targets
+
+VARIABLE = re.compile(r'^\$(bgm|sfx)_\d+$')
+
+
+def asset_variables(steps):
+    """{create_bgm/create_sfx 단계 번호: '$bgm_N' / '$sfx_N'}"""
+    names, counts = {}, {}
+    for idx, step in enumerate(steps):
+        action = step.get('action', '')
+        if action in ASSET_ACTIONS:
+            kind = 'bgm' if action == 'create_bgm' else 'sfx'
+            counts[kind] = counts.get(kind, 0) + 1
+            names[idx] = f'${kind}_{counts[kind]}'
+    return names
+
+
+def references(value):
+    """단계 JSON 안의 '$bgm_N' / '$sfx_N' 참조"""
+    if isinstance(value, str):
+        return {value} if VARIABLE.match(value) else set()
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return set()
+    found = set()
+    for item in value:
+        found |= references(item)
+    return found
+
+
+def dependencies(steps):
+    """{단계 번호: 먼저 끝나야 하는 단계 번호 set}"""
+    producers = {name: idx for idx, name in asset_variables(steps).items()}
+    targets = mix_targets(steps)
+    episode_of = {mix: ep for ep, mixes in targets.items() for mix in mixes}
+    deps = {idx: set() for idx in range(len(steps))}
+    orphans = {}  # episode_number → 이 배치에서 만들지 않은 에피소드 대상 mix_bgm 단계
+
+    for idx, step in enumerate(steps):
+        action = step.get('action', '')
+        number = step.get('episode_number', 1)
+        if action == 'create_episode':
+            deps[idx] |= set(orphans.get(number, []))
+        elif action == 'mix_bgm':
+            deps[idx] |= {producers[name] for name in references(step) if name in producers}
+            if idx in episode_of:
+                chain = targets[episode_of[idx]]
+                position = chain.index(idx)
+                deps[idx].add(chain[position - 1] if position else episode_of[idx])
+            else:
+                deps[idx] |= set(orphans.get(number, [])[-1:])
+                orphans.setdefault(number, []).append(idx)
+    return deps
+
+
+def first_mix(steps, step_idx):
+    """mix_bgm 단계가 대상 에피소드의 첫 믹스인지 (게시가 미뤄진 에피소드의 게시 담당)"""
+    return any(mixes and mixes[0] == step_idx for mixes in mix_targets(steps).values())
+
+
+def ready(deps, done):
+    """의존성이 모두 끝났고 아직 끝나지 않은 단계 번호 (순서대로)"""
+    done = set(done)
+    return [idx for idx in sorted(deps) if idx not in done and deps[idx] <= done]
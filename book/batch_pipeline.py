@@ -0,0 +1,664 @@
+"""
+배치 오디오북 JSON(Fast 생성기) 단계 구현 — create_bgm / create_sfx / create_episode / mix_bgm
+- process_batch_audiobook(한 워커에서 순서대로)와 Celery canvas(book.batch_canvas — 페이지 TTS를 워커 전체에 분산) 공용
+- 페이지: prepare_page()가 1페이지를 계획으로 만들고(재사용/무음은 즉시 완료, DB 접근은 여기서만)
+  render_tts_job()이 TTS 요청 1개를 렌더(스레드 안전, DB 접근 없음), finish_page()가 페이지 결과로 조립
+  (render_pages() = 여러 페이지의 요청을 한 풀에서 렌더 + 페이지가 끝나는 대로 조립 — 페이지 단위 체크포인트용)
+- 에피소드: save_episode() — 페이지 결과 병합 → 무손실 마스터(Content.tts_audio_file) → PageAudio
+  mix_episode() — 마스터 구간 + SFX 삽입 + BGM bed를 EDL 단일 패스로 렌더 → 게시 MP3 1회 인코딩
+- 페이지 결과/계획은 JSON 직렬화 가능한 dict (Celery 태스크 인자/결과로 전달)
+"""
+import copy
+import json
+import math
+import os
+import traceback
+
+import requests
+from django.conf import settings
+from django.core.files import File
+
+from book.storage import is_blob_name
+from book.utils import (
+    apply_webaudio_effect, background_music, generate_tts, merge_audio_files, merge_duet_audio,
+    publish_content_audio, run_tts_parallel, sound_effect,
+)
+
+ASSET_ACTIONS = ('create_bgm', 'create_sfx')
+
+
+class BatchStepError(Exception):
+    """배치 전체를 실패로 끝내는 단계 오류 (메시지는 사용자에게 그대로 표시)"""
+
+
+# ==================== 배경음 / 효과음 ====================
+
+def run_asset_step(user, step, variable, warnings):
+    """
+    create_bgm / create_sfx 1개 실행 → 라이브러리 ID (실패 시 None + warnings에 메시지).
+    variable: 이 단계의 결과 변수 '$bgm_N' / '$sfx_N' (book.batch_graph.asset_variables — 선언 순서)
+    """
+    from book.models import BackgroundMusicLibrary, SoundEffectLibrary
+
+    action = step.get('action', '')
+    number = variable.rsplit('_', 1)[-1]
+
+    if action == 'create_bgm':
+        name = step.get('music_name', f'BGM_{number}')
+        desc = step.get('music_description', '')
+        duration = step.get('duration_seconds', 120)
+        print(f"🎵 [create_bgm] 시작 — name={repr(name)}, desc={repr(desc)}, duration={duration}s")
+        audio_path = background_music(name, desc, duration)
+        print(f"🎵 [create_bgm] background_music() 반환값: {repr(audio_path)}")
+        if not audio_path:
+            msg = f'배경음 생성 실패: {name} (API 오류 — Celery 로그 확인)'
+            print(f"⚠️ {msg}")
+            warnings.append(msg)
+            return None
+        obj = BackgroundMusicLibrary(user=user, music_name=name, music_description=desc, duration_seconds=duration)
+    else:
+        name = step.get('effect_name', f'SFX_{number}')
+        desc = step.get('effect_description', '')
+        duration = step.get('duration_seconds', 5)
+        print(f"🔊 [create_sfx] 시작 — name={repr(name)}, desc={repr(desc)}, duration={duration}s")
+        audio_path = sound_effect(name, desc, duration)
+        print(f"🔊 [create_sfx] sound_effect() 반환값: {repr(audio_path)}")
+        if not audio_path:
+            msg = f'효과음 생성 실패: {name} (API 오류 — Celery 로그 확인)'
+            print(f"⚠️ {msg}")
+            warnings.append(msg)
+            return None
+        obj = SoundEffectLibrary(user=user, effect_name=name, effect_description=desc)
+
+    with open(audio_path, 'rb') as f:
+        obj.audio_file.save(os.path.basename(audio_path), File(f), save=True)
+    print(f"✅ {'배경음' if action == 'create_bgm' else '효과음'} 생성 완료: ID={obj.id}, {variable} → {obj.id}")
+    return obj.id
+
+
+# ==================== 페이지 ====================
+
+def _page_info(page_type, text, audio_path, voice_id='', speed=1.0, style=0.0, similarity=0.75, effect='normal'):
+    return {
+        'page_type': page_type, 'text': text, 'voice_id': voice_id, 'speed_value': speed,
+        'style_value': style, 'similarity_value': similarity, 'webaudio_effect': effect, 'audio_path': audio_path,
+    }
+
+
+def _reuse_page(page_idx, page):
+    """_skip_tts 페이지: 기존 PageAudio 파일을 복사 없이 그대로 사용 (blob이면 PageAudio도 같은 blob을 가리킴)"""
+    from book.models import PageAudio
+
+    try:
+        existing = PageAudio.objects.filter(
+            content__public_uuid=page['_existing_content_uuid'],
+            page_number=page['_existing_page_num'],
+        ).first()
+        if not existing or not existing.audio_file or not os.path.exists(existing.audio_file.path):
+            return None
+        path = existing.audio_file.path
+        text = existing.text or page.get('text', '')
+        info = _page_info(existing.page_type or 'tts', text, path, existing.voice_id or page.get('voice_id', ''),
+                          existing.speed_value, existing.style_value, existing.similarity_value,
+                          existing.webaudio_effect or '')
+        info['blob_name'] = existing.audio_file.name if is_blob_name(existing.audio_file.name) else None
+        print(f"♻️ TTS 재사용 (페이지 {page_idx + 1})")
+        return {'audio': path, 'text': text, 'info': info, 'reused': True}
+    except Exception as e:
+        print(f"⚠️ TTS 재사용 실패, 새로 생성합니다: {e}")
+        return None
+
+
+def prepare_page(page_idx, page):
+    """
+    배치 페이지 1개 → 계획 dict (JSON 직렬화 가능) 또는 None (텍스트/보이스 없음)
+    - {'kind': 'ready', 'result': 페이지 결과}: 재사용/무음 — TTS 없음
+    - {'kind': 'tts' | 'duet', 'page_idx', 'page', 'jobs': [render_tts_job 인자]}
+    """
+    if page.get('_skip_tts') and page.get('_existing_content_uuid') and page.get('_existing_page_num'):
+        result = _reuse_page(page_idx, page)
+        if result:
+            return {'kind': 'ready', 'page_idx': page_idx, 'result': result}
+
+    # 무음 페이지 (BGM은 mix_bgm 단계에서 merged audio 전체에 걸쳐 재생)
+    silence_seconds = page.get('silence_seconds', 0)
+    if silence_seconds and float(silence_seconds) > 0:
+        try:
+            from book.utils import generate_silence
+            silence_path = generate_silence(float(silence_seconds), lossless=True)
+            if silence_path and os.path.exists(silence_path):
+                print(f"🔇 무음 삽입: {silence_seconds}초")
+                return {'kind': 'ready', 'page_idx': page_idx, 'result': {
+                    'audio': silence_path, 'text': '', 'info': _page_info('silence', '', silence_path), 'reused': False}}
+        except Exception as e:
+            print(f"⚠️ 무음 생성 오류: {e}")
+        return None
+
+    # 2인 대화(duet) — voices 하위 요청도 각각 TTS 작업
+    voices = page.get('voices', [])
+    if voices:
+        jobs = [{'text': v.get('text', ''), 'voice_id': v.get('voice_id', ''),
+                 'webaudio_effect': v.get('webaudio_effect', ''), 'page_idx': page_idx}
+                for v in voices if v.get('text', '') and v.get('voice_id', '')]
+        return {'kind': 'duet', 'page_idx': page_idx, 'page': page, 'jobs': jobs}
+
+    text, voice_id = page.get('text', ''), page.get('voice_id', '')
+    if not text or not voice_id:
+        return None
+    return {'kind': 'tts', 'page_idx': page_idx, 'page': page, 'jobs': [{
+        'text': text, 'voice_id': voice_id, 'webaudio_effect': page.get('webaudio_effect', 'normal'),
+        'page_idx': page_idx}]}
+
+
+def render_tts_job(job):
+    """
+    배치 페이지 1개(또는 duet voice 1개)의 TTS 생성 + 검증 + WebAudio 효과.
+    run_tts_parallel 워커 스레드에서 실행될 수 있음 (DB 접근 없음).
+
+    job: {'text', 'voice_id', 'webaudio_effect', 'page_idx'}
+    Returns: 최종 오디오 경로 또는 None
+    """
+    page_no = job.get('page_idx', 0) + 1
+    tts_file = generate_tts(job['text'], job['voice_id'], 'ko', 1.0, 0.0, 0.75, lossless=True)
+
+    # 🔥 파일 유효성 검사
+    if not tts_file:
+        print(f"⚠️ TTS 생성 실패: {page_no}번 페이지")
+        return None
+
+    tts_path = tts_file if isinstance(tts_file, str) else tts_file.path
+
+    # 🔥 파일 존재 및 크기 확인
+    if not os.path.exists(tts_path):
+        print(f"⚠️ TTS 파일 없음: {tts_path}")
+        return None
+
+    if os.path.getsize(tts_path) < 1000:  # 1KB 미만이면 손상된 파일
+        print(f"⚠️ TTS 파일 손상 (너무 작음): {tts_path}")
+        os.remove(tts_path)
+        return None
+
+    # WebAudio 효과 적용
+    webaudio_effect = job.get('webaudio_effect') or 'normal'
+    if webaudio_effect != 'normal':
+        try:
+            processed_path = apply_webaudio_effect(tts_path, webaudio_effect)
+
+            # 🔥 처리된 파일 검증
+            if processed_path and os.path.exists(processed_path):
+                if os.path.getsize(processed_path) >= 1000:
+                    if processed_path != tts_path:
+                        os.remove(tts_path)  # 원본 삭제
+                    tts_path = processed_path
+                else:
+                    print(f"⚠️ WebAudio 처리 파일 손상: {processed_path}")
+                    # 원본 사용
+            else:
+                print(f"⚠️ WebAudio 처리 실패, 원본 사용")
+        except Exception as e:
+            print(f"⚠️ WebAudio 효과 적용 오류: {e}")
+            # 원본 파일 그대로 사용
+
+    return tts_path
+
+
+def finish_page(plan, tts_paths, timer=None):
+    """계획 + 그 jobs의 TTS 결과 경로(같은 순서, 실패는 None) → 페이지 결과 dict 또는 None"""
+    if plan['kind'] == 'ready':
+        return plan['result']
+    page = plan['page']
+
+    if plan['kind'] == 'duet':
+        duet_paths = [p for p in tts_paths if p]
+        if not duet_paths:
+            return None
+        try:
+            if timer is not None:
+                with timer.stage('duet'):
+                    duet_mp3 = merge_duet_audio(duet_paths, mode=page.get('mode', 'alternate'))
+            else:
+                duet_mp3 = merge_duet_audio(duet_paths, mode=page.get('mode', 'alternate'))
+        except Exception as e:
+            print(f"⚠️ 듀엣 병합 오류 (페이지 {plan['page_idx'] + 1}): {e}")
+            return None
+        if not duet_mp3:
+            return None
+        text = '\n'.join(v.get('text', '') for v in page.get('voices', []) if v.get('text'))
+        print(f"🎭 듀엣 페이지 생성 완료 ({page.get('mode', 'alternate')} 모드)")
+        return {'audio': duet_mp3, 'text': text, 'info': _page_info('duet', text, duet_mp3), 'reused': False}
+
+    path = tts_paths[0] if tts_paths else None
+    if not path:
+        return None
+    text = page.get('text', '')
+    return {'audio': path, 'text': text, 'reused': False, 'info': _page_info(
+        'tts', text, path, page.get('voice_id', ''), page.get('speed_value', 1.0), page.get('style_value', 0.85),
+        page.get('similarity_value', 0.75), page.get('webaudio_effect', 'normal'))}
+
+
+def render_pages(plans, timer=None, on_page=None):
+    """
+    여러 페이지 계획의 TTS 요청(duet voices 포함)을 하나의 병렬 풀에서 렌더 → 페이지 결과 목록 (plans와 같은 순서)
+    페이지의 마지막 요청이 끝나는 즉시 finish_page로 조립하고 on_page(계획 번호, 결과) 호출 (호출한 스레드 — 체크포인트용)
+    """
+    slots = [(plan_no, slot) for plan_no, plan in enumerate(plans) for slot in range(len(plan.get('jobs', [])))]
+    paths = [[None] * len(plan.get('jobs', [])) for plan in plans]
+    pending = [len(plan.get('jobs', [])) for plan in plans]
+    results = [None] * len(plans)
+
+    def _finish(plan_no):
+        results[plan_no] = finish_page(plans[plan_no], paths[plan_no], timer)
+        if on_page:
+            on_page(plan_no, results[plan_no])
+
+    def _job_done(idx, path):
+        plan_no, slot = slots[idx]
+        paths[plan_no][slot] = path
+        pending[plan_no] -= 1
+        if pending[plan_no] == 0:
+            _finish(plan_no)
+
+    for plan_no, count in enumerate(pending):
+        if count == 0:  # TTS 요청이 없는 duet (voices 비어 있음)
+            _finish(plan_no)
+    run_tts_parallel(render_tts_job, [plans[plan_no]['jobs'][slot] for plan_no, slot in slots], on_result=_job_done)
+    return results
+
+
+def discard_pages(page_results):
+    """병합/저장이 끝났거나 실패한 페이지 임시 파일 삭제 (재사용한 기존 파일은 제외)"""
+    for result in page_results:
+        if not result or result.get('reused'):
+            continue
+        try:
+            if os.path.exists(result['audio']):
+                os.remove(result['audio'])
+        except OSError:
+            pass
+
+
+# ==================== 에피소드 ====================
+
+def _save_page_audios(content, page_results):
+    from book.models import PageAudio
+
+    for pg_idx, result in enumerate(page_results):
+        info, fpath = result['info'], result['audio']
+        if not fpath or not os.path.exists(fpath):
+            continue
+        try:
+            pa = PageAudio(
+                content=content,
+                page_number=pg_idx + 1,
+                text=info.get('text', ''),
+                voice_id=info.get('voice_id', ''),
+                language_code='ko',
+                speed_value=info.get('speed_value', 1.0),
+                style_value=info.get('style_value', 0.85),
+                similarity_value=info.get('similarity_value', 0.75),
+                webaudio_effect=info.get('webaudio_effect', 'normal'),
+                page_type=info.get('page_type', 'tts'),
+            )
+            if info.get('blob_name'):
+                pa.audio_file.name = info['blob_name']  # 재사용: 행 추가 + 참조 수 +1
+                pa.save()
+            else:
+                with open(fpath, 'rb') as pf:
+                    pa.audio_file.save(os.path.basename(fpath), File(pf), save=True)
+        except Exception as e:
+            print(f"⚠️ PageAudio 저장 실패 (페이지 {pg_idx + 1}): {e}")
+    print(f"💾 PageAudio {len(page_results)}개 저장 완료")
+
+
+def save_episode(user, book, step, page_results, timer, edit_content_uuid=None, defer_publish=False):
+    """
+    create_episode 저장: 페이지 결과(순서대로, 실패는 None) 병합 → Content 생성/수정 → PageAudio → 임시 파일 정리.
+    defer_publish면 게시 인코딩은 mix_episode에서 1회 (같은 에피소드를 대상으로 하는 mix_bgm이 뒤에 있을 때).
+    Returns: (content, 에피소드 정보 dict). 실패 시 BatchStepError
+    (페이지 임시 파일은 재개를 위해 남김 — 체크포인트 만료 후 blobs.sweep이 정리)
+    """
+    from book.audio_engine import INTERMEDIATE_FORMAT
+    from book.models import Content, PageAudio
+
+    ep_number = step.get('episode_number', 1)
+    ep_title = step.get('episode_title', f'에피소드 {ep_number}')
+    pages = step.get('pages', [])
+    page_results = [r for r in page_results if r]
+
+    # 🔥 오디오 파일이 없으면 에러 반환
+    if not page_results:
+        raise BatchStepError('TTS 생성에 실패했습니다')
+
+    try:
+        # 무손실 마스터로 병합 (MP3 인코딩은 게시 단계에서 1회)
+        with timer.stage('merge'):
+            merged_file, timestamps, total_duration = merge_audio_files(
+                [r['audio'] for r in page_results], pages_text=[r['text'] for r in page_results],
+                output_format=INTERMEDIATE_FORMAT)
+
+        # 🔥 병합 결과 검증
+        if not merged_file or not os.path.exists(merged_file):
+            raise Exception('오디오 병합 실패: 파일이 생성되지 않음')
+        if os.path.getsize(merged_file) < 1000:
+            raise Exception('오디오 병합 실패: 파일이 너무 작음')
+        if not total_duration or total_duration <= 0:
+            # 🔥 duration이 없으면 헤더로 계산 (디코딩 없음)
+            from book.audio_probe import duration_ms
+            total_duration = duration_ms(merged_file) / 1000.0  # ms → 초
+            print(f"⚠️ duration 자동 계산: {total_duration}초")
+    except Exception as e:
+        raise BatchStepError(f'오디오 병합 실패: {str(e)}')
+
+    # DB 저장 — 수정 모드: edit_content_uuid가 있으면 기존 Content 업데이트
+    try:
+        content = None
+        if edit_content_uuid:
+            content = Content.objects.filter(public_uuid=edit_content_uuid, book__user=user).first()
+            if content:
+                content.title = ep_title
+                content.text = "\n".join([p.get('text', '') for p in pages])
+                content.audio_timestamps = timestamps
+                content.duration_seconds = int(total_duration)
+                content.mix_config = {}  # mix_bgm 단계에서 다시 채워짐
+                old_master = content.tts_audio_file.name or None
+                with open(merged_file, 'rb') as f:
+                    content.tts_audio_file.save(os.path.basename(merged_file), File(f), save=True)
+                if old_master and old_master != content.tts_audio_file.name:
+                    content.tts_audio_file.storage.delete(old_master)  # blob이면 참조 수로 관리 (sweep)
+                # 기존 PageAudio 삭제 후 새로 생성
+                PageAudio.objects.filter(content=content).delete()
+                print(f"✏️ 기존 에피소드 수정: {edit_content_uuid}")
+            else:
+                print(f"⚠️ edit_content_uuid={edit_content_uuid} 를 찾지 못함 → 신규 생성")
+
+        if content is None:
+            content = Content(
+                book=book,
+                title=ep_title,
+                number=ep_number,
+                text="\n".join([p.get('text', '') for p in pages]),
+                audio_timestamps=timestamps,
+                duration_seconds=int(total_duration),
+            )
+            with open(merged_file, 'rb') as f:
+                content.tts_audio_file.save(os.path.basename(merged_file), File(f), save=True)
+
+        if not defer_publish:
+            with timer.stage('publish_encode'):
+                publish_content_audio(content, content.tts_audio_file.path)
+    except Exception as e:
+        if merged_file and os.path.exists(merged_file):
+            os.remove(merged_file)
+        raise BatchStepError(f'DB 저장 실패: {str(e)}')
+
+    try:
+        _save_page_audios(content, page_results)
+    except Exception as e:
+        print(f"⚠️ PageAudio 전체 저장 오류: {e}")
+
+    # 임시 병합/TTS 파일 정리 (이미 FileField로 복사됨)
+    if merged_file and os.path.exists(merged_file):
+        os.remove(merged_file)
+    discard_pages(page_results)
+
+    return content, {
+        'content_uuid': str(content.public_uuid),
+        'title': ep_title,
+        'number': ep_number,
+        'duration': total_duration,
+        'page_count': len(pages),
+    }
+
+
+def _resolve(value, variables, label):
+    if isinstance(value, str) and value.startswith('$'):
+        if value in variables:
+            print(f"[mix_bgm] {label} 변수 치환: {value} → {variables[value]}")
+            return variables[value]
+        print(f"[mix_bgm] ⚠️ {label} 변수 미해결: {value} (results에 없음)")
+    return value
+
+
+def mix_base_path(content):
+    """
+    재믹싱 base 오디오 경로 — 무손실 마스터(tts_audio_file).
+    마스터가 없으면 아직 BGM/SFX가 들어가지 않은 게시 오디오만 base로 허용하고, 이미 믹싱된 에피소드는 None
+    (믹싱된 MP3를 다시 믹싱하면 BGM/SFX가 겹치고 master_timestamps 기준 SFX 위치도 어긋남)
+    """
+    if content.tts_audio_file:
+        return content.tts_audio_file.path
+    if not content.audio_file:
+        return None
+    timestamps = content.audio_timestamps or []
+    if isinstance(timestamps, str):
+        timestamps = json.loads(timestamps)
+    mix_config = content.mix_config or {}
+    if mix_config.get('bgm') or mix_config.get('sfx') or mix_config.get('master_timestamps') \
+            or any(t.get('type') == 'sfx' for t in timestamps):
+        return None
+    return content.audio_file.path
+
+
+def mix_episode(book, step, variables, timer, content=None, publish_if_unmixed=False):
+    """
+    mix_bgm 1개: 무손실 마스터 구간 + SFX 삽입 + BGM bed → EDL 단일 패스 렌더 → 게시 MP3(+ 렌디션) 1회 인코딩.
+    content가 없으면 책에서 episode_number가 같은 가장 최근 에피소드.
+    믹싱할 트랙이 없고 publish_if_unmixed면 마스터 그대로 게시 인코딩.
+    Returns: 대상 Content (없거나 재믹싱할 base가 없으면 None — mix_base_path)
+    """
+    from book import renditions
+    from book.audio_engine import master_sequence, render_plan
+    from book.models import BackgroundMusicLibrary, Content, SoundEffectLibrary
+
+    step = copy.deepcopy(step)  # 변수 치환은 사본에만
+    ep_number = step.get('episode_number', 1)
+    if content is None:
+        # 같은 에피소드 번호로 여러 번 생성시 가장 최신 에피소드를 사용
+        content = Content.objects.filter(book=book, number=ep_number).order_by('-pk').first()
+    if not content:
+        print(f"⚠️ 에피소드 {ep_number}를 찾을 수 없습니다")
+        return None
+
+    bg_tracks = step.get('background_tracks', [])
+    print(f"[mix_bgm] results keys: {list(variables.keys())}")
+    for track in bg_tracks:
+        track['music_id'] = _resolve(track.get('music_id', ''), variables, 'BGM')
+
+    # 무손실 마스터 + 마스터 기준 페이지 타임스탬프
+    # (이전 mix_bgm으로 audio_timestamps가 SFX만큼 밀려 있어도 mix_config의 원본 기준을 사용)
+    timestamps = content.audio_timestamps
+    if isinstance(timestamps, str):
+        timestamps = json.loads(timestamps)
+    master_ts = (content.mix_config or {}).get('master_timestamps') or timestamps or []
+    master_path = mix_base_path(content)
+    if master_path is None:
+        print(f"⚠️ 에피소드 {content.number}: 무손실 마스터가 없고 이미 믹싱된 오디오라 재믹싱하지 않음 (믹스 중복 방지)")
+        return None
+    page_count = len([t for t in master_ts if t.get('type') != 'sfx'])
+
+    # BGM bed — 위치는 렌더러가 페이지 타임스탬프로 계산 (SFX 삽입분 자동 반영)
+    beds = []
+    for track in bg_tracks:
+        mid = track.get('music_id', '')
+        if not mid or str(mid).startswith('$'):
+            print(f"⚠️ BGM 변수 미해결: {mid}, 건너뜀 (create_bgm 실패)")
+            continue
+        bgm_obj = BackgroundMusicLibrary.objects.filter(id=mid).first()
+        if not bgm_obj or not bgm_obj.audio_file:
+            print(f"⚠️ BGM ID={mid} 없음, 건너뜀")
+            continue
+        volume = track.get('volume', 0.25)
+        beds.append({
+            'path': bgm_obj.audio_file.path,
+            'gain_db': 20 * math.log10(max(volume, 0.01)),
+            'start_page': track.get('start_page', 0),
+            'end_page': track.get('end_page', -1),
+            'fade_ms': 500,
+        })
+        print(f"✅ 배경음 구간: 페이지 {track.get('start_page', 0)} ~ {track.get('end_page', -1)}")
+
+    # SFX — 해당 페이지 직전에 삽입 (대사 직전 순차 재생)
+    sfx_tracks = step.get('sound_effects', [])
+    sfx_inserts = {}  # 페이지 위치(0-based) → [sequence 항목]
+    for sfx_track in sfx_tracks:
+        sfx_track['effect_id'] = _resolve(sfx_track.get('effect_id', ''), variables, 'SFX')
+        eid = sfx_track.get('effect_id', '')
+        if not eid or str(eid).startswith('$'):
+            print(f"⚠️ SFX 변수 미해결: {eid}, 건너뜀 (create_sfx 실패)")
+            continue
+        sfx_obj = SoundEffectLibrary.objects.filter(id=eid).first()
+        if not sfx_obj or not sfx_obj.audio_file:
+            continue
+        sfx_page = sfx_track.get('page_number') or sfx_track.get('page') or 1
+        page_pos = sfx_page - 1 if 0 <= sfx_page - 1 < page_count else 0
+        sfx_volume = sfx_track.get('volume', 0.7)
+        sfx_inserts.setdefault(page_pos, []).append({
+            'type': 'audio',
+            'path': sfx_obj.audio_file.path,
+            'gain_db': 20 * math.log10(max(sfx_volume, 0.01)),
+            'timestamp': {'pageIndex': -1, 'text': '', 'type': 'sfx', 'effectName': sfx_obj.effect_name},
+        })
+        print(f"✅ 효과음 삽입: 페이지 {page_pos + 1} 직전")
+
+    # 단일 패스 렌더링: 마스터 구간 + SFX 삽입 + BGM bed → 게시용 MP3 1회 인코딩
+    mixed_file = None
+    rendition_outs = []
+    mixed_meta = {}  # 렌더 결과 타임스탬프/길이 — 파일 저장과 함께 기록
+    if beds or sfx_inserts:
+        import uuid as _uuid
+        mixed_file = os.path.join(settings.MEDIA_ROOT, 'audio', f'mixed_{_uuid.uuid4().hex}.mp3')
+        rendition_outs = renditions.outputs('mixed')
+        try:
+            with timer.stage('mix'):
+                new_ts, total_ms = render_plan({
+                    'sequence': master_sequence(master_path, master_ts, inserts=sfx_inserts),
+                    'beds': beds,
+                }, mixed_file, renditions=renditions.encoder_targets(rendition_outs))
+            mixed_meta = {'audio_timestamps': new_ts, 'duration_seconds': int(total_ms / 1000)}
+        except Exception as e:
+            print(f"❌ 배경음/효과음 렌더링 오류: {e}")
+            traceback.print_exc()
+            mixed_file = None
+            renditions.discard(rendition_outs)
+
+    # mix_config (에디터에서 SFX/BGM 재생성 가능하도록) — 믹스 파일이 있으면 파일과 함께 저장
+    try:
+        mix_config_bgm = []
+        for track in bg_tracks:
+            bgm_obj2 = BackgroundMusicLibrary.objects.filter(id=track.get('music_id', '')).first()
+            if bgm_obj2:
+                mix_config_bgm.append({
+                    'id': bgm_obj2.id,
+                    'name': bgm_obj2.music_name,
+                    'desc': bgm_obj2.music_description,
+                    'duration': bgm_obj2.duration_seconds,
+                    'volume': track.get('volume', 0.25),
+                    'start_page': track.get('start_page', 0),
+                    'end_page': track.get('end_page', -1),
+                })
+        mix_config_sfx = []
+        for sfx_track in sfx_tracks:
+            sfx_obj2 = SoundEffectLibrary.objects.filter(id=sfx_track.get('effect_id', '')).first()
+            if sfx_obj2:
+                mix_config_sfx.append({
+                    'id': sfx_obj2.id,
+                    'name': sfx_obj2.effect_name,
+                    'desc': sfx_obj2.effect_description,
+                    'volume': sfx_track.get('volume', 0.7),
+                    'page_number': sfx_track.get('page_number') or sfx_track.get('page') or 1,
+                })
+        mix_config = {'bgm': mix_config_bgm, 'sfx': mix_config_sfx, 'master_timestamps': master_ts}
+        if mixed_file:
+            mixed_meta['mix_config'] = mix_config
+        else:
+            content.mix_config = mix_config
+            content.save(update_fields=['mix_config'])
+    except Exception as e:
+        print(f"⚠️ mix_config 저장 오류: {e}")
+
+    # 최종 파일 저장
+    try:
+        if mixed_file:
+            old_name = content.audio_file.name if content.audio_file else None
+            with open(mixed_file, 'rb') as f:
+                content.audio_file.save(os.path.basename(mixed_file), File(f), save=False)
+            # 파일 저장이 끝난 뒤 타임스탬프/길이/mix_config와 함께 1회 저장 → 실패해도 행의 오디오와 메타데이터가 어긋나지 않음
+            for field, value in mixed_meta.items():
+                setattr(content, field, value)
+            content.save(update_fields=['audio_file', *mixed_meta])
+            # 내용 해시 이름: 같은 믹스면 같은 파일, 다른 행이 같은 파일을 쓰면 남겨 둠
+            if old_name and old_name != content.audio_file.name:
+                renditions.remove_file(old_name)
+            os.remove(mixed_file)
+            renditions.save(content, rendition_outs)
+        elif publish_if_unmixed:
+            # 믹싱할 트랙이 없음 → 마스터 그대로 1회 인코딩
+            with timer.stage('publish_encode'):
+                publish_content_audio(content, master_path)
+        print(f"✅ 배경음/효과음 처리 완료")
+    except Exception as e:
+        print(f"❌ 파일 저장 오류: {e}")
+        renditions.discard(rendition_outs)
+    return content
+
+
+def publish_master(content, timer):
+    """mix_bgm이 건너뛰어져 게시되지 않은 에피소드 → 마스터 그대로 게시"""
+    try:
+        with timer.stage('publish_encode'):
+            publish_content_audio(content, content.tts_audio_file.path)
+    except Exception as e:
+        print(f"❌ 에피소드 게시 인코딩 오류: {e}")
+
+
+# ==================== 완료 ====================
+
+def mix_targets(steps):
+    """create_episode 단계 번호 → 그 에피소드를 대상으로 하는 뒤쪽 mix_bgm 단계 번호 목록 (다음 같은 번호 생성 전까지)"""
+    targets = {}
+    latest = {}  # episode_number → 가장 최근 create_episode 단계
+    for idx, step in enumerate(steps):
+        action = step.get('action', '')
+        number = step.get('episode_number', 1)
+        if action == 'create_episode':
+            latest[number] = idx
+            targets[idx] = []
+        elif action == 'mix_bgm' and number in latest:
+            targets[latest[number]].append(idx)
+    return targets
+
+
+def completion_response(book_uuid, book, steps_completed, timings, episode_info=None, warnings=None):
+    """배치 완료 결과 dict + n8n TTS 완료 알림 웹훅"""
+    response = {
+        'success': True,
+        'steps_completed': steps_completed,
+        'stage_timings': timings,
+    }
+
+    if episode_info:
+        response['episode'] = episode_info
+        response['redirect_url'] = f'/book/detail/{book_uuid}/'
+
+        # n8n TTS 완료 알림 웹훅 호출
+        n8n_webhook_url = os.getenv('N8N_TTS_WEBHOOK_URL')
+        if n8n_webhook_url and book:
+            try:
+                requests.post(n8n_webhook_url, json={
+                    'book_uuid': str(book.public_uuid),
+                    'book_title': book.name,
+                    'episode_number': episode_info['number'],
+                    'episode_title': episode_info['title'],
+                    'author_email': book.user.email,
+                    'audio_url': f"https://voxliber.ink/book/detail/{book_uuid}/",
+                    'duration_seconds': int(episode_info.get('duration', 0)),
+                }, timeout=5)
+                print(f"✅ n8n TTS 완료 알림 발송: {book.name} {episode_info['number']}화")
+            except Exception as e:
+                print(f"⚠️ n8n 웹훅 호출 실패 (무시): {e}")
+
+    if warnings:
+        response['warnings'] = warnings
+        print(f"⚠️ 완료 (경고 {len(warnings)}개): {warnings}")
+
+    return response
@@ -0,0 +1,302 @@
+"""
+중복 제거 미디어 blob 저장소 (내용 주소 + 참조 수)
+- PageAudio.audio_file, Content.tts_audio_file, BGM/SFX 라이브러리 audio_file은 book.storage.blob_storage 사용
+  → 같은 내용은 blobs/ab/<해시>.<확장자> 파일 1개. 페이지 재사용은 파일 복사 없이 같은 이름을 가리키는 행 추가
+- MediaBlob.ref_count: 필드 값이 blob을 가리키게/벗어나게 될 때 signals가 acquire/release
+  (QuerySet.update처럼 신호 없는 변경은 recount()로 복구. sweep은 삭제 전 실제 참조를 다시 확인)
+- sweep(): 참조 0 상태로 BLOB_SWEEP_GRACE_HOURS가 지난 blob, 행 없이 남은 blob 파일(저장 직후 실패),
+  MEDIA_ROOT/audio 작업 폴더의 오래된 임시 파일(실패한 배치 실행 잔여물) 삭제
+- usage(): 사용자/책별 디스크 사용량 (중복 제거 후 실제 용량, 참조 기준 논리 용량, 게시 오디오)
+- adopt(): 예전 이름(uploads/page_audio/..., tts_reuse_ 복사본 등) 파일을 blob으로 옮겨 중복 제거
+"""
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from book.storage import BLOB_PREFIX, blob_storage, content_hash, is_blob_name
+
+# blob_storage를 쓰는 필드 (모델 이름 → 필드 이름들)
+BLOB_FIELDS = {
+    'PageAudio': ('audio_file',),
+    'Content': ('tts_audio_file',),
+    'SoundEffectLibrary': ('audio_file',),
+    'BackgroundMusicLibrary': ('audio_file',),
+}
+_UNLOADED = object()
+_CHUNK = 500
+
+
+def _models():
+    from django.apps import apps
+    return [(apps.get_model('book', name), fields) for name, fields in BLOB_FIELDS.items()]
+
+
+def _name(value):
+    return (getattr(value, 'name', value) or None) if value is not _UNLOADED else _UNLOADED
+
+
+# ==================== 참조 수 (signals) ====================
+
+def snapshot(instance):
+    """post_init: 로드 시점의 blob 필드 값 기록 (지연 로드 필드는 _UNLOADED — 조회하지 않음)"""
+    instance._blob_names = {
+        field: _name(instance.__dict__.get(field, _UNLOADED))
+        for field in BLOB_FIELDS[type(instance).__name__]
+    }
+
+
+def acquire(name):
+    if not is_blob_name(name):
+        return
+    from book.models import MediaBlob
+    if MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, released_at=None):
+        return
+    size = os.path.getsize(blob_storage.path(name)) if blob_storage.exists(name) else 0
+    blob, created = MediaBlob.objects.get_or_create(name=name, defaults={'size_bytes': size, 'ref_count': 1})
+    if not created:
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, released_at=None)
+
+
+def release(name):
+    if not is_blob_name(name):
+        return
+    from book.models import MediaBlob
+    MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    MediaBlob.objects.filter(name=name, ref_count=0, released_at__isnull=True).update(released_at=timezone.now())
+
+
+def sync(instance, update_fields=None):
+    """post_save: 저장된 blob 필드 값이 바뀌었으면 새 blob acquire, 이전 blob release"""
+    before = getattr(instance, '_blob_names', {})
+    for field in BLOB_FIELDS[type(instance).__name__]:
+        if update_fields is not None and field not in update_fields:
+            continue
+        old, new = before.get(field), _name(getattr(instance, field))
+        if old is _UNLOADED or old == new:
+            continue
+        acquire(new)
+        release(old)
+    snapshot(instance)
+
+
+def release_all(instance):
+    """post_delete: 삭제된 행이 가리키던 blob release (파일은 sweep이 유예 후 삭제)"""
+    for field in BLOB_FIELDS[type(instance).__name__]:
+        release(_name(instance.__dict__.get(field)))
+
+
+# ==================== 참조 확인 / 재계산 ====================
+
+def references(name):
+    """blob을 가리키는 실제 행 수 (모든 blob 필드)"""
+    return sum(model.objects.filter(**{field: name}).count()
+               for model, fields in _models() for field in fields)
+
+
+def _reference_counts():
+    counts = {}
+    for model, fields in _models():
+        for field in fields:
+            names = model.objects.filter(**{f'{field}__startswith': BLOB_PREFIX}).values_list(field, flat=True)
+            for name in names.iterator(chunk_size=2000):
+                counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def recount():
+    """참조 수를 실제 필드 값으로 다시 계산 (신호 없이 바뀐 값 복구) → (수정, 생성) 행 수"""
+    from book.models import MediaBlob
+    counts = _reference_counts()
+    updated = created = 0
+    now = timezone.now()
+    for blob in MediaBlob.objects.all().iterator(chunk_size=2000):
+        actual = counts.pop(blob.name, 0)
+        if blob.ref_count != actual:
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                ref_count=actual, released_at=(blob.released_at or now) if not actual else None)
+            updated += 1
+    for name, count in counts.items():
+        size = os.path.getsize(blob_storage.path(name)) if blob_storage.exists(name) else 0
+        MediaBlob.objects.create(name=name, size_bytes=size, ref_count=count)
+        created += 1
+    return updated, created
+
+
+# ==================== 정리 ====================
+
+def _older_than(path, cutoff):
+    try:
+        return os.path.getmtime(path) < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def sweep(grace_hours=None, scratch_hours=None, dry_run=False):
+    """
+    참조 없는 blob/고아 blob 파일/오래된 작업 파일 삭제 → 통계 dict
+    - 참조 0 blob: released_at이 grace_hours(BLOB_SWEEP_GRACE_HOURS) 이전이고 실제 참조도 없을 때만
+    - 행 없는 blob 파일: mtime이 grace_hours 이전이고 참조 없음 (파일 저장 후 모델 저장 전에 실패)
+    - MEDIA_ROOT/audio 최상위 파일: mtime이 scratch_hours(MEDIA_SCRATCH_MAX_AGE_HOURS) 이전 (TTS/병합/믹싱 임시 파일)
+      단, 배치 체크포인트가 가리키는 페이지는 체크포인트가 만료(BATCH_CHECKPOINT_MAX_AGE_HOURS)될 때까지 유지
+    """
+    from book.models import MediaBlob
+
+    grace = float(grace_hours if grace_hours is not None else getattr(settings, 'BLOB_SWEEP_GRACE_HOURS', 24))
+    scratch = float(scratch_hours if scratch_hours is not None
+                    else getattr(settings, 'MEDIA_SCRATCH_MAX_AGE_HOURS', 24))
+    stats = {'blobs': 0, 'orphan_files': 0, 'scratch_files': 0, 'freed_bytes': 0, 'repaired': 0, 'checkpoints': 0}
+
+    def remove(path):
+        size = os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+        stats['freed_bytes'] += size
+
+    stale = MediaBlob.objects.filter(ref_count__lte=0, released_at__lt=timezone.now() - timedelta(hours=grace))
+    for blob in stale.iterator(chunk_size=500):
+        live = references(blob.name)
+        if live:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=live, released_at=None)
+            stats['repaired'] += 1
+            continue
+        if not dry_run and not MediaBlob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()[0]:
+            continue  # 그사이 다시 참조됨
+        path = blob_storage.path(blob.name)
+        if os.path.exists(path):
+            remove(path)
+        stats['blobs'] += 1
+
+    cutoff = time.time() - grace * 3600
+    root = blob_storage.path(BLOB_PREFIX)
+    if os.path.isdir(root):
+        for dirpath, _, filenames in os.walk(root):
+            names = [f'{BLOB_PREFIX}{os.path.relpath(os.path.join(dirpath, f), root).replace(os.sep, "/")}'
+                     for f in filenames]
+            names = [n for n in names if _older_than(blob_storage.path(n), cutoff)]
+            for i in range(0, len(names), _CHUNK):
+                chunk = names[i:i + _CHUNK]
+                known = set(MediaBlob.objects.filter(name__in=chunk).values_list('name', flat=True))
+                for name in chunk:
+                    if name not in known and not references(name):
+                        remove(blob_storage.path(name))
+                        stats['orphan_files'] += 1
+
+    from book import batch_checkpoints
+    stats['checkpoints'] = batch_checkpoints.expire(dry_run=dry_run)
+    scratch_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
+    if os.path.isdir(scratch_dir):
+        keep = batch_checkpoints.protected_paths()  # 재개 가능한 배치 작업의 렌더된 페이지
+        cutoff = time.time() - scratch * 3600
+        with os.scandir(scratch_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff \
+                        and os.path.abspath(entry.path) not in keep:
+                    remove(entry.path)
+                    stats['scratch_files'] += 1
+
+    print(f"🧹 미디어 정리{' (dry-run)' if dry_run else ''}: blob {stats['blobs']}개, 고아 파일 {stats['orphan_files']}개, "
+          f"작업 파일 {stats['scratch_files']}개, {stats['freed_bytes'] / 1024 / 1024:.1f}MB")
+    return stats
+
+
+# ==================== 기존 파일 이전 ====================
+
+def adopt(dry_run=False):
+    """
+    blob이 아닌 예전 이름의 파일을 blob 저장소로 이전 → (이전 파일 수, 절약 bytes)
+    새 blob이면 파일 이동(rename), 같은 내용 blob이 이미 있으면 예전 파일 삭제 (tts_reuse_ 복사본 등)
+    행은 QuerySet.update로 바꾸므로 신호 없음 → 마지막에 recount()
+    """
+    moved = saved = 0
+    for model, fields in _models():
+        for field in fields:
+            rows = (model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .exclude(**{f'{field}__startswith': BLOB_PREFIX}).values_list(field, flat=True))
+            for old_name in rows.iterator(chunk_size=500):
+                if not blob_storage.exists(old_name):
+                    continue  # 같은 이름의 앞선 행에서 이미 이전됨
+                old_path = blob_storage.path(old_name)
+                with open(old_path, 'rb') as f:
+                    new_name = blob_storage.hashed_name(old_name, content_hash(File(f)))
+                moved += 1
+                if dry_run:
+                    continue
+                if blob_storage.exists(new_name):
+                    saved += os.path.getsize(old_path)
+                    os.remove(old_path)
+                else:
+                    os.makedirs(os.path.dirname(blob_storage.path(new_name)), exist_ok=True)
+                    os.replace(old_path, blob_storage.path(new_name))
+                model.objects.filter(**{field: old_name}).update(**{field: new_name})
+    if not dry_run:
+        recount()
+    return moved, saved
+
+
+# ==================== 사용량 ====================
+
+def _blob_sizes(names):
+    from book.models import MediaBlob
+    names = list(names)
+    sizes = {}
+    for i in range(0, len(names), _CHUNK):
+        sizes.update(MediaBlob.objects.filter(name__in=names[i:i + _CHUNK]).values_list('name', 'size_bytes'))
+    return sizes
+
+
+def _file_size(storage, name):
+    try:
+        return os.path.getsize(storage.path(name))
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _usage(refs, contents):
+    """refs: (storage, 이름) 참조 목록(중복 포함), contents: 게시 오디오를 셀 Content QuerySet"""
+    from book.models import Content, ContentRendition
+
+    blob_refs = [name for _, name in refs if is_blob_name(name)]
+    sizes = _blob_sizes(set(blob_refs))
+    legacy = {(storage, name) for storage, name in refs if not is_blob_name(name)}
+    audio_storage = Content._meta.get_field('audio_file').storage
+    published = sum(_file_size(audio_storage, name) for name in contents.exclude(audio_file='')
+                    .exclude(audio_file__isnull=True).values_list('audio_file', flat=True).iterator())
+    published += ContentRendition.objects.filter(content__in=contents).aggregate(s=Sum('size_bytes'))['s'] or 0
+    return {
+        'blobs': len(sizes),
+        'stored_bytes': sum(sizes.values()),              # 중복 제거 후 실제 blob 용량
+        'logical_bytes': sum(sizes.get(n, 0) for n in blob_refs),  # 참조마다 따로 셌을 때 (복사본 방식)
+        'legacy_bytes': sum(_file_size(storage, name) for storage, name in legacy),
+        'published_bytes': published,                    # 게시 MP3 + 렌디션
+    }
+
+
+def _refs(queryset, field):
+    storage = queryset.model._meta.get_field(field).storage
+    names = queryset.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True)
+    return [(storage, name) for name in names.iterator(chunk_size=2000)]
+
+
+def usage(user=None, book=None):
+    """
+    사용자 또는 책의 디스크 사용량 dict
+    - 책: 페이지 오디오 + 무손실 마스터 + 게시 오디오
+    - 사용자: 모든 책 + BGM/SFX 라이브러리 (책 사이에 공유된 blob은 1번만)
+    """
+    from book.models import BackgroundMusicLibrary, Content, PageAudio, SoundEffectLibrary
+
+    if book is not None:
+        contents = Content.objects.filter(book=book)
+        refs = _refs(PageAudio.objects.filter(content__book=book), 'audio_file') + _refs(contents, 'tts_audio_file')
+        return _usage(refs, contents)
+    contents = Content.objects.filter(book__user=user)
+    refs = (_refs(PageAudio.objects.filter(content__book__user=user), 'audio_file')
+            + _refs(contents, 'tts_audio_file')
+            + _refs(SoundEffectLibrary.objects.filter(user=user), 'audio_file')
+            + _refs(BackgroundMusicLibrary.objects.filter(user=user), 'audio_file'))
+    return _usage(refs, contents)
@@ -0,0 +1,312 @@
+"""
+인프로세스 오디오 코덱 (ffmpeg 프로세스 생성 없음)
+- libsndfile 바인딩(soundfile)으로 WAV/FLAC/OGG/MP3를 파이썬 프로세스 안에서 디코딩/인코딩
+  (libsndfile 1.1+ 는 mpg123/LAME 내장 — MP3 읽기/쓰기 모두 가능)
+- 파일 → (frames, channels) int16 배열, 배열 → 파일, 블록 단위 스트리밍 인코더(StreamWriter)
+- soundfile이 없거나 지원하지 않는 포맷(m4a/webm 등), 디코딩 실패 시에만 pydub(ffmpeg)로 폴백
+- settings.AUDIO_CODEC_BACKEND='pydub' 이면 항상 pydub 사용 (비교/장애 대응용)
+
+MP3 인코딩만 예외: libsndfile에 내장된 LAME은 품질 2 고정이라 ffmpeg(libmp3lame 기본 품질 3)보다
+약 2배 느림 (bench_audio codec). 그래서 기본값(settings.AUDIO_CODEC_MP3_ENCODER='ffmpeg')에서는
+출력 파일당 ffmpeg 1개에 PCM을 파이프로 넘기고 (임시 파일/ffprobe 없음),
+ffmpeg가 없을 때나 'soundfile'로 설정했을 때만 인프로세스로 인코딩.
+"""
+import io
+import os
+import shutil
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import soundfile as sf
+except (ImportError, OSError):  # 패키지 또는 libsndfile 공유 라이브러리 없음
+    sf = None
+
+SAMPLE_WIDTH = 2
+BLOCK_FRAMES = 65536
+
+# 확장자/포맷 이름 → (libsndfile format, 기본 subtype)
+_SF_FORMATS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'ogg': ('OGG', 'VORBIS'),
+    'mp3': ('MP3', 'MPEG_LAYER_III'),
+}
+# libsndfile의 MP3 CBR 비트레이트 = 320 - compression_level * 288 (kbps)
+_MP3_MAX_KBPS = 320
+_MP3_MIN_KBPS = 32
+
+
+def _format_name(path_or_format):
+    name = str(path_or_format).lower()
+    if '.' in name:
+        name = os.path.splitext(name)[1].lstrip('.')
+    return name
+
+
+def _use_soundfile():
+    return sf is not None and getattr(settings, 'AUDIO_CODEC_BACKEND', 'auto') != 'pydub'
+
+
+def backend():
+    """현재 사용 중인 코덱 백엔드 이름 ('soundfile' | 'pydub')"""
+    return 'soundfile' if _use_soundfile() else 'pydub'
+
+
+def can_decode(path):
+    return _use_soundfile() and _format_name(path) in _SF_FORMATS
+
+
+@lru_cache(maxsize=1)
+def _ffmpeg_available():
+    from pydub import AudioSegment
+    return shutil.which(AudioSegment.converter) is not None
+
+
+def can_encode(format):
+    name = _format_name(format)
+    if not _use_soundfile() or name not in _SF_FORMATS:
+        return False
+    if name == 'mp3':
+        return 'MP3' in sf.available_formats() and \
+            (getattr(settings, 'AUDIO_CODEC_MP3_ENCODER', 'ffmpeg') == 'soundfile' or not _ffmpeg_available())
+    return True
+
+
+def _bitrate_kbps(bitrate):
+    if not bitrate:
+        return None
+    return int(str(bitrate).lower().rstrip('k'))
+
+
+def _writer_options(format, bitrate):
+    fmt, subtype = _SF_FORMATS[_format_name(format)]
+    options = {'format': fmt, 'subtype': subtype}
+    kbps = _bitrate_kbps(bitrate)
+    if fmt == 'MP3' and kbps:
+        kbps = max(_MP3_MIN_KBPS, min(_MP3_MAX_KBPS, kbps))
+        options['compression_level'] = (_MP3_MAX_KBPS - kbps) / (_MP3_MAX_KBPS - _MP3_MIN_KBPS)
+        options['bitrate_mode'] = 'CONSTANT'
+    return options
+
+
+def conform_channels(data, channels):
+    """(n, ch) int16 배열의 채널 수 맞춤 (mono↔stereo)"""
+    if not channels or data.shape[1] == channels:
+        return data
+    if channels == 1:
+        return data.mean(axis=1, keepdims=True).astype(np.int16)
+    return np.repeat(data[:, :1], channels, axis=1)
+
+
+def resample(data, src_rate, dst_rate):
+    """(n, ch) int16 배열 리샘플 (polyphase FIR)"""
+    if not dst_rate or src_rate == dst_rate or not len(data):
+        return data
+    from scipy.signal import resample_poly
+    g = gcd(int(src_rate), int(dst_rate))
+    out = resample_poly(data.astype(np.float32), dst_rate // g, src_rate // g, axis=0)
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def _decode_pydub(path):
+    from pydub import AudioSegment
+    seg = AudioSegment.from_file(str(path)).set_sample_width(SAMPLE_WIDTH)
+    return np.frombuffer(seg.raw_data, dtype=np.int16).reshape(-1, seg.channels), seg.frame_rate
+
+
+def decode(path, frame_rate=None, channels=None):
+    """
+    오디오 파일 → ((frames, channels) int16 배열, frame_rate).
+    frame_rate/channels 지정 시 그 포맷으로 변환. soundfile 실패 시 pydub 폴백.
+    """
+    data = rate = None
+    if can_decode(path):
+        try:
+            data, rate = sf.read(str(path), dtype='int16', always_2d=True)
+        except (sf.LibsndfileError, RuntimeError) as e:
+            print(f"⚠️ 인프로세스 디코딩 실패 → pydub 폴백: {os.path.basename(str(path))} ({e})")
+    if data is None:
+        data, rate = _decode_pydub(path)
+    if frame_rate and rate != frame_rate:
+        data, rate = resample(data, rate, frame_rate), frame_rate
+    return conform_channels(data, channels), rate
+
+
+def decode_segment(path):
+    """오디오 파일 → pydub AudioSegment (디코딩은 인프로세스, 세그먼트 연산은 기존 코드 그대로)"""
+    from pydub import AudioSegment
+    data, rate = decode(path)
+    return AudioSegment(data=np.ascontiguousarray(data).tobytes(), sample_width=SAMPLE_WIDTH,
+                        frame_rate=rate, channels=data.shape[1])
+
+
+def encode(data, frame_rate, output, format='mp3', bitrate=None):
+    """
+    (frames, channels) int16 배열 → 파일 경로 또는 file-like(BytesIO 등).
+    인프로세스로 인코딩하지 않는 포맷은 파일 경로면 ffmpeg 파이프(PCMEncoder) 1회, 그 외에는 pydub export.
+    """
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if can_encode(format):
+        with StreamWriter(output, frame_rate, data.shape[1], format=format, bitrate=bitrate) as writer:
+            writer.write(data)
+        return output
+    if isinstance(output, str) and _format_name(format) != 'wav':  # WAV는 pydub도 ffmpeg 없이 기록
+        from book.audio_engine import PCMEncoder
+        with PCMEncoder(output, frame_rate, data.shape[1], bitrate=bitrate, format=_format_name(format)) as encoder:
+            encoder.write_pcm(np.ascontiguousarray(data, dtype=np.int16).tobytes())
+        return output
+    from pydub import AudioSegment
+    seg = AudioSegment(data=np.ascontiguousarray(data, dtype=np.int16).tobytes(), sample_width=SAMPLE_WIDTH,
+                       frame_rate=frame_rate, channels=data.shape[1])
+    seg.export(output, format=_format_name(format), **({'bitrate': bitrate} if bitrate else {}))
+    return output
+
+
+def export_segment(segment, output, format='mp3', bitrate=None):
+    """AudioSegment.export 대체 (encode와 같은 규칙으로 인코딩)"""
+    segment = segment.set_sample_width(SAMPLE_WIDTH)
+    data = np.frombuffer(segment.raw_data, dtype=np.int16).reshape(-1, segment.channels)
+    return encode(data, segment.frame_rate, output, format=format, bitrate=bitrate)
+
+
+def transcode(src_path, dst_path, bitrate=None, format='mp3'):
+    """
+    파일 → 파일 변환을 블록 단위로 수행 (전체를 메모리에 올리지 않음).
+    인프로세스로 처리할 수 없으면 False 반환 → 호출자가 ffmpeg 경로 사용.
+    """
+    if not (can_decode(src_path) and can_encode(format)):
+        return False
+    try:
+        with sf.SoundFile(str(src_path)) as src, \
+                StreamWriter(dst_path, src.samplerate, src.channels, format=format, bitrate=bitrate) as writer:
+            for block in src.blocks(BLOCK_FRAMES, dtype='int16', always_2d=True):
+                writer.write(block)
+    except (sf.LibsndfileError, RuntimeError) as e:
+        print(f"⚠️ 인프로세스 변환 실패 → ffmpeg 폴백: {os.path.basename(str(src_path))} ({e})")
+        if isinstance(dst_path, str) and os.path.exists(dst_path):
+            os.remove(dst_path)
+        return False
+    return True
+
+
+class Reader:
+    """
+    순차 블록 읽기용 소스 (파일 전체를 디코딩하지 않음).
+    reader[a:b] → (b-a, channels) int16 — 직전 읽기 위치에서 이어지면 seek 없이 읽음.
+    len(reader)는 전체 프레임 수. 렌더러의 bed/sequence 소스로 배열 대신 사용.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = sf.SoundFile(self.path)
+        self.frame_rate = self._file.samplerate
+        self.channels = self._file.channels
+        self.frames = self._file.frames
+        self.shape = (self.frames, self.channels)
+        self._pos = 0
+
+    def __len__(self):
+        return self.frames
+
+    def __getitem__(self, index):
+        start, stop, _ = index.indices(self.frames)
+        count = max(0, stop - start)
+        if start != self._pos:
+            self._file.seek(start)
+        data = self._file.read(count, dtype='int16', always_2d=True)
+        self._pos = start + len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_reader(path, frame_rate=None):
+    """
+    스트리밍 Reader. 인프로세스로 읽을 수 없거나 frame_rate가 다르면(리샘플 필요) None
+    → 호출자는 decode()로 전체 디코딩.
+    """
+    if not can_decode(path):
+        return None
+    try:
+        reader = Reader(path)
+    except (sf.LibsndfileError, RuntimeError):
+        return None
+    if (frame_rate and reader.frame_rate != frame_rate) or not reader.frames:
+        reader.close()
+        return None
+    return reader
+
+
+class StreamWriter:
+    """
+    블록 단위 인프로세스 인코더 (libsndfile). audio_engine.PCMEncoder의 ffmpeg 파이프를 대신함.
+
+    with StreamWriter(path, 44100, 2, format='mp3', bitrate='128k') as w:
+        w.write(block)          # (n, ch) int16 배열
+        w.write_bytes(raw)      # interleaved s16le 바이트
+    """
+
+    def __init__(self, output, frame_rate, channels, format='mp3', bitrate=None):
+        self.output = output
+        self.frame_rate = int(frame_rate)
+        self.channels = int(channels)
+        self.format = format
+        self.bitrate = bitrate
+        self._file = None
+
+    def open(self):
+        self._file = sf.SoundFile(self.output, 'w', samplerate=self.frame_rate, channels=self.channels,
+                                  **_writer_options(self.format, self.bitrate))
+        return self
+
+    def write(self, data):
+        if len(data):
+            self._file.write(np.ascontiguousarray(data, dtype=np.int16))
+        return len(data)
+
+    def write_bytes(self, raw):
+        return self.write(np.frombuffer(raw, dtype=np.int16).reshape(-1, self.channels))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def abort(self):
+        """불완전한 출력 파일 삭제"""
+        try:
+            self.close()
+        except Exception:
+            pass
+        if isinstance(self.output, str) and os.path.exists(self.output):
+            os.remove(self.output)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def to_bytes(data, frame_rate, format='mp3', bitrate=None):
+    """배열을 인코딩한 바이트 (스니펫 응답 등)"""
+    buf = io.BytesIO()
+    encode(data, frame_rate, buf, format=format, bitrate=bitrate)
+    return buf.getvalue()
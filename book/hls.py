@@ -0,0 +1,255 @@
+"""
+에피소드 HLS 패키징 (MP3 프레임 복사 — 디코딩/재인코딩 없음)
+- 게시된 MP3(Content.audio_file, MP3 렌디션)를 AUDIO_HLS_SEGMENT_SECONDS 안팎의 세그먼트로 나눠
+  오디오 옆 '<파일명>.hls/' 폴더에 seg_00000.mp3 … + index.m3u8(VOD 미디어 플레이리스트) 기록
+- 세그먼트는 HLS packed audio 형식: 각 세그먼트 앞에 ID3 PRIV(transportStreamTimestamp) 태그
+- 세그먼트 경계는 audio_timestamps의 대사 시작 시각에 맞춤 (target의 0.5~1.5배 범위에서 target에 가장 가까운 대사 시작)
+  → 대사 이동 시 해당 세그먼트부터 받으면 됨 (timestamp_segments)
+- 서명 URL(signed_media, 패키지 폴더 단위 서명)로 제공 — public 등급은 CDN 캐시 가능, 클라이언트는 세그먼트를 병렬로 받을 수 있음
+- 마스터 플레이리스트(standard + MP3 렌디션)는 audio_streaming.hls_master_playlist가 생성
+- package.json에 원본 크기/mtime과 대사 경계를 저장하여 파일이나 타임스탬프가 바뀌면 자동 재생성
+
+세그먼트 첫 프레임은 이전 세그먼트의 비트 저장소(main_data_begin)를 참조할 수 있어
+세그먼트 중간부터 디코딩을 시작하면 첫 프레임(≈26ms)이 무음/잡음일 수 있음 (연속 재생에는 영향 없음).
+"""
+import hashlib
+import json
+import math
+import mmap
+import os
+import shutil
+from bisect import bisect_right
+from uuid import uuid4
+
+from django.conf import settings
+
+from book import mp3_index
+
+PACKAGE_VERSION = 1
+HLS_SUFFIX = '.hls'
+PLAYLIST_NAME = 'index.m3u8'
+MANIFEST_NAME = 'package.json'
+MP3_CODECS = 'mp4a.40.34'  # HLS CODECS 속성의 MPEG-1/2 Layer III
+_ID3_OWNER = b'com.apple.streaming.transportStreamTimestamp\x00'
+
+
+def enabled():
+    return getattr(settings, 'AUDIO_HLS_ENABLED', False)
+
+
+def segment_ms():
+    return int(float(getattr(settings, 'AUDIO_HLS_SEGMENT_SECONDS', 6)) * 1000)
+
+
+def package_dir(audio_path):
+    return str(audio_path) + HLS_SUFFIX
+
+
+def _timestamps(value):
+    """audio_timestamps(JSON 문자열로 저장된 예전 데이터 포함) → dict 목록"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return [ts for ts in value or [] if isinstance(ts, dict)] if isinstance(value, list) else []
+
+
+def _start_ms(ts):
+    try:
+        return int(ts.get('startTime') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _boundaries(timestamps):
+    """audio_timestamps → 정렬된 대사 시작 시각(ms) 목록"""
+    return sorted({_start_ms(ts) for ts in _timestamps(timestamps)})
+
+
+def _boundaries_key(boundaries):
+    return hashlib.md5(','.join(map(str, boundaries)).encode()).hexdigest()
+
+
+def _cut_time(seg_start, target, boundaries):
+    """seg_start에서 시작하는 세그먼트의 끝 시각: [0.5, 1.5]×target 범위의 대사 시작 중 target에 가장 가까운 것"""
+    lo, hi = seg_start + target // 2, seg_start + target * 3 // 2
+    i = bisect_right(boundaries, lo - 1)
+    best = None
+    while i < len(boundaries) and boundaries[i] <= hi:
+        if best is None or abs(boundaries[i] - seg_start - target) < abs(best - seg_start - target):
+            best = boundaries[i]
+        i += 1
+    return best if best is not None else seg_start + target
+
+
+def _syncsafe(n):
+    return bytes(((n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F))
+
+
+def _id3_timestamp(start_ms):
+    """packed audio 세그먼트 시작 PTS (90kHz, 33bit) ID3v2.4 PRIV 태그"""
+    pts = (int(start_ms) * 90) & ((1 << 33) - 1)
+    payload = _ID3_OWNER + pts.to_bytes(8, 'big')
+    frame = b'PRIV' + _syncsafe(len(payload)) + b'\x00\x00' + payload
+    return b'ID3\x04\x00\x00' + _syncsafe(len(frame)) + frame
+
+
+def _split(buf, target, boundaries):
+    """
+    프레임 헤더를 따라가며 세그먼트 목록 [(start_offset, end_offset, start_samples, samples)], sample_rate, 프레임당 샘플 수.
+    끝 시각(대사 시작)을 포함하는 프레임에서 새 세그먼트 시작 → 대사 시작은 세그먼트 첫 프레임 안에 있음
+    """
+    segments = []
+    sample_rate = frame_samples = 0
+    seg = None  # [start_offset, end_offset, start_samples, samples]
+    cut = None
+    elapsed = 0
+    for pos, frame_bytes, samples, rate, _ in mp3_index.iter_frames(buf):
+        if not sample_rate:
+            sample_rate, frame_samples = rate, samples
+        if seg is None or (elapsed + samples) * 1000 // sample_rate > cut:
+            if seg is not None:
+                segments.append(tuple(seg))
+            seg = [pos, pos, elapsed, 0]
+            cut = _cut_time(elapsed * 1000 // sample_rate, target, boundaries)
+        seg[1] = pos + frame_bytes
+        seg[3] += samples
+        elapsed += samples
+    if seg is not None:
+        segments.append(tuple(seg))
+    return segments, sample_rate, frame_samples
+
+
+def _write_playlist(path, entries):
+    target_duration = max((math.ceil(e['duration_ms'] / 1000) for e in entries), default=1)
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        f'#EXT-X-TARGETDURATION:{target_duration}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+    ]
+    for e in entries:
+        lines.append(f"#EXTINF:{e['duration_ms'] / 1000:.3f},")
+        lines.append(e['uri'])
+    lines.append('#EXT-X-ENDLIST')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def package(audio_path, timestamps=None, target_ms=None):
+    """
+    MP3 → '<audio_path>.hls/' 세그먼트 + index.m3u8 + package.json (임시 폴더에 기록 후 교체).
+    manifest dict 반환. MP3가 아니거나 프레임이 없으면 None.
+    """
+    audio_path = str(audio_path)
+    if not audio_path.lower().endswith('.mp3') or not os.path.exists(audio_path):
+        return None
+    target = target_ms or segment_ms()
+    timestamps = _timestamps(timestamps)
+    boundaries = _boundaries(timestamps)
+    st = os.stat(audio_path)
+    if not st.st_size:
+        return None
+
+    dest = package_dir(audio_path)
+    tmp = f"{dest}.tmp-{uuid4().hex[:8]}"
+    os.makedirs(tmp)
+    try:
+        with open(audio_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            spans, sample_rate, frame_samples = _split(buf, target, boundaries)
+            if not spans:
+                shutil.rmtree(tmp)
+                return None
+            entries = []
+            for i, (start, end, start_samples, samples) in enumerate(spans):
+                start_ms = start_samples * 1000 // sample_rate
+                uri = f'seg_{i:05d}.mp3'
+                with open(os.path.join(tmp, uri), 'wb') as out:
+                    out.write(_id3_timestamp(start_ms))
+                    out.write(buf[start:end])
+                entries.append({
+                    'uri': uri,
+                    'start_ms': start_ms,
+                    'duration_ms': samples * 1000 // sample_rate,
+                    'size': end - start,
+                })
+        _write_playlist(os.path.join(tmp, PLAYLIST_NAME), entries)
+        starts = [e['start_ms'] for e in entries]
+        manifest = {
+            'version': PACKAGE_VERSION,
+            'target_ms': target,
+            'source_size': st.st_size,
+            'source_mtime': int(st.st_mtime),
+            'boundaries_key': _boundaries_key(boundaries),
+            'duration_ms': entries[-1]['start_ms'] + entries[-1]['duration_ms'],
+            'segments': entries,
+            # 대사 i 시작 시각이 들어 있는 세그먼트 번호 (audio_timestamps 순서)
+            'timestamp_segments': [max(0, bisect_right(starts, _start_ms(ts)) - 1) for ts in timestamps],
+        }
+        frame_ms = frame_samples * 1000 / sample_rate
+        aligned = sum(1 for b in boundaries if b - starts[max(0, bisect_right(starts, b) - 1)] < frame_ms)
+        with open(os.path.join(tmp, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    shutil.rmtree(dest, ignore_errors=True)
+    os.replace(tmp, dest)
+    print(f"📦 HLS 패키징: {os.path.basename(audio_path)} ({len(entries)}개 세그먼트, "
+          f"대사 경계 일치 {aligned}/{len(boundaries)})")
+    return manifest
+
+
+def load_manifest(audio_path):
+    """저장된 package.json (없거나 원본보다 오래됐으면 None)"""
+    try:
+        with open(os.path.join(package_dir(audio_path), MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        st = os.stat(audio_path)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (manifest.get('version') != PACKAGE_VERSION or manifest.get('source_size') != st.st_size
+            or manifest.get('source_mtime') != int(st.st_mtime)):
+        return None
+    return manifest
+
+
+def is_fresh(audio_path, timestamps=None):
+    """패키지가 현재 오디오/대사 경계/세그먼트 길이와 맞는지"""
+    manifest = load_manifest(audio_path)
+    return bool(manifest) and manifest.get('target_ms') == segment_ms() \
+        and manifest.get('boundaries_key') == _boundaries_key(_boundaries(timestamps))
+
+
+def ensure_package(audio_path, timestamps=None):
+    """게시/타임스탬프 갱신 직후 호출용: 패키지가 없거나 오디오/대사 경계/세그먼트 길이가 바뀌었으면 생성"""
+    if is_fresh(audio_path, timestamps):
+        return load_manifest(audio_path)
+    return package(audio_path, timestamps)
+
+
+def remove(audio_path):
+    try:
+        shutil.rmtree(package_dir(audio_path))
+    except (FileNotFoundError, TypeError):
+        pass
+
+
+def describe(request, content):
+    """API 응답용 HLS 정보 (standard 패키지 기준, 패키지 없으면 None)"""
+    from django.urls import reverse
+
+    if not content.audio_file:
+        return None
+    manifest = load_manifest(content.audio_file.path)
+    if manifest is None:
+        return None
+    return {
+        'url': request.build_absolute_uri(reverse('book:hls_master_playlist', args=[content.id])),
+        'segment_ms': manifest['target_ms'],
+        'segment_starts': [s['start_ms'] for s in manifest['segments']],
+        'timestamp_segments': manifest['timestamp_segments'],
+    }
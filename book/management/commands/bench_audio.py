@@ -0,0 +1,741 @@
+"""
+오디오 파이프라인 벤치마크 — Django Management Command
+
+사용법:
+  python manage.py bench_audio merge                    # 50/200/500 페이지 병합 (기존 방식 vs 스트리밍)
+  python manage.py bench_audio merge --pages 200 --skip-legacy
+  python manage.py bench_audio tts --pages 50 --latency 1.0 --workers 1 4 8   # fake ElevenLabs 서버 대상
+  python manage.py bench_audio tts --pages 50 --fail-rate 0.3                 # 실패 주입: book.tts_client 재시도/차단기
+  python manage.py bench_audio pipeline --pages 50       # 단계별 시간: 단계마다 MP3 인코딩(기존) vs 무손실 중간 포맷
+  python manage.py bench_audio mix --pages 200 --sfx 5 20 50   # SFX 삽입 + BGM: 3단계 방식 vs EDL 단일 패스
+  python manage.py bench_audio effects --clip-seconds 60        # WEBAUDIO_PRESETS 전체: 채널별 처리(기존) vs 2-D 엔진
+  python manage.py bench_audio remix --pages 200 --page-seconds 9   # 30분 에피소드 BGM 볼륨 변경: 디코딩 vs PCM 사이드카
+  python manage.py bench_audio snippet --minutes 10 30 60        # 15초 스니펫: 전체 디코딩+인코딩(기존) vs 프레임 복사
+  python manage.py bench_audio codec --pages 200                # 코덱 호출: pydub(ffmpeg 프로세스) vs 인프로세스(book.codec)
+  python manage.py bench_audio longmix --minutes 30 180 --beds 5  # MP3 마스터 + 루프 BGM bed 믹싱: 전체 디코딩 vs 블록 스트리밍
+  python manage.py bench_audio renditions --pages 200 --page-seconds 9   # 렌디션: 렌더 1회(동시 인코딩) vs 렌디션별 렌더
+  python manage.py bench_audio hls --minutes 30 180           # HLS 패키징: ffmpeg hls muxer vs 프레임 복사, 탐색 시 전송량
+
+합성 페이지(사인파 WAV)를 임시 폴더에 만들어 측정하며, DB는 사용하지 않음.
+메모리는 tracemalloc 최대치(파이썬 힙, pydub 버퍼 포함)로 측정.
+"""
+import math
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import wave
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+
+
+def _write_sine_wav(path, seconds, freq, frame_rate=44100, channels=1):
+    """합성 페이지: 지정 주파수의 사인파 WAV"""
+    frames = int(seconds * frame_rate)
+    period = max(1, int(frame_rate / freq))
+    one_period = b''.join(
+        struct.pack('<h', int(8000 * math.sin(2 * math.pi * i / period))) * channels
+        for i in range(period)
+    )
+    data = (one_period * (frames // period + 1))[:frames * channels * 2]
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(frame_rate)
+        w.writeframes(data)
+
+
+def _write_long_tone(path, seconds, freq, channels=1, frame_rate=44100):
+    """긴 합성 오디오 (블록 단위로 인코더에 기록 — 파일 길이와 무관하게 메모리 일정). 포맷은 확장자"""
+    from book.audio_engine import PCMEncoder
+    period = max(1, int(frame_rate / freq))
+    one_period = b''.join(
+        struct.pack('<h', int(8000 * math.sin(2 * math.pi * i / period))) * channels
+        for i in range(period)
+    )
+    block = one_period * max(1, frame_rate // period)
+    fmt = os.path.splitext(path)[1].lstrip('.')
+    with PCMEncoder(path, frame_rate, channels, bitrate='128k' if fmt == 'mp3' else None, format=fmt) as enc:
+        frames = int(seconds * frame_rate)
+        while enc.frames_written < frames:
+            enc.write_pcm(block[:(frames - enc.frames_written) * channels * 2])
+    return path
+
+
+def _make_pages(workdir, count, seconds):
+    paths = []
+    for i in range(count):
+        path = os.path.join(workdir, f'page_{i:04d}.wav')
+        _write_sine_wav(path, seconds, 220 + (i % 12) * 20)
+        paths.append(path)
+    return paths
+
+
+def _legacy_merge(audio_paths, output_path):
+    """기존 merge_audio_files 방식: combined = combined + silence + segment"""
+    from pydub import AudioSegment
+    combined = None
+    for path in audio_paths:
+        seg = AudioSegment.from_file(path)
+        if combined is None:
+            combined = seg
+        else:
+            combined = combined + AudioSegment.silent(duration=500) + seg
+    combined = AudioSegment.silent(duration=3000) + combined + AudioSegment.silent(duration=3000)
+    combined.export(output_path, format='mp3', bitrate='128k')
+    return len(combined)
+
+
+def _streaming_merge(audio_paths, output_path):
+    from book.audio_engine import stream_concat
+    _, total_ms = stream_concat(audio_paths, output_path)
+    return total_ms
+
+
+def _pipeline_run(pages_mp3, workdir, lossless, effect='phone', speed=1.1):
+    """
+    에피소드 1개 파이프라인 재현: 속도 조절 → WebAudio 효과 → 병합 → SFX 삽입 → BGM 믹싱.
+    lossless=False는 기존 방식(단계마다 MP3 인코딩), True는 WAV 중간 포맷 + 최종 1회 인코딩.
+    Returns: StageTimer
+    """
+    from pydub import AudioSegment
+    from book.audio_engine import StageTimer, export_intermediate, stream_concat
+    from book.utils import adjust_speed, apply_webaudio_effect, mix_audio_with_background
+
+    timer = StageTimer()
+    ext = '.wav' if lossless else '.mp3'
+    pages = []
+    with timer.stage('speed'):
+        for i, src in enumerate(pages_mp3):
+            seg = adjust_speed(AudioSegment.from_mp3(src), speed)
+            out = os.path.join(workdir, f'speed_{i:04d}{ext}')
+            if lossless:
+                export_intermediate(seg, out)
+            else:
+                seg.export(out, format='mp3')
+            pages.append(out)
+
+    with timer.stage('effect'):
+        processed = []
+        for path in pages:
+            out = apply_webaudio_effect(path, effect)
+            if out != path:
+                os.remove(path)
+            processed.append(out)
+        pages = processed
+
+    merged = os.path.join(workdir, f'merged{ext}')
+    with timer.stage('merge'):
+        stream_concat(pages, merged, bitrate=None if lossless else '128k', format='wav' if lossless else 'mp3')
+
+    sfx_path = os.path.join(workdir, 'sfx.wav')
+    bgm_path = os.path.join(workdir, 'bgm.wav')
+    if not os.path.exists(sfx_path):
+        _write_sine_wav(sfx_path, 1.5, 880)
+        _write_sine_wav(bgm_path, 20.0, 110, channels=2)
+
+    with timer.stage('sfx_insert'):
+        audio = AudioSegment.from_file(merged)
+        sfx = AudioSegment.from_file(sfx_path)
+        audio = audio[:5000] + sfx + audio[5000:]
+        sfx_out = os.path.join(workdir, f'sfx_insert{ext}')
+        if lossless:
+            export_intermediate(audio, sfx_out)
+        else:
+            audio.export(sfx_out, format='mp3', bitrate='128k')
+        del audio
+
+    with timer.stage('mix'):
+        final = mix_audio_with_background(sfx_out, [{'audioPath': bgm_path, 'startTime': 0, 'endTime': 60000, 'volume': -12}])
+
+    for path in pages + [merged, sfx_out, final]:
+        if path and os.path.exists(path):
+            os.remove(path)
+    return timer
+
+
+def _legacy_mix(master, timestamps, sfx_path, sfx_pages, bgm_path, bgm_ranges, output_path):
+    """기존 mix_bgm 방식: SFX마다 before + sfx + after, 타임스탬프 중첩 루프 보정, BGM overlay 후 재인코딩"""
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(master)
+    sfx = AudioSegment.from_file(sfx_path)
+    inserts = sorted(int(timestamps[p]['startTime']) for p in sfx_pages)
+    for insert_at in reversed(inserts):
+        audio = audio[:insert_at] + sfx + audio[insert_at:]
+    updated = [dict(t) for t in timestamps]
+    for insert_at in inserts:
+        for ts in updated:
+            if ts['startTime'] >= insert_at:
+                ts['startTime'] += len(sfx)
+            if ts['endTime'] >= insert_at:
+                ts['endTime'] += len(sfx)
+    tmp = output_path + '.sfx.mp3'
+    audio.export(tmp, format='mp3', bitrate='128k')
+
+    audio = AudioSegment.from_file(tmp)
+    bgm = AudioSegment.from_file(bgm_path) - 12
+    for start_page, end_page in bgm_ranges:
+        start = updated[start_page - 1]['endTime'] if start_page else 0
+        end = updated[end_page]['endTime']
+        bed = (bgm * ((end - start) // len(bgm) + 1))[:end - start]
+        fade = min(500, (end - start) // 4)
+        audio = audio.overlay(bed.fade_in(fade).fade_out(fade), position=start)
+    audio.export(output_path, format='mp3')
+    os.remove(tmp)
+    return len(audio)
+
+
+def _edl_mix(master, timestamps, sfx_path, sfx_pages, bgm_path, bgm_ranges, output_path):
+    from book.audio_engine import master_sequence, render_plan
+    inserts = {p: [{'type': 'audio', 'path': sfx_path}] for p in sfx_pages}
+    beds = [{'path': bgm_path, 'gain_db': -12, 'start_page': s, 'end_page': e} for s, e in bgm_ranges]
+    _, total_ms = render_plan({'sequence': master_sequence(master, timestamps, inserts=inserts), 'beds': beds}, output_path)
+    return total_ms
+
+
+def _legacy_effect(samples, sample_rate, preset):
+    """기존 apply_webaudio_effect 방식: 채널별 분리, 호출마다 필터 설계, 탭마다 전체 길이 버퍼"""
+    import numpy as np
+    from scipy.signal import butter, sosfilt
+
+    def channel(x):
+        nyq = sample_rate / 2.0
+        freq = min(preset['freq'], nyq - 1)
+        q = preset['Q'] if preset['Q'] > 0 else 1
+        if preset['filter_type'] == 'lowpass':
+            x = sosfilt(butter(2, freq / nyq, btype='low', output='sos'), x).astype(np.float32)
+        elif preset['filter_type'] == 'highpass':
+            x = sosfilt(butter(2, freq / nyq, btype='high', output='sos'), x).astype(np.float32)
+        elif preset['filter_type'] == 'bandpass':
+            low, high = max(freq / q, 20) / nyq, min(freq * q, nyq - 1) / nyq
+            if low >= high:
+                low, high = max(20 / nyq, 0.001), min(0.999, freq * 2 / nyq)
+            x = sosfilt(butter(2, [low, high], btype='band', output='sos'), x).astype(np.float32)
+
+        d = int(preset['delay'] * sample_rate)
+        if d > 0:
+            out = x.copy()
+            for i in range(8):
+                gain = preset['feedback'] ** (i + 1)
+                start = d * (i + 1)
+                if gain < 0.01 or start >= len(x):
+                    break
+                padded = np.zeros(len(x), dtype=np.float32)
+                padded[start:] = x[:len(x) - start] * gain
+                out += padded
+            peak = np.max(np.abs(out))
+            x = out / peak if peak > 1.0 else out
+
+        if preset['tremolo_rate'] > 0 and preset['tremolo_depth'] > 0:
+            t = np.arange(len(x)) / sample_rate
+            x = (x * (1.0 - preset['tremolo_depth'] * 0.5 * (1.0 + np.sin(2 * np.pi * preset['tremolo_rate'] * t)))).astype(np.float32)
+        return x
+
+    return np.stack([channel(np.ascontiguousarray(samples[:, c])) for c in range(samples.shape[1])], axis=1)
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+@contextmanager
+def _count_spawns():
+    """구간 안에서 생성된 자식 프로세스(ffmpeg/ffprobe) 수 집계 — counter['spawns']"""
+    import pydub.utils
+    counter = {'spawns': 0}
+    original = subprocess.Popen
+
+    class CountingPopen(original):
+        def __init__(self, *args, **kwargs):
+            counter['spawns'] += 1
+            super().__init__(*args, **kwargs)
+
+    subprocess.Popen = pydub.utils.Popen = CountingPopen
+    try:
+        yield counter
+    finally:
+        subprocess.Popen = pydub.utils.Popen = original
+
+
+class Command(BaseCommand):
+    help = '오디오 파이프라인 벤치마크 (합성 데이터)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', choices=['merge', 'tts', 'pipeline', 'mix', 'effects', 'remix', 'snippet', 'codec', 'longmix', 'renditions', 'hls'], help='측정 대상')
+        parser.add_argument('--pages', type=int, nargs='+', default=[50, 200, 500], help='페이지 수 목록')
+        parser.add_argument('--page-seconds', type=float, default=3.0, help='합성 페이지 길이(초)')
+        parser.add_argument('--skip-legacy', action='store_true', help='기존 방식 측정 생략')
+        parser.add_argument('--latency', type=float, default=1.0, help='[tts] fake 서버 응답 지연(초)')
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='[tts] 동시 요청 수 목록')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='[tts] fake 서버 실패 응답 비율 (0~1)')
+        parser.add_argument('--sfx', type=int, nargs='+', default=[5, 20, 50], help='[mix] SFX 삽입 개수 목록')
+        parser.add_argument('--clip-seconds', type=float, default=60.0, help='[effects] 테스트 클립 길이(초, stereo 44100Hz)')
+        parser.add_argument('--minutes', type=float, nargs='+', default=[10, 30, 60], help='[snippet/longmix/hls] 에피소드 길이(분) 목록')
+        parser.add_argument('--beds', type=int, default=5, help='[longmix] BGM bed 개수')
+
+    def handle(self, *args, **options):
+        workdir = tempfile.mkdtemp(prefix='bench_audio_')
+        try:
+            getattr(self, f"_bench_{options['target']}")(workdir, options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _row(self, label, pages, elapsed, peak, extra=''):
+        self.stdout.write(f'{label:<10} {pages:>6} {elapsed:>10.2f}s {peak / 1024 / 1024:>10.1f}MB  {extra}')
+
+    def _bench_merge(self, workdir, options):
+        self.stdout.write(f"{'방식':<10} {'페이지':>6} {'시간':>11} {'최대메모리':>12}")
+        max_pages = max(options['pages'])
+        all_pages = _make_pages(workdir, max_pages, options['page_seconds'])
+
+        for count in options['pages']:
+            pages = all_pages[:count]
+            if not options['skip_legacy']:
+                out = os.path.join(workdir, f'legacy_{count}.mp3')
+                total_ms, elapsed, peak = _measure(_legacy_merge, pages, out)
+                self._row('legacy', count, elapsed, peak, f'{total_ms / 1000:.1f}s audio')
+                os.remove(out)
+
+            out = os.path.join(workdir, f'stream_{count}.mp3')
+            total_ms, elapsed, peak = _measure(_streaming_merge, pages, out)
+            self._row('streaming', count, elapsed, peak, f'{total_ms / 1000:.1f}s audio')
+            os.remove(out)
+
+        self.stdout.write(self.style.SUCCESS('✅ merge 벤치마크 완료'))
+
+    def _bench_tts(self, workdir, options):
+        """fake ElevenLabs 서버(지연/실패 주입)를 대상으로 배치 페이지 TTS 단계 측정 (book.tts_client 경유)"""
+        import book.utils as book_utils
+        from book import tts_client
+        from book.batch_pipeline import render_tts_job as _render_page_tts
+        from book.management.commands.fake_tts_server import start_fake_server
+
+        count = options['pages'][0]
+        server, state, base_url = start_fake_server(
+            latency=options['latency'], audio_seconds=1.0, fail_rate=options['fail_rate'])
+        try:
+            jobs = [{'text': f'페이지 {i}', 'voice_id': 'fake_voice', 'webaudio_effect': 'normal', 'page_idx': i}
+                    for i in range(count)]
+            self.stdout.write(f"{'workers':<10} {'페이지':>6} {'시간':>11} {'서버 최대 동시':>14}")
+            for workers in options['workers']:
+                tts_client.configure(base_url=base_url, api_key='fake')
+                state.max_in_flight = 0
+                t0 = time.perf_counter()
+                paths = book_utils.run_tts_parallel(_render_page_tts, jobs, max_workers=workers)
+                elapsed = time.perf_counter() - t0
+                ok = sum(1 for p in paths if p)
+                stats = tts_client.stats()
+                self.stdout.write(
+                    f'{workers:<10} {count:>6} {elapsed:>10.2f}s {state.max_in_flight:>14}  ({ok}/{count} 성공, '
+                    f"재시도 {stats['retries']}회, 차단 {stats['rejected']}회, 한도 대기 {stats['throttled_seconds']:.1f}s)")
+                for p in paths:
+                    if p and os.path.exists(p):
+                        os.remove(p)
+        finally:
+            tts_client.configure()
+            server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS('✅ tts 벤치마크 완료'))
+
+    def _bench_pipeline(self, workdir, options):
+        """단계별 소요 시간: 기존(단계마다 MP3) vs 무손실 중간 포맷(최종 1회 인코딩)"""
+        from pydub import AudioSegment
+        from django.conf import settings
+
+        count = options['pages'][0]
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'audio'), exist_ok=True)
+        # TTS 응답과 같은 포맷(mono 44100Hz 128k MP3)의 합성 페이지
+        pages_mp3 = []
+        for i, wav in enumerate(_make_pages(workdir, count, options['page_seconds'])):
+            mp3 = os.path.join(workdir, f'tts_{i:04d}.mp3')
+            AudioSegment.from_file(wav).export(mp3, format='mp3', bitrate='128k')
+            os.remove(wav)
+            pages_mp3.append(mp3)
+
+        legacy = _pipeline_run(pages_mp3, workdir, lossless=False).report()
+        lossless = _pipeline_run(pages_mp3, workdir, lossless=True).report()
+
+        self.stdout.write(f"{count}페이지 × {options['page_seconds']}초")
+        self.stdout.write(f"{'단계':<12} {'기존(MP3)':>12} {'무손실':>12}")
+        for stage in legacy:
+            self.stdout.write(f'{stage:<12} {legacy[stage]:>11.2f}s {lossless.get(stage, 0):>11.2f}s')
+        self.stdout.write(f"{'합계':<12} {sum(legacy.values()):>11.2f}s {sum(lossless.values()):>11.2f}s")
+        self.stdout.write(f'페이지당 MP3 인코딩 횟수: 기존 5회 → 무손실 1회')
+        self.stdout.write(self.style.SUCCESS('✅ pipeline 벤치마크 완료'))
+
+    def _bench_mix(self, workdir, options):
+        """SFX 삽입 + BGM 3개: 기존 3단계(병합본 splice → overlay) vs EDL 단일 패스"""
+        from book.audio_engine import stream_concat
+
+        count = options['pages'][0]
+        master = os.path.join(workdir, 'master.wav')
+        timestamps, _ = stream_concat(_make_pages(workdir, count, options['page_seconds']), master,
+                                      bitrate=None, format='wav')
+        sfx_path = os.path.join(workdir, 'sfx.wav')
+        bgm_path = os.path.join(workdir, 'bgm.wav')
+        _write_sine_wav(sfx_path, 1.5, 880)
+        _write_sine_wav(bgm_path, 20.0, 110, channels=2)
+        third = max(1, count // 3)
+        bgm_ranges = [(0, third - 1), (third, 2 * third - 1), (2 * third, count - 1)]
+
+        self.stdout.write(f"{'방식':<10} {'SFX':>6} {'시간':>11} {'최대메모리':>12}")
+        for n_sfx in options['sfx']:
+            sfx_pages = sorted({(i * count) // max(1, n_sfx) for i in range(n_sfx)})
+            if not options['skip_legacy']:
+                out = os.path.join(workdir, 'legacy_mix.mp3')
+                total_ms, elapsed, peak = _measure(_legacy_mix, master, timestamps, sfx_path, sfx_pages, bgm_path, bgm_ranges, out)
+                self._row('legacy', len(sfx_pages), elapsed, peak, f'{total_ms / 1000:.1f}s audio')
+                os.remove(out)
+            out = os.path.join(workdir, 'edl_mix.mp3')
+            total_ms, elapsed, peak = _measure(_edl_mix, master, timestamps, sfx_path, sfx_pages, bgm_path, bgm_ranges, out)
+            self._row('edl', len(sfx_pages), elapsed, peak, f'{total_ms / 1000:.1f}s audio')
+            os.remove(out)
+
+        self.stdout.write(self.style.SUCCESS('✅ mix 벤치마크 완료'))
+
+    def _bench_effects(self, workdir, options):
+        """WEBAUDIO_PRESETS 전체를 stereo 클립에 적용 (첫 호출은 계수/테이블 캐시 생성 포함)"""
+        import numpy as np
+        from book.audio_fx import WEBAUDIO_PRESETS, apply_preset
+
+        sample_rate = 44100
+        frames = int(options['clip_seconds'] * sample_rate)
+        rng = np.random.default_rng(0)
+        t = np.arange(frames) / sample_rate
+        voice = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        samples = np.stack([voice, voice * 0.9], axis=1).astype(np.float32)
+        samples += rng.normal(0, 0.02, samples.shape).astype(np.float32)
+        planar = np.ascontiguousarray(samples.T)  # 엔진 입력: (channels, frames)
+
+        self.stdout.write(f"{options['clip_seconds']:.0f}초 stereo {sample_rate}Hz")
+        self.stdout.write(f"{'프리셋':<18} {'기존':>9} {'엔진':>9} {'엔진(캐시)':>11} {'최대 오차':>10}")
+        totals = [0.0, 0.0, 0.0]
+        for name, preset in WEBAUDIO_PRESETS.items():
+            legacy = None
+            legacy_sec = float('nan')
+            if not options['skip_legacy']:
+                t0 = time.perf_counter()
+                legacy = _legacy_effect(samples, sample_rate, preset)
+                legacy_sec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            result = apply_preset(planar, sample_rate, name).T
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            apply_preset(planar, sample_rate, name)
+            warm = time.perf_counter() - t0
+            err = float(np.abs(result - legacy).max()) if legacy is not None else float('nan')
+            for i, v in enumerate((legacy_sec, cold, warm)):
+                totals[i] += v
+            self.stdout.write(f'{name:<18} {legacy_sec:>8.3f}s {cold:>8.3f}s {warm:>10.3f}s {err:>10.1e}')
+        self.stdout.write(f"{'합계':<18} {totals[0]:>8.2f}s {totals[1]:>8.2f}s {totals[2]:>10.2f}s")
+        self.stdout.write(self.style.SUCCESS('✅ effects 벤치마크 완료'))
+
+    def _bench_remix(self, workdir, options):
+        """MP3 base(기존 에피소드) + MP3 BGM/SFX 재믹싱: 매번 디코딩 vs PCM 사이드카(최초 생성 / 재사용)"""
+        from pydub import AudioSegment
+        from django.test.utils import override_settings
+        from book import pcm_cache
+        from book.audio_engine import master_sequence, render_plan, stream_concat
+
+        count = options['pages'][0]
+        master_wav = os.path.join(workdir, 'master.wav')
+        timestamps, total_ms = stream_concat(_make_pages(workdir, count, options['page_seconds']), master_wav,
+                                             bitrate=None, format='wav')
+        master = os.path.join(workdir, 'tts_master.mp3')
+        bgm_path = os.path.join(workdir, 'bgm.mp3')
+        sfx_path = os.path.join(workdir, 'sfx.mp3')
+        bgm_wav, sfx_wav = os.path.join(workdir, 'bgm.wav'), os.path.join(workdir, 'sfx.wav')
+        _write_sine_wav(bgm_wav, 180.0, 110, channels=2)
+        _write_sine_wav(sfx_wav, 2.0, 880)
+        for src, dst in ((master_wav, master), (bgm_wav, bgm_path), (sfx_wav, sfx_path)):
+            AudioSegment.from_file(src).export(dst, format='mp3', bitrate='128k')
+            os.remove(src)
+        for name in os.listdir(workdir):
+            if name.startswith('page_'):
+                os.remove(os.path.join(workdir, name))
+
+        third = max(1, count // 3)
+        sfx_pages = range(0, count, max(1, count // 10))
+
+        def remix(volume_db, loader):
+            beds = [{'path': bgm_path, 'gain_db': volume_db, 'start_page': s, 'end_page': e, 'fade_ms': 500}
+                    for s, e in ((0, third - 1), (third, count - 1))]
+            beds += [{'path': sfx_path, 'gain_db': -3, 'loop': False, 'at_page': p,
+                      'timestamp': {'pageIndex': -1, 'type': 'sfx'}} for p in sfx_pages]
+            out = os.path.join(workdir, 'remix.mp3')
+            render_plan({'sequence': master_sequence(master, timestamps), 'beds': beds}, out, source_loader=loader)
+            os.remove(out)
+
+        self.stdout.write(f"{total_ms / 60000:.1f}분 에피소드 ({count}페이지), BGM 2구간 + SFX {len(sfx_pages)}개")
+        self.stdout.write(f"{'방식':<16} {'시간':>11} {'최대메모리':>12}")
+        with override_settings(PCM_CACHE_DIR=os.path.join(workdir, 'pcm'), PCM_CACHE_MAX_BYTES=8 * 1024 ** 3):
+            if not options['skip_legacy']:
+                _, elapsed, peak = _measure(remix, -14, None)
+                self.stdout.write(f"{'decode':<16} {elapsed:>10.2f}s {peak / 1024 / 1024:>10.1f}MB")
+            for label, volume_db in (('sidecar(생성)', -14), ('sidecar(재사용)', -10), ('sidecar(재사용)', -18)):
+                _, elapsed, peak = _measure(remix, volume_db, pcm_cache.load)
+                self.stdout.write(f"{label:<16} {elapsed:>10.2f}s {peak / 1024 / 1024:>10.1f}MB")
+        self.stdout.write(self.style.SUCCESS('✅ remix 벤치마크 완료'))
+
+    def _bench_snippet(self, workdir, options):
+        """에피소드 중간 15초 스니펫: 기존(전체 디코딩 → 자르기 → MP3 인코딩) vs 프레임 복사 (book.mp3_index.clip)"""
+        import io
+        from pydub import AudioSegment
+        from book import mp3_index
+
+        def legacy(path, start_ms, end_ms):
+            buf = io.BytesIO()
+            AudioSegment.from_file(path)[start_ms:end_ms].export(buf, format='mp3', bitrate='128k')
+            return buf.getvalue()
+
+        self.stdout.write(f"{'에피소드':<10} {'기존':>10} {'프레임 복사':>12} {'인덱스 생성':>12} {'클립 크기':>10}")
+        for minutes in options['minutes']:
+            wav = os.path.join(workdir, 'episode.wav')
+            mp3 = os.path.join(workdir, f'episode_{minutes:g}.mp3')
+            _write_sine_wav(wav, minutes * 60, 330)
+            AudioSegment.from_file(wav).export(mp3, format='mp3', bitrate='128k')
+            os.remove(wav)
+            start_ms = int(minutes * 30 * 1000)  # 에피소드 중간
+            end_ms = start_ms + 15000
+
+            legacy_sec = float('nan')
+            if not options['skip_legacy']:
+                t0 = time.perf_counter()
+                legacy(mp3, start_ms, end_ms)
+                legacy_sec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            mp3_index.write_index(mp3)
+            index_sec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            data = mp3_index.clip(mp3, start_ms, end_ms)
+            clip_sec = time.perf_counter() - t0
+            self.stdout.write(f'{minutes:>6g}분   {legacy_sec:>9.2f}s {clip_sec * 1000:>10.2f}ms '
+                              f'{index_sec * 1000:>10.1f}ms {len(data) / 1024:>8.0f}KB')
+            os.remove(mp3)
+            mp3_index.remove_index(mp3)
+
+        self.stdout.write(self.style.SUCCESS('✅ snippet 벤치마크 완료'))
+
+    def _bench_codec(self, workdir, options):
+        """
+        에피소드 1개 분량의 코덱 호출: 페이지 MP3 디코딩(→ 속도 조절 → WAV) / 페이지 MP3 인코딩 /
+        무손실 마스터 병합 / 게시용 MP3 변환.
+        기존(pydub: 호출마다 ffprobe+ffmpeg 프로세스, 임시 파일) vs book.codec(인프로세스 디코딩, MP3는 파이프 인코더).
+        """
+        from pydub import AudioSegment
+        from book import codec
+        from book.audio_engine import export_intermediate, stream_concat, transcode
+        from book.utils import adjust_speed
+
+        if codec.sf is None:
+            self.stdout.write(self.style.WARNING('⚠️ soundfile(libsndfile) 미설치 — 인프로세스 경로를 측정할 수 없습니다.'))
+            return
+        count = options['pages'][0]
+        pages_mp3 = []
+        for wav in _make_pages(workdir, count, options['page_seconds']):
+            mp3 = wav[:-4] + '.mp3'
+            transcode(wav, mp3)
+            os.remove(wav)
+            pages_mp3.append(mp3)
+
+        def decode_pages(tag, legacy):
+            out = []
+            for i, path in enumerate(pages_mp3):
+                seg = AudioSegment.from_file(path) if legacy else codec.decode_segment(path)
+                out.append(export_intermediate(adjust_speed(seg, 1.1), os.path.join(workdir, f'{tag}_{i:04d}.wav')))
+            return out
+
+        def encode_pages(pages_wav, tag, legacy):
+            for i, path in enumerate(pages_wav):
+                out = os.path.join(workdir, f'{tag}_{i:04d}.mp3')
+                if legacy:
+                    AudioSegment.from_file(path).export(out, format='mp3', bitrate='128k')
+                else:
+                    codec.export_segment(codec.decode_segment(path), out, format='mp3', bitrate='128k')
+
+        def merge(pages_wav, tag):
+            return stream_concat(pages_wav, os.path.join(workdir, f'{tag}_master.wav'), bitrate=None, format='wav')
+
+        def publish(tag):
+            transcode(os.path.join(workdir, f'{tag}_master.wav'), os.path.join(workdir, f'{tag}_master.mp3'))
+
+        self.stdout.write(f"{count}페이지 × {options['page_seconds']:g}초 (페이지 MP3 128k), "
+                          f"코덱 백엔드={codec.backend()}, MP3 인코더={'soundfile' if codec.can_encode('mp3') else 'ffmpeg'}")
+        self.stdout.write(f"{'단계':<14} {'방식':<8} {'시간':>9} {'프로세스':>8} {'호출당':>9}")
+        totals = {}
+
+        def timed(label, name, calls, func, *args):
+            with _count_spawns() as counter:
+                t0 = time.perf_counter()
+                result = func(*args)
+                elapsed = time.perf_counter() - t0
+            total = totals.setdefault(label, [0.0, 0])
+            total[0] += elapsed
+            total[1] += counter['spawns']
+            self.stdout.write(f"{name:<14} {label:<8} {elapsed:>8.2f}s {counter['spawns']:>8} "
+                              f"{elapsed / calls * 1000:>7.1f}ms")
+            return result
+
+        for label in ([] if options['skip_legacy'] else ['pydub']) + ['codec']:
+            legacy = label == 'pydub'
+            pages_wav = timed(label, 'page decode', count, decode_pages, label, legacy)
+            timed(label, 'page encode', count, encode_pages, pages_wav, label, legacy)
+            if legacy:
+                timed(label, 'merge+publish', 1, _legacy_merge, pages_wav, os.path.join(workdir, 'pydub_master.mp3'))
+            else:
+                timed(label, 'merge(wav)', 1, merge, pages_wav, label)
+                timed(label, 'publish mp3', 1, publish, label)
+        for label, (elapsed, spawns) in totals.items():
+            self.stdout.write(f"{'합계':<14} {label:<8} {elapsed:>8.2f}s {spawns:>8}")
+        self.stdout.write(self.style.SUCCESS('✅ codec 벤치마크 완료'))
+
+    def _bench_longmix(self, workdir, options):
+        """
+        긴 MP3 마스터 + 루프 BGM(MP3, 2분) bed N개 렌더링 (render_plan, 출력은 WAV — 인코더는 별도 프로세스라 제외).
+        기존: 마스터/BGM 전체 디코딩 (AUDIO_CODEC_BACKEND='pydub') vs 블록 스트리밍 (codec.Reader).
+        """
+        from django.test.utils import override_settings
+        from book import codec
+        from book.audio_engine import render_plan
+
+        if codec.sf is None:
+            self.stdout.write(self.style.WARNING('⚠️ soundfile(libsndfile) 미설치 — 스트리밍 경로를 측정할 수 없습니다.'))
+            return
+        count = options['beds']
+        bgms = [_write_long_tone(os.path.join(workdir, f'bgm_{i}.mp3'), 120.0, 110 + 30 * i, channels=2)
+                for i in range(count)]
+        self.stdout.write(f"BGM bed {count}개 (2분 stereo MP3, 루프) — 출력 WAV")
+        self.stdout.write(f"{'에피소드':<10} {'방식':<10} {'시간':>10} {'최대메모리':>12}")
+        for minutes in options['minutes']:
+            master = _write_long_tone(os.path.join(workdir, f'master_{minutes:g}.mp3'), minutes * 60, 330)
+            total_ms = int(minutes * 60000)
+            span = total_ms // count
+            beds = [{'path': path, 'gain_db': -14, 'start_ms': i * span, 'end_ms': total_ms if i == count - 1 else (i + 1) * span + 5000,
+                     'fade_ms': 2000} for i, path in enumerate(bgms)]
+            plan = {'sequence': [{'type': 'audio', 'path': master}], 'beds': beds}
+            out = os.path.join(workdir, 'longmix.wav')
+            for label, backend in (('decode', 'pydub'), ('stream', 'auto')):
+                if label == 'decode' and options['skip_legacy']:
+                    continue
+                with override_settings(AUDIO_CODEC_BACKEND=backend):
+                    _, elapsed, peak = _measure(render_plan, plan, out, None, 'wav')
+                self.stdout.write(f'{minutes:>6g}분   {label:<10} {elapsed:>9.2f}s {peak / 1024 / 1024:>10.1f}MB')
+                os.remove(out)
+            os.remove(master)
+        self.stdout.write(self.style.SUCCESS('✅ longmix 벤치마크 완료'))
+
+    def _bench_renditions(self, workdir, options):
+        """
+        BGM 믹싱 렌더 + 렌디션(settings.AUDIO_RENDITIONS): 한 번의 렌더 패스에서 동시 인코딩 vs 렌디션마다 렌더.
+        파일 크기 = 해당 렌디션으로 전체 재생 시 stream_audio 전송량.
+        """
+        from book import renditions
+        from book.audio_engine import PUBLISH_BITRATE, render_plan, stream_concat
+
+        count = options['pages'][0]
+        master = os.path.join(workdir, 'master.wav')
+        timestamps, total_ms = stream_concat(_make_pages(workdir, count, options['page_seconds']), master,
+                                             bitrate=None, format='wav')
+        bgm = os.path.join(workdir, 'bgm.wav')
+        _write_sine_wav(bgm, 120.0, 110, channels=2)
+        plan = {'sequence': [{'type': 'audio', 'path': master}],
+                'beds': [{'path': bgm, 'gain_db': -14, 'fade_ms': 1000}]}
+        outs = [dict(o, path=os.path.join(workdir, os.path.basename(o['path']))) for o in renditions.outputs('bench')]
+        if not outs:
+            self.stdout.write(self.style.WARNING('⚠️ settings.AUDIO_RENDITIONS가 비어 있습니다.'))
+            return
+        standard = os.path.join(workdir, 'standard.mp3')
+        self.stdout.write(f"{total_ms / 60000:.1f}분 에피소드, 렌디션: standard({PUBLISH_BITRATE}) + "
+                          + ', '.join(f"{o['name']}({o['format']} {o['bitrate']})" for o in outs))
+
+        t0 = time.perf_counter()
+        render_plan(plan, standard)
+        for o in outs:
+            target = renditions.encoder_targets([o])[0]
+            render_plan(plan, o['path'], bitrate=target['bitrate'], format=target['format'])
+        separate = time.perf_counter() - t0
+        for o in outs:
+            os.remove(o['path'])
+
+        t0 = time.perf_counter()
+        render_plan(plan, standard, renditions=renditions.encoder_targets(outs))
+        single = time.perf_counter() - t0
+
+        self.stdout.write(f"렌디션별 렌더 {len(outs) + 1}회 {separate:>8.2f}s / 렌더 1회 동시 인코딩 {single:>8.2f}s")
+        base = os.path.getsize(standard)
+        self.stdout.write(f"{'렌디션':<10} {'크기':>10} {'standard 대비':>14}")
+        self.stdout.write(f"{'standard':<10} {base / 1024 / 1024:>8.1f}MB {100:>12.0f}%")
+        for o in outs:
+            size = os.path.getsize(o['path'])
+            self.stdout.write(f"{o['name']:<10} {size / 1024 / 1024:>8.1f}MB {size * 100 / base:>12.0f}%")
+        self.stdout.write(self.style.SUCCESS('✅ renditions 벤치마크 완료'))
+
+    def _bench_hls(self, workdir, options):
+        """
+        게시 MP3(128k) + 합성 대사 타임스탬프(3~10초 간격) HLS 패키징.
+        기존 대안: ffmpeg hls muxer(-c copy, MPEG-TS 세그먼트, 대사 경계 무시) vs book.hls 프레임 복사.
+        탐색 전송량: 에피소드 중간으로 이동 시 stream_audio ?t= 응답(탐색 지점~끝) vs 세그먼트 1개.
+        """
+        import random
+        from bisect import bisect_left
+        from pydub import AudioSegment
+        from book import hls, mp3_index
+
+        rng = random.Random(14)
+        self.stdout.write(f"{'에피소드':<8} {'ffmpeg hls':>11} {'프레임 복사':>11} {'세그먼트':>8} {'평균 크기':>9} "
+                          f"{'대사 경계':>10} {'?t= 응답':>10} {'세그먼트 1개':>11}")
+        for minutes in options['minutes']:
+            total_ms = int(minutes * 60000)
+            mp3 = _write_long_tone(os.path.join(workdir, f'episode_{minutes:g}.mp3'), minutes * 60, 330)
+            timestamps, t = [], 0
+            while t < total_ms:
+                end = min(total_ms, t + rng.randint(3000, 10000))
+                timestamps.append({'pageIndex': len(timestamps), 'startTime': t, 'endTime': end})
+                t = end
+
+            legacy_sec = float('nan')
+            if not options['skip_legacy']:
+                out = os.path.join(workdir, 'ffmpeg_hls')
+                os.makedirs(out, exist_ok=True)
+                t0 = time.perf_counter()
+                subprocess.run([AudioSegment.converter, '-v', 'error', '-y', '-i', mp3, '-c', 'copy', '-f', 'hls',
+                                '-hls_time', str(hls.segment_ms() / 1000), '-hls_playlist_type', 'vod',
+                                '-hls_segment_filename', os.path.join(out, 'seg_%05d.ts'),
+                                os.path.join(out, 'index.m3u8')], check=True)
+                legacy_sec = time.perf_counter() - t0
+                shutil.rmtree(out)
+
+            t0 = time.perf_counter()
+            manifest = hls.package(mp3, timestamps)
+            package_sec = time.perf_counter() - t0
+            segments = manifest['segments']
+            # 대사 시작이 세그먼트 첫 프레임(1152 samples) 안에 있는 세그먼트 경계 수
+            dialogue_starts = [ts['startTime'] for ts in timestamps]
+            aligned = sum(1 for seg in segments[1:]
+                          if any(0 <= b - seg['start_ms'] < 1152 * 1000 / 44100
+                                 for b in dialogue_starts[bisect_left(dialogue_starts, seg['start_ms']):][:1]))
+
+            index = mp3_index.load_index(mp3)
+            seek_ms = total_ms // 2
+            _, offset = mp3_index.seek(index, seek_ms)
+            progressive = os.path.getsize(mp3) - offset
+            seg = segments[max(0, sum(1 for s in segments if s['start_ms'] <= seek_ms) - 1)]
+            avg = sum(s['size'] for s in segments) / len(segments)
+            self.stdout.write(f'{minutes:>6g}분 {legacy_sec:>10.2f}s {package_sec:>10.2f}s {len(segments):>8} '
+                              f'{avg / 1024:>7.0f}KB {aligned:>4}/{len(segments) - 1:<5} '
+                              f'{progressive / 1024 / 1024:>8.1f}MB {seg["size"] / 1024:>9.0f}KB')
+            hls.remove(mp3)
+            mp3_index.remove_index(mp3)
+            os.remove(mp3)
+        self.stdout.write(self.style.SUCCESS('✅ hls 벤치마크 완료'))
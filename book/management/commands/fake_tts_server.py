@@ -0,0 +1,184 @@
+"""
+로컬 Fake ElevenLabs 서버 — Django Management Command
+
+실제 API 비용 없이 TTS 병렬 처리/지연/장애 상황을 재현하기 위한 개발용 서버.
+ElevenLabs SDK가 호출하는 경로(text-to-speech, sound-generation, music)에
+사인파 MP3를 응답함 (output_format=pcm_* 요청이면 raw PCM).
+
+사용법:
+  python manage.py fake_tts_server --port 8765 --latency 1.5 --jitter 0.5
+  ELEVEN_BASE_URL=http://127.0.0.1:8765 celery -A voxliber worker ...
+
+  --fail-rate 0.2   요청의 20%를 실패 응답 (재시도/장애 격리 테스트)
+  --fail-status 429 실패 응답 상태 코드 (기본 503, 429면 Retry-After: 1)
+  POST /_config {"fail_rate": 1.0, "latency": 0.2}   실행 중 설정 변경 (장애 시작/복구 → book.tts_client 차단기 확인)
+"""
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+
+AUDIO_PATHS = ('/v1/text-to-speech/', '/v1/sound-generation', '/v1/music')
+
+
+def _sine_mp3(seconds):
+    """응답용 사인파 MP3 (mono 44100Hz 128k — ElevenLabs 기본 포맷과 동일)"""
+    from pydub.generators import Sine
+    seg = Sine(440).to_audio_segment(duration=int(seconds * 1000), volume=-12)
+    seg = seg.set_frame_rate(44100).set_channels(1)
+    buf = io.BytesIO()
+    seg.export(buf, format='mp3', bitrate='128k')
+    return buf.getvalue()
+
+
+def _sine_pcm(seconds):
+    """output_format=pcm_44100 응답용 raw PCM (s16le mono 44100Hz)"""
+    from pydub.generators import Sine
+    seg = Sine(440).to_audio_segment(duration=int(seconds * 1000), volume=-12)
+    return seg.set_frame_rate(44100).set_channels(1).set_sample_width(2).raw_data
+
+
+class FakeTTSState:
+    """서버 설정 + 요청 통계 (동시 요청 수 최대치 포함)"""
+
+    def __init__(self, latency=1.0, jitter=0.0, fail_rate=0.0, audio_seconds=2.0, fail_status=503):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.audio = _sine_mp3(audio_seconds)
+        self.pcm = _sine_pcm(audio_seconds)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'failures': self.failures,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+            }
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith('/_stats'):
+                return self._send_json(200, state.stats())
+            self._send_json(404, {'detail': 'not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+
+            if self.path.startswith('/_config'):
+                changes = json.loads(body or b'{}')
+                with state.lock:
+                    for key in ('latency', 'jitter', 'fail_rate', 'fail_status'):
+                        if key in changes:
+                            setattr(state, key, type(getattr(state, key))(changes[key]))
+                return self._send_json(200, {'fail_rate': state.fail_rate, 'fail_status': state.fail_status,
+                                             'latency': state.latency})
+
+            if not self.path.startswith(AUDIO_PATHS):
+                return self._send_json(404, {'detail': 'not found'})
+
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                time.sleep(max(0.0, state.latency + random.uniform(-state.jitter, state.jitter)))
+                if state.fail_rate and random.random() < state.fail_rate:
+                    with state.lock:
+                        state.failures += 1
+                    if state.fail_status == 429:
+                        return self._send_json(429, {'detail': {'status': 'too_many_concurrent_requests',
+                                                                'message': 'fake rate limit'}},
+                                               headers={'Retry-After': '1'})
+                    return self._send_json(state.fail_status,
+                                           {'detail': {'status': 'system_busy', 'message': 'fake outage'}})
+
+                output_format = parse_qs(urlparse(self.path).query).get('output_format', [''])[0]
+                is_pcm = output_format.startswith('pcm')
+                body = state.pcm if is_pcm else state.audio
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/pcm' if is_pcm else 'audio/mpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+def start_fake_server(port=0, **state_kwargs):
+    """
+    백그라운드 스레드로 fake 서버 시작 (벤치마크/로컬 검증용)
+    Returns: (server, state, base_url) — 종료는 server.shutdown()
+    """
+    state = FakeTTSState(**state_kwargs)
+    server = ThreadingHTTPServer(('127.0.0.1', port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    return server, state, base_url
+
+
+class Command(BaseCommand):
+    help = '로컬 Fake ElevenLabs 서버 실행 (지연/장애 주입)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=1.0, help='응답 지연(초)')
+        parser.add_argument('--jitter', type=float, default=0.0, help='지연 편차(초)')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='실패 응답 비율 (0~1)')
+        parser.add_argument('--fail-status', type=int, default=503, help='실패 응답 상태 코드 (429면 Retry-After 포함)')
+        parser.add_argument('--audio-seconds', type=float, default=2.0, help='응답 오디오 길이(초)')
+
+    def handle(self, *args, **options):
+        state = FakeTTSState(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            fail_rate=options['fail_rate'],
+            audio_seconds=options['audio_seconds'],
+            fail_status=options['fail_status'],
+        )
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), _make_handler(state))
+        server.daemon_threads = True
+        self.stdout.write(self.style.SUCCESS(
+            f"🎙️ Fake ElevenLabs 서버: http://127.0.0.1:{options['port']} "
+            f"(latency={options['latency']}s, fail_rate={options['fail_rate']})"
+        ))
+        self.stdout.write(f"   ELEVEN_BASE_URL=http://127.0.0.1:{options['port']} 으로 연결, 통계: GET /_stats")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'통계: {state.stats()}')
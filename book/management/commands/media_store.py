@@ -0,0 +1,79 @@
+"""
+중복 제거 blob 저장소 관리 — Django Management Command
+
+book.blobs: 참조 없는 blob/임시 파일 정리, 참조 수 재계산, 예전 파일 이전, 사용자/책별 사용량.
+
+사용법:
+  python manage.py media_store --sweep [--dry-run] [--grace-hours 24]
+  python manage.py media_store --recount
+  python manage.py media_store --adopt [--dry-run]        # 예전 이름 파일을 blob으로 이전 (복사본 중복 제거)
+  python manage.py media_store --usage --user <user_id>
+  python manage.py media_store --usage --book <book_uuid>
+  python manage.py media_store --usage --top 20          # 사용량 상위 사용자
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from book import blobs
+
+
+def _mb(n):
+    return f'{n / 1024 / 1024:.1f}MB'
+
+
+class Command(BaseCommand):
+    help = '중복 제거 blob 저장소 정리/재계산/이전/사용량 (book.blobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sweep', action='store_true', help='참조 없는 blob, 고아 blob 파일, 오래된 작업 파일 삭제')
+        parser.add_argument('--recount', action='store_true', help='참조 수를 실제 필드 값으로 다시 계산')
+        parser.add_argument('--adopt', action='store_true', help='예전 이름 파일을 blob 저장소로 이전')
+        parser.add_argument('--usage', action='store_true', help='디스크 사용량 출력')
+        parser.add_argument('--user', type=int, help='--usage 대상 사용자 ID')
+        parser.add_argument('--book', help='--usage 대상 책(public_uuid)')
+        parser.add_argument('--top', type=int, default=10, help='--usage 대상이 없을 때 상위 사용자 수')
+        parser.add_argument('--grace-hours', type=float, help='참조 0 blob 삭제 유예 (기본 BLOB_SWEEP_GRACE_HOURS)')
+        parser.add_argument('--dry-run', action='store_true', help='삭제/이동 없이 대상만 집계')
+
+    def handle(self, *args, **options):
+        if not any(options[k] for k in ('sweep', 'recount', 'adopt', 'usage')):
+            raise CommandError('--sweep, --recount, --adopt, --usage 중 하나 이상을 지정하세요.')
+
+        if options['adopt']:
+            moved, saved = blobs.adopt(dry_run=options['dry_run'])
+            self.stdout.write(f"이전 {moved}개 파일 / 중복 제거 {_mb(saved)}")
+        if options['recount']:
+            updated, created = blobs.recount()
+            self.stdout.write(f"참조 수 수정 {updated}개 / 새 blob 행 {created}개")
+        if options['sweep']:
+            stats = blobs.sweep(grace_hours=options['grace_hours'], dry_run=options['dry_run'])
+            self.stdout.write(
+                f"blob {stats['blobs']}개 / 고아 파일 {stats['orphan_files']}개 / 작업 파일 {stats['scratch_files']}개 "
+                f"/ 참조 복구 {stats['repaired']}개 / 만료 체크포인트 {stats['checkpoints']}개 → {_mb(stats['freed_bytes'])}"
+            )
+        if options['usage']:
+            self._usage(options)
+
+    def _usage(self, options):
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count
+        from book.models import Books
+
+        if options['book']:
+            book = Books.objects.filter(public_uuid=options['book']).first()
+            if book is None:
+                raise CommandError(f"책을 찾을 수 없습니다: {options['book']}")
+            self._print(f'📚 {book.name}', blobs.usage(book=book))
+            return
+        users = get_user_model().objects.filter(pk=options['user']) if options['user'] else \
+            get_user_model().objects.annotate(n=Count('books')).filter(n__gt=0)
+        rows = [(user, blobs.usage(user=user)) for user in users]
+        rows.sort(key=lambda r: r[1]['stored_bytes'] + r[1]['legacy_bytes'] + r[1]['published_bytes'], reverse=True)
+        for user, usage in rows[:options['top'] if not options['user'] else 1]:
+            self._print(f'👤 {user.pk} {getattr(user, "nickname", "")}', usage)
+
+    def _print(self, label, usage):
+        saved = usage['logical_bytes'] - usage['stored_bytes']
+        self.stdout.write(
+            f"{label}: blob {usage['blobs']}개 {_mb(usage['stored_bytes'])} (중복 제거 {_mb(saved)}) "
+            f"/ 예전 파일 {_mb(usage['legacy_bytes'])} / 게시 오디오 {_mb(usage['published_bytes'])}"
+        )
@@ -0,0 +1,69 @@
+"""
+에피소드 HLS 패키지 일괄 생성 — Django Management Command
+
+AUDIO_HLS_ENABLED 이전에 게시된 에피소드(standard + MP3 렌디션)를 book.hls로 패키징.
+패키지가 오디오/대사 경계와 맞으면 건너뜀 (--force면 다시 생성).
+
+사용법:
+  python manage.py package_hls                       # 전체 (소프트 삭제 제외)
+  python manage.py package_hls --book <book_uuid> --force
+  python manage.py package_hls --remove              # 패키지 삭제
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from book import hls
+
+
+class Command(BaseCommand):
+    help = '게시된 에피소드 MP3를 HLS 세그먼트 + 플레이리스트로 패키징 (book.hls)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--book', help='특정 책(public_uuid)만')
+        parser.add_argument('--force', action='store_true', help='최신 패키지도 다시 생성')
+        parser.add_argument('--remove', action='store_true', help='패키지 삭제')
+        parser.add_argument('--include-deleted', action='store_true', help='소프트 삭제된 에피소드 포함')
+
+    def handle(self, *args, **options):
+        from book.models import Content
+
+        qs = Content.objects.exclude(audio_file='').exclude(audio_file__isnull=True).prefetch_related('renditions')
+        if not options['include_deleted']:
+            qs = qs.filter(is_deleted=False)
+        if options['book']:
+            qs = qs.filter(book__public_uuid=options['book'])
+
+        t0 = time.perf_counter()
+        packaged = skipped = errors = segments = 0
+        for content in qs.iterator(chunk_size=200):
+            files = [content.audio_file] + [r.audio_file for r in content.renditions.all()
+                                            if r.format == 'mp3' and r.audio_file]
+            for audio_file in files:
+                path = audio_file.path
+                if not os.path.exists(path):
+                    self.stdout.write(self.style.WARNING(f'⚠️ 파일 없음: Content {content.id} ({audio_file.name})'))
+                    continue
+                if options['remove']:
+                    hls.remove(path)
+                    continue
+                try:
+                    if not options['force'] and hls.is_fresh(path, content.audio_timestamps):
+                        skipped += 1
+                        continue
+                    manifest = hls.package(path, content.audio_timestamps)
+                    if manifest:
+                        packaged += 1
+                        segments += len(manifest['segments'])
+                except Exception as e:
+                    errors += 1
+                    self.stdout.write(self.style.ERROR(f'❌ Content {content.id}: {e}'))
+
+        if options['remove']:
+            self.stdout.write(self.style.SUCCESS('✅ HLS 패키지 삭제 완료'))
+            return
+        self.stdout.write(
+            f"패키징 {packaged}개 ({segments}개 세그먼트) / 최신 {skipped}개 / 오류 {errors}개 "
+            f"({time.perf_counter() - t0:.1f}초)"
+        )
@@ -0,0 +1,43 @@
+"""
+Celery 큐 지표 / 워커 설정 도우미 — Django Management Command
+
+book.task_queues: interactive / regenerate / bulk.<N> / maintenance 큐의 깊이와 대기 시간.
+
+사용법:
+  python manage.py task_queues --stats            # 큐별 깊이, 대기 시간(p50/p95/max, 평균)
+  python manage.py task_queues --bulk-queues      # bulk 워커 -Q 인자 (예: bulk.0,bulk.1,...)
+  python manage.py task_queues --reset            # 대기 시간 지표 초기화
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from book import task_queues
+
+
+def _sec(value):
+    return '-' if value is None else f'{value:.1f}s'
+
+
+class Command(BaseCommand):
+    help = 'Celery 큐 깊이/대기 시간 지표, bulk 샤드 큐 목록 (book.task_queues)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='큐별 깊이와 대기 시간 출력')
+        parser.add_argument('--bulk-queues', action='store_true', help='bulk 샤드 큐 이름 (쉼표 구분)')
+        parser.add_argument('--reset', action='store_true', help='대기 시간 지표 초기화')
+
+    def handle(self, *args, **options):
+        if not any(options[k] for k in ('stats', 'bulk_queues', 'reset')):
+            raise CommandError('--stats, --bulk-queues, --reset 중 하나 이상을 지정하세요.')
+
+        if options['bulk_queues']:
+            self.stdout.write(','.join(task_queues.bulk_queues()))
+        if options['stats']:
+            for queue, stats in task_queues.metrics().items():
+                self.stdout.write(
+                    f"{queue:<12} 대기 {stats['depth']:>5}개 | 대기 시간 p50 {_sec(stats['wait_p50'])} "
+                    f"p95 {_sec(stats['wait_p95'])} max {_sec(stats['wait_max'])} "
+                    f"(평균 {_sec(stats['wait_avg'])}, {stats['wait_count']}건)"
+                )
+        if options['reset']:
+            task_queues.reset_metrics()
+            self.stdout.write('대기 시간 지표를 초기화했습니다.')
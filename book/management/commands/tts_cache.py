@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from book import tts_cache
+
+
+class Command(BaseCommand):
+    help = 'TTS 렌더 캐시 상태 확인 / 정리'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'evict', 'clear'], nargs='?', default='stats')
+        parser.add_argument('--max-mb', type=int, help='evict 시 목표 용량(MB), 기본값 settings.TTS_CACHE_MAX_BYTES')
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        if action == 'evict':
+            max_bytes = options['max_mb'] * 1024 * 1024 if options['max_mb'] else None
+            removed = tts_cache.evict(max_bytes)
+            self.stdout.write(self.style.SUCCESS(f'✅ {removed}개 항목 삭제'))
+        elif action == 'clear':
+            tts_cache.clear()
+            self.stdout.write(self.style.SUCCESS('✅ TTS 캐시 전체 삭제'))
+
+        stats = tts_cache.stats()
+        self.stdout.write(
+            f"항목 {stats['entries']}개 / "
+            f"{stats['bytes'] / 1024 / 1024:.1f}MB (상한 {stats['max_bytes'] / 1024 / 1024:.0f}MB)\n"
+            f"hit {stats['hits']} / miss {stats['misses']} (hit rate {stats['hit_rate'] * 100:.1f}%), "
+            f"evictions {stats['evictions']}, 가장 오래된 사용: {stats['oldest_access'] or '-'}"
+        )
@@ -0,0 +1,87 @@
+"""
+Content.duration_seconds 재검증 — Django Management Command
+
+에피소드 오디오(audio_file)의 실제 길이를 헤더로 조회하여(book.audio_probe, 디코딩 없음)
+DB 값과 비교. 파일 조회는 프로세스 풀에서 병렬 실행.
+
+사용법:
+  python manage.py verify_durations                      # 불일치 목록만 출력
+  python manage.py verify_durations --fix                # 불일치 항목 duration_seconds 수정
+  python manage.py verify_durations --workers 8 --tolerance 2 --book <book_uuid>
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from book.audio_probe import probe
+
+
+def _probe_file(item):
+    """프로세스 풀 작업: (content_id, path) → (content_id, duration_ms, method, error)"""
+    content_id, path = item
+    try:
+        info = probe(path)
+        return content_id, info['duration_ms'], info['method'], None
+    except Exception as e:
+        return content_id, None, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Content.duration_seconds를 오디오 헤더 기준으로 재검증 (프로세스 풀)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='불일치 항목의 duration_seconds 갱신')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='프로세스 수')
+        parser.add_argument('--tolerance', type=int, default=1, help='허용 오차(초)')
+        parser.add_argument('--book', help='특정 책(public_uuid)만 검사')
+        parser.add_argument('--include-deleted', action='store_true', help='소프트 삭제된 에피소드 포함')
+
+    def handle(self, *args, **options):
+        from book.models import Content
+
+        qs = Content.objects.exclude(audio_file='').exclude(audio_file__isnull=True)
+        if not options['include_deleted']:
+            qs = qs.filter(is_deleted=False)
+        if options['book']:
+            qs = qs.filter(book__public_uuid=options['book'])
+
+        items, missing = [], 0
+        stored = {}
+        for content_id, name, duration in qs.values_list('id', 'audio_file', 'duration_seconds').iterator():
+            path = Content._meta.get_field('audio_file').storage.path(name)
+            if not os.path.exists(path):
+                missing += 1
+                self.stdout.write(self.style.WARNING(f'⚠️ 파일 없음: Content {content_id} ({name})'))
+                continue
+            items.append((content_id, path))
+            stored[content_id] = duration
+
+        self.stdout.write(f"🔍 {len(items)}개 에피소드 검사 (workers={options['workers']})")
+        t0 = time.perf_counter()
+        mismatched, errors = [], 0
+        methods = {}
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for content_id, duration_ms, method, error in pool.map(_probe_file, items, chunksize=16):
+                if error:
+                    errors += 1
+                    self.stdout.write(self.style.ERROR(f'❌ Content {content_id}: {error}'))
+                    continue
+                methods[method] = methods.get(method, 0) + 1
+                actual = duration_ms // 1000
+                if abs(actual - (stored[content_id] or 0)) > options['tolerance']:
+                    mismatched.append((content_id, stored[content_id], actual))
+        elapsed = time.perf_counter() - t0
+
+        for content_id, old, new in mismatched:
+            self.stdout.write(f'  Content {content_id}: {old}초 → {new}초')
+        if options['fix'] and mismatched:
+            for content_id, _, new in mismatched:
+                Content.objects.filter(id=content_id).update(duration_seconds=new)
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(mismatched)}개 duration_seconds 수정'))
+
+        self.stdout.write(
+            f"검사 {len(items)}개 / 불일치 {len(mismatched)}개 / 오류 {errors}개 / 파일 없음 {missing}개 "
+            f"({elapsed:.1f}초, 조회 방식: {methods})"
+        )
@@ -0,0 +1,273 @@
+"""
+미디어 파일 전송 (권한 확인은 Django, 바이트 전송은 커널/nginx)
+- settings.MEDIA_DELIVERY
+  'sendfile': Django가 Range/조건부 요청을 처리하고 본문은 FileResponse → gunicorn wsgi.file_wrapper가 os.sendfile로 전송
+              (파이썬에서 8KB씩 읽어 보내지 않음. runserver처럼 file_wrapper가 없으면 64KB 블록 읽기)
+  'accel':    Django는 권한/304만 판단하고 X-Accel-Redirect로 nginx internal location(MEDIA_ACCEL_PREFIX)에 전송을 넘김
+              → Range/multi-range/If-None-Match/If-Modified-Since는 nginx가 처리, 워커는 즉시 반환
+- Range: 단일(206), 다중(multipart/byteranges), 범위 밖(416), If-Range
+- ETag/Last-Modified는 nginx와 같은 형식("mtime hex-size hex") → 두 모드가 같은 캐시 검증값 사용
+- authorize_content: 작가 본인/관리자, 삭제 여부, 성인 작품(19세), 구독 전용 회차(MEDIA_SUBSCRIPTION_REQUIRED)
+
+nginx 설정 (accel):
+    location /protected-media/ {
+        internal;
+        alias /home/ubuntu/voxliber/media/;
+    }
+    location ^~ /media/uploads/audio/ {   # 게시 오디오는 /media/로 직접 열리지 않음
+        internal;
+    }
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from uuid import uuid4
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+BLOCK_SIZE = 64 * 1024
+MAX_RANGES = 16  # 이보다 많은 다중 Range는 무시하고 전체 응답 (nginx max_ranges와 같은 취지)
+_RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+def mode():
+    return getattr(settings, 'MEDIA_DELIVERY', 'sendfile')
+
+
+# ==================== 권한 ====================
+
+def request_user(request):
+    """세션 로그인 사용자, 없으면 X-API-Key 헤더의 사용자 (앱). 익명이면 None"""
+    user = getattr(request, 'api_user', None) or getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        from book.models import APIKey
+        key = APIKey.objects.select_related('user').filter(key=api_key, is_active=True).first()
+        if key:
+            return key.user
+    return None
+
+
+def has_active_subscription(user):
+    if user is None:
+        return False
+    from register.models import Subscription
+    try:
+        return user.subscription.is_active
+    except Subscription.DoesNotExist:
+        return False
+
+
+def authorize_content(user, content):
+    """
+    에피소드 오디오 접근 권한 → (허용 여부, HTTP status, 사유)
+    - 작가 본인/관리자는 항상 허용
+    - 삭제된 에피소드 404
+    - 성인 작품(book.adult_choice)은 19세 이상 로그인 사용자만
+    - MEDIA_SUBSCRIPTION_REQUIRED면 MEDIA_FREE_EPISODES화 이후는 구독 중인 사용자만
+    """
+    book = content.book
+    if user is not None and (user.is_staff or book.user_id == user.pk):
+        return True, 200, None
+    if content.is_deleted:
+        return False, 404, '삭제된 에피소드입니다.'
+    if book.adult_choice and not (user is not None and user.is_adult()):
+        return False, 403, '성인 인증이 필요한 작품입니다.'
+    if getattr(settings, 'MEDIA_SUBSCRIPTION_REQUIRED', False) \
+            and content.number > getattr(settings, 'MEDIA_FREE_EPISODES', 1) \
+            and not has_active_subscription(user):
+        return False, 403, '구독이 필요한 에피소드입니다.'
+    return True, 200, None
+
+
+def content_stream_url(request, content, rendition=None):
+    """권한 확인을 거치는 에피소드 스트림 URL (book:stream_audio). /media/ 직접 URL 대신 앱에 제공"""
+    from django.urls import reverse
+    url = reverse('book:stream_audio', args=[content.id])
+    if rendition:
+        url += f'?rendition={quote(rendition)}'
+    return request.build_absolute_uri(url)
+
+
+# ==================== 조건부 요청 / Range ====================
+
+def file_etag(st, offset=0):
+    """nginx 형식 ETag ("mtime hex-size hex"), 잘린 스트림(offset)이면 offset 포함"""
+    tag = f'{int(st.st_mtime):x}-{st.st_size:x}'
+    return f'"{tag}-{offset:x}"' if offset else f'"{tag}"'
+
+
+def _etag_matches(header, etag):
+    tags = [t.strip() for t in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def not_modified(request, etag, mtime):
+    """If-None-Match 우선, 없으면 If-Modified-Since (RFC 9110 13.2.2)"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+    return since is not None and int(mtime) <= since
+
+
+def _range_applies(request, etag, mtime):
+    """If-Range가 없거나 현재 ETag/Last-Modified와 일치할 때만 Range 적용"""
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def parse_ranges(header, size):
+    """
+    'bytes=0-99,200-,-500' → [(start, end)] (end 포함).
+    형식이 잘못됐거나 MAX_RANGES 초과면 None (Range 무시 → 200), 만족하는 구간이 없으면 [] (416).
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    specs = header[len('bytes='):].split(',')
+    if len(specs) > MAX_RANGES:
+        return None
+    ranges = []
+    for spec in specs:
+        m = _RANGE_RE.match(spec)
+        if not m or (not m.group(1) and not m.group(2)):
+            return None
+        if not m.group(1):  # 접미 구간: 마지막 N 바이트
+            suffix = int(m.group(2))
+            if suffix:
+                ranges.append((max(0, size - suffix), size - 1))
+            continue
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+        if m.group(2) and int(m.group(2)) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    return ranges
+
+
+# ==================== 전송 ====================
+
+class _FileSlice:
+    """
+    파일의 [start, start+length) 구간만 읽히는 file-like.
+    fileno()가 있어 gunicorn은 현재 위치(start)부터 Content-Length만큼 os.sendfile로 전송.
+    버퍼 없는 파일(FileIO)이라 lseek 위치와 읽기 위치가 항상 같음.
+    """
+
+    def __init__(self, path, start, length):
+        self._file = open(path, 'rb', buffering=0)
+        self._file.seek(start)
+        self._remaining = length
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _iter_multipart(path, parts, boundary):
+    with open(path, 'rb') as f:
+        for head, (start, end) in parts:
+            yield head
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(BLOCK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def accel_uri(path):
+    """MEDIA_ROOT 아래 파일 → nginx internal location URI. MEDIA_ROOT 밖이면 None"""
+    root = os.path.realpath(str(settings.MEDIA_ROOT))
+    real = os.path.realpath(str(path))
+    if os.path.commonpath([root, real]) != root:
+        return None
+    prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/').rstrip('/') + '/'
+    return prefix + quote(os.path.relpath(real, root).replace(os.sep, '/'))
+
+
+def serve_file(request, path, offset=0, content_type=None, cache_control='private, max-age=3600'):
+    """
+    파일 응답 (Range/다중 Range/조건부 요청 처리).
+    offset > 0이면 그 byte부터 시작하는 파일처럼 취급 (stream_audio ?t= — 이 경우 accel 대신 sendfile 경로)
+    """
+    st = os.stat(path)
+    size = st.st_size - offset
+    etag = file_etag(st, offset)
+    content_type = content_type or mimetypes.guess_type(str(path))[0] or 'application/octet-stream'
+    common = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if request.method in ('GET', 'HEAD') and not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        for key, value in common.items():
+            response[key] = value
+        return response
+
+    if mode() == 'accel' and not offset:
+        uri = accel_uri(path)
+        if uri:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = uri
+            response['Cache-Control'] = cache_control  # nginx가 유지하는 헤더 (ETag/Range는 nginx가 다시 계산)
+            return response
+
+    ranges = None
+    if _range_applies(request, etag, st.st_mtime):
+        ranges = parse_ranges(request.META.get('HTTP_RANGE', '').strip(), size)
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if ranges and len(ranges) > 1:
+        boundary = uuid4().hex
+        parts = [
+            ((f'\r\n--{boundary}\r\nContent-Type: {content_type}\r\n'
+              f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n').encode(), (start + offset, end + offset))
+            for start, end in ranges
+        ]
+        length = sum(len(head) + end - start + 1 for head, (start, end) in parts) + len(f'\r\n--{boundary}--\r\n')
+        response = StreamingHttpResponse(_iter_multipart(path, parts, boundary), status=206,
+                                         content_type=f'multipart/byteranges; boundary={boundary}')
+        response['Content-Length'] = str(length)
+    else:
+        start, end = ranges[0] if ranges else (0, size - 1)
+        length = max(0, end - start + 1)
+        response = FileResponse(_FileSlice(path, start + offset, length), status=206 if ranges else 200,
+                                content_type=content_type)
+        response.block_size = BLOCK_SIZE
+        response['Content-Length'] = str(length)
+        if ranges:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    for key, value in common.items():
+        response[key] = value
+    return response
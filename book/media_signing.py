@@ -0,0 +1,144 @@
+"""
+서명된 만료 미디어 URL (HMAC-SHA256, DB 조회 없이 검증)
+- /api/media/<expires>/<tier>/<sig>/<MEDIA 상대 경로>
+  sig = HMAC(key, "scope\nexpires\ntier") 앞 16byte base64url
+- 권한 확인(book.media_delivery.authorize_content)은 URL 발급 시 1회 → 재생/탐색/세그먼트 요청은 서명만 검증
+- scope: 일반 파일은 경로 그대로, HLS 패키지('<파일>.hls/') 안의 파일은 패키지 폴더
+  → 서명된 index.m3u8의 상대 경로 세그먼트(seg_00000.mp3)도 같은 서명으로 열림
+- 만료 시각은 MEDIA_SIGNED_URL_BUCKET 단위로 올림 → 같은 구간에 발급한 URL이 같아 CDN/브라우저 캐시 재사용
+- tier: 발급 시 권한 등급 (public | adult | sub | owner) — public이 아니면 Cache-Control private
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+
+from book.hls import HLS_SUFFIX
+
+TIERS = ('public', 'adult', 'sub', 'owner')
+URL_PREFIX = '/api/media/'
+_SIG_RE = re.compile(r'^[A-Za-z0-9_-]{22}$')
+
+
+def _key():
+    secret = getattr(settings, 'MEDIA_SIGNING_KEY', '') or settings.SECRET_KEY
+    return hashlib.sha256(b'voxliber.media-signing:' + secret.encode()).digest()
+
+
+def scope(path):
+    """서명 범위: HLS 패키지 안의 파일이면 패키지 폴더('.../x.mp3.hls/'), 아니면 파일 경로"""
+    path = path.lstrip('/')
+    parent = path.rsplit('/', 1)[0] if '/' in path else ''
+    return parent + '/' if parent.endswith(HLS_SUFFIX) else path
+
+
+def signature(path, expires, tier):
+    message = f'{scope(path)}\n{int(expires)}\n{tier}'.encode()
+    digest = hmac.new(_key(), message, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def expires_at(ttl=None, now=None):
+    ttl = int(ttl or getattr(settings, 'MEDIA_SIGNED_URL_TTL', 6 * 3600))
+    bucket = int(getattr(settings, 'MEDIA_SIGNED_URL_BUCKET', 600)) or 1
+    return (int((now or time.time()) + ttl) // bucket + 1) * bucket
+
+
+def sign_path(path, tier='public', expires=None):
+    """MEDIA 상대 경로 → 서명된 URL 경로 (도메인 없음)"""
+    path = path.lstrip('/')
+    expires = expires or expires_at()
+    return f'{URL_PREFIX}{expires}/{tier}/{signature(path, expires, tier)}/{quote(path)}'
+
+
+def signed_url(request, audio_file, tier='public', expires=None, suffix=''):
+    """FieldFile(+ suffix, 예: '.hls/index.m3u8') → 서명된 절대 URL"""
+    return request.build_absolute_uri(sign_path(audio_file.name + suffix, tier, expires))
+
+
+def verify(path, expires, tier, sig, now=None):
+    """(통과 여부, 사유) — 상수 시간 비교, DB 조회 없음"""
+    if tier not in TIERS or not _SIG_RE.match(sig or '') or {'..', '.'} & set(path.split('/')):
+        return False, '잘못된 서명입니다.'
+    if int(expires) < (now or time.time()):
+        return False, '만료된 URL입니다.'
+    if not hmac.compare_digest(signature(path, expires, tier), sig):
+        return False, '잘못된 서명입니다.'
+    return True, None
+
+
+def resolve(path):
+    """MEDIA_ROOT 아래 실제 파일 경로 (벗어나거나 없으면 None)"""
+    root = os.path.realpath(str(settings.MEDIA_ROOT))
+    real = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, real]) != root or not os.path.isfile(real):
+        return None
+    return real
+
+
+def tier_for(user, content):
+    """발급 시 권한 등급 (authorize_content 통과 후 호출)"""
+    book = content.book
+    if user is not None and (user.is_staff or book.user_id == user.pk):
+        return 'owner'
+    if book.adult_choice:
+        return 'adult'
+    if getattr(settings, 'MEDIA_SUBSCRIPTION_REQUIRED', False) \
+            and content.number > getattr(settings, 'MEDIA_FREE_EPISODES', 1):
+        return 'sub'
+    return 'public'
+
+
+def content_signer(request, content, user=None):
+    """
+    권한 확인 후 (FieldFile, suffix='') → 서명된 절대 URL 함수 — 권한이 없으면 None
+    같은 등급/만료 시각으로 에피소드의 여러 파일(standard, 렌디션, HLS)을 서명
+    """
+    from book import media_delivery
+
+    user = user if user is not None else media_delivery.request_user(request)
+    allowed, _, _ = media_delivery.authorize_content(user, content)
+    if not allowed:
+        return None
+    tier = tier_for(user, content)
+    expires = expires_at()
+
+    def sign(audio_file, suffix=''):
+        return signed_url(request, audio_file, tier, expires, suffix=suffix)
+    sign.expires = expires
+    return sign
+
+
+def content_signed_urls(request, content, rendition=None, user=None, sign=None):
+    """
+    API 응답용 에피소드 서명 URL {audio_url, hls_url, expires} — 권한이 없거나 오디오가 없으면 None
+    hls_url은 HLS 패키지가 있을 때만 (standard/렌디션 미디어 플레이리스트, 세그먼트도 같은 서명)
+    sign: 이미 만든 content_signer 결과 (없으면 여기서 권한 확인)
+    """
+    from book import hls, renditions
+
+    if not content.audio_file:
+        return None
+    sign = sign or content_signer(request, content, user=user)
+    if sign is None:
+        return None
+    audio_file = renditions.select(content, rendition)
+    hls_url = None
+    if os.path.isfile(os.path.join(hls.package_dir(audio_file.path), hls.PLAYLIST_NAME)):
+        hls_url = sign(audio_file, suffix=f'{HLS_SUFFIX}/{hls.PLAYLIST_NAME}')
+    return {
+        'audio_url': sign(audio_file),
+        'hls_url': hls_url,
+        'expires': sign.expires,
+    }
+
+
+def content_audio_url(request, content, rendition=None, user=None):
+    """에피소드 오디오 서명 URL 1개 — 권한이 없거나 오디오가 없으면 None (audio_url/audio_file 응답 필드용)"""
+    signed = content_signed_urls(request, content, rendition, user=user)
+    return signed['audio_url'] if signed else None
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0024_alter_voicelist_voice_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='렌디션 이름 (low, high 등 — settings.AUDIO_RENDITIONS)', max_length=20)),
+                ('audio_file', models.FileField(max_length=1000, upload_to='uploads/audio/renditions/')),
+                ('format', models.CharField(default='mp3', max_length=10)),
+                ('bitrate_kbps', models.IntegerField(default=0)),
+                ('channels', models.IntegerField(default=0, help_text='0이면 원본 채널 수')),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='book.content')),
+            ],
+            options={
+                'verbose_name': '에피소드 렌디션',
+                'db_table': 'content_rendition',
+                'unique_together': {('content', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:05
+
+import book.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0025_contentrendition'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='books',
+            name='cover_img',
+            field=models.ImageField(blank=True, max_length=1000, null=True, storage=book.storage.ContentHashStorage(), upload_to='uploads/book_covers/'),
+        ),
+        migrations.AlterField(
+            model_name='content',
+            name='audio_file',
+            field=models.FileField(blank=True, max_length=1000, null=True, storage=book.storage.ContentHashStorage(), upload_to='uploads/audio/'),
+        ),
+        migrations.AlterField(
+            model_name='content',
+            name='episode_image',
+            field=models.ImageField(blank=True, null=True, storage=book.storage.ContentHashStorage(), upload_to='uploads/episode_images/'),
+        ),
+        migrations.AlterField(
+            model_name='contentrendition',
+            name='audio_file',
+            field=models.FileField(max_length=1000, storage=book.storage.ContentHashStorage(), upload_to='uploads/audio/renditions/'),
+        ),
+    ]
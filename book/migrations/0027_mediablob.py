@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:20
+
+import book.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0026_content_hash_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='blob_storage 상대 경로 (blobs/ab/<해시>.<확장자>)', max_length=190, unique=True)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0, help_text='이 blob을 가리키는 필드 값 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, help_text='참조 수가 0이 된 시각 (sweep 유예 기준)', null=True)),
+            ],
+            options={
+                'verbose_name': '미디어 blob',
+                'db_table': 'media_blob',
+            },
+        ),
+        migrations.AlterField(
+            model_name='backgroundmusiclibrary',
+            name='audio_file',
+            field=models.FileField(blank=True, null=True, storage=book.storage.BlobStorage(), upload_to='background_music/'),
+        ),
+        migrations.AlterField(
+            model_name='content',
+            name='tts_audio_file',
+            field=models.FileField(blank=True, help_text='믹싱 전 원본 TTS 오디오 (re-mix 시 base)', max_length=1000, null=True, storage=book.storage.BlobStorage(), upload_to='uploads/audio/tts_original/'),
+        ),
+        migrations.AlterField(
+            model_name='pageaudio',
+            name='audio_file',
+            field=models.FileField(blank=True, max_length=1000, null=True, storage=book.storage.BlobStorage(), upload_to='uploads/page_audio/'),
+        ),
+        migrations.AlterField(
+            model_name='soundeffectlibrary',
+            name='audio_file',
+            field=models.FileField(blank=True, null=True, storage=book.storage.BlobStorage(), upload_to='sound_effects/'),
+        ),
+    ]
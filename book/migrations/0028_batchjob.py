@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0027_mediablob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(help_text='audiobook_task_status 조회 ID', max_length=64, unique=True)),
+                ('data', models.JSONField(default=dict, help_text='배치 JSON 원본')),
+                ('state', models.CharField(choices=[('PENDING', '대기'), ('PROGRESS', '진행 중'), ('SUCCESS', '완료'), ('FAILURE', '실패')], default='PENDING', max_length=20)),
+                ('status', models.CharField(blank=True, default='', max_length=255)),
+                ('steps_total', models.IntegerField(default=0)),
+                ('steps_done', models.IntegerField(default=0)),
+                ('pages_total', models.IntegerField(default=0)),
+                ('pages_done', models.IntegerField(default=0)),
+                ('variables', models.JSONField(blank=True, default=dict, help_text='$bgm_N / $sfx_N → 라이브러리 ID')),
+                ('warnings', models.JSONField(blank=True, default=list)),
+                ('stage_timings', models.JSONField(blank=True, default=dict)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='batch_jobs', to='book.books')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batch_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '배치 오디오북 작업',
+                'db_table': 'batch_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
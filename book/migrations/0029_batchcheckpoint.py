@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0028_batchjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step_index', models.IntegerField()),
+                ('page_index', models.IntegerField(default=-1, help_text='-1: 단계 전체 결과')),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='book.batchjob')),
+            ],
+            options={
+                'verbose_name': '배치 작업 체크포인트',
+                'db_table': 'batch_checkpoint',
+                'unique_together': {('job', 'step_index', 'page_index')},
+            },
+        ),
+    ]
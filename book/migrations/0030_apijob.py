@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book', '0029_batchcheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(choices=[('create_episode', '에피소드 생성'), ('regenerate_episode', '에피소드 재생성'), ('regenerate_page', '페이지 재생성'), ('register_pages', '페이지 등록')], max_length=30)),
+                ('params', models.JSONField(default=dict, help_text='요청 본문')),
+                ('state', models.CharField(choices=[('PENDING', '대기'), ('PROGRESS', '진행 중'), ('SUCCESS', '완료'), ('FAILURE', '실패')], default='PENDING', max_length=20)),
+                ('progress', models.IntegerField(default=0)),
+                ('status', models.CharField(blank=True, default='', max_length=255)),
+                ('result', models.JSONField(blank=True, help_text='동기 응답의 data와 같은 결과', null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('http_status', models.IntegerField(default=200, help_text='동기 응답이었다면 반환했을 HTTP 상태')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API 비동기 작업',
+                'db_table': 'api_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.utils import timezone
 from django.conf import settings
 import uuid
 
+from book.storage import blob_storage, content_hash_storage
+
 
 
 
@@ -48,7 +50,7 @@ class Books(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='books')
     name = models.CharField(max_length=190, unique=True)
     description = models.TextField(null=True, blank=True)
-    cover_img = models.ImageField(upload_to="uploads/book_covers/", null=True, blank=True, max_length=1000)
+    cover_img = models.ImageField(upload_to="uploads/book_covers/", storage=content_hash_storage, null=True, blank=True, max_length=1000)
     created_at = models.DateTimeField(default=timezone.now)
     book_score = models.DecimalField(max_digits=2, decimal_places=1, default=0.0)
     genres = models.ManyToManyField(Genres, related_name="books", blank=True)
@@ -129,9 +131,9 @@ class Content(models.Model):
     title = models.CharField(max_length=190)
     number = models.IntegerField(default=1)
     text = models.TextField(blank=True, null=True)
-    episode_image = models.ImageField(upload_to="uploads/episode_images/", null=True, blank=True)  # 에피소드 썸네일
-    audio_file = models.FileField(upload_to="uploads/audio/", null=True, blank=True, max_length=1000)
-    tts_audio_file = models.FileField(upload_to="uploads/audio/tts_original/", null=True, blank=True, max_length=1000, help_text="믹싱 전 원본 TTS 오디오 (re-mix 시 base)")
+    episode_image = models.ImageField(upload_to="uploads/episode_images/", storage=content_hash_storage, null=True, blank=True)  # 에피소드 썸네일
+    audio_file = models.FileField(upload_to="uploads/audio/", storage=content_hash_storage, null=True, blank=True, max_length=1000)  # 내용 해시 이름 (book.storage)
+    tts_audio_file = models.FileField(upload_to="uploads/audio/tts_original/", storage=blob_storage, null=True, blank=True, max_length=1000, help_text="믹싱 전 원본 TTS 오디오 (re-mix 시 base)")
     audio_timestamps = models.JSONField(null=True, blank=True)  # 각 대사의 시작/종료 시간 저장
     duration_seconds = models.IntegerField(default=0, help_text="오디오 길이(초)")
     mix_config = models.JSONField(null=True, blank=True, help_text="믹싱 설정 {bgm:[{id,name,desc,volume,start_page,end_page}], sfx:[{id,name,desc,volume,page_number}]}")  # 오디오 길이 (초 단위)
@@ -159,6 +161,125 @@ class Content(models.Model):
 
 
 
+# 에피소드 오디오 렌디션 (모바일 저비트레이트 등) — 기본(standard) 렌디션은 Content.audio_file
+class ContentRendition(models.Model):
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='renditions')
+    name = models.CharField(max_length=20, help_text="렌디션 이름 (low, high 등 — settings.AUDIO_RENDITIONS)")
+    audio_file = models.FileField(upload_to='uploads/audio/renditions/', storage=content_hash_storage, max_length=1000)
+    format = models.CharField(max_length=10, default='mp3')
+    bitrate_kbps = models.IntegerField(default=0)
+    channels = models.IntegerField(default=0, help_text="0이면 원본 채널 수")
+    size_bytes = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'content_rendition'
+        unique_together = ('content', 'name')
+        verbose_name = '에피소드 렌디션'
+
+    def __str__(self):
+        return f"{self.content_id}:{self.name}"
+
+
+# 중복 제거 미디어 blob (book.blobs) — 같은 내용 파일 1개를 여러 FileField(blob_storage)가 참조
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=190, unique=True, help_text="blob_storage 상대 경로 (blobs/ab/<해시>.<확장자>)")
+    size_bytes = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0, help_text="이 blob을 가리키는 필드 값 수")
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True, help_text="참조 수가 0이 된 시각 (sweep 유예 기준)")
+
+    class Meta:
+        db_table = 'media_blob'
+        verbose_name = '미디어 blob'
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+# 배치 오디오북 작업 (book.batch_canvas) — canvas로 분산된 태스크들의 진행률/결과를 한 곳에 모음
+class BatchJob(models.Model):
+    STATE_CHOICES = [
+        ('PENDING', '대기'),
+        ('PROGRESS', '진행 중'),
+        ('SUCCESS', '완료'),
+        ('FAILURE', '실패'),
+    ]
+    job_id = models.CharField(max_length=64, unique=True, help_text="audiobook_task_status 조회 ID")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='batch_jobs')
+    book = models.ForeignKey(Books, on_delete=models.SET_NULL, null=True, blank=True, related_name='batch_jobs')
+    data = models.JSONField(default=dict, help_text="배치 JSON 원본")
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='PENDING')
+    status = models.CharField(max_length=255, blank=True, default='')
+    steps_total = models.IntegerField(default=0)
+    steps_done = models.IntegerField(default=0)
+    pages_total = models.IntegerField(default=0)
+    pages_done = models.IntegerField(default=0)
+    variables = models.JSONField(default=dict, blank=True, help_text="$bgm_N / $sfx_N → 라이브러리 ID")
+    warnings = models.JSONField(default=list, blank=True)
+    stage_timings = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'batch_job'
+        verbose_name = '배치 오디오북 작업'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.job_id} ({self.state})"
+
+
+# 배치 작업 체크포인트 (book.batch_checkpoints) — 재개 시 완료된 단계/페이지 건너뜀
+class BatchCheckpoint(models.Model):
+    job = models.ForeignKey(BatchJob, on_delete=models.CASCADE, related_name='checkpoints')
+    step_index = models.IntegerField()
+    page_index = models.IntegerField(default=-1, help_text="-1: 단계 전체 결과")
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'batch_checkpoint'
+        verbose_name = '배치 작업 체크포인트'
+        unique_together = ('job', 'step_index', 'page_index')
+
+    def __str__(self):
+        return f"{self.job_id} step={self.step_index} page={self.page_index}"
+
+
+# 외부 API 비동기 작업 (voxliber.api_jobs) — 202 + job_id 응답 후 /api/v1/jobs/<job_id>/로 조회
+class ApiJob(models.Model):
+    KIND_CHOICES = [
+        ('create_episode', '에피소드 생성'),
+        ('regenerate_episode', '에피소드 재생성'),
+        ('regenerate_page', '페이지 재생성'),
+        ('register_pages', '페이지 등록'),
+    ]
+    job_id = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='api_jobs')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, help_text="요청 본문")
+    state = models.CharField(max_length=20, choices=BatchJob.STATE_CHOICES, default='PENDING')
+    progress = models.IntegerField(default=0)
+    status = models.CharField(max_length=255, blank=True, default='')
+    result = models.JSONField(null=True, blank=True, help_text="동기 응답의 data와 같은 결과")
+    error = models.TextField(blank=True, default='')
+    http_status = models.IntegerField(default=200, help_text="동기 응답이었다면 반환했을 HTTP 상태")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'api_job'
+        verbose_name = 'API 비동기 작업'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.kind} {self.job_id} ({self.state})"
+
+
 # 페이지별 TTS 개별 저장 테이블
 class PageAudio(models.Model):
     PAGE_TYPE_CHOICES = [
@@ -168,7 +289,7 @@ class PageAudio(models.Model):
     ]
     content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='page_audios')
     page_number = models.IntegerField()  # 1-based
-    audio_file = models.FileField(upload_to='uploads/page_audio/', null=True, blank=True, max_length=1000)
+    audio_file = models.FileField(upload_to='uploads/page_audio/', storage=blob_storage, null=True, blank=True, max_length=1000)  # blob (book.blobs) — 재사용 페이지와 파일 공유
     text = models.TextField(blank=True, default='')
     voice_id = models.CharField(max_length=100, blank=True, default='')
     language_code = models.CharField(max_length=10, default='ko')
@@ -366,7 +487,7 @@ class VoiceList(models.Model):
 class SoundEffectLibrary(models.Model):
     effect_name = models.CharField(max_length=100)
     effect_description = models.TextField()
-    audio_file = models.FileField(upload_to='sound_effects/', null=True, blank=True)
+    audio_file = models.FileField(upload_to='sound_effects/', storage=blob_storage, null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     user = models.ForeignKey('register.Users', on_delete=models.CASCADE, related_name='sound_effects', null=True, blank=True)
 
@@ -383,7 +504,7 @@ class SoundEffectLibrary(models.Model):
 class BackgroundMusicLibrary(models.Model):
     music_name = models.CharField(max_length=100)
     music_description = models.TextField()
-    audio_file = models.FileField(upload_to='background_music/', null=True, blank=True)
+    audio_file = models.FileField(upload_to='background_music/', storage=blob_storage, null=True, blank=True)
     duration_seconds = models.IntegerField(default=30)
     created_at = models.DateTimeField(default=timezone.now)
     user = models.ForeignKey('register.Users', on_delete=models.CASCADE, related_name='background_music', null=True, blank=True)
@@ -0,0 +1,308 @@
+"""
+MP3 프레임 탐색 인덱스 (시간 → 프레임 byte offset)
+- 게시된 에피소드 MP3(Content.audio_file)의 프레임 헤더만 읽어 SEEK_INTERVAL_MS 간격의 탐색 지점 테이블 생성
+- 오디오 옆에 '<파일명>.seek.json'으로 저장 → 스니펫/북마크/이어듣기/stream_audio ?t= 가 디코딩 없이 위치 계산
+- 원본 크기/mtime을 함께 저장하여 파일이 바뀌면 자동 재생성
+- MPEG-1/2/2.5 Layer III만 지원 (ID3v2 태그, Xing/Info 헤더 프레임은 건너뜀)
+- clip(): 구간의 프레임만 복사해 스니펫 생성 (디코딩/재인코딩 없음, 가장자리 페이드는 global_gain 조정)
+"""
+import json
+import mmap
+import os
+from bisect import bisect_right
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.seek.json'
+SEEK_INTERVAL_MS = 1000  # 탐색 지점 간격
+CLIP_FADE_MS = 300  # 스니펫 앞뒤 페이드 길이
+CLIP_FADE_STEPS = 24  # 페이드 시작 감쇠 = 24 × 1.5dB = -36dB (global_gain 1단계 = 1.5dB)
+CLIP_PRIME_FRAMES = 2  # 비트 저장소(main_data_begin) 참조용으로 앞에 붙이는 무음 처리 프레임 수
+
+# Layer III 비트레이트(kbps): [MPEG-1, MPEG-2/2.5]
+_BITRATES = (
+    (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+)
+# version 비트(00=2.5, 10=2, 11=1) → 샘플레이트
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+def parse_frame_header(buf, pos):
+    """
+    pos 위치의 Layer III 프레임 헤더 해석.
+    Returns: (frame_bytes, samples_per_frame, sample_rate, channels) 또는 None
+    """
+    if pos + 4 > len(buf) or buf[pos] != 0xFF or (buf[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = buf[pos + 1], buf[pos + 2], buf[pos + 3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_idx = b2 >> 4
+    rate_idx = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None  # reserved / Layer I·II / free-format
+    mpeg1 = version == 3
+    bitrate = _BITRATES[0 if mpeg1 else 1][bitrate_idx] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_idx]
+    padding = (b2 >> 1) & 0x01
+    samples = 1152 if mpeg1 else 576
+    frame_bytes = (samples // 8) * bitrate // sample_rate + padding
+    channels = 1 if (b3 >> 6) == 3 else 2
+    return frame_bytes, samples, sample_rate, channels
+
+
+def audio_start(buf):
+    """ID3v2 태그 다음 위치"""
+    if len(buf) >= 10 and buf[:3] == b'ID3':
+        size = ((buf[6] & 0x7F) << 21) | ((buf[7] & 0x7F) << 14) | ((buf[8] & 0x7F) << 7) | (buf[9] & 0x7F)
+        return 10 + size + (10 if buf[5] & 0x10 else 0)
+    return 0
+
+
+def _is_info_frame(buf, pos, header):
+    """Xing/Info/VBRI 헤더 프레임 여부 (오디오가 아닌 메타데이터 프레임)"""
+    frame_bytes, samples, _, channels = header
+    mpeg1 = samples == 1152
+    side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+    tag = bytes(buf[pos + 4 + side_info:pos + 8 + side_info])
+    return tag in (b'Xing', b'Info') or bytes(buf[pos + 36:pos + 40]) == b'VBRI'
+
+
+def iter_frames(buf, start=None):
+    """
+    (byte_offset, frame_bytes, samples, sample_rate, channels) 순회.
+    동기 워드가 깨진 구간은 다음 유효 프레임(뒤 프레임 헤더까지 확인)으로 재동기화.
+    """
+    pos = audio_start(buf) if start is None else start
+    end = len(buf)
+    first = start is None  # Xing/Info 프레임은 파일 첫 프레임에만 있음
+    while pos + 4 <= end:
+        header = parse_frame_header(buf, pos)
+        if header is None or (header[0] < 24):
+            nxt = buf.find(b'\xff', pos + 1)
+            if nxt < 0:
+                return
+            # 재동기화: 다음 헤더도 유효해야 프레임으로 인정
+            cand = parse_frame_header(buf, nxt)
+            if cand and (nxt + cand[0] >= end or parse_frame_header(buf, nxt + cand[0])):
+                pos = nxt
+            else:
+                pos = nxt + 1
+            continue
+        if first:
+            first = False
+            if _is_info_frame(buf, pos, header):
+                pos += header[0]
+                continue
+        yield (pos,) + header
+        pos += header[0]
+
+
+def build_index(path, interval_ms=SEEK_INTERVAL_MS):
+    """MP3 파일의 탐색 테이블 생성 (프레임 헤더만 읽음, 디코딩 없음)"""
+    st = os.stat(path)
+    times, offsets = [], []
+    elapsed_samples = 0
+    sample_rate = channels = 0
+    frames = 0
+    next_point = 0
+    data_end = 0
+    if st.st_size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for pos, frame_bytes, samples, rate, ch in iter_frames(buf):
+                if not sample_rate:
+                    sample_rate, channels = rate, ch
+                ms = elapsed_samples * 1000 // sample_rate
+                if ms >= next_point:
+                    times.append(int(ms))
+                    offsets.append(pos)
+                    next_point = (ms // interval_ms + 1) * interval_ms
+                elapsed_samples += samples
+                frames += 1
+                data_end = pos + frame_bytes
+    return {
+        'version': INDEX_VERSION,
+        'interval_ms': interval_ms,
+        'duration_ms': int(elapsed_samples * 1000 // sample_rate) if sample_rate else 0,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'frames': frames,
+        'data_end': min(data_end, st.st_size),
+        'source_size': st.st_size,
+        'source_mtime': int(st.st_mtime),
+        'times': times,
+        'offsets': offsets,
+    }
+
+
+def index_path(audio_path):
+    return str(audio_path) + INDEX_SUFFIX
+
+
+def _is_fresh(index, audio_path):
+    try:
+        st = os.stat(audio_path)
+    except FileNotFoundError:
+        return False
+    return (index.get('version') == INDEX_VERSION and index.get('source_size') == st.st_size
+            and index.get('source_mtime') == int(st.st_mtime))
+
+
+def write_index(audio_path, interval_ms=SEEK_INTERVAL_MS):
+    """인덱스 생성 후 오디오 옆에 저장 (임시 파일 → os.replace). 인덱스 반환"""
+    index = build_index(audio_path, interval_ms)
+    dest = index_path(audio_path)
+    tmp = dest + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp, dest)
+    print(f"🧭 탐색 인덱스 생성: {os.path.basename(str(audio_path))} ({len(index['offsets'])}개 지점, {index['duration_ms'] / 1000:.1f}초)")
+    return index
+
+
+def load_index(audio_path, build=True):
+    """저장된 인덱스 반환. 없거나 오래됐으면 build=True일 때 새로 생성, 아니면 None"""
+    try:
+        with open(index_path(audio_path)) as f:
+            index = json.load(f)
+        if _is_fresh(index, audio_path):
+            return index
+    except (FileNotFoundError, ValueError):
+        pass
+    if not build or not str(audio_path).lower().endswith('.mp3') or not os.path.exists(audio_path):
+        return None
+    return write_index(audio_path)
+
+
+def ensure_index(audio_path):
+    """게시 직후 호출용: MP3이고 인덱스가 없거나 오디오보다 오래됐으면 생성 (stat만 비교)"""
+    audio_path = str(audio_path)
+    if not audio_path.lower().endswith('.mp3') or not os.path.exists(audio_path):
+        return
+    try:
+        if os.path.getmtime(index_path(audio_path)) >= os.path.getmtime(audio_path):
+            return
+    except FileNotFoundError:
+        pass
+    write_index(audio_path)
+
+
+def remove_index(audio_path):
+    try:
+        os.remove(index_path(audio_path))
+    except (FileNotFoundError, TypeError):
+        pass
+
+
+def seek(index, ms):
+    """
+    ms 위치를 포함하는 탐색 지점 (time_ms, byte_offset). ms 이하에서 가장 가까운 지점.
+    범위 밖이면 처음/마지막 지점으로 맞춤. 빈 인덱스면 (0, 0).
+    """
+    times = index.get('times') or []
+    if not times:
+        return 0, 0
+    i = max(0, bisect_right(times, max(0, int(ms))) - 1)
+    return times[i], index['offsets'][i]
+
+
+def byte_range(index, start_ms, end_ms=None):
+    """
+    [start_ms, end_ms) 구간을 덮는 프레임 byte 범위 (start_offset, end_offset, actual_start_ms, actual_end_ms).
+    end 쪽은 end_ms 이상인 첫 탐색 지점까지 (없으면 오디오 끝).
+    """
+    start_time, start_offset = seek(index, start_ms)
+    times = index.get('times') or []
+    end_offset = index.get('data_end') or index.get('source_size', 0)
+    end_time = index.get('duration_ms', 0)
+    if end_ms is not None and times:
+        i = bisect_right(times, int(end_ms) - 1)
+        if i < len(times):
+            end_time, end_offset = times[i], index['offsets'][i]
+    return start_offset, end_offset, start_time, end_time
+
+
+# ==================== 프레임 복사 클립 ====================
+
+def _granule_layout(buf, pos, header):
+    """
+    side info 안 global_gain 필드들의 bit 위치 목록 (granule 순서, 채널 순서).
+    CRC 보호 프레임은 수정하면 CRC가 깨지므로 None.
+    """
+    _, samples, _, channels = header
+    if not buf[pos + 1] & 0x01:
+        return None  # protection bit 0 = CRC 있음
+    side = (pos + 4) * 8
+    if samples == 1152:  # MPEG-1: main_data_begin 9 + private + scfsi, granule 2개 × 채널별 59bit
+        base = side + 9 + (5 if channels == 1 else 3) + 4 * channels
+        return [base + (gr * channels + ch) * 59 + 21 for gr in range(2) for ch in range(channels)]
+    # MPEG-2/2.5 (LSF): main_data_begin 8 + private, granule 1개 × 채널별 63bit
+    base = side + 8 + (1 if channels == 1 else 2)
+    return [base + ch * 63 + 21 for ch in range(channels)]
+
+
+def _adjust_gain(buf, bit_pos, delta):
+    """bit_pos의 8bit global_gain에서 delta 단계를 뺌 (0 미만은 0 = 사실상 무음)"""
+    byte, shift = divmod(bit_pos, 8)
+    word = int.from_bytes(buf[byte:byte + 3], 'big')
+    offset = 16 - shift
+    gain = (word >> offset) & 0xFF
+    word = (word & ~(0xFF << offset)) | (max(0, gain - delta) << offset)
+    buf[byte:byte + 3] = word.to_bytes(3, 'big')
+
+
+def clip(audio_path, start_ms, end_ms, fade_ms=CLIP_FADE_MS, index=None):
+    """
+    MP3의 [start_ms, end_ms) 구간을 덮는 프레임만 복사해 새 MP3 바이트 반환 (디코딩/재인코딩 없음).
+    - 시작 위치는 탐색 인덱스로 찾고, 그 지점부터 프레임 헤더를 따라가며 정확한 프레임 선택 (≈26ms 단위)
+    - 앞에 CLIP_PRIME_FRAMES개 프레임을 무음(global_gain=0)으로 붙여 비트 저장소 참조를 충족
+    - 앞뒤 fade_ms 구간은 granule별 global_gain을 단계적으로 낮춰 페이드 인/아웃
+    MP3가 아니거나 구간에 프레임이 없으면 None.
+    """
+    index = index or load_index(audio_path)
+    if not index or not index.get('times') or end_ms <= start_ms:
+        return None
+    point_ms, point_offset = seek(index, start_ms)
+    sample_rate = index['sample_rate']
+
+    with open(audio_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        frames = []  # (pos, header, start_ms)
+        history = []  # 시작 프레임 직전 프레임 (priming용)
+        elapsed = point_ms * sample_rate // 1000  # 인덱스 지점의 샘플 위치 (ms 반올림 오차 1 frame 미만)
+        for pos, frame_bytes, samples, rate, ch in iter_frames(buf, start=point_offset):
+            header = (frame_bytes, samples, rate, ch)
+            frame_start = elapsed * 1000 // sample_rate
+            frame_end = (elapsed + samples) * 1000 // sample_rate
+            elapsed += samples
+            if frame_start >= end_ms:
+                break
+            if frame_end <= start_ms:
+                history = (history + [(pos, header)])[-CLIP_PRIME_FRAMES:]
+                continue
+            frames.append((pos, header, frame_start))
+        if not frames:
+            return None
+
+        out = bytearray()
+        gains = []  # (out 내 frame 위치, 헤더, 감쇠 단계)
+        for pos, header in history:
+            gains.append((len(out), header, 255))
+            out += buf[pos:pos + header[0]]
+
+        clip_start = frames[0][2]
+        clip_end = frames[-1][2] + frames[-1][1][1] * 1000 // sample_rate
+        fade = max(1, min(fade_ms, (clip_end - clip_start) // 4))
+        for pos, header, frame_start in frames:
+            pos_in_clip = frame_start - clip_start
+            remain = clip_end - frame_start
+            level = min(1.0, pos_in_clip / fade, remain / fade)
+            steps = 0 if level >= 1.0 else int(round((1.0 - level) * CLIP_FADE_STEPS))
+            if steps:
+                gains.append((len(out), header, steps))
+            out += buf[pos:pos + header[0]]
+
+    for frame_pos, header, steps in gains:
+        layout = _granule_layout(out, frame_pos, header)
+        for bit_pos in layout or ():
+            _adjust_gain(out, bit_pos, steps)
+    return bytes(out)
@@ -0,0 +1,230 @@
+"""
+디코딩된 PCM 사이드카 캐시 (재믹싱용)
+- Content.tts_audio_file(믹싱 base), BGM/SFX 라이브러리 파일을 s16 PCM으로 한 번만 디코딩해 .npy로 저장
+- 이후 np.load(mmap_mode='r')로 메모리 매핑 → BGM 볼륨/SFX 위치 수정 시 디코딩 없이 float 연산 + 인코딩 1회
+- 16bit WAV는 사이드카 없이 원본 파일의 data 청크를 직접 매핑
+- 키: (절대 경로, 크기, mtime, 요청 frame_rate)의 sha256 → 파일이 교체되면 자동으로 새 키
+- 용량 상한(settings.PCM_CACHE_MAX_BYTES) 초과 시 가장 오래 사용되지 않은 항목부터 삭제 (LRU, mtime 기준)
+  사이드카를 만들 때마다 디렉터리를 스캔하지 않고 프로세스별 근사 총 용량(_approx_bytes)으로 판단 →
+  상한을 넘었거나 RESCAN_SECONDS가 지났을 때만 스캔(evict)하고 근사값을 실제 값으로 맞춤
+  (다른 워커가 만든 사이드카는 다음 스캔에서 반영)
+"""
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+from uuid import uuid4
+
+import numpy as np
+from django.conf import settings
+
+SAMPLE_WIDTH = 2
+EVICT_TARGET = 0.9  # 정리할 때는 상한의 90%까지 → 상한 근처에서 사이드카마다 스캔하지 않도록
+RESCAN_SECONDS = 600
+
+_lock = threading.Lock()
+_approx_bytes = None  # 마지막 스캔 총 용량 + 이후 이 프로세스가 추가한 용량
+_scanned_at = 0.0
+
+
+def _cache_dir():
+    path = str(getattr(settings, 'PCM_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'pcm')))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_enabled():
+    return getattr(settings, 'PCM_CACHE_ENABLED', True)
+
+
+def make_key(path, frame_rate=None):
+    st = os.stat(path)
+    payload = json.dumps([os.path.abspath(str(path)), st.st_size, st.st_mtime_ns, frame_rate or 0],
+                         separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(_cache_dir(), key[:2], key + '.npy')
+
+
+def _wav_data_view(path, frame_rate=None):
+    """
+    16bit PCM WAV이면 data 청크를 (frames, channels) int16으로 직접 메모리 매핑하여 (array, frame_rate) 반환.
+    헤더가 다르거나(압축/24bit 등) frame_rate가 맞지 않으면 None.
+    """
+    if not str(path).lower().endswith('.wav'):
+        return None
+    with open(path, 'rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            return None
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            elif chunk_id == b'data':
+                offset = f.tell()
+                break
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+    if fmt is None:
+        return None
+    audio_format, channels, rate, _, _, bits = fmt
+    if audio_format != 1 or bits != SAMPLE_WIDTH * 8 or (frame_rate and rate != frame_rate):
+        return None
+    frames = min(size, os.path.getsize(path) - offset) // (channels * SAMPLE_WIDTH)
+    if not frames:
+        return np.zeros((0, channels), dtype=np.int16), rate
+    data = np.memmap(path, dtype=np.int16, mode='r', offset=offset, shape=(frames, channels))
+    return data, rate
+
+
+def _decode(path, frame_rate=None):
+    from book import codec
+    return codec.decode(path, frame_rate=frame_rate)
+
+
+def load(path, frame_rate=None):
+    """
+    오디오 파일의 PCM을 (frames, channels) int16 읽기 전용 배열로 반환 (메모리 매핑).
+    frame_rate 지정 시 해당 샘플레이트로 리샘플된 사이드카 사용.
+
+    Returns:
+        tuple: (array, frame_rate)
+    """
+    path = str(path)
+    direct = _wav_data_view(path, frame_rate)
+    if direct is not None:
+        return direct
+
+    key = make_key(path, frame_rate)
+    entry = _entry_path(key)
+    meta_path = entry[:-4] + '.json'
+    try:
+        with open(meta_path) as f:
+            rate = json.load(f)['frame_rate']
+        data = np.load(entry, mmap_mode='r')
+        os.utime(entry, None)  # LRU: 마지막 사용 시각 갱신
+        return data, rate
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    data, rate = _decode(path, frame_rate)
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = f'{entry}.{uuid4().hex}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            np.save(f, data)
+        with open(meta_path, 'w') as f:
+            json.dump({'frame_rate': rate, 'source': os.path.basename(path)}, f)
+        os.replace(tmp, entry)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    print(f"💾 PCM 사이드카 생성: {os.path.basename(path)} ({data.nbytes / 1024 / 1024:.1f}MB)")
+    _added(os.path.getsize(entry))
+    return np.load(entry, mmap_mode='r'), rate
+
+
+def warm(path):
+    """사이드카를 미리 생성 (믹싱 base/라이브러리 파일 저장 직후 호출). 실패해도 무시"""
+    if not is_enabled() or not path:
+        return
+    try:
+        load(path)
+    except Exception as e:
+        print(f"⚠️ PCM 사이드카 생성 실패 ({os.path.basename(str(path))}): {e}")
+
+
+def _entries():
+    """(mtime, size, path) 목록"""
+    result = []
+    root = _cache_dir()
+    for sub in os.scandir(root):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if entry.name.endswith('.npy'):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                result.append((st.st_mtime, st.st_size, entry.path))
+    return result
+
+
+def _max_bytes():
+    return getattr(settings, 'PCM_CACHE_MAX_BYTES', 8 * 1024 ** 3)
+
+
+def _added(size):
+    """사이드카 추가 → 근사 총 용량 갱신, 상한 초과(또는 오래된 근사값)면 스캔 후 정리"""
+    global _approx_bytes
+    with _lock:
+        stale = _approx_bytes is None or time.monotonic() - _scanned_at > RESCAN_SECONDS
+        if not stale:
+            _approx_bytes += size
+        over = stale or _approx_bytes > _max_bytes()
+    if over:
+        evict(int(_max_bytes() * EVICT_TARGET) if not stale else None)
+
+
+def evict(max_bytes=None):
+    """
+    총 용량이 max_bytes 이하가 될 때까지 오래 사용되지 않은 항목 삭제 (근사 총 용량도 스캔 결과로 갱신). 삭제 개수 반환
+    max_bytes 생략 시: 상한을 넘었을 때만 상한의 EVICT_TARGET까지
+    """
+    global _approx_bytes, _scanned_at
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    if max_bytes is None:
+        max_bytes = _max_bytes() if total <= _max_bytes() else int(_max_bytes() * EVICT_TARGET)
+    if total <= max_bytes:
+        with _lock:
+            _approx_bytes, _scanned_at = total, time.monotonic()
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)  # 이미 매핑 중인 프로세스는 닫을 때까지 그대로 읽을 수 있음
+            total -= size
+            removed += 1
+        except FileNotFoundError:
+            pass
+        try:
+            os.remove(path[:-4] + '.json')
+        except FileNotFoundError:
+            pass
+    with _lock:
+        _approx_bytes, _scanned_at = total, time.monotonic()
+    if removed:
+        print(f"🧹 PCM 캐시 정리: {removed}개 삭제")
+    return removed
+
+
+def stats():
+    entries = _entries()
+    return {
+        'entries': len(entries),
+        'bytes': sum(size for _, size, _ in entries),
+        'max_bytes': _max_bytes(),
+    }
+
+
+def clear():
+    global _approx_bytes
+    shutil.rmtree(_cache_dir(), ignore_errors=True)
+    with _lock:
+        _approx_bytes = None
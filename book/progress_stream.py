@@ -0,0 +1,111 @@
+"""
+작업 진행률 푸시 (SSE) — 워커가 단계 경계마다 Redis pub/sub으로 상태를 발행 → 구독 중인 브라우저에 바로 전달
+- 채널: 'voxliber:progress:<task_id>', 메시지는 폴링 응답과 같은 키의 JSON ({'state', 'status', 'progress', ...})
+- 발행: batch_canvas (BatchJob 진행률/완료/실패), merge_audio_task (update_state와 함께)
+- 구독: stream() — 연결 직후 현재 상태(폴링 응답과 같은 스냅샷) 1회 + 이후 발행분, SUCCESS/FAILURE에서 종료
+  PROGRESS_STREAM_MAX_SECONDS가 지나면 연결을 닫음 → EventSource가 다시 연결해 스냅샷부터 이어 받음
+- ASGI(uvicorn 등)에서만 스트리밍. WSGI/Redis 연결 실패/PROGRESS_STREAM_ENABLED=False → 204
+  → 클라이언트는 기존 폴링 엔드포인트(preview_task_status, audiobook_task_status)로 전환
+"""
+import json
+import time
+
+from django.conf import settings
+
+DONE_STATES = ('SUCCESS', 'FAILURE')
+HEARTBEAT_SECONDS = 15  # 프록시 유휴 타임아웃 방지용 주석 라인 간격
+RETRY_BACKOFF_SECONDS = 30  # 발행 실패 후 이 시간 동안 발행 생략 (Redis 장애 시 페이지마다 연결 타임아웃 방지)
+
+_client = None
+_down_until = 0.0
+
+
+def enabled():
+    return getattr(settings, 'PROGRESS_STREAM_ENABLED', True)
+
+
+def _url():
+    return getattr(settings, 'PROGRESS_REDIS_URL', None) or settings.CELERY_BROKER_URL
+
+
+def channel(task_id):
+    return f'voxliber:progress:{task_id}'
+
+
+# ==================== 발행 (워커) ====================
+
+def _redis():
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(_url(), socket_timeout=2, socket_connect_timeout=2)
+    return _client
+
+
+def publish(task_id, data):
+    """진행 상태 발행 — 실패해도 작업은 계속 (폴링 엔드포인트는 DB/결과 백엔드를 그대로 읽음)"""
+    global _down_until
+    if not enabled() or time.monotonic() < _down_until:
+        return
+    try:
+        _redis().publish(channel(task_id), json.dumps(data, ensure_ascii=False, default=str))
+    except Exception as e:
+        _down_until = time.monotonic() + RETRY_BACKOFF_SECONDS
+        print(f"⚠️ 진행률 발행 실패 ({task_id}): {e}")
+
+
+# ==================== 구독 (SSE 뷰) ====================
+
+def _event(data):
+    return f"data: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _events(client, pubsub, task_id, snapshot):
+    from asgiref.sync import sync_to_async
+
+    deadline = time.monotonic() + getattr(settings, 'PROGRESS_STREAM_MAX_SECONDS', 600)
+    try:
+        # 구독을 먼저 시작한 뒤 스냅샷 → 그 사이에 발행된 상태도 놓치지 않음
+        data = await sync_to_async(snapshot)()
+        yield 'retry: 3000\n' + _event(data)
+        if data.get('state') in DONE_STATES:
+            return
+        while time.monotonic() < deadline:
+            wait = min(HEARTBEAT_SECONDS, max(0.0, deadline - time.monotonic()))
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=wait)
+            if message is None:
+                yield ': ping\n\n'
+                continue
+            data = json.loads(message['data'])
+            yield _event(data)
+            if data.get('state') in DONE_STATES:
+                return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
+
+
+async def stream(request, task_id, snapshot):
+    """
+    SSE 응답 (async 뷰에서 await). snapshot()은 폴링 응답과 같은 dict를 만드는 동기 함수 (스레드에서 실행)
+    스트리밍할 수 없으면 204 → 클라이언트 폴링
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, StreamingHttpResponse
+
+    if not enabled() or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    try:
+        import redis.asyncio as aioredis
+        client = aioredis.Redis.from_url(_url(), socket_connect_timeout=2)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel(task_id))
+    except Exception as e:
+        print(f"⚠️ 진행률 스트림 구독 실패 ({task_id}): {e}")
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(_events(client, pubsub, task_id, snapshot), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 응답 버퍼링 끔
+    return response
@@ -0,0 +1,187 @@
+"""
+에피소드 오디오 렌디션 (같은 PCM에서 비트레이트별 파일을 동시에 인코딩)
+- standard: Content.audio_file (PUBLISH_BITRATE 128k MP3) — 기존 그대로
+- 추가 렌디션: settings.AUDIO_RENDITIONS = "name:format:bitrate[:channels],..."
+  기본값 low = MP3 48k mono (모바일/셀룰러), medium = MP3 96k
+  format: mp3 | opus | m4a(AAC)
+- 렌더러(render_plan)와 게시 인코딩(transcode)이 한 번의 디코딩/믹싱으로 모든 렌디션을 함께 기록
+  → 렌디션용 렌더 작업을 따로 돌리지 않음
+- 클라이언트는 ?rendition=<name>으로 선택 (stream_audio, 에피소드 API). 없거나 모르는 이름이면 standard
+- 게시 오디오는 내용 해시 이름(book.storage)이라 여러 행이 파일 1개를 공유할 수 있음
+  → 교체/삭제할 때는 remove_file()로 다른 Content/ContentRendition이 참조하지 않을 때만 파일/인덱스/HLS 삭제
+"""
+import os
+from uuid import uuid4
+
+from django.conf import settings
+
+STANDARD = 'standard'
+
+# format → (확장자, ffmpeg muxer)
+FORMATS = {
+    'mp3': ('.mp3', 'mp3'),
+    'opus': ('.opus', 'opus'),
+    'm4a': ('.m4a', 'ipod'),
+}
+
+
+def configured():
+    """settings.AUDIO_RENDITIONS 파싱 → [{name, format, muxer, ext, bitrate, channels}]"""
+    result = []
+    for entry in str(getattr(settings, 'AUDIO_RENDITIONS', '') or '').split(','):
+        parts = [p.strip() for p in entry.split(':')]
+        if len(parts) < 3 or not parts[0] or parts[0] == STANDARD:
+            continue
+        name, fmt, bitrate = parts[:3]
+        if fmt not in FORMATS:
+            print(f"⚠️ 지원하지 않는 렌디션 포맷 무시: {entry}")
+            continue
+        ext, muxer = FORMATS[fmt]
+        result.append({
+            'name': name,
+            'format': fmt,
+            'muxer': muxer,
+            'ext': ext,
+            'bitrate': bitrate,
+            'channels': int(parts[3]) if len(parts) > 3 and parts[3] else None,
+        })
+    return result
+
+
+def outputs(prefix='episode'):
+    """이번 렌더에서 함께 기록할 렌디션 출력 목록 (임시 경로 포함). render_plan/transcode의 renditions 인자로 전달"""
+    audio_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
+    os.makedirs(audio_dir, exist_ok=True)
+    return [
+        dict(r, path=os.path.join(audio_dir, f"{prefix}_{r['name']}_{uuid4().hex}{r['ext']}"))
+        for r in configured()
+    ]
+
+
+def encoder_targets(outs):
+    """audio_engine 인코더 인자 형태 [{path, format(muxer), bitrate, channels}]"""
+    return [{'path': o['path'], 'format': o['muxer'], 'bitrate': o['bitrate'], 'channels': o['channels']} for o in outs]
+
+
+def discard(outs):
+    """렌더 실패 시 임시 렌디션 파일 삭제"""
+    for out in outs or []:
+        if os.path.exists(out['path']):
+            os.remove(out['path'])
+
+
+def referenced(name, skip_content=None, skip_rendition=None):
+    """name을 audio_file로 쓰는 Content/ContentRendition 행이 있는지 (skip_*: 곧 교체/삭제될 행의 pk)"""
+    from book.models import Content, ContentRendition
+
+    contents = Content.objects.filter(audio_file=name)
+    rows = ContentRendition.objects.filter(audio_file=name)
+    if skip_content is not None:
+        contents = contents.exclude(pk=skip_content)
+    if skip_rendition is not None:
+        rows = rows.exclude(pk=skip_rendition)
+    return contents.exists() or rows.exists()
+
+
+def remove_file(name, skip_content=None, skip_rendition=None):
+    """게시 오디오 파일 + 탐색 인덱스 + HLS 패키지 삭제 — 다른 행이 같은 파일을 참조하면 남겨 둠. 삭제했으면 True"""
+    from book import hls, mp3_index
+    from book.storage import content_hash_storage
+
+    if not name or referenced(name, skip_content, skip_rendition):
+        return False
+    path = content_hash_storage.path(name)
+    if os.path.exists(path):
+        os.remove(path)
+    mp3_index.remove_index(path)
+    hls.remove(path)
+    return True
+
+
+def kbps(bitrate):
+    try:
+        return int(str(bitrate).lower().rstrip('k'))
+    except ValueError:
+        return 0
+
+
+def save(content, outs):
+    """
+    렌더된 렌디션 파일을 ContentRendition으로 저장 (이름별 교체, 기존 파일/탐색 인덱스는 다른 참조가 없으면 삭제).
+    이번 렌더에서 만들어지지 않은 렌디션은 standard와 내용이 달라지므로 삭제.
+    """
+    from django.core.files import File
+    from book.models import ContentRendition
+
+    kept = []
+    for out in outs or []:
+        if not os.path.exists(out['path']):
+            continue
+        rendition = ContentRendition.objects.filter(content=content, name=out['name']).first() \
+            or ContentRendition(content=content, name=out['name'])
+        old_name = rendition.audio_file.name if rendition.audio_file else None
+        try:
+            with open(out['path'], 'rb') as f:
+                rendition.audio_file.save(os.path.basename(out['path']), File(f), save=False)
+            rendition.format = out['format']
+            rendition.bitrate_kbps = kbps(out['bitrate'])
+            rendition.channels = out['channels'] or 0
+            rendition.size_bytes = rendition.audio_file.size
+            rendition.save()
+        finally:
+            os.remove(out['path'])
+        if old_name and old_name != rendition.audio_file.name:
+            remove_file(old_name)
+        kept.append(out['name'])
+
+    for stale in content.renditions.exclude(name__in=kept):
+        if stale.audio_file:
+            remove_file(stale.audio_file.name, skip_rendition=stale.pk)
+        stale.delete()
+    if kept:
+        print(f"🎚️ 렌디션 저장: {', '.join(kept)}")
+
+
+def select(content, name=None):
+    """요청한 렌디션의 FieldFile (없으면 standard = content.audio_file). prefetch_related('renditions') 활용"""
+    if name and name != STANDARD:
+        for rendition in content.renditions.all():
+            if rendition.name == name and rendition.audio_file:
+                return rendition.audio_file
+    return content.audio_file
+
+
+def requested(request):
+    return (request.GET.get('rendition') or '').strip() or None
+
+
+def describe(request, content, sign=None):
+    """
+    API 응답용 {name: {url, bitrate_kbps, format, size_bytes}} (standard 포함)
+    sign: FieldFile → URL 함수 (media_signing.content_signer) — 없으면 권한 확인을 거치는 stream_audio URL
+    (uploads/audio는 nginx internal — /media/ 직접 URL은 열리지 않음)
+    """
+    from book import media_delivery
+    from book.audio_engine import PUBLISH_BITRATE
+
+    def url(audio_file, name=None):
+        if sign:
+            return sign(audio_file)
+        return media_delivery.content_stream_url(request, content, name)
+
+    result = {}
+    if content.audio_file:
+        result[STANDARD] = {
+            'url': url(content.audio_file),
+            'format': os.path.splitext(content.audio_file.name)[1].lstrip('.').lower(),
+            'bitrate_kbps': kbps(PUBLISH_BITRATE),
+        }
+    for rendition in content.renditions.all():
+        if rendition.audio_file:
+            result[rendition.name] = {
+                'url': url(rendition.audio_file, rendition.name),
+                'format': rendition.format,
+                'bitrate_kbps': rendition.bitrate_kbps,
+                'size_bytes': rendition.size_bytes,
+            }
+    return result
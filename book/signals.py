@@ -2,11 +2,19 @@
 Django Signals
 - 로그인 시 자동으로 API Key 생성
 - 이미지 업로드 시 자동 최적화
+- 에피소드 오디오 저장 시 MP3 탐색 인덱스 생성
+- 에피소드 오디오가 바뀌면 이전 오디오의 렌디션/HLS 패키지 삭제
+- 에피소드 오디오/타임스탬프 저장 시 HLS 패키징 (AUDIO_HLS_ENABLED)
+- blob 필드(book.blobs.BLOB_FIELDS) 저장/삭제 시 MediaBlob 참조 수 갱신
+- Celery 태스크 발행/실행 시 큐 대기 시간 기록 (book.task_queues)
 """
+from celery.signals import before_task_publish, task_prerun
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
-from book.models import APIKey, Books
+from book.models import (APIKey, BackgroundMusicLibrary, Books, Content, ContentRendition, PageAudio,
+                         SoundEffectLibrary)
+from book import blobs, hls, mp3_index, renditions, task_queues
 from book.image_utils import optimize_image
 import secrets
 
@@ -69,3 +77,118 @@ def optimize_book_cover_image(sender, instance, **kwargs):
             print(f"[Image] Optimized: {instance.name}")
     except Exception as e:
         print(f"[Image] Optimize failed: {str(e)}")
+
+
+@receiver(post_save, sender=Content)
+def build_audio_seek_index(sender, instance, **kwargs):
+    """
+    에피소드 오디오(MP3) 탐색 인덱스 생성
+    - 게시/믹싱/업로드 등 audio_file이 바뀐 경우에만 생성 (인덱스가 오디오보다 새 것이면 건너뜀)
+    - 프레임 헤더만 읽으므로 30분 에피소드도 수십 ms
+    """
+    if not instance.audio_file:
+        return
+    try:
+        mp3_index.ensure_index(instance.audio_file.path)
+    except Exception as e:
+        print(f"[SeekIndex] Build failed: {str(e)}")
+
+
+@receiver(post_save, sender=Content)
+def build_hls_package(sender, instance, update_fields=None, **kwargs):
+    """
+    에피소드 오디오 HLS 패키징 (standard + MP3 렌디션)
+    - audio_file 또는 audio_timestamps가 저장될 때만 확인 (세그먼트 경계 = 대사 시작)
+    - 패키지가 오디오/대사 경계와 맞으면 건너뜀. 프레임 복사라 30분 에피소드도 1초 미만
+    """
+    if not hls.enabled() or not instance.audio_file:
+        return
+    if update_fields is not None and not {'audio_file', 'audio_timestamps'} & set(update_fields):
+        return
+    try:
+        hls.ensure_package(instance.audio_file.path, instance.audio_timestamps)
+        for rendition in instance.renditions.filter(format='mp3'):
+            if rendition.audio_file:
+                hls.ensure_package(rendition.audio_file.path, instance.audio_timestamps)
+    except Exception as e:
+        print(f"[HLS] Package failed: {str(e)}")
+
+
+@receiver(pre_save, sender=Content)
+def drop_stale_renditions(sender, instance, update_fields=None, **kwargs):
+    """
+    audio_file이 바뀌면 이전 오디오로 만든 렌디션(book.renditions)과 HLS 패키지 삭제
+    - 렌더러 경로는 audio_file 저장 직후 renditions.save()로 새 렌디션을 기록
+    - 업로드 등 렌디션 없이 교체된 경우에는 standard만 남음 (?rendition= 요청도 standard로 응답)
+    """
+    if not instance.pk or (update_fields is not None and 'audio_file' not in update_fields):
+        return
+    old_name = Content.objects.filter(pk=instance.pk).values_list('audio_file', flat=True).first()
+    if not old_name or old_name == instance.audio_file.name:
+        return
+    # 내용 해시 이름 — 같은 파일을 쓰는 다른 행이 있으면 HLS/렌디션 파일을 남겨 둠 (이전 파일 자체는 교체한 쪽에서 삭제)
+    if not renditions.referenced(old_name, skip_content=instance.pk):
+        hls.remove(Content._meta.get_field('audio_file').storage.path(old_name))
+    for rendition in ContentRendition.objects.filter(content_id=instance.pk):
+        try:
+            if rendition.audio_file:
+                renditions.remove_file(rendition.audio_file.name, skip_rendition=rendition.pk)
+        except Exception as e:
+            print(f"[Rendition] Cleanup failed: {str(e)}")
+        rendition.delete()
+
+
+@receiver(post_save, sender=ContentRendition)
+def build_rendition_seek_index(sender, instance, **kwargs):
+    """렌디션 MP3도 ?t= 탐색/스니펫용 인덱스 생성 (+ HLS 패키징)"""
+    if not instance.audio_file:
+        return
+    try:
+        mp3_index.ensure_index(instance.audio_file.path)
+    except Exception as e:
+        print(f"[SeekIndex] Build failed: {str(e)}")
+    if hls.enabled() and instance.format == 'mp3':
+        try:
+            hls.ensure_package(instance.audio_file.path, instance.content.audio_timestamps)
+        except Exception as e:
+            print(f"[HLS] Package failed: {str(e)}")
+
+
+def track_blob_names(sender, instance, **kwargs):
+    """로드/생성 시점의 blob 필드 값 기록 (DB 조회 없음)"""
+    blobs.snapshot(instance)
+
+
+def update_blob_refs(sender, instance, update_fields=None, **kwargs):
+    """blob 필드 값이 바뀌었으면 새 blob 참조 +1, 이전 blob 참조 -1 (파일 삭제는 blobs.sweep)"""
+    try:
+        blobs.sync(instance, update_fields)
+    except Exception as e:
+        print(f"[Blob] Ref update failed: {str(e)}")
+
+
+def release_blob_refs(sender, instance, **kwargs):
+    try:
+        blobs.release_all(instance)
+    except Exception as e:
+        print(f"[Blob] Ref release failed: {str(e)}")
+
+
+for _model in (PageAudio, Content, SoundEffectLibrary, BackgroundMusicLibrary):
+    post_init.connect(track_blob_names, sender=_model)
+    post_save.connect(update_blob_refs, sender=_model)
+    post_delete.connect(release_blob_refs, sender=_model)
+
+
+@before_task_publish.connect
+def stamp_task_enqueued(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        task_queues.stamp(headers)
+
+
+@task_prerun.connect
+def record_task_wait(sender=None, task=None, **kwargs):
+    try:
+        task_queues.record_wait(task)
+    except Exception as e:
+        print(f"[Queue] Wait metric failed: {str(e)}")
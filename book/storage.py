@@ -0,0 +1,78 @@
+"""
+내용 해시 파일 이름 저장소
+- ContentHashStorage: 게시 오디오, 렌디션, 책 커버, 에피소드 이미지
+- 저장 시 파일 내용 SHA-256 앞 20자리를 이름으로 사용: uploads/audio/3f9c…e1.mp3 (upload_to 폴더 유지)
+- 내용이 바뀌면(재렌더/재업로드) 이름과 URL이 바뀌고, 같은 내용이면 같은 이름 → 기존 파일을 그대로 사용
+- URL이 내용을 대표하므로 이미지는 nginx에서 1년 public immutable 캐시 (DEPLOYMENT_CHECKLIST.md)
+  게시 오디오/렌디션은 공개 경로로 제공하지 않음 — 서명 URL(signed_media, 비공개 등급은 private 캐시)/stream_audio만
+  → 재청취/앱 재시작 시 바뀌지 않은 파일을 다시 받지 않음
+- BlobStorage: 중복 제거 blob 저장소 (book.blobs — 페이지 오디오, 무손실 마스터, BGM/SFX 라이브러리)
+"""
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_LENGTH = 20
+BLOB_PREFIX = 'blobs/'
+_HASHED_NAME_RE = re.compile(r'^[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def content_hash(content):
+    """File/UploadedFile 내용 SHA-256 hex (chunks() 순회 — 큰 오디오도 메모리 일정)"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_hashed_name(name):
+    return bool(name) and bool(_HASHED_NAME_RE.match(posixpath.basename(str(name).replace(os.sep, '/'))))
+
+
+def is_blob_name(name):
+    return bool(name) and str(name).startswith(BLOB_PREFIX)
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """
+    FileSystemStorage + 내용 해시 이름.
+    upload_to가 정한 폴더와 확장자만 유지하고 파일 이름은 내용 해시로 교체.
+    같은 이름의 파일이 이미 있으면 내용이 같으므로 쓰지 않고 그 이름을 반환.
+    """
+
+    def hashed_name(self, name, digest):
+        dirname, basename = posixpath.split(name)
+        return posixpath.join(dirname, f'{digest[:HASH_LENGTH]}{os.path.splitext(basename)[1].lower()}')
+
+    def _save(self, name, content):
+        hashed = self.hashed_name(name, content_hash(content))
+        if self.exists(hashed):
+            return hashed
+        return super()._save(hashed, content)
+
+
+@deconstructible
+class BlobStorage(ContentHashStorage):
+    """
+    중복 제거 blob 저장소 — upload_to와 관계없이 blobs/<해시 앞 2자리>/<해시><확장자>.
+    필드/모델이 달라도 같은 내용이면 파일 1개 (참조 수는 book.blobs.MediaBlob).
+    delete()는 blob 파일을 지우지 않음: 참조 수가 0이 되고 유예 시간이 지나면 book.blobs.sweep()이 삭제.
+    blob이 아닌 예전 이름(uploads/page_audio/... 등)은 기존처럼 바로 삭제.
+    """
+
+    def hashed_name(self, name, digest):
+        return f'{BLOB_PREFIX}{digest[:2]}/{digest[:HASH_LENGTH]}{os.path.splitext(name)[1].lower()}'
+
+    def delete(self, name):
+        if is_blob_name(name):
+            return
+        super().delete(name)
+
+
+content_hash_storage = ContentHashStorage()
+blob_storage = BlobStorage()
@@ -0,0 +1,144 @@
+"""
+Celery 큐 라우팅 / 대량 작업 사용자별 공정 스케줄링 / 큐 지표
+
+큐 (CELERY_TASK_ROUTES = route — 워커를 큐별로 따로 띄워 동시성 분리, DEPLOYMENT_CHECKLIST 참고):
+    interactive   미리듣기 병합, 단건 TTS                          — 사용자가 화면에서 기다리는 작업
+    regenerate    단일 페이지 재생성 / 작은 페이지 등록 API 작업
+    bulk.<N>      배치 오디오북(단일 워커/canvas), 에피소드 생성·재생성 API 작업
+    maintenance   정리/동기화/웹소설 자동 생성 (beat)
+- bulk는 BULK_QUEUE_SHARDS개 샤드로 나누고 사용자를 user_id로 한 샤드에 고정 (bulk_queue).
+  bulk 워커는 모든 샤드를 소비하고, kombu Redis 전송은 메시지를 가져온 큐를 순서 맨 뒤로 돌리므로(round-robin)
+  한 사용자의 200페이지 배치가 샤드 하나만 채움 → 다른 샤드의 사용자와 번갈아 실행 (같은 샤드 사용자끼리는 FIFO).
+  워커 prefetch는 1 (CELERY_WORKER_PREFETCH_MULTIPLIER) — 한 워커가 한 사용자 태스크를 미리 쌓아 두지 않도록
+- 지표: 발행 시 enqueued_at 헤더 (book.signals) → 실행 직전 대기 시간을 큐별로 Redis에 기록 (record_wait).
+  metrics()는 큐 깊이(LLEN) + 대기 시간(최근 WAIT_SAMPLES개 p50/p95/max, 누적 평균)
+"""
+import time
+
+from django.conf import settings
+
+INTERACTIVE = 'interactive'
+REGENERATE = 'regenerate'
+BULK = 'bulk'
+MAINTENANCE = 'maintenance'
+
+ROUTES = {
+    'book.tasks.merge_audio_task': INTERACTIVE,
+    'book.tasks.generate_tts_task': INTERACTIVE,
+    'book.tasks.generate_full_audio_pipeline': INTERACTIVE,
+    'book.tasks.sweep_media_store': MAINTENANCE,
+    'book.tasks.run_ai_factory': MAINTENANCE,
+    'main.tasks.sync_notion_task': MAINTENANCE,
+}
+# 호출부에서 queue=bulk_queue(user_id)로 보내는 태스크 — 지정 없이 발행되면 첫 샤드
+BULK_TASKS = {
+    'book.tasks.process_batch_audiobook',
+    'book.tasks.batch_asset_task',
+    'book.tasks.batch_page_task',
+    'book.tasks.batch_merge_task',
+    'book.tasks.batch_mix_task',
+    'book.tasks.batch_finalize_task',
+    'book.tasks.batch_failed_task',
+    'book.tasks.run_api_job',
+}
+
+WAIT_SAMPLES = 500  # 큐별로 보관할 최근 대기 시간 샘플 수
+_METRIC_PREFIX = 'voxliber:queue_wait:'
+
+_client = None
+
+
+def shards():
+    return max(1, getattr(settings, 'BULK_QUEUE_SHARDS', 8))
+
+
+def bulk_queue(user_id):
+    """사용자의 bulk 샤드 큐 이름 (같은 사용자의 작업은 항상 같은 샤드 → 사용자 안에서는 순서 유지)"""
+    return f'{BULK}.{(user_id or 0) % shards()}'
+
+
+def bulk_queues():
+    return [f'{BULK}.{n}' for n in range(shards())]
+
+
+def all_queues():
+    return [INTERACTIVE, REGENERATE, *bulk_queues(), MAINTENANCE]
+
+
+def route(name, args, kwargs, options, task=None, **kw):
+    """Celery 라우터 — apply_async(queue=...)로 지정한 큐가 우선"""
+    if name in ROUTES:
+        return {'queue': ROUTES[name]}
+    if name in BULK_TASKS:
+        return {'queue': bulk_queue(0)}
+    return None
+
+
+# ==================== 지표 ====================
+
+def _redis():
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _client
+
+
+def stamp(headers):
+    """발행 직전 (before_task_publish) — 대기 시간 측정용 발행 시각"""
+    headers.setdefault('enqueued_at', time.time())
+
+
+def record_wait(task):
+    """실행 직전 (task_prerun) — 발행 → 시작 대기 시간을 큐별로 기록 (ETA/재시도 태스크는 제외)"""
+    request = task.request
+    enqueued_at = request.get('enqueued_at')
+    queue = (request.delivery_info or {}).get('routing_key')
+    if not enqueued_at or not queue or request.eta:
+        return
+    wait = max(0.0, time.time() - float(enqueued_at))
+    key = _METRIC_PREFIX + queue
+    try:
+        pipe = _redis().pipeline()
+        pipe.lpush(key + ':samples', round(wait, 3))
+        pipe.ltrim(key + ':samples', 0, WAIT_SAMPLES - 1)
+        pipe.hincrby(key, 'count', 1)
+        pipe.hincrbyfloat(key, 'total', wait)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠️ 큐 대기 시간 기록 실패 ({queue}): {e}")
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+
+def depth(client, queue):
+    """큐에 쌓인 메시지 수 (kombu Redis 전송: 큐 이름 리스트 + 우선순위별 '<큐>\\x06\\x16<n>' 리스트)"""
+    return client.llen(queue) + sum(client.llen(f'{queue}\x06\x16{p}') for p in (3, 6, 9))
+
+
+def metrics():
+    """{큐: {'depth', 'wait_count', 'wait_avg', 'wait_p50', 'wait_p95', 'wait_max'}} (대기 시간 단위: 초)"""
+    client = _redis()
+    result = {}
+    for queue in all_queues():
+        key = _METRIC_PREFIX + queue
+        stats = client.hgetall(key)
+        samples = sorted(float(v) for v in client.lrange(key + ':samples', 0, -1))
+        count = int(stats.get(b'count', 0))
+        result[queue] = {
+            'depth': depth(client, queue),
+            'wait_count': count,
+            'wait_avg': round(float(stats.get(b'total', 0)) / count, 3) if count else None,
+            'wait_p50': _percentile(samples, 0.5),
+            'wait_p95': _percentile(samples, 0.95),
+            'wait_max': samples[-1] if samples else None,
+        }
+    return result
+
+
+def reset_metrics():
+    client = _redis()
+    for queue in all_queues():
+        client.delete(_METRIC_PREFIX + queue, _METRIC_PREFIX + queue + ':samples')
@@ -1,12 +1,23 @@
-from celery import shared_task
-from book.utils import generate_tts, merge_audio_files, mix_audio_with_background, apply_webaudio_effect, sound_effect, background_music, merge_duet_audio
+from celery import Task, shared_task
+from book.utils import generate_tts, merge_audio_files, mix_audio_with_background, run_tts_parallel
 import os
-import json
-import math
 import traceback
-import requests
 from django.conf import settings
-from django.core.files import File
+
+
+class ProgressTask(Task):
+    """진행률을 결과 백엔드(폴링)와 progress_stream(SSE 푸시)에 함께 기록하는 태스크"""
+
+    def report(self, status, progress):
+        from book import progress_stream
+
+        self.update_state(state='PROGRESS', meta={'status': status, 'progress': progress})
+        progress_stream.publish(self.request.id, {'state': 'PROGRESS', 'status': status, 'progress': progress})
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        # 결과가 백엔드에 저장된 뒤 호출 → 구독자가 바로 폴링 엔드포인트에서 결과를 받을 수 있음
+        from book import progress_stream
+        progress_stream.publish(task_id, {'state': status, 'progress': 100 if status == 'SUCCESS' else 0})
 
 
 @shared_task(bind=True)
@@ -46,14 +57,14 @@ def generate_full_audio_pipeline(text_list, voice_id, lang, speed):
     }
 
 
-@shared_task(bind=True, time_limit=7200)
+@shared_task(bind=True, base=ProgressTask, time_limit=7200)
 def merge_audio_task(self, audio_files_data, background_tracks_data=None, pages_text=None):
     """
     오디오 파일들을 병합하는 Celery 태스크 (기존 book_serialization용)
     """
     temp_files_to_cleanup = []
     try:
-        self.update_state(state='PROGRESS', meta={'status': '오디오 파일 병합 시작...', 'progress': 10})
+        self.report('오디오 파일 병합 시작...', 10)
         temp_files_to_cleanup.extend(audio_files_data)
 
         merged_audio_path, dialogue_durations, total_duration = merge_audio_files(audio_files_data, pages_text)
@@ -61,7 +72,7 @@ def merge_audio_task(self, audio_files_data, background_tracks_data=None, pages_
         if not merged_audio_path or not os.path.exists(merged_audio_path):
             return {'success': False, 'error': '오디오 병합 실패'}
 
-        self.update_state(state='PROGRESS', meta={'status': '오디오 병합 완료, 배경음 처리 중...', 'progress': 60})
+        self.report('오디오 병합 완료, 배경음 처리 중...', 60)
 
         final_audio_path = merged_audio_path
         if background_tracks_data and dialogue_durations:
@@ -82,7 +93,7 @@ def merge_audio_task(self, audio_files_data, background_tracks_data=None, pages_
                 if os.path.exists(merged_audio_path):
                     os.remove(merged_audio_path)
 
-        self.update_state(state='PROGRESS', meta={'status': '최종 파일 생성 중...', 'progress': 90})
+        self.report('최종 파일 생성 중...', 90)
 
         rel_path = os.path.relpath(final_audio_path, settings.MEDIA_ROOT)
         audio_url = settings.MEDIA_URL + rel_path.replace("\\", "/")
@@ -116,651 +127,178 @@ def merge_audio_task(self, audio_files_data, background_tracks_data=None, pages_
 
 # ==================== Fast 생성기 전용 배치 태스크 ====================
 @shared_task(bind=True, time_limit=7200, soft_time_limit=6600)
-def process_batch_audiobook(self, data, user_id):
+def process_batch_audiobook(self, data, user_id, job_id=None):
     """
-    배치 JSON을 Celery에서 비동기 처리:
+    배치 JSON을 한 워커에서 순서대로 처리 (BATCH_CANVAS_ENABLED=False일 때, 분산 실행은 book.batch_canvas):
     create_bgm → create_sfx → create_episode (TTS + WebAudio) → mix_bgm
-
-    진행률을 실시간으로 업데이트하여 프론트에서 폴링 가능.
+    단계 구현은 book.batch_pipeline (canvas 태스크와 공용)
+
+    진행률은 BatchJob(job_id)에 기록 → 프론트에서 audiobook_task_status로 폴링.
+    완료된 단계/페이지는 체크포인트(book.batch_checkpoints)로 남아 재개(batch_canvas.resume) 시 건너뜀
+    — 이미 렌더된 페이지 오디오와 $bgm_N / $sfx_N 바인딩을 그대로 사용 (다른 워커에서 재개해도 동일).
+
+    에피소드 오디오는 무손실(WAV)로 처리되며 MP3 인코딩은 게시 시점에 1회만 수행.
+    - create_episode: 무손실 마스터 → content.tts_audio_file
+      (같은 에피소드의 mix_bgm이 뒤에 있으면 게시 인코딩을 mix_bgm으로 미룸)
+    - mix_bgm: tts_audio_file 구간 + SFX 삽입 + BGM bed를 EDL로 구성해 단일 패스 렌더링
+      (book.audio_engine.render_plan) → MP3 1회 인코딩 → content.audio_file
+      설정된 렌디션(book.renditions)도 같은 렌더 패스에서 함께 인코딩
+    단계별 소요 시간은 결과의 stage_timings에 포함.
     """
-    from book.models import BackgroundMusicLibrary, SoundEffectLibrary, Content, Books
+    from book import batch_canvas
+    from book.models import Books
     from django.contrib.auth import get_user_model
     User = get_user_model()
 
+    def _fail(error):
+        response = {'success': False, 'error': error}
+        if job_id:
+            batch_canvas.finish(job_id, response)
+        return response
+
     try:
         user = User.objects.get(user_id=user_id)
     except User.DoesNotExist:
-        return {'success': False, 'error': '사용자를 찾을 수 없습니다'}
+        return _fail('사용자를 찾을 수 없습니다')
 
     steps = data.get('steps', [])
     if not steps:
-        return {'success': False, 'error': 'steps가 비어있습니다'}
+        return _fail('steps가 비어있습니다')
 
     book_uuid = data.get('book_uuid', '')
     book = None
     if book_uuid:
         book = Books.objects.filter(public_uuid=book_uuid, user=user).first()
         if not book:
-            return {'success': False, 'error': f'책을 찾을 수 없습니다: {book_uuid}'}
+            return _fail(f'책을 찾을 수 없습니다: {book_uuid}')
 
-    # 수정 모드: 기존 에피소드 UUID가 있으면 UPDATE, 없으면 CREATE
-    edit_content_uuid = data.get('_content_uuid')
+    if job_id is None:  # BatchJob 없이 큐에 들어온 예전 메시지
+        job_id = batch_canvas.create_job(data, user, book, job_id=self.request.id).job_id
 
-    total_steps = len(steps)
-    results = {}
-    warnings = []
-    bgm_counter = 0
-    sfx_counter = 0
+    try:
+        response = _run_batch_steps(job_id, user, book, data)
+    except Exception as e:  # 시간 초과 등 — 체크포인트는 남아 있어 재개 가능
+        batch_canvas.fail(job_id, str(e))
+        raise
+    batch_canvas.finish(job_id, response)
+    return response
+
+
+def _run_batch_steps(job_id, user, book, data):
+    from book import batch_canvas
+    from book import batch_checkpoints as checkpoints
+    from book import batch_graph
+    from book import batch_pipeline as bp
+    from book.models import BatchJob, Content
+    from book.audio_engine import StageTimer
+
+    job = BatchJob.objects.get(job_id=job_id)
+    steps = data.get('steps', [])
+    edit_content_uuid = data.get('_content_uuid')  # 수정 모드: 기존 에피소드 UUID가 있으면 UPDATE, 없으면 CREATE
+    variables = dict(job.variables)  # '$bgm_N' / '$sfx_N' → 라이브러리 ID (재개 시 이전 바인딩)
+    warnings = list(job.warnings)
     created_episode_info = None
+    timer = StageTimer()
+    mix_targets = bp.mix_targets(steps)
+    asset_variables = batch_graph.asset_variables(steps)
+    pending_publish = {}  # content.pk → 게시 인코딩이 mix_bgm으로 미뤄진 Content
+    episode_contents = {}  # create_episode 단계 번호 → Content (뒤쪽 mix_bgm 대상)
+
+    # 체크포인트 복원: 완료된 에피소드/믹스 상태
+    done = checkpoints.completed_steps(job_id)
+    for step_idx in sorted(done):
+        output = done[step_idx] or {}
+        content = Content.objects.filter(pk=output.get('content_id')).first() if output.get('content_id') else None
+        if content is None:
+            continue
+        if steps[step_idx].get('action') == 'create_episode':
+            episode_contents[step_idx] = content
+            created_episode_info = output.get('episode') or created_episode_info
+            if output.get('deferred'):
+                pending_publish[content.pk] = content
+        else:
+            pending_publish.pop(content.pk, None)
+    if done:
+        print(f"🔁 체크포인트에서 재개: 완료된 단계 {len(done)}/{len(steps)}개 건너뜀")
 
     for step_idx, step in enumerate(steps):
         action = step.get('action', '')
-        progress = int((step_idx / total_steps) * 100)
+
+        if step_idx in done:  # 진행률 카운터는 재개 시 체크포인트로 이미 계산됨
+            continue
 
         try:
-            # ==================== BGM 생성 ====================
-            if action == 'create_bgm':
-                bgm_counter += 1
-                music_name = step.get('music_name', f'BGM_{bgm_counter}')
-                music_desc = step.get('music_description', '')
-                duration = step.get('duration_seconds', 120)
-
-                print(f"🎵 [create_bgm] 시작 — name={repr(music_name)}, desc={repr(music_desc)}, duration={duration}s")
-
-                self.update_state(state='PROGRESS', meta={
-                    'status': f'배경음 생성 중: {music_name}',
-                    'progress': progress,
-                    'current_step': step_idx + 1,
-                    'total_steps': total_steps
-                })
-
-                audio_path = background_music(music_name, music_desc, duration)
-                print(f"🎵 [create_bgm] background_music() 반환값: {repr(audio_path)}")
-                if not audio_path:
-                    msg = f'배경음 생성 실패: {music_name} (API 오류 — Celery 로그 확인)'
-                    print(f"⚠️ {msg}")
-                    warnings.append(msg)
-                    bgm_counter -= 1  # 카운터 되돌림
-                    continue
-                bgm_obj = BackgroundMusicLibrary(
-                    user=user,
-                    music_name=music_name,
-                    music_description=music_desc,
-                    duration_seconds=duration
-                )
-                with open(audio_path, 'rb') as f:
-                    bgm_obj.audio_file.save(os.path.basename(audio_path), File(f), save=True)
-                results[f'$bgm_{bgm_counter}'] = str(bgm_obj.id)
-                print(f"✅ 배경음 생성 완료: ID={bgm_obj.id}, $bgm_{bgm_counter} → {bgm_obj.id}")
-
-            # ==================== SFX 생성 ====================
-            elif action == 'create_sfx':
-                sfx_counter += 1
-                effect_name = step.get('effect_name', f'SFX_{sfx_counter}')
-                effect_desc = step.get('effect_description', '')
-                duration = step.get('duration_seconds', 5)
-
-                print(f"🔊 [create_sfx] 시작 — name={repr(effect_name)}, desc={repr(effect_desc)}, duration={duration}s")
-
-                self.update_state(state='PROGRESS', meta={
-                    'status': f'효과음 생성 중: {effect_name}',
-                    'progress': progress,
-                    'current_step': step_idx + 1,
-                    'total_steps': total_steps
-                })
-
-                audio_path = sound_effect(effect_name, effect_desc, duration)
-                print(f"🔊 [create_sfx] sound_effect() 반환값: {repr(audio_path)}")
-                if not audio_path:
-                    msg = f'효과음 생성 실패: {effect_name} (API 오류 — Celery 로그 확인)'
-                    print(f"⚠️ {msg}")
-                    warnings.append(msg)
-                    sfx_counter -= 1  # 카운터 되돌림
-                    continue
-                sfx_obj = SoundEffectLibrary(
-                    user=user,
-                    effect_name=effect_name,
-                    effect_description=effect_desc,
-                )
-                with open(audio_path, 'rb') as f:
-                    sfx_obj.audio_file.save(os.path.basename(audio_path), File(f), save=True)
-                results[f'$sfx_{sfx_counter}'] = str(sfx_obj.id)
-                print(f"✅ 효과음 생성 완료: ID={sfx_obj.id}, $sfx_{sfx_counter} → {sfx_obj.id}")
+            # ==================== BGM / SFX 생성 ====================
+            if action in bp.ASSET_ACTIONS:
+                batch_canvas.set_status(job_id, (f"배경음 생성 중: {step.get('music_name', 'BGM')}"
+                                                 if action == 'create_bgm'
+                                                 else f"효과음 생성 중: {step.get('effect_name', 'SFX')}"))
+                variable, step_warnings = asset_variables[step_idx], []
+                with timer.stage(action):
+                    obj_id = bp.run_asset_step(user, step, variable, step_warnings)
+                if obj_id:
+                    variables[variable] = str(obj_id)
+                warnings.extend(step_warnings)
+                checkpoints.save_step(job_id, step_idx, {'id': obj_id, 'variable': variable},
+                                      variables={variable: str(obj_id)} if obj_id else None, warnings=step_warnings)
 
             # ==================== 에피소드 생성 (TTS + WebAudio) ====================
             elif action == 'create_episode':
                 if not book:
                     return {'success': False, 'error': 'book_uuid가 필요합니다'}
-
-                ep_number = step.get('episode_number', 1)
-                ep_title = step.get('episode_title', f'에피소드 {ep_number}')
                 pages = step.get('pages', [])
-
                 if not pages:
                     return {'success': False, 'error': '페이지가 비어있습니다'}
 
-                # 페이지별 TTS 생성
-                audio_files = []
-                successful_texts = []  # TTS 성공한 페이지 텍스트 (timestamps 싱크용)
-                page_infos = []  # PageAudio 저장용: audio_files와 동일 순서
-                for page_idx, page in enumerate(pages):
-                    # 기존 TTS 재사용 (_skip_tts 플래그)
-                    if page.get('_skip_tts') and page.get('_existing_content_uuid') and page.get('_existing_page_num'):
-                        try:
-                            from book.models import PageAudio as _PA
-                            existing_pa = _PA.objects.filter(
-                                content__public_uuid=page['_existing_content_uuid'],
-                                page_number=page['_existing_page_num']
-                            ).first()
-                            if existing_pa and existing_pa.audio_file:
-                                import shutil as _shutil, uuid as _uuid2
-                                old_path = existing_pa.audio_file.path
-                                new_name = f'tts_reuse_{_uuid2.uuid4().hex}.mp3'
-                                new_path = os.path.join(settings.MEDIA_ROOT, 'audio', new_name)
-                                _shutil.copy2(old_path, new_path)
-                                page_infos.append({
-                                    'page_type': existing_pa.page_type or 'tts',
-                                    'text': existing_pa.text or page.get('text', ''),
-                                    'voice_id': existing_pa.voice_id or page.get('voice_id', ''),
-                                    'speed_value': existing_pa.speed_value,
-                                    'style_value': existing_pa.style_value,
-                                    'similarity_value': existing_pa.similarity_value,
-                                    'webaudio_effect': existing_pa.webaudio_effect or '',
-                                    'audio_path': new_path,
-                                })
-                                audio_files.append(new_path)
-                                successful_texts.append(existing_pa.text or page.get('text', ''))
-                                print(f"♻️ TTS 재사용 (페이지 {page_idx+1})")
-                                continue
-                        except Exception as e:
-                            print(f"⚠️ TTS 재사용 실패, 새로 생성합니다: {e}")
-
-                    # 무음 페이지 처리 (BGM은 mix_bgm 단계에서 merged audio 전체에 걸쳐 재생)
-                    silence_seconds = page.get('silence_seconds', 0)
-                    if silence_seconds and float(silence_seconds) > 0:
-                        try:
-                            from book.utils import generate_silence
-                            silence_path = generate_silence(float(silence_seconds))
-                            if silence_path and os.path.exists(silence_path):
-                                audio_files.append(silence_path)
-                                successful_texts.append('')
-                                page_infos.append({'page_type': 'silence', 'text': '', 'voice_id': '', 'speed_value': 1.0, 'style_value': 0.0, 'similarity_value': 0.75, 'webaudio_effect': 'normal', 'audio_path': silence_path})
-                                print(f"🔇 무음 삽입: {silence_seconds}초")
-                        except Exception as e:
-                            print(f"⚠️ 무음 생성 오류: {e}")
-                        continue
-
-                    # 2인 대화(duet) 처리
-                    voices = page.get('voices', [])
-                    if voices:
-                        duet_paths = []
-                        for ve in voices:
-                            v_text = ve.get('text', '')
-                            v_voice_id = ve.get('voice_id', '')
-                            if not v_text or not v_voice_id:
-                                continue
-                            try:
-                                v_tts = generate_tts(v_text, v_voice_id, 'ko', 1.0, 0.0, 0.75)
-                                if not v_tts:
-                                    continue
-                                v_path = v_tts if isinstance(v_tts, str) else v_tts.path
-                                v_effect = ve.get('webaudio_effect', '')
-                                if v_effect and v_effect != 'normal':
-                                    v_path = apply_webaudio_effect(v_path, v_effect) or v_path
-                                duet_paths.append(v_path)
-                            except Exception as e:
-                                print(f"⚠️ 듀엣 TTS 오류: {e}")
-                        if duet_paths:
-                            try:
-                                duet_mp3 = merge_duet_audio(duet_paths, mode=page.get('mode', 'alternate'))
-                                if duet_mp3:
-                                    audio_files.append(duet_mp3)
-                                    combined_text = '\n'.join(v.get('text', '') for v in voices if v.get('text'))
-                                    successful_texts.append(combined_text)
-                                    page_infos.append({'page_type': 'duet', 'text': combined_text, 'voice_id': '', 'speed_value': 1.0, 'style_value': 0.0, 'similarity_value': 0.75, 'webaudio_effect': 'normal', 'audio_path': duet_mp3})
-                                    print(f"🎭 듀엣 페이지 생성 완료 ({page.get('mode','alternate')} 모드)")
-                            except Exception as e:
-                                print(f"⚠️ 듀엣 병합 오류 (페이지 {page_idx+1}): {e}")
-                        continue
-
-                    text = page.get('text', '')
-                    voice_id = page.get('voice_id', '')
-
-                    if not text or not voice_id:
-                        continue
-
-                    self.update_state(state='PROGRESS', meta={
-                        'status': f'TTS 생성 중: {page_idx + 1}/{len(pages)} 페이지',
-                        'progress': progress + int((page_idx / len(pages)) * (100 / total_steps)),
-                        'current_step': step_idx + 1,
-                        'total_steps': total_steps
-                    })
-
-                    try:
-                        tts_file = generate_tts(text, voice_id, 'ko', 1.0, 0.0, 0.75)
-                        
-                        # 🔥 파일 유효성 검사 추가
-                        if not tts_file:
-                            print(f"⚠️ TTS 생성 실패: {page_idx + 1}번 페이지")
-                            continue
-                            
-                        tts_path = tts_file if isinstance(tts_file, str) else tts_file.path
-                        
-                        # 🔥 파일 존재 및 크기 확인
-                        if not os.path.exists(tts_path):
-                            print(f"⚠️ TTS 파일 없음: {tts_path}")
-                            continue
-                            
-                        if os.path.getsize(tts_path) < 1000:  # 1KB 미만이면 손상된 파일
-                            print(f"⚠️ TTS 파일 손상 (너무 작음): {tts_path}")
-                            os.remove(tts_path)
-                            continue
-
-                        # WebAudio 효과 적용
-                        webaudio_effect = page.get('webaudio_effect', 'normal')
-                        if webaudio_effect and webaudio_effect != 'normal':
-                            try:
-                                processed_path = apply_webaudio_effect(tts_path, webaudio_effect)
-                                
-                                # 🔥 처리된 파일 검증
-                                if processed_path and os.path.exists(processed_path):
-                                    if os.path.getsize(processed_path) >= 1000:
-                                        if processed_path != tts_path:
-                                            os.remove(tts_path)  # 원본 삭제
-                                        tts_file = processed_path
-                                    else:
-                                        print(f"⚠️ WebAudio 처리 파일 손상: {processed_path}")
-                                        # 원본 사용
-                                else:
-                                    print(f"⚠️ WebAudio 처리 실패, 원본 사용")
-                            except Exception as e:
-                                print(f"⚠️ WebAudio 효과 적용 오류: {e}")
-                                # 원본 파일 그대로 사용
-
-                        tts_path_final = tts_file if isinstance(tts_file, str) else getattr(tts_file, 'path', str(tts_file))
-                        audio_files.append(tts_file)
-                        successful_texts.append(text)
-                        page_infos.append({
-                            'page_type': 'tts',
-                            'text': text,
-                            'voice_id': voice_id,
-                            'speed_value': page.get('speed_value', 1.0),
-                            'style_value': page.get('style_value', 0.85),
-                            'similarity_value': page.get('similarity_value', 0.75),
-                            'webaudio_effect': page.get('webaudio_effect', 'normal'),
-                            'audio_path': tts_path_final,
-                        })
-
-                    except Exception as e:
-                        print(f"❌ TTS 생성 오류 ({page_idx + 1}번 페이지): {e}")
-                        continue
-
-                # 🔥 오디오 파일이 없으면 에러 반환
-                if not audio_files:
-                    return {'success': False, 'error': 'TTS 생성에 실패했습니다'}
-
-                # 오디오 병합
-                self.update_state(state='PROGRESS', meta={
-                    'status': '오디오 병합 중...',
-                    'progress': progress + int(80 / total_steps),
-                    'current_step': step_idx + 1,
-                    'total_steps': total_steps
-                })
-
+                # 1단계: 페이지 순서대로 계획 (체크포인트/재사용/무음은 즉시 완료, TTS 페이지는 모아서 병렬 실행)
+                rendered = checkpoints.page_results(job_id, step_idx)
+                plans = [{'kind': 'ready', 'page_idx': page_idx, 'result': rendered[page_idx]}
+                         if page_idx in rendered else bp.prepare_page(page_idx, page)
+                         for page_idx, page in enumerate(pages)]
+                plans = [plan for plan in plans if plan]
+                tts_plans = [plan for plan in plans if plan['kind'] != 'ready']
+                batch_canvas.page_done(job_id, len(pages) - len(tts_plans) - len(rendered))
+                if rendered:
+                    print(f"🔁 렌더된 페이지 {len(rendered)}개 재사용 (TTS 생략)")
+
+                # 2단계: 모든 페이지의 TTS 요청(duet voices 포함)을 한 풀에서 병렬 렌더 (동시성 = settings.TTS_MAX_CONCURRENCY) — 페이지가 끝나는 대로 체크포인트
+                def _page_rendered(idx, result):
+                    checkpoints.save_page(job_id, step_idx, tts_plans[idx]['page_idx'], result)
+                    batch_canvas.page_done(job_id)
+
+                with timer.stage('tts'):
+                    tts_results = bp.render_pages(tts_plans, on_page=_page_rendered)
+                results = {plan['page_idx']: plan['result'] for plan in plans if plan['kind'] == 'ready'}
+                results.update((plan['page_idx'], result) for plan, result in zip(tts_plans, tts_results))
+
+                # 3단계: 페이지 순서대로 병합 → DB 저장 → PageAudio
+                batch_canvas.set_status(job_id, '오디오 병합 중...')
+                defer_publish = bool(mix_targets.get(step_idx))
                 try:
-                    merged_file, timestamps, total_duration = merge_audio_files(audio_files, pages_text=successful_texts)
-                    
-                    # 🔥 병합 결과 검증
-                    if not merged_file or not os.path.exists(merged_file):
-                        raise Exception('오디오 병합 실패: 파일이 생성되지 않음')
-                        
-                    if os.path.getsize(merged_file) < 1000:
-                        raise Exception('오디오 병합 실패: 파일이 너무 작음')
-                        
-                    if not total_duration or total_duration <= 0:
-                        # 🔥 duration이 없으면 직접 계산
-                        from pydub import AudioSegment
-                        audio = AudioSegment.from_file(merged_file)
-                        total_duration = len(audio) / 1000.0  # ms → 초
-                        print(f"⚠️ duration 자동 계산: {total_duration}초")
-                        
-                except Exception as e:
-                    # 임시 파일 정리
-                    for f in audio_files:
-                        try:
-                            fpath = f if isinstance(f, str) else getattr(f, 'path', None)
-                            if fpath and os.path.exists(fpath):
-                                os.remove(fpath)
-                        except:
-                            pass
-                    return {'success': False, 'error': f'오디오 병합 실패: {str(e)}'}
-
-                # DB 저장 (절대 경로 → FileField로 올바르게 저장)
-                # 수정 모드: edit_content_uuid가 있으면 기존 Content 업데이트
-                try:
-                    from book.models import PageAudio as _PAclean
-                    if edit_content_uuid:
-                        content = Content.objects.filter(
-                            public_uuid=edit_content_uuid,
-                            book__user=user
-                        ).first()
-                        if content:
-                            # 기존 오디오 파일 교체
-                            content.title = ep_title
-                            content.text = "\n".join([p.get('text', '') for p in pages])
-                            content.audio_timestamps = timestamps
-                            content.duration_seconds = int(total_duration)
-                            content.mix_config = {}  # mix_bgm 단계에서 다시 채워짐
-                            with open(merged_file, 'rb') as f:
-                                content.audio_file.save(os.path.basename(merged_file), File(f), save=True)
-                            # 기존 PageAudio 삭제 후 새로 생성
-                            _PAclean.objects.filter(content=content).delete()
-                            print(f"✏️ 기존 에피소드 수정: {edit_content_uuid}")
-                        else:
-                            print(f"⚠️ edit_content_uuid={edit_content_uuid} 를 찾지 못함 → 신규 생성")
-                            edit_content_uuid = None
-
-                    if not edit_content_uuid:
-                        content = Content(
-                            book=book,
-                            title=ep_title,
-                            number=ep_number,
-                            text="\n".join([p.get('text', '') for p in pages]),
-                            audio_timestamps=timestamps,
-                            duration_seconds=int(total_duration)
-                        )
-                        with open(merged_file, 'rb') as f:
-                            content.audio_file.save(os.path.basename(merged_file), File(f), save=True)
-                except Exception as e:
-                    # 병합 파일 삭제
-                    if merged_file and os.path.exists(merged_file):
-                        os.remove(merged_file)
-                    # 임시 파일 정리
-                    for f in audio_files:
-                        try:
-                            fpath = f if isinstance(f, str) else getattr(f, 'path', None)
-                            if fpath and os.path.exists(fpath):
-                                os.remove(fpath)
-                        except:
-                            pass
-                    return {'success': False, 'error': f'DB 저장 실패: {str(e)}'}
-
-                created_episode_info = {
-                    'content_uuid': str(content.public_uuid),
-                    'title': ep_title,
-                    'number': ep_number,
-                    'duration': total_duration,
-                    'page_count': len(pages)
-                }
-
-                # ── PageAudio 개별 저장 ──────────────────────────────────
-                try:
-                    from book.models import PageAudio
-                    for pg_idx, (audio_file, info) in enumerate(zip(audio_files, page_infos)):
-                        fpath = audio_file if isinstance(audio_file, str) else getattr(audio_file, 'path', None)
-                        if not fpath or not os.path.exists(fpath):
-                            continue
-                        try:
-                            pa = PageAudio(
-                                content=content,
-                                page_number=pg_idx + 1,
-                                text=info.get('text', ''),
-                                voice_id=info.get('voice_id', ''),
-                                language_code='ko',
-                                speed_value=info.get('speed_value', 1.0),
-                                style_value=info.get('style_value', 0.85),
-                                similarity_value=info.get('similarity_value', 0.75),
-                                webaudio_effect=info.get('webaudio_effect', 'normal'),
-                                page_type=info.get('page_type', 'tts'),
-                            )
-                            with open(fpath, 'rb') as pf:
-                                pa.audio_file.save(os.path.basename(fpath), File(pf), save=True)
-                        except Exception as e:
-                            print(f"⚠️ PageAudio 저장 실패 (페이지 {pg_idx + 1}): {e}")
-                    print(f"💾 PageAudio {len(page_infos)}개 저장 완료")
-                except Exception as e:
-                    print(f"⚠️ PageAudio 전체 저장 오류: {e}")
-                # ────────────────────────────────────────────────────────
-
-                # 임시 병합 파일 정리 (이미 FileField로 복사됨)
-                if merged_file and os.path.exists(merged_file):
-                    os.remove(merged_file)
-
-                # 임시 TTS 파일 정리
-                for f in audio_files:
-                    try:
-                        fpath = f if isinstance(f, str) else getattr(f, 'path', None)
-                        if fpath and os.path.exists(fpath):
-                            os.remove(fpath)
-                    except:
-                        pass
+                    content, created_episode_info = bp.save_episode(
+                        user, book, step, [results.get(plan['page_idx']) for plan in plans], timer,
+                        edit_content_uuid=edit_content_uuid, defer_publish=defer_publish)
+                except bp.BatchStepError as e:
+                    return {'success': False, 'error': str(e)}
+                checkpoints.save_step(job_id, step_idx, {
+                    'content_id': content.pk, 'episode': created_episode_info, 'deferred': defer_publish})
+                episode_contents[step_idx] = content
+                if defer_publish:
+                    pending_publish[content.pk] = content
 
             # ==================== BGM 믹싱 ====================
             elif action == 'mix_bgm':
                 if not book:
                     return {'success': False, 'error': 'book_uuid가 필요합니다'}
 
-                ep_number = step.get('episode_number', 1)
-                # 같은 에피소드 번호로 여러 번 생성시 가장 최신 에피소드를 사용
-                content = Content.objects.filter(book=book, number=ep_number).order_by('-pk').first()
-                if not content:
-                    print(f"⚠️ 에피소드 {ep_number}를 찾을 수 없습니다")
-                    continue
-
-                self.update_state(state='PROGRESS', meta={
-                    'status': '배경음 믹싱 중...',
-                    'progress': progress,
-                    'current_step': step_idx + 1,
-                    'total_steps': total_steps
-                })
-
-                bg_tracks = step.get('background_tracks', [])
-
-                # 변수 치환
-                print(f"[mix_bgm] results keys: {list(results.keys())}")
-                for track in bg_tracks:
-                    music_id = track.get('music_id', '')
-                    if music_id.startswith('$'):
-                        if music_id in results:
-                            track['music_id'] = results[music_id]
-                            print(f"[mix_bgm] BGM 변수 치환: {music_id} → {track['music_id']}")
-                        else:
-                            print(f"[mix_bgm] ⚠️ BGM 변수 미해결: {music_id} (results에 없음)")
-
-                # 타임스탬프 (각 항목에 pageIndex, endTime(ms)만 있음)
-                timestamps = content.audio_timestamps
-                if isinstance(timestamps, str):
-                    timestamps = json.loads(timestamps)
-
-                def page_start_ms(page_idx):
-                    """페이지 시작 시간(ms): 이전 페이지의 endTime, 첫 페이지는 0"""
-                    if not timestamps or page_idx <= 0:
-                        return 0
-                    prev_idx = min(page_idx - 1, len(timestamps) - 1)
-                    return int(timestamps[prev_idx].get('endTime', 0))
-
-                def page_end_ms(page_idx):
-                    """페이지 끝 시간(ms) - timestamps 없으면 전체 duration 사용"""
-                    if not timestamps:
-                        # fallback: 전체 에피소드 길이 사용
-                        return int(content.duration_seconds * 1000) if content.duration_seconds else 0
-                    idx = min(page_idx, len(timestamps) - 1)
-                    return int(timestamps[idx].get('endTime', 0))
-
-                # bg_tracks → mix_audio_with_background 형식으로 변환
-                converted_tracks = []
-                for track in bg_tracks:
-                    mid = track.get('music_id', '')
-                    if not mid or str(mid).startswith('$'):
-                        print(f"⚠️ BGM 변수 미해결: {mid}, 건너뜀 (create_bgm 실패)")
-                        continue
-                    bgm_obj = BackgroundMusicLibrary.objects.filter(id=mid).first()
-                    if not bgm_obj or not bgm_obj.audio_file:
-                        print(f"⚠️ BGM ID={mid} 없음, 건너뜀")
-                        continue
-
-                    start_page = track.get('start_page', 0)
-                    end_page = track.get('end_page', len(timestamps) - 1 if timestamps else -1)
-                    volume = track.get('volume', 0.25)
-                    volume_db = 20 * math.log10(max(volume, 0.01))
-
-                    start_time = page_start_ms(start_page)
-                    end_time = page_end_ms(end_page)
-
-                    if content.duration_seconds:
-                        max_ms = int(content.duration_seconds * 1000)
-                        end_time = min(end_time, max_ms)
-
-                    if start_time >= end_time:
-                        print(f"⚠️ 잘못된 시간 범위: {start_time}ms ~ {end_time}ms, 건너뜀")
-                        continue
-
-                    print(f"✅ 배경음 구간: {start_time}ms ~ {end_time}ms ({(end_time - start_time) / 1000:.1f}초)")
-
-                    converted_tracks.append({
-                        'audioPath': bgm_obj.audio_file.path,
-                        'startTime': start_time,
-                        'endTime': end_time,
-                        'volume': volume_db
-                    })
-
-                # SFX 트랙 — overlay 대신 삽입 방식으로 처리 (대사 직전 순차 재생)
-                sfx_tracks = step.get('sound_effects', [])
-                sfx_inserts = []  # [(insert_at_ms, sfx_segment)]
-                page_ts = [t for t in (timestamps or []) if t.get('type') != 'sfx']
-
-                for sfx_track in sfx_tracks:
-                    eid = sfx_track.get('effect_id', '')
-                    if eid.startswith('$'):
-                        if eid in results:
-                            sfx_track['effect_id'] = results[eid]
-                            print(f"[mix_bgm] SFX 변수 치환: {eid} → {sfx_track['effect_id']}")
-                        else:
-                            print(f"[mix_bgm] ⚠️ SFX 변수 미해결: {eid} (results에 없음)")
-
-                    eid_resolved = sfx_track.get('effect_id', '')
-                    if not eid_resolved or str(eid_resolved).startswith('$'):
-                        print(f"⚠️ SFX 변수 미해결: {eid_resolved}, 건너뜀 (create_sfx 실패)")
-                        continue
-                    sfx_obj = SoundEffectLibrary.objects.filter(id=eid_resolved).first()
-                    if not sfx_obj or not sfx_obj.audio_file:
-                        continue
-
-                    sfx_page = sfx_track.get('page_number') or sfx_track.get('page') or 1
-                    if page_ts and 0 <= sfx_page - 1 < len(page_ts):
-                        insert_at = int(page_ts[sfx_page - 1].get('startTime', 0))
-                    else:
-                        insert_at = 0
-
-                    sfx_volume = sfx_track.get('volume', 0.7)
-                    sfx_volume_db = 20 * math.log10(max(sfx_volume, 0.01))
-
-                    from pydub import AudioSegment as PydubSegment
-                    sfx_seg = PydubSegment.from_file(sfx_obj.audio_file.path)
-                    sfx_seg = sfx_seg + sfx_volume_db
-
-                    print(f"✅ 효과음 삽입 위치: {insert_at}ms ({len(sfx_seg)}ms 길이)")
-                    sfx_inserts.append((insert_at, sfx_seg))
-
-                # 1단계: SFX 삽입 (BGM 전에 — BGM이 SFX 구간도 끊김 없이 커버하도록)
-                current_path = content.audio_file.path
-                if sfx_inserts:
-                    try:
-                        from pydub import AudioSegment as PydubSegment
-                        import uuid as _uuid
-                        audio = PydubSegment.from_file(current_path)
-                        sfx_inserts.sort(key=lambda x: x[0])
-                        for insert_at, sfx_seg in reversed(sfx_inserts):
-                            before = audio[:insert_at]
-                            after  = audio[insert_at:]
-                            audio  = before + sfx_seg + after
-
-                        # 타임스탬프 보정
-                        if timestamps:
-                            updated_ts = list(timestamps)
-                            for insert_at, sfx_seg in sfx_inserts:  # 오름차순
-                                shift = len(sfx_seg)
-                                for ts in updated_ts:
-                                    if ts.get('type') == 'sfx':
-                                        continue
-                                    if ts.get('startTime', 0) >= insert_at:
-                                        ts['startTime'] = ts['startTime'] + shift
-                                    if ts.get('endTime', 0) >= insert_at:
-                                        ts['endTime'] = ts['endTime'] + shift
-                            content.audio_timestamps = updated_ts
-                            content.save(update_fields=['audio_timestamps'])
-
-                        # BGM startTime/endTime도 SFX 삽입량만큼 보정
-                        for track in converted_tracks:
-                            for insert_at, sfx_seg in sfx_inserts:
-                                shift = len(sfx_seg)
-                                if track.get('startTime', 0) >= insert_at:
-                                    track['startTime'] += shift
-                                if track.get('endTime', 0) >= insert_at:
-                                    track['endTime'] += shift
-
-                        out_path = os.path.join(settings.MEDIA_ROOT, 'audio', f'sfx_insert_{_uuid.uuid4().hex}.mp3')
-                        audio.export(out_path, format='mp3', bitrate='128k')
-                        current_path = out_path
-                    except Exception as e:
-                        print(f"❌ SFX 삽입 오류: {e}")
-
-                # 2단계: BGM overlay (SFX 삽입 후 전체 오디오에 덮어씌워 끊김 없이 재생)
-                if converted_tracks:
-                    try:
-                        mixed_file = mix_audio_with_background(current_path, converted_tracks)
-                        if mixed_file and os.path.exists(mixed_file):
-                            if current_path != content.audio_file.path and os.path.exists(current_path):
-                                os.remove(current_path)
-                            current_path = mixed_file
-                    except Exception as e:
-                        print(f"❌ BGM 믹싱 오류: {e}")
-
-                # mix_config 저장 (에디터에서 SFX/BGM 재생성 가능하도록)
-                try:
-                    mix_config_bgm = []
-                    for track in bg_tracks:
-                        mid = track.get('music_id', '')
-                        bgm_obj2 = BackgroundMusicLibrary.objects.filter(id=mid).first()
-                        if bgm_obj2:
-                            mix_config_bgm.append({
-                                'id': bgm_obj2.id,
-                                'name': bgm_obj2.music_name,
-                                'desc': bgm_obj2.music_description,
-                                'duration': bgm_obj2.duration_seconds,
-                                'volume': track.get('volume', 0.25),
-                                'start_page': track.get('start_page', 0),
-                                'end_page': track.get('end_page', -1),
-                            })
-                    mix_config_sfx = []
-                    for sfx_track in sfx_tracks:
-                        sfx_obj2 = SoundEffectLibrary.objects.filter(id=sfx_track.get('effect_id', '')).first()
-                        if sfx_obj2:
-                            mix_config_sfx.append({
-                                'id': sfx_obj2.id,
-                                'name': sfx_obj2.effect_name,
-                                'desc': sfx_obj2.effect_description,
-                                'volume': sfx_track.get('volume', 0.7),
-                                'page_number': sfx_track.get('page_number') or sfx_track.get('page') or 1,
-                            })
-                    content.mix_config = {'bgm': mix_config_bgm, 'sfx': mix_config_sfx}
-                    content.save(update_fields=['mix_config'])
-                except Exception as e:
-                    print(f"⚠️ mix_config 저장 오류: {e}")
-
-                # 최종 파일 저장
-                if current_path != content.audio_file.path and os.path.exists(current_path):
-                    try:
-                        old_path = content.audio_file.path
-                        with open(current_path, 'rb') as f:
-                            content.audio_file.save(os.path.basename(current_path), File(f), save=True)
-                        if old_path and os.path.exists(old_path):
-                            os.remove(old_path)
-                        if os.path.exists(current_path):
-                            os.remove(current_path)
-                        print(f"✅ 배경음/효과음 처리 완료")
-                    except Exception as e:
-                        print(f"❌ 파일 저장 오류: {e}")
+                batch_canvas.set_status(job_id, '배경음 믹싱 중...')
+                target = next((episode_contents.get(ep_idx) for ep_idx, mixes in mix_targets.items()
+                               if step_idx in mixes), None)
+                content = bp.mix_episode(book, step, variables, timer, content=target,
+                                         publish_if_unmixed=target is not None and target.pk in pending_publish)
+                if content is not None:
+                    pending_publish.pop(content.pk, None)
+                checkpoints.save_step(job_id, step_idx, {'content_id': content.pk if content else None})
 
         except Exception as e:
             error_msg = f'Step {step_idx + 1} ({action}) 실패: {str(e)}'
@@ -772,36 +310,208 @@ def process_batch_audiobook(self, data, user_id):
                 'failed_step': step_idx + 1,
                 'failed_action': action
             }
+        batch_canvas.step_done(job_id, f'단계 {step_idx + 1} 완료')
+
+    # mix_bgm이 건너뛰어져 게시되지 않은 에피소드는 마스터 그대로 게시
+    for content in pending_publish.values():
+        bp.publish_master(content, timer)
+
+    return bp.completion_response(data.get('book_uuid', ''), book, len(steps), timer.report(),
+                                  episode_info=created_episode_info, warnings=warnings)
+
+
+# ==================== 배치 단계 태스크 (book.batch_canvas — 의존성 그래프) ====================
+def _batch_context(job_id):
+    from book.models import BatchJob
+    job = BatchJob.objects.select_related('user', 'book').get(job_id=job_id)
+    return job, job.data.get('steps', [])
+
+
+def _merge_timings(*reports):
+    merged = {}
+    for report in reports:
+        for name, sec in (report or {}).items():
+            merged[name] = round(merged.get(name, 0.0) + sec, 2)
+    return merged
+
+
+def _step_finished(job_id, step_idx, output, status, **job_fields):
+    """단계 체크포인트 → 진행률 → 다음 단계 실행"""
+    from book import batch_canvas
+    from book import batch_checkpoints as checkpoints
+
+    checkpoints.save_step(job_id, step_idx, output, **job_fields)
+    batch_canvas.step_done(job_id, status)
+    batch_canvas.advance(job_id)
+
+
+def _step_failed(job_id, response):
+    """단계 실패 → 작업 종료 (실행 중인 다른 단계는 마저 끝나고 체크포인트만 남김 — 재개 시 재사용)"""
+    from book import batch_canvas
+    batch_canvas.finish(job_id, response)
+    return response
 
-    # 완료
-    response = {
-        'success': True,
-        'steps_completed': total_steps,
+
+@shared_task(bind=True, time_limit=1800, soft_time_limit=1700)
+def batch_asset_task(self, job_id, step_idx):
+    """create_bgm / create_sfx 1개 → $bgm_N / $sfx_N 바인딩 (다른 에셋/페이지 TTS와 동시에)"""
+    from book import batch_canvas
+    from book import batch_graph
+    from book import batch_pipeline as bp
+    from book.audio_engine import StageTimer
+
+    job, steps = _batch_context(job_id)
+    step = steps[step_idx]
+    variable = batch_graph.asset_variables(steps)[step_idx]
+    warnings = []
+    timer = StageTimer()
+    batch_canvas.set_status(job_id, (f"배경음 생성 중: {step.get('music_name', 'BGM')}"
+                                     if step.get('action') == 'create_bgm'
+                                     else f"효과음 생성 중: {step.get('effect_name', 'SFX')}"))
+    try:
+        with timer.stage(step.get('action')):
+            obj_id = bp.run_asset_step(job.user, step, variable, warnings)
+    except Exception as e:
+        print(f'❌ Step {step_idx + 1} ({step.get("action")}) 실패: {e}')
+        traceback.print_exc()
+        return _step_failed(job_id, {'success': False, 'error': f'Step {step_idx + 1} ({step.get("action")}) 실패: {str(e)}',
+                                     'failed_step': step_idx + 1, 'failed_action': step.get('action')})
+    output = {'id': obj_id, 'variable': variable, 'timings': timer.report()}
+    _step_finished(job_id, step_idx, output, f'단계 {step_idx + 1} 완료',
+                   variables={variable: str(obj_id)} if obj_id else None, warnings=warnings)
+    return output
+
+
+@shared_task(bind=True, time_limit=900, soft_time_limit=840)
+def batch_page_task(self, job_id, step_idx, page_idx, page):
+    """배치 페이지 1개 렌더 (체크포인트/재사용/무음/TTS/duet) → {'page': 페이지 결과 또는 None, 'timings'}"""
+    from book import batch_canvas
+    from book import batch_checkpoints as checkpoints
+    from book import batch_pipeline as bp
+    from book.audio_engine import StageTimer
+
+    timer = StageTimer()
+    result = checkpoints.page_result(job_id, step_idx, page_idx)
+    if result is None:
+        try:
+            plan = bp.prepare_page(page_idx, page)
+            if plan:
+                with timer.stage('tts'):
+                    paths = run_tts_parallel(bp.render_tts_job, plan.get('jobs', []))
+                result = bp.finish_page(plan, paths, timer)
+                if plan['kind'] != 'ready':
+                    checkpoints.save_page(job_id, step_idx, page_idx, result)
+        except Exception as e:
+            print(f"❌ 페이지 {page_idx + 1} 렌더 오류: {e}")
+            traceback.print_exc()
+        batch_canvas.page_done(job_id)
+    return {'page': result, 'timings': timer.report()}
+
+
+@shared_task(bind=True, time_limit=3600, soft_time_limit=3300)
+def batch_merge_task(self, page_outputs, job_id, step_idx, defer_publish):
+    """chord body: 페이지 결과(순서 유지) 병합 → Content + PageAudio (믹스가 없으면 게시까지)"""
+    from book import batch_canvas
+    from book import batch_pipeline as bp
+    from book.audio_engine import StageTimer
+
+    job, steps = _batch_context(job_id)
+    page_outputs = [out or {} for out in page_outputs]
+    timer = StageTimer()
+    batch_canvas.set_status(job_id, '오디오 병합 중...')
+    try:
+        content, episode = bp.save_episode(
+            job.user, job.book, steps[step_idx], [out.get('page') for out in page_outputs], timer,
+            edit_content_uuid=job.data.get('_content_uuid'), defer_publish=defer_publish)
+    except Exception as e:
+        return _step_failed(job_id, {'success': False, 'error': str(e), 'failed_step': step_idx + 1,
+                                     'failed_action': 'create_episode'})
+    output = {
+        'content_id': content.pk,
+        'episode': episode,
+        'deferred': defer_publish,
+        'timings': _merge_timings(timer.report(), *(out.get('timings') for out in page_outputs)),
     }
+    _step_finished(job_id, step_idx, output, f"{episode['number']}화 병합 완료")
+    return output
 
-    if created_episode_info:
-        response['episode'] = created_episode_info
-        response['redirect_url'] = f'/book/detail/{book_uuid}/'
 
-        # n8n TTS 완료 알림 웹훅 호출
-        n8n_webhook_url = os.getenv('N8N_TTS_WEBHOOK_URL')
-        if n8n_webhook_url and book:
-            try:
-                requests.post(n8n_webhook_url, json={
-                    'book_uuid': str(book.public_uuid),
-                    'book_title': book.name,
-                    'episode_number': created_episode_info['number'],
-                    'episode_title': created_episode_info['title'],
-                    'author_email': book.user.email,
-                    'audio_url': f"https://voxliber.ink/book/detail/{book_uuid}/",
-                    'duration_seconds': int(created_episode_info.get('duration', 0)),
-                }, timeout=5)
-                print(f"✅ n8n TTS 완료 알림 발송: {book.name} {created_episode_info['number']}화")
-            except Exception as e:
-                print(f"⚠️ n8n 웹훅 호출 실패 (무시): {e}")
-
-    if warnings:
-        response['warnings'] = warnings
-        print(f"⚠️ 완료 (경고 {len(warnings)}개): {warnings}")
-
-    return response
\ No newline at end of file
+@shared_task(bind=True, time_limit=3600, soft_time_limit=3300)
+def batch_mix_task(self, job_id, step_idx):
+    """
+    mix_bgm 1개 → 게시. 대상은 mix_targets의 create_episode 체크포인트 (없으면 episode_number로 기존 에피소드)
+    게시가 미뤄진 에피소드는 첫 믹스가 게시 담당 (믹스할 트랙이 없으면 마스터 그대로)
+    """
+    from book import batch_canvas
+    from book import batch_checkpoints as checkpoints
+    from book import batch_graph
+    from book import batch_pipeline as bp
+    from book.audio_engine import StageTimer
+    from book.models import BatchJob, Content
+
+    job, steps = _batch_context(job_id)
+    episode_idx = next((ep for ep, mixes in bp.mix_targets(steps).items() if step_idx in mixes), None)
+    episode = checkpoints.step_result(job_id, episode_idx) if episode_idx is not None else None
+    content = Content.objects.filter(pk=episode['content_id']).first() if episode else None
+    publish = bool(episode and episode.get('deferred')) and batch_graph.first_mix(steps, step_idx)
+    variables = BatchJob.objects.filter(job_id=job_id).values_list('variables', flat=True).first() or {}
+    timer = StageTimer()
+    batch_canvas.set_status(job_id, '배경음 믹싱 중...')
+    try:
+        mixed = bp.mix_episode(job.book, steps[step_idx], variables, timer, content=content,
+                               publish_if_unmixed=publish)
+        if mixed is None and publish and content is not None:
+            bp.publish_master(content, timer)
+    except Exception as e:
+        print(f'❌ Step {step_idx + 1} (mix_bgm) 실패: {e}')
+        traceback.print_exc()
+        return _step_failed(job_id, {'success': False, 'error': f'Step {step_idx + 1} (mix_bgm) 실패: {str(e)}',
+                                     'failed_step': step_idx + 1, 'failed_action': 'mix_bgm'})
+    output = {'content_id': mixed.pk if mixed else None, 'timings': timer.report()}
+    _step_finished(job_id, step_idx, output, f'단계 {step_idx + 1} 완료')
+    return output
+
+
+@shared_task(bind=True, time_limit=300)
+def batch_finalize_task(self, job_id):
+    """모든 단계 완료 → 단계 체크포인트의 결과/단계별 시간 취합 → BatchJob.result (audiobook_task_status SUCCESS 응답)"""
+    from book import batch_canvas
+    from book import batch_checkpoints as checkpoints
+    from book import batch_pipeline as bp
+
+    job, steps = _batch_context(job_id)
+    done = checkpoints.completed_steps(job_id)
+    outputs = [done[idx] or {} for idx in sorted(done)]
+    episode = next((out['episode'] for out in reversed(outputs) if out.get('episode')), None)
+    timings = _merge_timings(job.stage_timings, *(out.get('timings') for out in outputs))
+    response = bp.completion_response(job.data.get('book_uuid', ''), job.book, len(steps), timings,
+                                      episode_info=episode, warnings=job.warnings)
+    batch_canvas.finish(job_id, response)
+    print(f"🧩 배치 작업 완료: {job_id} (단계 {len(steps)}개)")
+    return response
+
+
+@shared_task
+def batch_failed_task(request, exc, traceback_, job_id):
+    """단계 태스크 예외(시간 초과, 워커 종료 등) → BatchJob FAILURE (체크포인트는 남아 재개 가능)"""
+    from book import batch_canvas
+    print(f"❌ 배치 작업 실패: {job_id} — {exc}")
+    batch_canvas.fail(job_id, str(exc))
+
+
+# ==================== 외부 API 비동기 작업 (voxliber.api_jobs) ====================
+@shared_task(bind=True, time_limit=7200, soft_time_limit=6600)
+def run_api_job(self, job_id):
+    """create-episode / regenerate-episode / regenerate-page / register-pages 본문 실행 → ApiJob"""
+    from voxliber import api_jobs
+    return api_jobs.run(job_id)
+
+
+@shared_task
+def sweep_media_store():
+    """참조 없는 blob / 고아 blob 파일 / 오래된 작업 파일 정리 + TTS/PCM 캐시 용량 정리 (CELERY_BEAT_SCHEDULE 매일)"""
+    from book import blobs, pcm_cache, tts_cache
+    result = blobs.sweep()
+    tts_cache.evict()
+    pcm_cache.evict()
+    return result
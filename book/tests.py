@@ -1,3 +1,548 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from book import blobs, media_delivery, media_signing, tts_client
+from book.storage import blob_storage
+
+
+def _user(pk=1, is_staff=False, adult=False, subscribed=None):
+    """authorize_content에 필요한 속성만 가진 사용자 (DB 없이)"""
+    user = SimpleNamespace(pk=pk, is_staff=is_staff, is_adult=lambda: adult)
+    if subscribed is not None:
+        user.subscription = SimpleNamespace(is_active=subscribed)
+    return user
+
+
+def _content(owner_pk=1, number=1, adult=False, deleted=False):
+    return SimpleNamespace(number=number, is_deleted=deleted,
+                           book=SimpleNamespace(user_id=owner_pk, adult_choice=adult))
+
+
+# ==================== 미디어 권한 (media_delivery.authorize_content) ====================
+
+@override_settings(MEDIA_SUBSCRIPTION_REQUIRED=False)
+class AuthorizeContentTests(SimpleTestCase):
+
+    def test_owner_allowed_even_when_deleted_or_adult(self):
+        content = _content(owner_pk=7, adult=True, deleted=True)
+        self.assertEqual(media_delivery.authorize_content(_user(pk=7), content), (True, 200, None))
+
+    def test_staff_allowed(self):
+        content = _content(owner_pk=7, adult=True, deleted=True)
+        self.assertTrue(media_delivery.authorize_content(_user(pk=2, is_staff=True), content)[0])
+
+    def test_deleted_episode_404(self):
+        allowed, status, _ = media_delivery.authorize_content(_user(pk=2), _content(owner_pk=7, deleted=True))
+        self.assertEqual((allowed, status), (False, 404))
+
+    def test_adult_book_requires_adult_user(self):
+        content = _content(owner_pk=7, adult=True)
+        self.assertEqual(media_delivery.authorize_content(None, content)[:2], (False, 403))
+        self.assertEqual(media_delivery.authorize_content(_user(pk=2, adult=False), content)[:2], (False, 403))
+        self.assertTrue(media_delivery.authorize_content(_user(pk=2, adult=True), content)[0])
+
+    def test_public_episode_allowed_for_anonymous(self):
+        self.assertTrue(media_delivery.authorize_content(None, _content(owner_pk=7, number=5))[0])
+
+    @override_settings(MEDIA_SUBSCRIPTION_REQUIRED=True, MEDIA_FREE_EPISODES=1)
+    def test_subscription_episode_requires_active_subscription(self):
+        paid = _content(owner_pk=7, number=2)
+        self.assertEqual(media_delivery.authorize_content(None, paid)[:2], (False, 403))
+        self.assertEqual(media_delivery.authorize_content(_user(pk=2, subscribed=False), paid)[:2], (False, 403))
+        self.assertTrue(media_delivery.authorize_content(_user(pk=2, subscribed=True), paid)[0])
+        self.assertTrue(media_delivery.authorize_content(None, _content(owner_pk=7, number=1))[0])  # 무료 회차
+
+
+# ==================== 파일 전송 (media_delivery.serve_file) ====================
+
+@override_settings(MEDIA_DELIVERY='sendfile')
+class ServeFileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'a.mp3')
+        self.data = bytes(range(256)) * 4  # 1024 bytes
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        self.factory = RequestFactory()
+        self.etag = media_delivery.file_etag(os.stat(self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _get(self, **headers):
+        response = media_delivery.serve_file(self.factory.get('/a.mp3', **headers), self.path)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        if hasattr(response, 'close'):
+            response.close()
+        return response, body
+
+    def test_full_response(self):
+        response, body = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(response['Content-Length'], '1024')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_single_range(self):
+        response, body = self._get(HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(body, self.data[100:200])
+
+    def test_suffix_range(self):
+        response, body = self._get(HTTP_RANGE='bytes=-24')
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1023/1024')
+        self.assertEqual(body, self.data[-24:])
+
+    def test_multi_range(self):
+        response, body = self._get(HTTP_RANGE='bytes=0-9,500-509')
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = response['Content-Type'].split('boundary=')[1]
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertIn(b'Content-Range: bytes 0-9/1024\r\n\r\n' + self.data[0:10], body)
+        self.assertIn(b'Content-Range: bytes 500-509/1024\r\n\r\n' + self.data[500:510], body)
+        self.assertTrue(body.endswith(f'\r\n--{boundary}--\r\n'.encode()))
+
+    def test_unsatisfiable_range_416(self):
+        response, _ = self._get(HTTP_RANGE='bytes=2000-3000')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_malformed_range_ignored(self):
+        response, body = self._get(HTTP_RANGE='bytes=abc')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+
+    def test_if_range_matching_etag_applies_range(self):
+        response, body = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.data[:10])
+
+    def test_if_range_mismatch_sends_full_file(self):
+        response, body = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale-etag"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+
+    def test_if_none_match_304(self):
+        response, body = self._get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(body, b'')
+
+    def test_if_modified_since_304(self):
+        response, _ = self._get(HTTP_IF_MODIFIED_SINCE=http_date(os.stat(self.path).st_mtime))
+        self.assertEqual(response.status_code, 304)
+
+    def test_offset_stream(self):
+        response = media_delivery.serve_file(self.factory.get('/a.mp3', HTTP_RANGE='bytes=0-9'), self.path, offset=1000)
+        body = b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(response['Content-Range'], 'bytes 0-9/24')
+        self.assertEqual(body, self.data[1000:1010])
+
+    def test_accel_redirects_to_internal_location(self):
+        with override_settings(MEDIA_DELIVERY='accel', MEDIA_ROOT=self.dir, MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response = media_delivery.serve_file(self.factory.get('/a.mp3'), self.path)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/a.mp3')
+        self.assertEqual(response.content, b'')
+
+
+# ==================== 서명 URL (media_signing) ====================
+
+@override_settings(MEDIA_SIGNING_KEY='test-signing-key')
+class MediaSigningTests(SimpleTestCase):
+    path = 'uploads/audio/3f9c0000000000000000.mp3'
+    expires = 2_000_000_000
+    now = 1_900_000_000
+
+    def _sig(self, path=None, tier='public'):
+        return media_signing.signature(path or self.path, self.expires, tier)
+
+    def test_valid_signature(self):
+        self.assertEqual(media_signing.verify(self.path, self.expires, 'public', self._sig(), now=self.now), (True, None))
+
+    def test_sign_path_round_trip(self):
+        url = media_signing.sign_path(self.path, 'adult', self.expires)
+        expires, tier, sig, path = url[len(media_signing.URL_PREFIX):].split('/', 3)
+        self.assertEqual((int(expires), tier, path), (self.expires, 'adult', self.path))
+        self.assertTrue(media_signing.verify(path, int(expires), tier, sig, now=self.now)[0])
+
+    def test_expired(self):
+        ok, reason = media_signing.verify(self.path, self.expires, 'public', self._sig(), now=self.expires + 1)
+        self.assertFalse(ok)
+        self.assertEqual(reason, '만료된 URL입니다.')
+
+    def test_wrong_tier(self):
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'owner', self._sig(), now=self.now)[0])
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'root', self._sig(), now=self.now)[0])
+
+    def test_tampered_signature_expires_or_path(self):
+        sig = self._sig()
+        tampered = ('A' if sig[0] != 'A' else 'B') + sig[1:]
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'public', tampered, now=self.now)[0])
+        self.assertFalse(media_signing.verify(self.path, self.expires + 600, 'public', sig, now=self.now)[0])
+        self.assertFalse(media_signing.verify('uploads/audio/other.mp3', self.expires, 'public', sig, now=self.now)[0])
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'public', sig[:-1], now=self.now)[0])
+
+    @override_settings(MEDIA_SIGNING_KEY='rotated-key')
+    def test_other_key_rejected(self):
+        with override_settings(MEDIA_SIGNING_KEY='test-signing-key'):
+            sig = self._sig()
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'public', sig, now=self.now)[0])
+
+    def test_hls_segment_under_signed_package_scope(self):
+        package = self.path + '.hls/'
+        self.assertEqual(media_signing.scope(package + 'index.m3u8'), package)
+        sig = self._sig(package + 'index.m3u8')
+        self.assertTrue(media_signing.verify(package + 'seg_00003.mp3', self.expires, 'public', sig, now=self.now)[0])
+        # 패키지 서명으로 원본 파일이나 다른 패키지는 열리지 않음
+        self.assertFalse(media_signing.verify(self.path, self.expires, 'public', sig, now=self.now)[0])
+        other = 'uploads/audio/ffff0000000000000000.mp3.hls/seg_00000.mp3'
+        self.assertFalse(media_signing.verify(other, self.expires, 'public', sig, now=self.now)[0])
+
+    def test_dot_segments_rejected_even_when_signed(self):
+        package = self.path + '.hls/'
+        for path in (package + '../../../../settings.py', package + './seg_00000.mp3', 'uploads/../secret.txt'):
+            sig = self._sig(path)
+            self.assertFalse(media_signing.verify(path, self.expires, 'public', sig, now=self.now)[0], path)
+
+    def test_resolve_stays_inside_media_root(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        os.makedirs(os.path.join(root, 'uploads'))
+        with open(os.path.join(root, 'uploads', 'a.mp3'), 'wb') as f:
+            f.write(b'x')
+        with override_settings(MEDIA_ROOT=root):
+            self.assertEqual(media_signing.resolve('uploads/a.mp3'), os.path.realpath(os.path.join(root, 'uploads', 'a.mp3')))
+            self.assertIsNone(media_signing.resolve('uploads/../../etc/passwd'))
+            self.assertIsNone(media_signing.resolve('/etc/passwd'))  # 절대 경로
+            self.assertIsNone(media_signing.resolve('uploads/missing.mp3'))
+            self.assertIsNone(media_signing.resolve('uploads'))  # 폴더
+
+    def test_absolute_path_signs_as_relative(self):
+        self.assertEqual(media_signing.scope('/' + self.path), self.path)
+        self.assertEqual(media_signing.sign_path('/' + self.path, 'public', self.expires),
+                         media_signing.sign_path(self.path, 'public', self.expires))
+
+    def test_expires_rounded_up_to_bucket(self):
+        with override_settings(MEDIA_SIGNED_URL_TTL=3600, MEDIA_SIGNED_URL_BUCKET=600):
+            a = media_signing.expires_at(now=1_000_000)
+            b = media_signing.expires_at(now=1_000_000 + 100)
+        self.assertEqual(a, b)
+        self.assertEqual(a % 600, 0)
+        self.assertGreaterEqual(a, 1_000_000 + 3600)
+
+
+# ==================== blob 저장소 (book.blobs) ====================
+
+class BlobStoreTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        from book.models import Books, Content
+        from register.models import Users
+        self.user = Users.objects.create_user(email='blob@example.com', nickname='blob')
+        self.book = Books.objects.create(user=self.user, name='blob test')
+        self.content = Content.objects.create(book=self.book, title='1화')
+
+    def _page(self, number, data=None, name=None):
+        """data가 있으면 새 blob 저장, name이 있으면 기존 blob을 가리키는 행 (페이지 재사용)"""
+        from book.models import PageAudio
+        page = PageAudio.objects.create(content=self.content, page_number=number)
+        if data is not None:
+            page.audio_file.save('page.mp3', ContentFile(data), save=True)
+        else:
+            page.audio_file = name
+            page.save()
+        return page
+
+    def _blob(self, name):
+        from book.models import MediaBlob
+        return MediaBlob.objects.get(name=name)
+
+    def _age(self, path, hours):
+        past = time.time() - hours * 3600
+        os.utime(path, (past, past))
+
+    def test_shared_blob_survives_one_referrer_deleted(self):
+        first = self._page(1, data=b'same audio')
+        name = first.audio_file.name
+        second = self._page(2, name=name)
+        self.assertTrue(name.startswith('blobs/'))
+        self.assertEqual(self._blob(name).ref_count, 2)
+
+        first.delete()
+        blob = self._blob(name)
+        self.assertEqual(blob.ref_count, 1)
+        self.assertIsNone(blob.released_at)
+        blobs.sweep(grace_hours=0)
+        self.assertTrue(blob_storage.exists(name))
+
+        second.delete()
+        self.assertEqual(self._blob(name).ref_count, 0)
+        self.assertIsNotNone(self._blob(name).released_at)
+
+    def test_sweep_honours_grace_period(self):
+        from book.models import MediaBlob
+        page = self._page(1, data=b'released audio')
+        name = page.audio_file.name
+        page.delete()
+
+        stats = blobs.sweep(grace_hours=24)
+        self.assertEqual(stats['blobs'], 0)
+        self.assertTrue(blob_storage.exists(name))
+
+        MediaBlob.objects.filter(name=name).update(released_at=timezone.now() - timedelta(hours=25))
+        stats = blobs.sweep(grace_hours=24)
+        self.assertEqual(stats['blobs'], 1)
+        self.assertFalse(blob_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_sweep_repairs_count_instead_of_deleting_live_blob(self):
+        from book.models import MediaBlob
+        page = self._page(1, data=b'live audio')
+        name = page.audio_file.name
+        MediaBlob.objects.filter(name=name).update(ref_count=0, released_at=timezone.now() - timedelta(days=2))
+
+        stats = blobs.sweep(grace_hours=24)
+        self.assertEqual((stats['blobs'], stats['repaired']), (0, 1))
+        self.assertTrue(blob_storage.exists(name))
+        self.assertEqual(self._blob(name).ref_count, 1)
+
+    def test_sweep_removes_old_orphan_blob_files_only(self):
+        old = blob_storage.save('orphan.mp3', ContentFile(b'orphan old'))
+        new = blob_storage.save('orphan.mp3', ContentFile(b'orphan new'))
+        self._age(blob_storage.path(old), 48)
+
+        stats = blobs.sweep(grace_hours=24)
+        self.assertEqual(stats['orphan_files'], 1)
+        self.assertFalse(blob_storage.exists(old))
+        self.assertTrue(blob_storage.exists(new))  # 저장 직후 (모델 저장 전)일 수 있음
+
+    def test_sweep_keeps_checkpoint_protected_scratch_files(self):
+        from book.models import BatchCheckpoint, BatchJob
+        scratch = os.path.join(self.media_root, 'audio')
+        os.makedirs(scratch)
+        paths = {}
+        for label in ('stale', 'protected', 'fresh'):
+            paths[label] = os.path.join(scratch, f'{label}.mp3')
+            with open(paths[label], 'wb') as f:
+                f.write(b'x' * 10)
+        self._age(paths['stale'], 48)
+        self._age(paths['protected'], 48)
+        job = BatchJob.objects.create(job_id='sweep-test', user=self.user, book=self.book)
+        BatchCheckpoint.objects.create(job=job, step_index=0, page_index=0, result={'audio': paths['protected']})
+
+        stats = blobs.sweep(scratch_hours=24)
+        self.assertEqual(stats['scratch_files'], 1)
+        self.assertFalse(os.path.exists(paths['stale']))
+        self.assertTrue(os.path.exists(paths['protected']))
+        self.assertTrue(os.path.exists(paths['fresh']))
+
+        # 체크포인트가 만료되면 보호도 풀림
+        BatchJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(days=30))
+        stats = blobs.sweep(scratch_hours=24)
+        self.assertEqual((stats['checkpoints'], stats['scratch_files']), (1, 1))
+        self.assertFalse(os.path.exists(paths['protected']))
+
+    def test_dry_run_deletes_nothing(self):
+        from book.models import MediaBlob
+        page = self._page(1, data=b'dry run audio')
+        name = page.audio_file.name
+        page.delete()
+        MediaBlob.objects.filter(name=name).update(released_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(blobs.sweep(grace_hours=24, dry_run=True)['blobs'], 1)
+        self.assertTrue(blob_storage.exists(name))
+        self.assertTrue(MediaBlob.objects.filter(name=name).exists())
+
+    def test_recount_repairs_drift(self):
+        from book.models import MediaBlob, PageAudio
+        a = self._page(1, data=b'audio a')
+        b = self._page(2, data=b'audio b')
+        name_a, name_b = a.audio_file.name, b.audio_file.name
+
+        # 신호 없는 변경: b도 a를 가리키게 됨 → a는 실제 2, b는 실제 0
+        PageAudio.objects.filter(pk=b.pk).update(audio_file=name_a)
+        MediaBlob.objects.filter(name=name_a).update(ref_count=7)
+        # 행 없이 참조만 있는 blob
+        orphan_ref = blob_storage.save('c.mp3', ContentFile(b'audio c'))
+        PageAudio.objects.create(content=self.content, page_number=3)
+        PageAudio.objects.filter(page_number=3).update(audio_file=orphan_ref)
+
+        self.assertEqual(blobs.recount(), (2, 1))
+        self.assertEqual(self._blob(name_a).ref_count, 2)
+        self.assertEqual(self._blob(name_b).ref_count, 0)
+        self.assertIsNotNone(self._blob(name_b).released_at)
+        self.assertEqual(self._blob(orphan_ref).ref_count, 1)
+        self.assertEqual(self._blob(orphan_ref).size_bytes, len(b'audio c'))
+        self.assertEqual(blobs.recount(), (0, 0))
+
+
+# ==================== ElevenLabs 호출 래퍼 (book.tts_client) ====================
+
+@override_settings(TTS_RATE_PER_SECOND=0, TTS_MAX_RETRIES=3, TTS_REQUEST_DEADLINE=120,
+                   TTS_BREAKER_THRESHOLD=3, TTS_BREAKER_RESET_SECONDS=30)
+class TTSClientTests(SimpleTestCase):
+    """실제 SDK + httpx.MockTransport — 응답/예외 형태는 ElevenLabs 서버와 같음, 네트워크 없음"""
+
+    def setUp(self):
+        tts_client.configure()
+        self.addCleanup(tts_client.configure)
+        self.calls = []
+        self.responses = []
+        sleep = mock.patch('book.tts_client.time.sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def _transport(self, request):
+        """self.responses 앞에서부터 하나씩: httpx.Response 또는 발생시킬 예외 클래스 (마지막 값은 반복)"""
+        self.calls.append(request.url.path)
+        reply = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(reply, type) and issubclass(reply, Exception):
+            raise reply('stub', request=request)
+        return reply
+
+    def _use_stub(self, *responses):
+        import httpx
+        from elevenlabs import ElevenLabs
+
+        self.responses = list(responses)
+        stub = ElevenLabs(api_key='test', httpx_client=httpx.Client(transport=httpx.MockTransport(self._transport)))
+        patcher = mock.patch.object(tts_client, 'client', return_value=stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _ok():
+        import httpx
+        return httpx.Response(200, content=b'AUDIO')
+
+    @staticmethod
+    def _status(code, **headers):
+        import httpx
+        return httpx.Response(code, headers=headers, json={'detail': 'stub'})
+
+    def test_429_retries_after_retry_after(self):
+        self._use_stub(self._status(429, **{'Retry-After': '7'}), self._ok())
+        self.assertEqual(tts_client.text_to_speech('voice', text='안녕'), b'AUDIO')
+        self.assertEqual(len(self.calls), 2)
+        self.sleep.assert_called_once()
+        self.assertGreaterEqual(self.sleep.call_args[0][0], 7)
+        self.assertEqual(tts_client.stats()['retries'], 1)
+
+    def test_client_error_not_retried(self):
+        self._use_stub(self._status(401))
+        with self.assertRaises(Exception) as raised:
+            tts_client.text_to_speech('voice', text='안녕')
+        self.assertEqual(getattr(raised.exception, 'status_code', None), 401)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(tts_client.breaker().failures, 0)  # 서버는 응답함 → 장애 아님
+
+    def test_tts_resent_after_read_timeout(self):
+        import httpx
+
+        self._use_stub(httpx.ReadTimeout, self._ok())
+        self.assertEqual(tts_client.text_to_speech('voice', text='안녕'), b'AUDIO')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_sound_effect_not_resent_after_read_timeout(self):
+        import httpx
+
+        self._use_stub(httpx.ReadTimeout, self._ok())
+        with self.assertRaises(httpx.ReadTimeout):
+            tts_client.sound_effect(text='문 닫히는 소리')
+        self.assertEqual(len(self.calls), 1)
+        self.sleep.assert_not_called()
+
+    def test_music_not_resent_after_read_timeout(self):
+        import httpx
+
+        self._use_stub(httpx.ReadTimeout, self._ok())
+        with self.assertRaises(httpx.ReadTimeout):
+            tts_client.compose_music(prompt='잔잔한 피아노', music_length_ms=10000)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_sound_effect_retried_when_not_sent(self):
+        import httpx
+
+        self._use_stub(httpx.ConnectError, self._status(503), self._ok())
+        self.assertEqual(tts_client.sound_effect(text='문 닫히는 소리'), b'AUDIO')
+        self.assertEqual(len(self.calls), 3)
+
+    @override_settings(TTS_MAX_RETRIES=0)
+    def test_breaker_opens_then_half_opens(self):
+        self._use_stub(self._status(503))
+        for _ in range(3):
+            with self.assertRaises(Exception):
+                tts_client.text_to_speech('voice', text='안녕')
+        self.assertEqual(len(self.calls), 3)
+
+        # 열림: 요청을 보내지 않고 바로 거절
+        with self.assertRaises(tts_client.TTSUnavailable):
+            tts_client.text_to_speech('voice', text='안녕')
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(tts_client.stats()['rejected'], 1)
+
+        # reset_seconds 경과 → probe 1개가 실패하면 다시 열림
+        guard = tts_client.breaker()
+        guard.opened_at -= 31
+        with self.assertRaises(Exception):
+            tts_client.text_to_speech('voice', text='안녕')
+        self.assertEqual(len(self.calls), 4)
+        with self.assertRaises(tts_client.TTSUnavailable):
+            tts_client.text_to_speech('voice', text='안녕')
+
+        # 다시 경과 → probe 성공하면 닫힘
+        self.responses = [self._ok()]
+        guard.opened_at -= 31
+        self.assertEqual(tts_client.text_to_speech('voice', text='안녕'), b'AUDIO')
+        self.assertIsNone(guard.opened_at)
+        self.assertEqual(tts_client.text_to_speech('voice', text='안녕'), b'AUDIO')
+
+    def test_breaker_allows_single_probe(self):
+        guard = tts_client.CircuitBreaker(threshold=2, reset_seconds=30)
+        guard.failure()
+        guard.before()  # 아직 닫힘
+        guard.failure()
+        with self.assertRaises(tts_client.TTSUnavailable):
+            guard.before()
+        guard.opened_at -= 31
+        guard.before()  # probe
+        with self.assertRaises(tts_client.TTSUnavailable):
+            guard.before()  # probe 진행 중에는 다른 요청 거절
+        guard.abandon()  # probe가 보내지 못함 → 다음 요청이 다시 probe
+        guard.before()
+        guard.success()
+        self.assertEqual((guard.failures, guard.opened_at, guard.probing), (0, None, False))
+
+    @override_settings(CELERY_BROKER_URL='redis://127.0.0.1:1/0')
+    def test_local_bucket_when_redis_down(self):
+        import redis
+
+        with mock.patch.object(tts_client, '_script', None), \
+                mock.patch.object(tts_client, '_redis_down_until', 0.0), \
+                mock.patch.object(tts_client, '_local_bucket', tts_client.LocalBucket()), \
+                mock.patch.object(redis.Redis, 'from_url', side_effect=redis.ConnectionError('down')) as from_url:
+            self.assertEqual(tts_client._take_token(rate=1, burst=2), 0.0)
+            self.assertEqual(tts_client._take_token(rate=1, burst=2), 0.0)
+            self.assertGreater(tts_client._take_token(rate=1, burst=2), 0.0)  # 로컬 버킷 소진
+            from_url.assert_called_once()  # REDIS_RETRY_SECONDS 동안 다시 연결하지 않음
+            self.assertGreater(tts_client._redis_down_until, 0.0)
@@ -0,0 +1,238 @@
+"""
+TTS 렌더 캐시 (콘텐츠 주소 기반, 디스크 저장)
+- 키: (text, voice_id, language_code, speed, style, similarity, model_id, 출력 포맷)의 sha256
+- 같은 대사/보이스/설정이면 ElevenLabs 재호출 없이 캐시 파일을 복사해서 사용
+- 용량 상한(settings.TTS_CACHE_MAX_BYTES) 초과 시 가장 오래 사용되지 않은 항목부터 삭제 (LRU, mtime 기준)
+- hit/miss/eviction 카운터와 총 용량 누적값은 Redis 해시(STATS_KEY)에 저장 → 모든 워커 공유
+  store()는 누적값만 갱신하고 상한을 넘을 때만 디렉터리 전체 스캔(evict). 누적값은 evict 때마다 실제 값으로 맞춤
+  (매일 sweep_media_store에서도 evict). Redis에 연결할 수 없으면 저장 EVICT_SAMPLE회에 1번꼴로 스캔
+"""
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from uuid import uuid4
+
+from django.conf import settings
+
+STATS_KEY = 'voxliber:tts_cache'
+CACHE_EXTS = ('.mp3', '.wav', '.flac')
+EVICT_SAMPLE = 50
+EVICT_TARGET = 0.9  # store()에서 정리할 때는 상한의 90%까지 → 상한 근처에서 저장마다 스캔하지 않도록
+REDIS_RETRY_SECONDS = 30  # Redis 연결 실패 후 이 시간 동안 카운터 생략 (TTS 요청마다 연결 타임아웃 방지)
+
+_client = None
+_down_until = 0.0
+
+
+def _cache_dir():
+    path = str(getattr(settings, 'TTS_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'tts')))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_enabled():
+    return getattr(settings, 'TTS_CACHE_ENABLED', True)
+
+
+def _norm_float(value, default):
+    try:
+        return round(float(value), 3)
+    except (TypeError, ValueError):
+        return default
+
+
+def make_key(text, voice_id, language_code, speed, style, similarity, model_id, output_format='mp3'):
+    """렌더 결과를 결정하는 모든 입력값으로 캐시 키 생성"""
+    payload = json.dumps([
+        text or '',
+        voice_id or '',
+        language_code or '',
+        _norm_float(speed, 1.0),
+        _norm_float(style, None),
+        _norm_float(similarity, None),
+        model_id or '',
+        output_format,
+    ], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key, ext):
+    return os.path.join(_cache_dir(), key[:2], key + ext)
+
+
+def _redis():
+    """카운터용 Redis 클라이언트 — 최근 연결 실패 후 REDIS_RETRY_SECONDS 동안은 None"""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _client
+
+
+def _redis_failed(e):
+    global _down_until
+    _down_until = time.monotonic() + REDIS_RETRY_SECONDS
+    print(f"⚠️ TTS 캐시 카운터 Redis 사용 불가: {e}")
+
+
+def _incr(name, amount=1):
+    try:
+        client = _redis()
+        if client is not None:
+            client.hincrby(STATS_KEY, name, amount)
+    except Exception as e:
+        _redis_failed(e)
+
+
+def _add_bytes(delta):
+    """총 용량 누적값에 delta를 더한 새 총합 (처음이면 디렉터리 스캔으로 집계). Redis 장애면 None"""
+    try:
+        client = _redis()
+        if client is None:
+            return None
+        if not client.hexists(STATS_KEY, 'bytes'):
+            client.hsetnx(STATS_KEY, 'bytes', sum(size for _, size, _ in _entries()))
+            return int(client.hget(STATS_KEY, 'bytes'))
+        return client.hincrby(STATS_KEY, 'bytes', delta)
+    except Exception as e:
+        _redis_failed(e)
+        return None
+
+
+def _set_bytes(total):
+    try:
+        client = _redis()
+        if client is not None:
+            client.hset(STATS_KEY, 'bytes', total)
+    except Exception as e:
+        _redis_failed(e)
+
+
+def _max_bytes():
+    return getattr(settings, 'TTS_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+
+
+def fetch(key, dest_dir, ext='.mp3'):
+    """
+    캐시 조회. hit이면 dest_dir에 새 파일로 복사하여 경로 반환 (호출자가 자유롭게 이동/삭제 가능).
+    miss면 None.
+    """
+    src = _entry_path(key, ext)
+    try:
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, f'response_{uuid4().hex}{ext}')
+        shutil.copyfile(src, dest)
+        os.utime(src, None)  # LRU: 마지막 사용 시각 갱신
+    except FileNotFoundError:
+        _incr('misses')
+        return None
+    _incr('hits')
+    return dest
+
+
+def store(key, audio_path):
+    """렌더된 오디오를 캐시에 저장 (임시 파일 → os.replace로 원자적 교체) 후 총 용량이 상한을 넘으면 정리"""
+    dest = _entry_path(key, os.path.splitext(audio_path)[1].lower() or '.mp3')
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = f'{dest}.{uuid4().hex}.tmp'
+    try:
+        replaced = os.path.getsize(dest) if os.path.exists(dest) else 0
+        shutil.copyfile(audio_path, tmp)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    total = _add_bytes(os.path.getsize(dest) - replaced)
+    if total is None:
+        if random.random() < 1 / EVICT_SAMPLE:
+            evict(int(_max_bytes() * EVICT_TARGET))
+    elif total > _max_bytes():
+        evict(int(_max_bytes() * EVICT_TARGET))
+    return dest
+
+
+def _entries():
+    """(mtime, size, path) 목록"""
+    result = []
+    root = _cache_dir()
+    for sub in os.scandir(root):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if entry.name.endswith(CACHE_EXTS):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                result.append((st.st_mtime, st.st_size, entry.path))
+    return result
+
+
+def evict(max_bytes=None):
+    """총 용량이 max_bytes 이하가 될 때까지 오래 사용되지 않은 항목 삭제 (총 용량 누적값도 스캔 결과로 갱신). 삭제 개수 반환"""
+    if max_bytes is None:
+        max_bytes = _max_bytes()
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        _set_bytes(total)
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except FileNotFoundError:
+            pass
+    _set_bytes(total)
+    if removed:
+        _incr('evictions', removed)
+        print(f"🧹 TTS 캐시 정리: {removed}개 삭제")
+    return removed
+
+
+def _counters():
+    try:
+        client = _redis()
+        if client is not None:
+            return {k.decode(): int(v) for k, v in client.hgetall(STATS_KEY).items()}
+    except Exception as e:
+        _redis_failed(e)
+    return {}
+
+
+def stats():
+    entries = _entries()
+    counters = _counters()
+    hits = counters.get('hits', 0)
+    misses = counters.get('misses', 0)
+    return {
+        'entries': len(entries),
+        'bytes': sum(size for _, size, _ in entries),
+        'max_bytes': _max_bytes(),
+        'hits': hits,
+        'misses': misses,
+        'evictions': counters.get('evictions', 0),
+        'hit_rate': round(hits / (hits + misses), 3) if (hits + misses) else 0.0,
+        'oldest_access': time.strftime('%Y-%m-%d %H:%M', time.localtime(min(e[0] for e in entries))) if entries else None,
+    }
+
+
+def clear():
+    """캐시 전체 삭제 + 카운터 초기화"""
+    shutil.rmtree(_cache_dir(), ignore_errors=True)
+    try:
+        client = _redis()
+        if client is not None:
+            client.delete(STATS_KEY)
+    except Exception as e:
+        _redis_failed(e)
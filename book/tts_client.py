@@ -0,0 +1,352 @@
+"""
+ElevenLabs 호출 래퍼 — TTS/SFX/BGM 요청은 모두 이 모듈을 거침 (book.utils)
+- 연결 풀: 프로세스당 ElevenLabs 클라이언트 1개 + httpx 연결 풀(TTS_POOL_CONNECTIONS, keep-alive), 스레드 공유.
+  처음 호출할 때 생성 (Celery prefork 자식 프로세스마다 따로, fork 후에는 다시 생성)
+- 요청 한도: Redis 토큰 버킷 — 초당 TTS_RATE_PER_SECOND개, 순간 최대 TTS_RATE_BURST개를 모든 워커가 나눠 씀
+  (시각은 Redis TIME 기준 → 서버 간 시계 차이 무관). Redis에 연결할 수 없으면 프로세스 로컬 버킷으로 대체
+- 재시도: 429/5xx/연결 오류/타임아웃만, 지수 백오프 + full jitter (Retry-After가 더 길면 그만큼), 최대 TTS_MAX_RETRIES회
+  SFX/BGM 생성(유료, 멱등 아님)은 요청이 서버에 닿았을 수 있는 오류(응답 대기 타임아웃/연결 끊김)는 재시도하지 않음
+  → 429/5xx 응답과 연결 실패만 재시도
+- 마감 시간: 요청마다 TTS_REQUEST_DEADLINE초 (토큰 대기 + 재시도 + 응답 수신 포함) → 넘으면 TTSDeadlineExceeded
+  시도 1회 타임아웃은 TTS_ATTEMPT_TIMEOUT초, SFX/BGM 생성은 TTS_GENERATION_TIMEOUT초 (마감 시간도 최소 그만큼)
+- 차단기: 연속 TTS_BREAKER_THRESHOLD회 실패하면 TTS_BREAKER_RESET_SECONDS 동안 요청 없이 바로 TTSUnavailable,
+  이후 요청 1개로 복구 확인 (프로세스 단위). 4xx(잘못된 요청/인증)는 장애로 세지 않음
+- SDK 스트림은 순회할 때 요청이 나가므로 응답을 끝까지 받아 bytes로 반환 (재시도 범위 안에서 수신)
+- 로컬 검증: manage.py fake_tts_server --fail-rate 0.3 --fail-status 429 / bench_audio tts --fail-rate 0.3
+"""
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+REDIS_RETRY_SECONDS = 30  # Redis 연결 실패 후 이 시간 동안 로컬 버킷 사용
+BUCKET_KEY = 'voxliber:tts_bucket'
+
+# 토큰 1개 차감 → 기다려야 할 초 (0이면 획득). 소수 반환을 위해 문자열로
+TAKE_TOKEN = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class TTSError(Exception):
+    """ElevenLabs 요청 실패 (한도/차단기/마감)"""
+
+
+class TTSUnavailable(TTSError):
+    """차단기가 열려 요청을 보내지 않음"""
+
+
+class TTSDeadlineExceeded(TTSError):
+    """요청 마감 시간 초과"""
+
+
+_lock = threading.Lock()
+_client = None
+_http = None
+_breaker = None
+_base_url = None
+_api_key = None
+_script = None
+_redis_down_until = 0.0
+_stats = {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'throttled_seconds': 0.0}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _count(key, amount=1):
+    with _lock:
+        _stats[key] += amount
+
+
+def stats():
+    """{'requests', 'retries', 'failures', 'rejected', 'throttled_seconds'} (프로세스 누적)"""
+    with _lock:
+        return dict(_stats)
+
+
+# ==================== 연결 풀 ====================
+
+def client():
+    """프로세스 공용 ElevenLabs 클라이언트 (httpx 연결 풀)"""
+    global _client, _http
+    with _lock:
+        if _client is None:
+            import httpx
+            from elevenlabs import ElevenLabs
+
+            size = _setting('TTS_POOL_CONNECTIONS', 16)
+            _http = httpx.Client(
+                limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                timeout=max(_setting('TTS_ATTEMPT_TIMEOUT', 60), _setting('TTS_GENERATION_TIMEOUT', 300)),
+                follow_redirects=True,
+            )
+            _client = ElevenLabs(
+                api_key=_api_key or os.getenv('ELEVEN_API_KEY'),
+                base_url=_base_url or os.getenv('ELEVEN_BASE_URL') or None,
+                httpx_client=_http,
+            )
+        return _client
+
+
+def configure(base_url=None, api_key=None):
+    """대상 서버 변경 (bench_audio/fake 서버) — 연결 풀과 차단기 초기화. 인자 없이 호출하면 환경 변수 설정으로 복귀"""
+    global _client, _http, _breaker, _base_url, _api_key
+    with _lock:
+        old, _client, _http, _breaker = _http, None, None, None
+        _base_url, _api_key = base_url, api_key
+        for key in _stats:
+            _stats[key] = 0
+    if old is not None:
+        old.close()
+
+
+def _reset_after_fork():
+    global _client, _http, _breaker, _lock
+    _lock = threading.Lock()
+    _client = _http = _breaker = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ==================== 요청 한도 (토큰 버킷) ====================
+
+class LocalBucket:
+    """Redis를 쓸 수 없을 때의 프로세스 로컬 토큰 버킷 (TAKE_TOKEN과 같은 계산)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = None
+        self.ts = time.monotonic()
+
+    def take(self, rate, burst):
+        with self.lock:
+            now = time.monotonic()
+            tokens = burst if self.tokens is None else self.tokens
+            tokens = min(burst, tokens + (now - self.ts) * rate)
+            self.ts = now
+            if tokens >= 1:
+                self.tokens = tokens - 1
+                return 0.0
+            self.tokens = tokens
+            return (1 - tokens) / rate
+
+
+_local_bucket = LocalBucket()
+
+
+def _take_token(rate, burst):
+    global _script, _redis_down_until
+    if time.monotonic() >= _redis_down_until:
+        try:
+            if _script is None:
+                import redis
+                conn = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=2, socket_connect_timeout=2)
+                _script = conn.register_script(TAKE_TOKEN)
+            return float(_script(keys=[BUCKET_KEY], args=[rate, burst]))
+        except Exception as e:
+            _script = None
+            _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            print(f"⚠️ [TTS] Redis 토큰 버킷 사용 불가 — 로컬 버킷으로 대체: {e}")
+    return _local_bucket.take(rate, burst)
+
+
+def acquire(deadline_at):
+    """요청 1개 분량의 토큰을 받을 때까지 대기 (마감 전에 받을 수 없으면 TTSDeadlineExceeded)"""
+    rate = float(_setting('TTS_RATE_PER_SECOND', 4))
+    if rate <= 0:
+        return
+    burst = max(1, int(_setting('TTS_RATE_BURST', 8)))
+    while True:
+        wait = _take_token(rate, burst)
+        if wait <= 0:
+            return
+        wait += random.uniform(0, wait * 0.2)  # 여러 워커가 같은 순간에 다시 몰리지 않도록
+        if time.monotonic() + wait > deadline_at:
+            raise TTSDeadlineExceeded('요청 한도 대기 중 마감 시간 초과')
+        _count('throttled_seconds', wait)
+        time.sleep(wait)
+
+
+# ==================== 차단기 ====================
+
+class CircuitBreaker:
+    """연속 threshold회 실패 → reset_seconds 동안 열림 → 요청 1개(probe)로 복구 확인 (스레드 안전)"""
+
+    def __init__(self, threshold, reset_seconds):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def before(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < self.reset_seconds:
+                raise TTSUnavailable('ElevenLabs 장애로 요청을 잠시 중단했습니다')
+            self.probing = True
+
+    def success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                print("✅ [TTS] 차단기 닫힘 — ElevenLabs 응답 정상")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                print(f"⛔ [TTS] 차단기 열림 — 연속 실패 {self.failures}회, {self.reset_seconds}초 동안 요청 중단")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def abandon(self):
+        """probe가 요청을 보내지 못하고 끝남 — 다음 요청이 다시 확인"""
+        with self.lock:
+            self.probing = False
+
+
+def breaker():
+    global _breaker
+    with _lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                _setting('TTS_BREAKER_THRESHOLD', 5), _setting('TTS_BREAKER_RESET_SECONDS', 30))
+        return _breaker
+
+
+# ==================== 요청 ====================
+
+def _retryable(error):
+    import httpx
+
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRY_STATUS
+    return isinstance(error, httpx.TransportError)  # 연결 실패/끊김/타임아웃
+
+
+def _not_sent(error):
+    """서버가 요청을 처리하지 않았음이 확실한 오류 — 429/5xx 응답, 연결 실패, 연결 풀 대기 초과"""
+    import httpx
+
+    if getattr(error, 'status_code', None) is not None:
+        return True
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _backoff(attempt, error):
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    headers = {k.lower(): v for k, v in (getattr(error, 'headers', None) or {}).items()}
+    try:
+        delay = max(delay, float(headers.get('retry-after', 0)))
+    except ValueError:
+        pass
+    return delay
+
+
+def _receive(stream, deadline_at):
+    chunks = []
+    for chunk in stream:
+        if time.monotonic() > deadline_at:
+            raise TTSDeadlineExceeded('응답 수신 중 마감 시간 초과')
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def request(send, label='TTS', deadline=None, attempt_timeout=None, idempotent=True):
+    """
+    send(client, request_options) → SDK 오디오 스트림. 한도/재시도/마감/차단기를 적용해 응답 bytes 반환
+    재시도하지 않는 오류(4xx)는 SDK 예외 그대로 전달
+    idempotent=False: 다시 보내면 과금/생성이 중복될 수 있는 요청 — _not_sent 오류만 재시도
+    """
+    deadline_at = time.monotonic() + (deadline or _setting('TTS_REQUEST_DEADLINE', 120))
+    retries = _setting('TTS_MAX_RETRIES', 4)
+    guard = breaker()
+    for attempt in range(retries + 1):
+        try:
+            guard.before()
+        except TTSUnavailable:
+            _count('rejected')
+            raise
+        try:
+            acquire(deadline_at)
+        except TTSDeadlineExceeded:
+            guard.abandon()
+            raise
+
+        timeout = max(1, int(min(attempt_timeout or _setting('TTS_ATTEMPT_TIMEOUT', 60), deadline_at - time.monotonic())))
+        _count('requests')
+        try:
+            audio = _receive(send(client(), {'max_retries': 0, 'timeout_in_seconds': timeout}), deadline_at)
+        except TTSDeadlineExceeded:
+            guard.failure()
+            _count('failures')
+            raise
+        except Exception as e:
+            if not _retryable(e):
+                if getattr(e, 'status_code', None) is not None:
+                    guard.success()  # 서버는 응답함 (잘못된 요청/인증 오류)
+                else:
+                    guard.abandon()
+                raise
+            guard.failure()
+            _count('failures')
+            if attempt == retries or not (idempotent or _not_sent(e)):
+                raise
+            delay = _backoff(attempt, e)
+            if time.monotonic() + delay >= deadline_at:
+                raise TTSDeadlineExceeded(f'재시도 대기 중 마감 시간 초과: {e}') from e
+            print(f"🔁 [{label}] 재시도 {attempt + 1}/{retries} ({delay:.1f}초 후): {getattr(e, 'status_code', None) or e}")
+            _count('retries')
+            time.sleep(delay)
+            continue
+        guard.success()
+        return audio
+
+
+def text_to_speech(voice_id, **kwargs):
+    return request(lambda c, options: c.text_to_speech.convert(voice_id, request_options=options, **kwargs), 'TTS')
+
+
+def _generate(send, label):
+    """SFX/BGM 생성 — 응답이 길어 시도 1회 타임아웃/마감을 TTS_GENERATION_TIMEOUT 이상으로, 중복 생성 방지"""
+    timeout = _setting('TTS_GENERATION_TIMEOUT', 300)
+    deadline = max(_setting('TTS_REQUEST_DEADLINE', 120), timeout)
+    return request(send, label, deadline, attempt_timeout=timeout, idempotent=False)
+
+
+def sound_effect(**kwargs):
+    return _generate(lambda c, options: c.text_to_sound_effects.convert(request_options=options, **kwargs), 'SFX')
+
+
+def compose_music(**kwargs):
+    return _generate(lambda c, options: c.music.compose(request_options=options, **kwargs), 'BGM')
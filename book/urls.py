@@ -2,6 +2,7 @@ from django.urls import path
 from book import api_views  # 🔥 API 뷰 추가
 from django.conf import settings
 from book import views
+from book.audio_streaming import stream_audio, hls_master_playlist
 from django.conf.urls.static import static
 app_name = "book"
 
@@ -18,6 +19,8 @@ urlpatterns=[
     path("webnovel/<uuid:book_uuid>/upload-cover/", views.webnovel_upload_cover, name="webnovel_upload_cover"),
     path("webnovel/episode/<uuid:content_uuid>/", views.webnovel_episode, name="webnovel_episode"),
     path("content/<uuid:content_uuid>/save-listening/", views.save_listening_history, name="save_listening_history"),
+    path("content/<int:content_id>/stream/", stream_audio, name="stream_audio"),
+    path("content/<int:content_id>/hls/master.m3u8", hls_master_playlist, name="hls_master_playlist"),
     path("content/<uuid:content_uuid>/snippet/save/", views.save_snippet, name="save_snippet"),
 
     path("review/<uuid:book_uuid>/", views.submit_review, name="submit_review"),
@@ -45,6 +48,7 @@ urlpatterns=[
     path("preview/generate/", views.generate_preview_audio, name="generate_preview_audio"),
     path("preview/generate-async/", views.generate_preview_audio_async, name="generate_preview_audio_async"),
     path("preview/task-status/<str:task_id>/", views.preview_task_status, name="preview_task_status"),
+    path("preview/task-stream/<str:task_id>/", views.preview_task_stream, name="preview_task_stream"),
 
     # 북 스냅 페이지
     path("book/snap/", views.book_snap_list, name="book_snap_list"),
@@ -104,6 +108,9 @@ urlpatterns=[
     path("json/ai-generate/", views.ai_analyze_audiobook, name="ai_analyze_audiobook"),
     path("json/ai-speakers/", views.ai_assign_speakers, name="ai_assign_speakers"),
     path("json/task-status/<str:task_id>/", views.audiobook_task_status, name="audiobook_task_status"),
+    path("json/task-stream/<str:task_id>/", views.audiobook_task_stream, name="audiobook_task_stream"),
+    path("ops/queue-metrics/", views.queue_metrics, name="queue_metrics"),
+    path("json/task-resume/<str:task_id>/", views.audiobook_task_resume, name="audiobook_task_resume"),
     # 에피소드 수정 (블록 에디터로 불러오기)
     path("episodes/<uuid:content_uuid>/load-for-edit/", views.load_episode_for_edit, name="load_episode_for_edit"),
     # 페이지별 TTS 편집
@@ -129,6 +136,7 @@ urlpatterns=[
     # 📖 Contents (Episodes)
     path("api/books/<uuid:book_uuid>/contents/", api_views.api_contents_list, name="api_contents_list"),
     path("api/contents/<uuid:content_uuid>/", api_views.api_content_detail, name="api_content_detail"),
+    path("api/contents/<uuid:content_uuid>/seek-index/", api_views.api_content_seek_index, name="api_content_seek_index"),
 
     # ⭐ Reviews
     path("api/books/<uuid:book_uuid>/reviews/", api_views.api_reviews_list, name="api_reviews_list"),
@@ -2,32 +2,70 @@
 import os
 import re
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
-from elevenlabs import ElevenLabs
 from uuid import uuid4
 from dotenv import load_dotenv
 from pydub import AudioSegment
 from book.models import VoiceList,VoiceType
 from openai import OpenAI
+from book import tts_client
 
 load_dotenv()
 
-ELEVEN_API_KEY = os.getenv('ELEVEN_API_KEY')
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 GROK_API_KEY=os.getenv("GROK_API_KEY")
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
-eleven_client = ElevenLabs(api_key=ELEVEN_API_KEY)
 grok_client = OpenAI(
     api_key=GROK_API_KEY,
     base_url="https://api.x.ai/v1"
 )
+# ElevenLabs 호출은 book.tts_client (연결 풀/공유 요청 한도/재시도/차단기, ELEVEN_API_KEY/ELEVEN_BASE_URL)
 
-# print("ElevenLabs 클라이언트 초기화 완료:", eleven_client)
 # print("openAI:" , openAI_client)
 
 
 
-def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, similarity_value ):
+TTS_MODEL_ID = "eleven_v3"
+TTS_PCM_FORMAT = "pcm_44100"  # ElevenLabs raw PCM 출력 (s16le mono 44100Hz)
+TTS_MP3_FORMAT = "mp3_44100_128"
+
+
+def _parse_speed(speed_value):
+    try:
+        speed_float = float(speed_value)
+        return max(0.5, min(2.0, speed_float))  # 0.5~2.0 범위로 제한
+    except:
+        return 1.0
+
+
+def adjust_speed(audio, speed_float):
+    """
+    속도 조절: frame_rate를 변경하고 원래대로 되돌림
+    speed > 1: 빠르게, speed < 1: 느리게
+    """
+    if abs(speed_float - 1.0) <= 0.01:
+        return audio
+    new_frame_rate = int(audio.frame_rate * speed_float)
+    audio_adjusted = audio._spawn(audio.raw_data, overrides={'frame_rate': new_frame_rate})
+    return audio_adjusted.set_frame_rate(audio.frame_rate)
+
+
+def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, similarity_value, use_cache=True, lossless=False):
+    """
+    ElevenLabs TTS 생성 → media/audio/response_<uuid>.mp3 경로 반환 (실패 시 None)
+
+    use_cache=True이면 TTS 렌더 캐시(book.tts_cache)를 먼저 조회하고,
+    새로 생성한 결과는 캐시에 저장함. 반환 파일은 항상 호출자 전용 복사본.
+    use_cache=False(재생성 — 같은 입력이라도 새 테이크)면 조회 없이 생성하고 캐시 항목을 새 결과로 덮어씀.
+
+    lossless=True이면 무손실 중간 포맷(.wav)으로 반환 — 에피소드 파이프라인용.
+    settings.TTS_REQUEST_PCM이 켜져 있으면 ElevenLabs에 PCM을 직접 요청하여
+    MP3 디코딩 단계도 생략함. 최종 MP3 인코딩은 게시 단계에서 1회만 수행.
+    """
+    from book import codec, tts_cache
+    from book.audio_engine import INTERMEDIATE_EXT, INTERMEDIATE_FORMAT, export_intermediate
+
     try:
         # 1️⃣ 입력 확인
         if not novel_text or not isinstance(novel_text, str):
@@ -41,16 +79,32 @@ def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, si
         # 2️⃣ 오디오 저장 경로 준비
         audio_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
         os.makedirs(audio_dir, exist_ok=True)
-        filename = f"response_{uuid4().hex}.mp3"
+        speed_float = _parse_speed(speed_value)
+        ext = INTERMEDIATE_EXT if lossless else '.mp3'
+
+        # 캐시 조회 (동일 텍스트/보이스/설정이면 API 호출 생략)
+        cache_key = None
+        if tts_cache.is_enabled():
+            cache_key = tts_cache.make_key(novel_text, voice_id, language_code, speed_float,
+                                           style_value, similarity_value, TTS_MODEL_ID,
+                                           INTERMEDIATE_FORMAT if lossless else 'mp3')
+            cached_path = tts_cache.fetch(cache_key, audio_dir, ext=ext) if use_cache else None
+            if cached_path:
+                print(f"♻️ TTS 캐시 hit: {cache_key[:12]}")
+                return cached_path
+
+        filename = f"response_{uuid4().hex}{ext}"
         audio_path = os.path.join(audio_dir, filename)
         print("📂 오디오 저장 경로:", audio_path)
 
         # 3️⃣ ElevenLabs API 호출
-        audio_stream = eleven_client.text_to_speech.convert(
+        request_pcm = lossless and getattr(settings, 'TTS_REQUEST_PCM', False)
+        audio_data = tts_client.text_to_speech(
             voice_id= voice_id,
-            model_id="eleven_v3",
+            model_id=TTS_MODEL_ID,
             text=novel_text,
             language_code=language_code,
+            output_format=TTS_PCM_FORMAT if request_pcm else TTS_MP3_FORMAT,
             voice_settings={
                 "stability": 0.5,
                 "similarity": similarity_value,
@@ -58,36 +112,33 @@ def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, si
                 "use_speaker_boost": False
             }
         )
-        print("✅ ElevenLabs API 호출 성공")
-        print("🖇️ audio_stream 타입:", type(audio_stream))
+        print(f"✅ ElevenLabs API 호출 성공 ({len(audio_data)} bytes)")
 
         # 4️⃣ 임시 오디오 파일로 저장
-        temp_path = audio_path.replace('.mp3', '_temp.mp3')
+        temp_path = os.path.join(audio_dir, f"response_{uuid4().hex}_temp.{'pcm' if request_pcm else 'mp3'}")
         with open(temp_path, "wb") as f:
-            for chunk in audio_stream:
-                f.write(chunk)
+            f.write(audio_data)
         print("💾 임시 오디오 저장 완료:", temp_path)
 
         # 5️⃣ 속도 조절 (pydub 사용)
-        try:
-            speed_float = float(speed_value)
-            speed_float = max(0.5, min(2.0, speed_float))  # 0.5~2.0 범위로 제한
-        except:
-            speed_float = 1.0
-
         print(f"🎚️ 속도 조절: {speed_float}x")
 
-        if abs(speed_float - 1.0) > 0.01:  # 속도가 1.0이 아니면 조절
-            audio = AudioSegment.from_mp3(temp_path)
-
-            # 속도 조절: frame_rate를 변경하고 원래대로 되돌림
-            # speed > 1: 빠르게, speed < 1: 느리게
-            new_frame_rate = int(audio.frame_rate * speed_float)
-            audio_adjusted = audio._spawn(audio.raw_data, overrides={'frame_rate': new_frame_rate})
-            audio_adjusted = audio_adjusted.set_frame_rate(audio.frame_rate)
+        if lossless:
+            # 무손실 경로: PCM(또는 MP3 1회 디코딩) → 속도 조절 → WAV (재인코딩 없음)
+            if request_pcm:
+                with open(temp_path, 'rb') as f:
+                    audio = AudioSegment(data=f.read(), sample_width=2, frame_rate=44100, channels=1)
+            else:
+                audio = codec.decode_segment(temp_path)
+            export_intermediate(adjust_speed(audio, speed_float), audio_path)
+            os.remove(temp_path)
+            print("✅ 무손실 중간 포맷으로 저장")
+        elif abs(speed_float - 1.0) > 0.01:  # 속도가 1.0이 아니면 조절
+            audio = codec.decode_segment(temp_path)
+            audio_adjusted = adjust_speed(audio, speed_float)
 
             # 최종 파일 저장
-            audio_adjusted.export(audio_path, format="mp3")
+            codec.export_segment(audio_adjusted, audio_path, format="mp3", bitrate="128k")
             print(f"✅ 속도 조절 완료: {speed_float}x")
 
             # 임시 파일 삭제
@@ -97,6 +148,12 @@ def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, si
             os.rename(temp_path, audio_path)
             print("✅ 속도 조절 없이 저장")
 
+        if cache_key:
+            try:
+                tts_cache.store(cache_key, audio_path)
+            except Exception as e:
+                print(f"⚠️ TTS 캐시 저장 실패 (무시): {e}")
+
         return audio_path
 
     except Exception as e:
@@ -104,138 +161,181 @@ def generate_tts(novel_text, voice_id,language_code,speed_value, style_value, si
         traceback.print_exc()  # 🔹 어디서 오류 났는지 자세히 출력
         return None
 
-def merge_audio_files(audio_files, pages_text=None):
-    """
-    여러 오디오 파일을 하나로 합치는 함수 (타임스탬프 정보 포함)
 
-    Returns:
-        tuple: (merged_audio_path, timestamps_info) 또는 (None, None)
-        - merged_audio_path: 합쳐진 오디오 파일 경로
-        - timestamps_info: 각 대사의 타임스탬프 정보 리스트
+def run_tts_parallel(func, items, max_workers=None, on_progress=None, on_result=None):
     """
-    import traceback
-    try:
-        print("🎵 오디오 합치기 시작...")
-        print(f"📊 총 {len(audio_files)}개의 오디오 파일")
-
-        if not audio_files:
-            print("⚠️ 합칠 오디오 파일이 없습니다.")
-            return None, None, None
-
-        # 임시 저장 폴더 확인
-        temp_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
-        os.makedirs(temp_dir, exist_ok=True)
-        print(f"🗂 임시 폴더 확인: {temp_dir}")
-
-        combined = None
-        timestamps_info = []
-        intro_silence_duration = 3000  # 시작 침묵 시간 (ms)
-        cumulative_time = intro_silence_duration  # 시작 침묵 시간부터 시작
+    TTS 요청들을 제한된 동시성(스레드 풀)으로 병렬 실행
 
-        for idx, audio_file in enumerate(audio_files):
-            print(f"🔄 {idx + 1}/{len(audio_files)} 오디오 처리 중...")
+    func: item 하나를 받아 결과(보통 오디오 경로)를 반환하는 함수
+    items: 요청 목록
+    max_workers: 동시 요청 수 (기본값 settings.TTS_MAX_CONCURRENCY)
+    on_progress: (완료 수, 전체 수) 콜백 — 호출한 스레드에서 실행됨 (Celery update_state 안전)
+    on_result: (항목 번호, 결과) 콜백 — 항목이 끝날 때마다 호출한 스레드에서 실행됨 (DB 체크포인트 기록 안전)
 
-            temp_path = None
-            is_temp_file = False
-
-            # 파일 경로(문자열) 또는 파일 객체 처리
+    Returns:
+        list: items와 같은 순서의 결과 (실패한 항목은 None)
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    if max_workers is None:
+        max_workers = getattr(settings, 'TTS_MAX_CONCURRENCY', 4)
+    max_workers = max(1, min(int(max_workers), len(items)))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts') as pool:
+        futures = {pool.submit(func, item): idx for idx, item in enumerate(items)}
+        done = 0
+        for future in as_completed(futures):
+            idx = futures[future]
             try:
-                if isinstance(audio_file, str):
-                    # 파일 경로인 경우 - 직접 사용
-                    if os.path.exists(audio_file):
-                        temp_path = audio_file
-                        is_temp_file = False
-                        print(f"📂 파일 경로 사용: {temp_path}")
-                    else:
-                        print(f"❌ 파일이 존재하지 않습니다: {audio_file}")
-                        return None, None, None
-                else:
-                    # 파일 객체인 경우 - 임시 파일로 저장
-                    temp_path = os.path.join(temp_dir, f'temp_{uuid4().hex}.mp3')
-                    is_temp_file = True
-                    audio_file.seek(0)  # 파일 포인터 리셋
-                    if hasattr(audio_file, 'chunks'):
-                        with open(temp_path, 'wb') as f:
-                            for chunk in audio_file.chunks():
-                                f.write(chunk)
-                    else:
-                        with open(temp_path, 'wb') as f:
-                            f.write(audio_file.read())
-                    print(f"💾 임시 파일 저장: {temp_path}")
+                results[idx] = future.result()
             except Exception as e:
-                print(f"❌ 파일 처리 실패: {e}")
+                print(f"❌ TTS 병렬 작업 오류 ({idx + 1}번): {e}")
                 traceback.print_exc()
-                return None, None, None
+            done += 1
+            if on_result:
+                on_result(idx, results[idx])
+            if on_progress:
+                on_progress(done, len(items))
 
-            # AudioSegment 로드
-            try:
-                audio_segment = AudioSegment.from_file(temp_path)
-                duration = len(audio_segment)  # ms 단위
-                print(f"✅ 로드 완료: {duration}ms")
+    return results
 
-                # 첫 번째가 아니면 대사 사이 침묵 시간 추가
-                if idx > 0:
-                    cumulative_time += 500
 
-                page_start = cumulative_time  # startTime: 이 페이지 오디오 시작 시점
-
-                # 오디오 길이만큼 누적
-                cumulative_time += duration
+def merge_audio_files(audio_files, pages_text=None, output_format='mp3'):
+    """
+    여러 오디오 파일을 하나로 합치는 함수 (타임스탬프 정보 포함)
 
-                timestamp_data = {
-                    'pageIndex': idx,
-                    'startTime': page_start,
-                    'endTime': cumulative_time
-                }
+    페이지를 하나씩 디코딩하여 단일 인코더 프로세스로 PCM을 흘려보내는 방식
+    (book.audio_engine.stream_concat). 페이지 수에 비례하는 선형 작업량이며
+    메모리에는 한 번에 한 페이지만 올라감.
 
-                # 페이지 텍스트가 있으면 추가 (TTS용 [] 태그 제거 후 저장)
-                if pages_text and idx < len(pages_text):
-                    raw = pages_text[idx] or ''
-                    timestamp_data['text'] = re.sub(r'\[[^\]]*\]', '', raw).strip()
+    output_format='wav'이면 무손실 마스터(.wav)를 만듦 — BGM/SFX 믹싱 후 최종 1회만 MP3 인코딩.
 
-                timestamps_info.append(timestamp_data)
+    Returns:
+        tuple: (merged_audio_path, timestamps_info, total_duration) 또는 (None, None, None)
+        - merged_audio_path: 합쳐진 오디오 파일 경로
+        - timestamps_info: 각 대사의 타임스탬프 정보 리스트
+        - total_duration: 전체 길이 (초)
+    """
+    from book.audio_engine import INTERMEDIATE_FORMAT, PUBLISH_BITRATE, stream_concat
 
-                # 오디오 병합
-                if combined is None:
-                    combined = audio_segment
-                else:
-                    silence = AudioSegment.silent(duration=500)
-                    combined = combined + silence + audio_segment
+    print("🎵 오디오 합치기 시작...")
+    print(f"📊 총 {len(audio_files)}개의 오디오 파일")
 
-            except Exception as e:
-                print(f"❌ AudioSegment 로드 실패: {e}")
-                traceback.print_exc()
-                # 임시 파일만 삭제 (외부에서 전달받은 파일 경로는 삭제하지 않음)
-                if is_temp_file and temp_path and os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return None, None, None
+    if not audio_files:
+        print("⚠️ 합칠 오디오 파일이 없습니다.")
+        return None, None, None
 
-            # 임시 파일만 삭제 (외부에서 전달받은 파일 경로는 삭제하지 않음)
-            if is_temp_file and temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
+    # 임시 저장 폴더 확인
+    temp_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
+    os.makedirs(temp_dir, exist_ok=True)
 
-        # 최종 오디오 export
+    input_paths = []
+    temp_inputs = []  # 파일 객체를 임시 저장한 경로 (외부에서 전달받은 경로는 삭제하지 않음)
+    try:
+        # 파일 경로(문자열) 또는 파일 객체 처리
+        for audio_file in audio_files:
+            if isinstance(audio_file, str):
+                if not os.path.exists(audio_file):
+                    print(f"❌ 파일이 존재하지 않습니다: {audio_file}")
+                    return None, None, None
+                input_paths.append(audio_file)
+            else:
+                temp_path = os.path.join(temp_dir, f'temp_{uuid4().hex}.mp3')
+                temp_inputs.append(temp_path)
+                audio_file.seek(0)  # 파일 포인터 리셋
+                with open(temp_path, 'wb') as f:
+                    if hasattr(audio_file, 'chunks'):
+                        for chunk in audio_file.chunks():
+                            f.write(chunk)
+                    else:
+                        f.write(audio_file.read())
+                input_paths.append(temp_path)
 
-        intro_silence = AudioSegment.silent(duration=3000)  # 원하는 길이 지정(ms)
-        outro_silence  = AudioSegment.silent(duration=3000)  # 원하는 길이 지정(ms)
-        combined = intro_silence + combined +outro_silence 
-        output_filename = f"merged_{uuid4().hex}.mp3"
+        lossless = output_format == INTERMEDIATE_FORMAT
+        output_filename = f"merged_{uuid4().hex}.{output_format}"
         output_path = os.path.join(temp_dir, output_filename)
-        combined.export(output_path, format="mp3", bitrate="128k")  # 비트레이트 최적화
-        total_duration = len(combined) / 1000
+        timestamps_info, total_ms = stream_concat(
+            input_paths, output_path, pages_text=pages_text,
+            bitrate=None if lossless else PUBLISH_BITRATE, format=output_format,
+        )
+
+        total_duration = total_ms / 1000
         print(f"🎉 최종 오디오 저장 완료: {output_path}")
         print(f"⏱️ 타임스탬프 정보 {len(timestamps_info)}개 생성 완료")
-        print("🔥 RETURNING 3 VALUES")
-        return output_path, timestamps_info,total_duration
+        return output_path, timestamps_info, total_duration
 
     except Exception as e:
         print(f"❌ 오디오 합치기 최종 에러: {e}")
         traceback.print_exc()
         return None, None, None
 
+    finally:
+        for temp_path in temp_inputs:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+
+def publish_content_audio(content, master_path):
+    """
+    무손실 마스터 → 게시용 MP3 1회 인코딩 후 content.audio_file 교체.
+    설정된 렌디션(book.renditions — 모바일 저비트레이트 등)도 같은 ffmpeg 실행에서 함께 인코딩하여 저장.
+    기존 audio_file(과 탐색 인덱스/HLS)은 다른 행이 참조하지 않으면 삭제 (renditions.remove_file). 게시된 파일 경로 반환.
+    새 파일의 탐색 인덱스는 Content post_save 신호에서 생성 (book/signals.py).
+    """
+    from django.core.files import File
+    from book import renditions
+    from book.audio_engine import transcode
+
+    published = os.path.join(settings.MEDIA_ROOT, 'audio', f'episode_{uuid4().hex}.mp3')
+    rendition_outs = renditions.outputs()
+    try:
+        transcode(master_path, published, renditions=renditions.encoder_targets(rendition_outs))
+    except Exception:
+        renditions.discard(rendition_outs)
+        raise
+    old_name = content.audio_file.name if content.audio_file else None
+    try:
+        with open(published, 'rb') as f:
+            content.audio_file.save(os.path.basename(published), File(f), save=True)
+    except Exception:
+        renditions.discard(rendition_outs)
+        raise
+    finally:
+        os.remove(published)
+    renditions.save(content, rendition_outs)
+    if old_name and old_name != content.audio_file.name:
+        renditions.remove_file(old_name)
+    return content.audio_file.path
+
 
 
+def clip_episode_audio(audio_path, start_sec, end_sec):
+    """
+    에피소드 오디오의 [start_sec, end_sec) 구간을 스니펫용 MP3 바이트로 반환.
+    MP3는 해당 구간 프레임만 복사 (book.mp3_index.clip — 디코딩/재인코딩 없음, 앞뒤 페이드 포함).
+    그 외 포맷이거나 프레임 복사가 불가능하면 pydub로 구간만 잘라 인코딩.
+    """
+    from book import mp3_index
+
+    start_ms = int(float(start_sec) * 1000)
+    end_ms = int(float(end_sec) * 1000)
+    if end_ms <= start_ms:
+        return None
+    if str(audio_path).lower().endswith('.mp3'):
+        data = mp3_index.clip(audio_path, start_ms, end_ms)
+        if data:
+            return data
 
+    import io
+    from book import codec
+    clip = codec.decode_segment(audio_path)[start_ms:end_ms]
+    fade = min(mp3_index.CLIP_FADE_MS, len(clip) // 4)
+    buf = io.BytesIO()
+    codec.export_segment(clip.fade_in(fade).fade_out(fade), buf, format='mp3', bitrate='128k')
+    return buf.getvalue()
 
 
 
@@ -276,7 +376,7 @@ def sound_effect(effect_name, effect_description, duration_seconds):
         effect_prompt = detailed_prompt.choices[0].message.content.strip()
         effect_prompt = effect_prompt[:440]
         print("ai 가 생성한 사운드 이펙트:", effect_prompt)
-        audio_stream = eleven_client.text_to_sound_effects.convert(
+        audio_data = tts_client.sound_effect(
             text=effect_prompt,
             duration_seconds=duration_seconds,
             prompt_influence=1.0
@@ -289,8 +389,7 @@ def sound_effect(effect_name, effect_description, duration_seconds):
         audio_path = os.path.join(audio_dir, filename)
 
         with open(audio_path, 'wb') as f:
-            for chunk in audio_stream:
-                f.write(chunk)
+            f.write(audio_data)
 
         print(f"✅ 사운드 이팩트 생성 완료: {audio_path}")
         return audio_path
@@ -346,7 +445,7 @@ def background_music(music_name, music_description, duration_seconds=30):
         print("ai 가 생성한 배경음:", refined_prompt)
 
         # ElevenLabs SDK music.compose() 사용 (music_length_ms 단위: 밀리초)
-        audio_stream = eleven_client.music.compose(
+        audio_data = tts_client.compose_music(
             prompt=refined_prompt,
             music_length_ms=int(duration_seconds * 1000),
             force_instrumental=True,
@@ -359,8 +458,7 @@ def background_music(music_name, music_description, duration_seconds=30):
         audio_path = os.path.join(audio_dir, filename)
 
         with open(audio_path, 'wb') as f:
-            for chunk in audio_stream:
-                f.write(chunk)
+            f.write(audio_data)
 
         print(f"✅ 배경음 생성 완료: {audio_path}")
         return audio_path
@@ -372,67 +470,49 @@ def background_music(music_name, music_description, duration_seconds=30):
 
 
 # 배경음과 대사 믹싱 함수
-def mix_audio_with_background(dialogue_audio_path, background_tracks_info):
+def mix_audio_with_background(dialogue_audio_path, background_tracks_info, output_format='mp3'):
     """
     대사 오디오와 배경음을 믹싱하는 함수
-    dialogue_audio_path: 합쳐진 대사 오디오 파일 경로
+    dialogue_audio_path: 합쳐진 대사 오디오 파일 경로 (무손실 마스터 권장)
     background_tracks_info: [{audioPath, startTime, endTime, volume}] 형태의 배경음 정보 리스트
+    output_format: 'mp3'(게시용 최종 인코딩) 또는 'wav'(무손실 중간 결과)
+
+    book.audio_engine.render_plan으로 단일 패스 렌더링 (트랙 수와 무관하게 대사 오디오를 한 번만 읽고 씀).
+    배경음은 구간 길이만큼 반복, 페이드 인/아웃 min(500ms, 구간의 1/4).
     """
+    from book.audio_engine import INTERMEDIATE_FORMAT, PUBLISH_BITRATE, render_plan
+
     try:
         print("🎵 배경음 믹싱 시작...")
 
-        # 대사 오디오 로드
-        dialogue_audio = AudioSegment.from_mp3(dialogue_audio_path)
-        dialogue_duration = len(dialogue_audio)
-        print(f"📊 대사 오디오 길이: {dialogue_duration}ms")
-
         # 배경음이 없으면 원본 그대로 반환
         if not background_tracks_info:
             print("⚠️ 배경음이 없습니다. 원본 오디오를 반환합니다.")
             return dialogue_audio_path
 
-        # 각 배경음 트랙 처리
+        beds = []
         for idx, track_info in enumerate(background_tracks_info):
-            bg_audio_path = track_info.get('audioPath')
             start_time = track_info.get('startTime', 0)  # ms 단위
-            end_time = track_info.get('endTime', dialogue_duration)  # ms 단위
             volume_adjust = track_info.get('volume', -10)  # dB 단위 (기본: -10dB로 배경음 볼륨 낮춤)
-
-            print(f"🎼 배경음 {idx + 1} 처리 중...")
-            print(f"   - 시작: {start_time}ms, 종료: {end_time}ms, 볼륨: {volume_adjust}dB")
-
-            # 배경음 로드
-            bg_audio = AudioSegment.from_file(bg_audio_path)
-
-            # 배경음 볼륨 조절
-            bg_audio = bg_audio + volume_adjust
-
-            # 필요한 길이 계산
-            required_duration = end_time - start_time
-
-            # 배경음이 필요한 길이보다 짧으면 반복
-            if len(bg_audio) < required_duration:
-                repeat_times = (required_duration // len(bg_audio)) + 1
-                bg_audio = bg_audio * repeat_times
-
-            # 필요한 길이만큼 자르기
-            bg_audio = bg_audio[:required_duration]
-
-            # 페이드 인/아웃 효과 (부드러운 전환)
-            fade_duration = min(500, required_duration // 4)  # 500ms 또는 전체 길이의 1/4
-            bg_audio = bg_audio.fade_in(fade_duration).fade_out(fade_duration)
-
-            # 배경음을 적절한 위치에 오버레이
-            # start_time 위치부터 bg_audio를 믹싱
-            dialogue_audio = dialogue_audio.overlay(bg_audio, position=start_time)
-            print(f"✅ 배경음 {idx + 1} 믹싱 완료")
+            print(f"🎼 배경음 {idx + 1}: 시작 {start_time}ms, 종료 {track_info.get('endTime')}ms, 볼륨 {volume_adjust}dB")
+            beds.append({
+                'path': track_info.get('audioPath'),
+                'start_ms': start_time,
+                'end_ms': track_info.get('endTime'),  # 없으면 대사 끝까지
+                'gain_db': volume_adjust,
+                'fade_ms': 500,
+            })
 
         # 최종 믹싱된 오디오 저장
-        output_filename = f"mixed_{uuid4().hex}.mp3"
+        output_filename = f"mixed_{uuid4().hex}.{output_format}"
         output_path = os.path.join(settings.MEDIA_ROOT, 'audio', output_filename)
-        dialogue_audio.export(output_path, format="mp3")
+        lossless = output_format == INTERMEDIATE_FORMAT
+        _, total_ms = render_plan(
+            {'sequence': [{'type': 'audio', 'path': dialogue_audio_path}], 'beds': beds},
+            output_path, bitrate=None if lossless else PUBLISH_BITRATE, format=output_format,
+        )
 
-        print(f"✅ 배경음 믹싱 완료: {output_path}")
+        print(f"✅ 배경음 믹싱 완료: {output_path} ({total_ms}ms)")
         return output_path
 
     except Exception as e:
@@ -447,15 +527,13 @@ import requests
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from book.models import VoiceList, VoiceType
-from elevenlabs import ElevenLabs
 
 def sync_voices_with_type():
     """
     ElevenLabs의 User Voice / Default Voice를 DB에 넣고,
     VoiceType도 연결하며 sample_audio까지 저장
     """
-    ELEVEN_API_KEY = os.getenv('ELEVEN_API_KEY')
-    eleven_client = ElevenLabs(api_key=ELEVEN_API_KEY)
+    eleven_client = tts_client.client()
     
     try:
         print("ElevenLabs 클라이언트 초기화 완료:", eleven_client)
@@ -642,129 +720,32 @@ def chat_with_character_debug(agent_id, character_name, voice_id, book_content,
 
 # ==================== 서버 사이드 WebAudio 효과 ====================
 import numpy as np
-from scipy.signal import butter, sosfilt
-
-# 31개 프리셋 파라미터 (webaudio-effects.js와 1:1 매칭)
-WEBAUDIO_PRESETS = {
-    "normal": {"filter_type": "allpass", "freq": 1000, "Q": 1, "delay": 0, "feedback": 0, "tremolo_rate": 0, "tremolo_depth": 0},
-    "phone": {"filter_type": "highpass", "freq": 2000, "Q": 8, "delay": 0, "feedback": 0, "tremolo_rate": 0, "tremolo_depth": 0},
-    "cave": {"filter_type": "lowpass", "freq": 600, "Q": 6, "delay": 0.45, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
-    "underwater": {"filter_type": "lowpass", "freq": 400, "Q": 2, "delay": 0.15, "feedback": 0.3, "tremolo_rate": 5, "tremolo_depth": 0.6},
-    "robot": {"filter_type": "highpass", "freq": 1200, "Q": 1, "delay": 0, "feedback": 0, "tremolo_rate": 30, "tremolo_depth": 1.0},
-    "ghost": {"filter_type": "bandpass", "freq": 500, "Q": 9, "delay": 0.5, "feedback": 0.8, "tremolo_rate": 3, "tremolo_depth": 0.7},
-    "child": {"filter_type": "allpass", "freq": 1500, "Q": 2, "delay": 0, "feedback": 0, "tremolo_rate": 15, "tremolo_depth": 0.3},
-    "old": {"filter_type": "lowpass", "freq": 700, "Q": 3, "delay": 0.2, "feedback": 0.5, "tremolo_rate": 2, "tremolo_depth": 0.2},
-    "echo": {"filter_type": "allpass", "freq": 1000, "Q": 1, "delay": 0.6, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
-    "protoss": {"filter_type": "allpass", "freq": 1100, "Q": 6, "delay": 0.09, "feedback": 0.42, "tremolo_rate": 0, "tremolo_depth": 0},
-    "whisper": {"filter_type": "bandpass", "freq": 1800, "Q": 4, "delay": 0.03, "feedback": 0.2, "tremolo_rate": 4, "tremolo_depth": 0.4},
-    "radio": {"filter_type": "bandpass", "freq": 1800, "Q": 2, "delay": 0, "feedback": 0, "tremolo_rate": 6.5, "tremolo_depth": 0.7},
-    "megaphone": {"filter_type": "highpass", "freq": 900, "Q": 5, "delay": 0.05, "feedback": 0.35, "tremolo_rate": 0, "tremolo_depth": 0},
-    "demon": {"filter_type": "lowpass", "freq": 800, "Q": 3, "delay": 0.07, "feedback": 0.6, "tremolo_rate": 120, "tremolo_depth": 0.9},
-    "angel": {"filter_type": "highpass", "freq": 800, "Q": 5, "delay": 0.35, "feedback": 0.65, "tremolo_rate": 1.5, "tremolo_depth": 0.4},
-    "vader": {"filter_type": "bandpass", "freq": 400, "Q": 8, "delay": 0.04, "feedback": 0.4, "tremolo_rate": 80, "tremolo_depth": 0.6},
-    "giant": {"filter_type": "lowpass", "freq": 300, "Q": 4, "delay": 0.6, "feedback": 0.7, "tremolo_rate": 0, "tremolo_depth": 0},
-    "tiny": {"filter_type": "highpass", "freq": 2200, "Q": 6, "delay": 0.02, "feedback": 0.3, "tremolo_rate": 8, "tremolo_depth": 0.4},
-    "possessed": {"filter_type": "bandpass", "freq": 600, "Q": 5, "delay": 0.07, "feedback": 0.7, "tremolo_rate": 100, "tremolo_depth": 0.9},
-    "horror": {"filter_type": "bandpass", "freq": 620, "Q": 14, "delay": 0.38, "feedback": 0.78, "tremolo_rate": 2.8, "tremolo_depth": 0.85},
-    "helium": {"filter_type": "highpass", "freq": 2900, "Q": 7, "delay": 0.015, "feedback": 0.18, "tremolo_rate": 12, "tremolo_depth": 0.5},
-    "timewarp": {"filter_type": "lowpass", "freq": 580, "Q": 9, "delay": 0.42, "feedback": 0.89, "tremolo_rate": 0.25, "tremolo_depth": 0.8},
-    "glitch": {"filter_type": "bandpass", "freq": 1300, "Q": 22, "delay": 0.008, "feedback": 0.35, "tremolo_rate": 280, "tremolo_depth": 0.98},
-    "choir": {"filter_type": "allpass", "freq": 1600, "Q": 5, "delay": 0.28, "feedback": 0.72, "tremolo_rate": 1.1, "tremolo_depth": 0.5},
-    "hyperpop": {"filter_type": "highpass", "freq": 3200, "Q": 14, "delay": 0.018, "feedback": 0.42, "tremolo_rate": 220, "tremolo_depth": 0.9},
-    "vaporwave": {"filter_type": "lowpass", "freq": 3400, "Q": 2, "delay": 0.38, "feedback": 0.78, "tremolo_rate": 0.35, "tremolo_depth": 0.8},
-    "darksynth": {"filter_type": "bandpass", "freq": 950, "Q": 11, "delay": 0.24, "feedback": 0.70, "tremolo_rate": 130, "tremolo_depth": 0.55},
-    "lofi-girl": {"filter_type": "lowpass", "freq": 4200, "Q": 1.8, "delay": 0.45, "feedback": 0.62, "tremolo_rate": 0.12, "tremolo_depth": 0.35},
-    "bitcrush-voice": {"filter_type": "bandpass", "freq": 2200, "Q": 28, "delay": 0.004, "feedback": 0.25, "tremolo_rate": 420, "tremolo_depth": 0.98},
-    "portal": {"filter_type": "allpass", "freq": 750, "Q": 18, "delay": 0.65, "feedback": 0.94, "tremolo_rate": 0.7, "tremolo_depth": 0.9},
-    "neoncity": {"filter_type": "bandpass", "freq": 1150, "Q": 9, "delay": 0.52, "feedback": 0.80, "tremolo_rate": 2.8, "tremolo_depth": 0.45},
-    "ghost-in-machine": {"filter_type": "bandpass", "freq": 780, "Q": 20, "delay": 0.09, "feedback": 0.58, "tremolo_rate": 190, "tremolo_depth": 0.88},
-}
-
-
-def _apply_biquad_filter(samples, sample_rate, filter_type, freq, Q):
-    """scipy butter 필터로 WebAudio BiquadFilter 재현"""
-    nyq = sample_rate / 2.0
-    freq = min(freq, nyq - 1)
-
-    if filter_type == "allpass":
-        return samples  # allpass = 통과
-    elif filter_type == "lowpass":
-        sos = butter(2, freq / nyq, btype='low', output='sos')
-    elif filter_type == "highpass":
-        sos = butter(2, freq / nyq, btype='high', output='sos')
-    elif filter_type == "bandpass":
-        low = max(freq / (Q if Q > 0 else 1), 20) / nyq
-        high = min(freq * (Q if Q > 0 else 1), nyq - 1) / nyq
-        if low >= high:
-            low = max(20 / nyq, 0.001)
-            high = min(0.999, freq * 2 / nyq)
-        sos = butter(2, [low, high], btype='band', output='sos')
-    else:
-        return samples
+from book.audio_fx import WEBAUDIO_PRESETS, apply_preset
 
-    return sosfilt(sos, samples).astype(np.float32)
 
-
-def _apply_delay(samples, sample_rate, delay_time, feedback_gain, max_iterations=8):
-    """딜레이 + 피드백 효과"""
-    if delay_time <= 0 and feedback_gain <= 0:
-        return samples
-
-    delay_samples = int(delay_time * sample_rate)
-    if delay_samples <= 0:
-        return samples
-
-    output = samples.copy()
-    delayed = samples.copy()
-
-    for i in range(max_iterations):
-        gain = feedback_gain ** (i + 1)
-        if gain < 0.01:
-            break
-        padded = np.zeros(len(samples), dtype=np.float32)
-        start = delay_samples * (i + 1)
-        if start >= len(samples):
-            break
-        end = min(start + len(delayed), len(samples))
-        padded[start:end] = delayed[:end - start] * gain
-        output += padded
-
-    # 클리핑 방지
-    max_val = np.max(np.abs(output))
-    if max_val > 1.0:
-        output = output / max_val
-    return output
-
-
-def _apply_tremolo(samples, sample_rate, rate, depth):
-    """트레몰로 (AM 변조) 효과"""
-    if rate <= 0 or depth <= 0:
-        return samples
-
-    t = np.arange(len(samples)) / sample_rate
-    # depth 0~1: 0이면 변조 없음, 1이면 최대 변조
-    modulation = 1.0 - depth * 0.5 * (1.0 + np.sin(2 * np.pi * rate * t))
-    return (samples * modulation).astype(np.float32)
-
-
-def generate_silence(duration_seconds):
+def generate_silence(duration_seconds, lossless=False):
     """
     지정된 길이의 무음 MP3 파일 생성 (44100Hz stereo — TTS 오디오 포맷에 맞춤).
     silence block이 삽입된 위치에서 BGM은 계속 재생됨 (mix_bgm 단계에서 처리).
+    lossless=True이면 무손실 중간 포맷(.wav)으로 생성 (인코딩 없음).
     """
     from pydub import AudioSegment
     import tempfile
+    from book import codec
+    from book.audio_engine import INTERMEDIATE_EXT, export_intermediate
 
     ms = int(float(duration_seconds) * 1000)
     # TTS 오디오와 동일한 포맷(44100Hz stereo)으로 생성해야 merge 시 포맷 충돌 없음
     silence = AudioSegment.silent(duration=ms, frame_rate=44100)
     silence = silence.set_channels(2).set_sample_width(2)
 
-    tmp = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+    tmp = tempfile.NamedTemporaryFile(suffix=INTERMEDIATE_EXT if lossless else '.mp3', delete=False)
     tmp_path = tmp.name
     tmp.close()
 
-    silence.export(tmp_path, format='mp3', bitrate='128k')
+    if lossless:
+        return export_intermediate(silence, tmp_path)
+    codec.export_segment(silence, tmp_path, format='mp3', bitrate='128k')
     return tmp_path
 
 
@@ -773,9 +754,13 @@ def merge_duet_audio(audio_paths, mode='alternate'):
     두 캐릭터 음성을 하나로 합치는 함수.
     mode='alternate' : TTS_A → 200ms 침묵 → TTS_B (교차 대화)
     mode='overlap'   : TTS_A + TTS_B 동시 재생 (합창/동시 대사)
+
+    입력이 모두 무손실(.wav/.flac)이면 결과도 무손실 중간 포맷으로 저장 (재인코딩 없음).
     """
     from pydub import AudioSegment
     import tempfile
+    from book import codec
+    from book.audio_engine import INTERMEDIATE_EXT, export_intermediate, is_lossless
 
     if not audio_paths:
         return None
@@ -783,7 +768,7 @@ def merge_duet_audio(audio_paths, mode='alternate'):
     segments = []
     for p in audio_paths:
         try:
-            seg = AudioSegment.from_file(p)
+            seg = codec.decode_segment(p)
             segments.append(seg)
         except Exception as e:
             print(f"⚠️ 듀엣 오디오 로드 실패: {p} — {e}")
@@ -818,10 +803,13 @@ def merge_duet_audio(audio_paths, mode='alternate'):
         for seg in segments[1:]:
             combined = combined + gap + seg
 
-    tmp = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+    lossless = all(is_lossless(p) for p in audio_paths)
+    tmp = tempfile.NamedTemporaryFile(suffix=INTERMEDIATE_EXT if lossless else '.mp3', delete=False)
     tmp_path = tmp.name
     tmp.close()
-    combined.export(tmp_path, format='mp3', bitrate='128k')
+    if lossless:
+        return export_intermediate(combined, tmp_path)
+    codec.export_segment(combined, tmp_path, format='mp3', bitrate='128k')
     return tmp_path
 
 
@@ -836,53 +824,38 @@ def apply_webaudio_effect(audio_path, effect_name):
 
     Returns:
         새로운 오디오 파일 경로 (effect가 적용된)
+        입력이 무손실(.wav/.flac)이면 결과도 무손실 중간 포맷 — 게시 단계에서만 인코딩
     """
+    from book import codec
+    from book.audio_engine import INTERMEDIATE_EXT, INTERMEDIATE_FORMAT, is_lossless
+
     if effect_name == "normal" or effect_name not in WEBAUDIO_PRESETS:
         return audio_path
 
-    preset = WEBAUDIO_PRESETS[effect_name]
     print(f"🎛️ WebAudio 효과 적용: {effect_name}")
 
     try:
-        # 오디오 로드
-        audio = AudioSegment.from_file(audio_path)
-        sample_rate = audio.frame_rate
-        channels = audio.channels
-
-        # numpy 배열로 변환 (float32, -1~1 범위)
-        samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
-        samples = samples / (2 ** 15)  # 16bit → float
-
-        # 스테레오면 모노로 처리 후 다시 스테레오로
-        if channels == 2:
-            left = samples[0::2]
-            right = samples[1::2]
-            # 양 채널에 동일 효과 적용
-            left = _process_channel(left, sample_rate, preset)
-            right = _process_channel(right, sample_rate, preset)
-            # 인터리브
-            samples = np.empty(len(left) + len(right), dtype=np.float32)
-            samples[0::2] = left
-            samples[1::2] = right
-        else:
-            samples = _process_channel(samples, sample_rate, preset)
+        # 오디오 로드 ((frames, channels) int16, 인프로세스 디코딩)
+        data, sample_rate = codec.decode(audio_path)
+
+        # (channels, frames) float32 배열로 변환 (-1~1 범위) — 모든 채널을 한 번에 처리
+        samples = np.ascontiguousarray(data.T, dtype=np.float32) / (2 ** 15)  # 16bit → float
+        del data
+        samples = apply_preset(samples, sample_rate, effect_name)
 
         # float → 16bit int로 변환
         samples = np.clip(samples, -1.0, 1.0)
         samples_int = (samples * (2 ** 15 - 1)).astype(np.int16)
 
-        # AudioSegment로 재조립
-        processed = AudioSegment(
-            data=samples_int.tobytes(),
-            sample_width=2,
-            frame_rate=sample_rate,
-            channels=channels
-        )
-
-        # 새 파일로 저장
-        output_filename = f"fx_{effect_name}_{uuid4().hex}.mp3"
-        output_path = os.path.join(settings.MEDIA_ROOT, 'audio', output_filename)
-        processed.export(output_path, format="mp3", bitrate="192k")
+        # 새 파일로 저장 (interleaved로 되돌려 인코딩)
+        if is_lossless(audio_path):
+            output_filename = f"fx_{effect_name}_{uuid4().hex}{INTERMEDIATE_EXT}"
+            output_path = os.path.join(settings.MEDIA_ROOT, 'audio', output_filename)
+            codec.encode(samples_int.T, sample_rate, output_path, format=INTERMEDIATE_FORMAT)
+        else:
+            output_filename = f"fx_{effect_name}_{uuid4().hex}.mp3"
+            output_path = os.path.join(settings.MEDIA_ROOT, 'audio', output_filename)
+            codec.encode(samples_int.T, sample_rate, output_path, format="mp3", bitrate="192k")
 
         print(f"✅ WebAudio 효과 적용 완료: {output_path}")
         return output_path
@@ -891,31 +864,3 @@ def apply_webaudio_effect(audio_path, effect_name):
         print(f"❌ WebAudio 효과 적용 오류 ({effect_name}): {e}")
         traceback.print_exc()
         return audio_path
-
-
-def _process_channel(samples, sample_rate, preset):
-    """단일 채널에 필터 + 딜레이 + 트레몰로 체인 적용"""
-    # 1. 필터 적용
-    filtered = _apply_biquad_filter(
-        samples, sample_rate,
-        preset["filter_type"],
-        preset["freq"],
-        preset["Q"]
-    )
-
-    # 2. 딜레이 적용
-    delayed = _apply_delay(
-        filtered, sample_rate,
-        preset["delay"],
-        preset["feedback"]
-    )
-
-    # 3. 트레몰로 적용
-    result = _apply_tremolo(
-        delayed, sample_rate,
-        preset["tremolo_rate"],
-        preset["tremolo_depth"]
-    )
-
-    return result
-
@@ -306,10 +306,9 @@ def book_serialization(request):
                     )
                 print(f"     : {content.audio_file.url}")
 
-                # 오디오 길이 계산 (pydub 사용)
-                from pydub import AudioSegment
-                audio_segment = AudioSegment.from_file(temp_path)
-                total_duration_ms = len(audio_segment)
+                # 오디오 길이 계산 (헤더 조회, 디코딩 없음)
+                from book.audio_probe import duration_ms
+                total_duration_ms = duration_ms(temp_path)
                 content.duration_seconds = int(total_duration_ms / 1000)
 
                 # 🔥 타임스탬프: 미리듣기에서 생성된 정확한 값 우선 사용
@@ -1254,7 +1253,7 @@ def content_detail(request, content_uuid):
 @login_required
 @require_POST
 def save_snippet(request, content_uuid):
-    import json as _json, os, tempfile
+    import json as _json
     from book.models import Content, BookSnippet
     from django.core.files.base import ContentFile
 
@@ -1280,24 +1279,17 @@ def save_snippet(request, content_uuid):
         link=request.build_absolute_uri(f'/book/content/{content_uuid}/'),
     )
 
-    # pydub 로 구간 클립
+    # 구간 클립 (MP3 프레임 복사 — 전체 디코딩/재인코딩 없음)
     if start_sec is not None and end_sec is not None and content.audio_file:
         try:
-            from pydub import AudioSegment
-            audio_path = content.audio_file.path
-            audio = AudioSegment.from_file(audio_path)
-            start_ms = int(float(start_sec) * 1000)
-            end_ms   = int(float(end_sec)   * 1000)
-            clip = audio[start_ms:end_ms]
-            buf = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-            clip.export(buf.name, format='mp3', bitrate='128k')
-            buf.close()
-            with open(buf.name, 'rb') as f:
+            from book.utils import clip_episode_audio
+            clip = clip_episode_audio(content.audio_file.path, start_sec, end_sec)
+            if clip:
+                start_ms = int(float(start_sec) * 1000)
                 snippet.audio_file.save(
                     f'snippet_{content_uuid}_{start_ms}.mp3',
-                    ContentFile(f.read()), save=False
+                    ContentFile(clip), save=False
                 )
-            os.unlink(buf.name)
         except Exception as e:
             print(f'[snippet clip error] {e}')
 
@@ -1871,6 +1863,26 @@ def preview_task_status(request, task_id):
     return JsonResponse(response)
 
 
+async def preview_task_stream(request, task_id):
+    """
+    미리듣기 병합 진행률 SSE 스트림 — PROGRESS는 preview_task_status와 같은 키,
+    SUCCESS/FAILURE는 state만 (오디오 데이터는 preview_task_status를 한 번 호출해 받음). 204면 폴링
+    """
+    from celery.result import AsyncResult
+    from book import progress_stream
+
+    def snapshot():
+        task = AsyncResult(task_id)
+        if task.state == 'PROGRESS':
+            info = task.info or {}
+            return {'state': task.state, 'status': info.get('status', ''), 'progress': info.get('progress', 0)}
+        if task.state == 'PENDING':
+            return {'state': task.state, 'status': '작업 대기 중...', 'progress': 0}
+        return {'state': task.state}
+
+    return await progress_stream.stream(request, task_id, snapshot)
+
+
 # book/views.py
 
 from django.shortcuts import render, get_object_or_404
@@ -3291,27 +3303,63 @@ def process_json_audiobook(request):
     if not steps:
         return JsonResponse({'error': 'steps가 비어있습니다'}, status=400)
 
+    book = None
     book_uuid = data.get('book_uuid', '')
     if book_uuid:
         book = Books.objects.filter(public_uuid=book_uuid, user=request.user).first()
         if not book:
             return JsonResponse({'error': f'책을 찾을 수 없습니다: {book_uuid}'}, status=404)
 
-    # Celery 태스크 시작
-    from book.tasks import process_batch_audiobook
-    task = process_batch_audiobook.delay(data, request.user.user_id)
+    # Celery 태스크 시작 — canvas: 에피소드/페이지를 워커 전체에 분산 (book.batch_canvas)
+    from book import batch_canvas
+    from book.batch_pipeline import BatchStepError
+    try:
+        task_id = batch_canvas.start(data, request.user, book).job_id
+    except BatchStepError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
     return JsonResponse({
         'success': True,
-        'task_id': task.id,
+        'task_id': task_id,
         'message': '오디오북 생성이 시작되었습니다'
     })
 
 
+# ==================== 배치 작업 재개 ====================
+@login_required
+@require_POST
+def audiobook_task_resume(request, task_id):
+    """
+    실패/중단된 배치 작업을 마지막 체크포인트부터 재개 (book.batch_checkpoints).
+    렌더된 페이지와 $bgm_N / $sfx_N 바인딩을 재사용하며, 같은 task_id로 계속 폴링.
+    """
+    from book import batch_canvas
+    from book.models import BatchJob
+
+    job = BatchJob.objects.filter(job_id=task_id, user=request.user).first()
+    if not job:
+        return JsonResponse({'error': '작업을 찾을 수 없습니다'}, status=404)
+    if not batch_canvas.resume(job):
+        return JsonResponse({'error': '재개할 수 없는 작업입니다 (완료되었거나 진행 중)'}, status=409)
+
+    return JsonResponse({
+        'success': True,
+        'task_id': job.job_id,
+        'message': '오디오북 생성을 재개합니다'
+    })
+
+
 # ==================== 태스크 상태 조회 ====================
 @login_required
 def audiobook_task_status(request, task_id):
     """Celery 태스크 진행률 조회 (프론트 폴링용)"""
+    from book import batch_canvas
+    from book.models import BatchJob
+
+    job = BatchJob.objects.filter(job_id=task_id, user=request.user).first()
+    if job:
+        return JsonResponse(batch_canvas.status_payload(job))
+
     from celery.result import AsyncResult
 
     result = AsyncResult(task_id)
@@ -3360,6 +3408,36 @@ def audiobook_task_status(request, task_id):
     return JsonResponse(response)
 
 
+@login_required
+async def audiobook_task_stream(request, task_id):
+    """
+    진행률 SSE 스트림 (book.progress_stream) — 메시지는 audiobook_task_status 응답과 동일.
+    204(WSGI/Redis 없음/BatchJob이 아닌 예전 태스크)면 프론트는 audiobook_task_status 폴링
+    """
+    from django.http import HttpResponse
+    from book import batch_canvas, progress_stream
+    from book.models import BatchJob
+
+    user = await request.auser()
+    jobs = BatchJob.objects.filter(job_id=task_id, user=user)
+    if not await jobs.aexists():
+        return HttpResponse(status=204)
+    return await progress_stream.stream(request, task_id, lambda: batch_canvas.status_payload(jobs.get()))
+
+
+@login_required
+def queue_metrics(request):
+    """관리자 전용: Celery 큐별 깊이 / 대기 시간 지표 (book.task_queues, 모니터링 수집용)"""
+    from book import task_queues
+
+    if not request.user.is_staff:
+        return HttpResponseForbidden()
+    try:
+        return JsonResponse({'queues': task_queues.metrics()})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=503)
+
+
 
 
 
@@ -3605,7 +3683,8 @@ def regenerate_page(request, content_uuid, page_number):
     webaudio = data.get('webaudio_effect', pa.webaudio_effect)
 
     try:
-        audio_path = generate_tts(text, voice_id, pa.language_code, speed, style, similarity)
+        # 재생성 = 새 테이크 → 캐시 조회 없이 생성 (캐시는 새 결과로 교체)
+        audio_path = generate_tts(text, voice_id, pa.language_code, speed, style, similarity, use_cache=False, lossless=True)
         if not audio_path:
             return JsonResponse({'success': False, 'error': 'TTS 생성 실패'}, status=500)
 
@@ -3621,10 +3700,7 @@ def regenerate_page(request, content_uuid, page_number):
         # 기존 파일 삭제 후 새 파일 저장
         if pa.audio_file:
             try:
-                old_path = pa.audio_file.path
-                pa.audio_file.delete(save=False)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+                pa.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
 
@@ -3690,11 +3766,13 @@ def save_page_text(request, content_uuid, page_number):
 @login_required
 @require_POST
 def remerge_episode(request, content_uuid):
-    """저장된 PageAudio들을 다시 병합하여 에피소드 오디오 갱신"""
+    """
+    저장된 PageAudio들을 다시 병합하여 에피소드 오디오 갱신
+    무손실 마스터(tts_audio_file)를 새로 만들고 게시용 MP3는 1회만 인코딩.
+    """
     from book.models import Content, PageAudio
-    from book.utils import merge_audio_files
+    from book.utils import merge_audio_files, publish_content_audio
     from django.core.files import File as DjangoFile
-    from pydub import AudioSegment
 
     content = get_object_or_404(Content, public_uuid=content_uuid, book__user=request.user, is_deleted=False)
     pages = list(PageAudio.objects.filter(content=content).order_by('page_number'))
@@ -3718,24 +3796,25 @@ def remerge_episode(request, content_uuid):
         return JsonResponse({'success': False, 'error': '오디오 파일이 없습니다'}, status=400)
 
     try:
-        merged_path, timestamps, _ = merge_audio_files(audio_paths, pages_text)
+        merged_path, timestamps, total_duration = merge_audio_files(audio_paths, pages_text, output_format='wav')
         if not merged_path or not os.path.exists(merged_path):
             return JsonResponse({'success': False, 'error': '병합 실패'}, status=500)
 
-        duration_seconds = int(len(AudioSegment.from_file(merged_path)) / 1000)
+        duration_seconds = int(total_duration)
 
-        if content.audio_file:
+        # 무손실 마스터 교체 (이후 BGM/SFX re-mix의 base)
+        if content.tts_audio_file:
             try:
-                old_path = content.audio_file.path
-                content.audio_file.delete(save=False)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+                content.tts_audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
-
         with open(merged_path, 'rb') as f:
-            content.audio_file.save(os.path.basename(merged_path), DjangoFile(f), save=True)
+            content.tts_audio_file.save(os.path.basename(merged_path), DjangoFile(f), save=True)
+
+        publish_content_audio(content, merged_path)
         content.audio_timestamps = timestamps
+        if content.mix_config and 'master_timestamps' in content.mix_config:
+            content.mix_config['master_timestamps'] = timestamps  # re-mix 기준 갱신
         content.duration_seconds = duration_seconds
         content.save()
 
@@ -3743,7 +3822,7 @@ def remerge_episode(request, content_uuid):
 
         return JsonResponse({
             'success': True,
-            'audio_url': content.audio_file.url,
+            'audio_url': reverse('book:stream_audio', args=[content.id]),
             'duration_seconds': duration_seconds,
         })
     except Exception as e:
@@ -3778,10 +3857,7 @@ def regenerate_sfx(request, content_uuid, sfx_id):
     try:
         if sfx_obj.audio_file:
             try:
-                old = sfx_obj.audio_file.path
-                sfx_obj.audio_file.delete(save=False)
-                if os.path.exists(old):
-                    os.remove(old)
+                sfx_obj.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
         with open(new_path, 'rb') as f:
@@ -3823,10 +3899,7 @@ def regenerate_bgm(request, content_uuid, bgm_id):
     try:
         if bgm_obj.audio_file:
             try:
-                old = bgm_obj.audio_file.path
-                bgm_obj.audio_file.delete(save=False)
-                if os.path.exists(old):
-                    os.remove(old)
+                bgm_obj.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
         with open(new_path, 'rb') as f:
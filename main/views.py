@@ -3,6 +3,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse, HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
+from django.urls import reverse
 import requests
 import json
 import os
@@ -200,7 +201,7 @@ def main(request):
                 'book_name': demo_book.name,
                 'ep_num': demo_content.number,
                 'ep_title': demo_content.title,
-                'audio_url': demo_content.audio_file.url,
+                'audio_url': reverse('book:stream_audio', args=[demo_content.id]),
                 'cover_url': demo_book.cover_img.url if demo_book.cover_img else '',
                 'content_uuid': demo_content.public_uuid,
                 'book_uuid': demo_book.public_uuid,
@@ -431,7 +432,7 @@ def filter_books_by_genre(request):
             'genres': [{'name': g.name, 'color': g.genres_color} for g in book.genres.all()],
             'contents_count': book.contents.count(),
             'score': float(book.book_score),
-            'audio_file': first_episode.audio_file.url if first_episode and first_episode.audio_file else None,
+            'audio_file': reverse('book:stream_audio', args=[first_episode.id]) if first_episode and first_episode.audio_file else None,
         })
 
     return JsonResponse({'books': books_data})
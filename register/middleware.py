@@ -21,10 +21,11 @@ class ProfileCompleteMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
+        # 경로 먼저 확인 → /api/ (서명된 미디어 URL 등)는 세션 사용자 조회(DB) 없이 통과
         if (
-            request.user.is_authenticated
+            not any(request.path.startswith(p) for p in SIGNUP_EXEMPT_PATHS)
+            and request.user.is_authenticated
             and not request.user.is_profile_completed
-            and not any(request.path.startswith(p) for p in SIGNUP_EXEMPT_PATHS)
         ):
             return redirect('/login/signup/')
         return self.get_response(request)
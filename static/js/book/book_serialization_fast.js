@@ -512,6 +512,7 @@ async function aiGenerate() {
 
 // ==================== JSON 실행 (Celery 비동기) ====================
 let pollingInterval = null;
+let taskStream = null;
 
 async function executeJSON() {
     // 블록 상태 → JSON 동기화 (최신 상태 보장)
@@ -594,96 +595,142 @@ try {
 
 // 폴링 중 페이지 이탈 경고
 window.addEventListener('beforeunload', function(e) {
-    if (pollingInterval) {
+    if (pollingInterval || taskStream) {
         e.preventDefault();
         e.returnValue = '오디오북 생성이 진행 중입니다. 페이지를 떠나시겠습니까?';
         return e.returnValue;
     }
 });
 
+// 진행률: SSE 푸시(json/task-stream) 우선, 스트림을 쓸 수 없으면(204/오류) 3초 폴링(json/task-status)
 function startPolling(taskId) {
-    if (pollingInterval) clearInterval(pollingInterval);
+    stopWatching();
+    if (!window.EventSource) {
+        startIntervalPolling(taskId);
+        return;
+    }
+    taskStream = new EventSource(`/book/json/task-stream/${taskId}/`);
+    taskStream.onmessage = (e) => handleTaskStatus(taskId, JSON.parse(e.data));
+    taskStream.onerror = () => {
+        // CLOSED: 204 또는 오류 응답 → 폴링으로 전환 (CONNECTING이면 EventSource가 스스로 재연결)
+        if (taskStream && taskStream.readyState === EventSource.CLOSED) {
+            taskStream = null;
+            startIntervalPolling(taskId);
+        }
+    };
+}
 
+function startIntervalPolling(taskId) {
     pollingInterval = setInterval(async () => {
         try {
             const response = await fetch(`/book/json/task-status/${taskId}/`);
-            const data = await response.json();
+            await handleTaskStatus(taskId, await response.json());
+        } catch (e) {
+            console.error('폴링 오류:', e);
+        }
+    }, 3000); // 3초마다 폴링
+}
 
-            if (data.state === 'PROGRESS') {
+function stopWatching() {
+    if (pollingInterval) clearInterval(pollingInterval);
+    pollingInterval = null;
+    if (taskStream) taskStream.close();
+    taskStream = null;
+}
+
+async function handleTaskStatus(taskId, data) {
+    if (data.state === 'PROGRESS') {
+        const loadingText = document.getElementById('loadingText');
+        const loadingDetail = document.getElementById('loadingDetail');
+        if (loadingText) loadingText.textContent = data.status || '처리 중...';
+        if (loadingDetail) {
+            const stepInfo = data.current_step && data.total_steps
+                ? `(${data.current_step}/${data.total_steps} 단계)`
+                : '';
+            loadingDetail.textContent = `${data.progress || 0}% 완료 ${stepInfo}`;
+        }
+    }
+    else if (data.state === 'SUCCESS') {
+        stopWatching();
+
+        if (data.success) {
+            const ep = data.episode || {};
+
+            // 에피소드 이미지 업로드 (파일이 선택된 경우)
+            const imageInput = document.getElementById('episodeImageInput');
+            if (imageInput && imageInput.files[0] && ep.number) {
                 const loadingText = document.getElementById('loadingText');
-                const loadingDetail = document.getElementById('loadingDetail');
-                if (loadingText) loadingText.textContent = data.status || '처리 중...';
-                if (loadingDetail) {
-                    const stepInfo = data.current_step && data.total_steps
-                        ? `(${data.current_step}/${data.total_steps} 단계)`
-                        : '';
-                    loadingDetail.textContent = `${data.progress || 0}% 완료 ${stepInfo}`;
-                }
-            }
-            else if (data.state === 'SUCCESS') {
-                clearInterval(pollingInterval);
-                pollingInterval = null;
-
-                if (data.success) {
-                    const ep = data.episode || {};
-
-                    // 에피소드 이미지 업로드 (파일이 선택된 경우)
-                    const imageInput = document.getElementById('episodeImageInput');
-                    if (imageInput && imageInput.files[0] && ep.number) {
-                        const loadingText = document.getElementById('loadingText');
-                        if (loadingText) loadingText.textContent = '에피소드 이미지 업로드 중...';
-
-                        const formData = new FormData();
-                        formData.append('episode_image', imageInput.files[0]);
-                        formData.append('episode_number', ep.number);
-
-                        try {
-                            await fetch(window.location.pathname, {
-                                method: 'POST',
-                                headers: { 'X-CSRFToken': getCookie('csrftoken') },
-                                body: formData
-                            });
-                        } catch (imgErr) {
-                            console.error('이미지 업로드 실패:', imgErr);
-                        }
-                    }
+                if (loadingText) loadingText.textContent = '에피소드 이미지 업로드 중...';
 
-                    hideLoading();
-                    if (data.warnings && data.warnings.length > 0) {
-                        const warnMsg = data.warnings.join('\n');
-                        showStatus(`⚠️ 일부 실패: ${data.warnings[0]}`, 'error');
-                        alert('⚠️ BGM/SFX 생성 실패 (TTS는 완료됨):\n\n' + warnMsg + '\n\nCelery 워커 로그를 확인하세요.');
-                    } else {
-                        showStatus(`✅ ${ep.title || '에피소드'} 생성 완료! (${ep.page_count || '?'}페이지)`, 'success');
-                    }
+                const formData = new FormData();
+                formData.append('episode_image', imageInput.files[0]);
+                formData.append('episode_number', ep.number);
 
-                    // 페이지 편집 패널 표시 (리다이렉트 대신)
-                    if (ep.content_uuid) {
-                        openPageEditor(ep.content_uuid, ep.title || '', bookId);
-                    } else if (data.redirect_url) {
-                        window.location.href = data.redirect_url;
-                    } else if (bookId) {
-                        window.location.href = `/book/detail/${bookId}/`;
-                    }
-                } else {
-                    hideLoading();
-                    showStatus('생성 실패: ' + (data.error || '알 수 없는 오류'), 'error');
-                    alert('오디오북 생성 실패:\n' + (data.error || '알 수 없는 오류'));
+                try {
+                    await fetch(window.location.pathname, {
+                        method: 'POST',
+                        headers: { 'X-CSRFToken': getCookie('csrftoken') },
+                        body: formData
+                    });
+                } catch (imgErr) {
+                    console.error('이미지 업로드 실패:', imgErr);
                 }
             }
-            else if (data.state === 'FAILURE') {
-                clearInterval(pollingInterval);
-                pollingInterval = null;
-                hideLoading();
-                showStatus('태스크 실패: ' + (data.error || ''), 'error');
-                alert('오디오북 생성 실패:\n' + (data.error || '알 수 없는 오류'));
+
+            hideLoading();
+            if (data.warnings && data.warnings.length > 0) {
+                const warnMsg = data.warnings.join('\n');
+                showStatus(`⚠️ 일부 실패: ${data.warnings[0]}`, 'error');
+                alert('⚠️ BGM/SFX 생성 실패 (TTS는 완료됨):\n\n' + warnMsg + '\n\nCelery 워커 로그를 확인하세요.');
+            } else {
+                showStatus(`✅ ${ep.title || '에피소드'} 생성 완료! (${ep.page_count || '?'}페이지)`, 'success');
             }
-            // PENDING → 계속 폴링
 
-        } catch (e) {
-            console.error('폴링 오류:', e);
+            // 페이지 편집 패널 표시 (리다이렉트 대신)
+            if (ep.content_uuid) {
+                openPageEditor(ep.content_uuid, ep.title || '', bookId);
+            } else if (data.redirect_url) {
+                window.location.href = data.redirect_url;
+            } else if (bookId) {
+                window.location.href = `/book/detail/${bookId}/`;
+            }
+        } else {
+            hideLoading();
+            showStatus('생성 실패: ' + (data.error || '알 수 없는 오류'), 'error');
+            offerResume(taskId, data.error);
         }
-    }, 3000); // 3초마다 폴링
+    }
+    else if (data.state === 'FAILURE') {
+        stopWatching();
+        hideLoading();
+        showStatus('태스크 실패: ' + (data.error || ''), 'error');
+        offerResume(taskId, data.error);
+    }
+    // PENDING → 계속 대기
+}
+
+// 실패한 작업 재개 — 완료된 단계/렌더된 페이지는 건너뜀 (TTS 재과금 없음)
+async function offerResume(taskId, error) {
+    const msg = '오디오북 생성 실패:\n' + (error || '알 수 없는 오류') +
+        '\n\n완료된 단계와 페이지는 저장되어 있습니다. 이어서 다시 시도할까요?';
+    if (!confirm(msg)) return;
+
+    try {
+        const response = await fetch(`/book/json/task-resume/${taskId}/`, {
+            method: 'POST',
+            headers: { 'X-CSRFToken': getCookie('csrftoken') }
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            showStatus('재개 실패: ' + (result.error || ''), 'error');
+            return;
+        }
+        showLoading('오디오북 생성 재개 중...', '완료된 단계는 건너뜁니다');
+        startPolling(result.task_id);
+    } catch (e) {
+        console.error('재개 오류:', e);
+        showStatus('재개 오류: ' + e.message, 'error');
+    }
 }
 
 // ==================== JSON 다운로드 ====================
@@ -0,0 +1,123 @@
+"""
+외부 API 비동기 작업 — 오래 걸리는 API(에피소드 생성/재생성, 페이지 재생성/등록)를 Celery로 실행
+- 뷰는 요청 검증만 하고 ApiJob 생성 → 202 {job_id, status_url} 즉시 응답 (gunicorn 워커 점유/프록시 타임아웃 없음)
+- 작업 본문은 @worker(kind)로 등록한 함수 (api_user, params, report) → 동기 응답의 data와 같은 dict
+  실패는 ApiJobError(message, status) — 동기 응답이었다면 반환했을 HTTP 상태를 http_status로 기록
+- 요청 본문에 "sync": true이고 작은 요청(페이지 API_SYNC_MAX_PAGES개 이하)이면 예전처럼 요청 안에서 실행 → 200
+- 결과 조회: GET /api/v1/jobs/<job_id>/ (api_views.api_job_status)
+"""
+import traceback
+from uuid import uuid4
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from book.api_utils import api_response
+
+WORKERS = {}  # kind → 작업 함수
+
+
+class ApiJobError(Exception):
+    """작업 실패 (message는 error로 그대로 응답, status는 동기 응답의 HTTP 상태)"""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def worker(kind):
+    def register(func):
+        WORKERS[kind] = func
+        return func
+    return register
+
+
+def _no_report(progress, status=''):
+    pass
+
+
+def _reporter(job_id):
+    """report(진행률 0~100, 상태 문구) → ApiJob 행 갱신"""
+    from book.models import ApiJob
+
+    def report(progress, status=''):
+        ApiJob.objects.filter(job_id=job_id, state__in=('PENDING', 'PROGRESS')).update(
+            state='PROGRESS', progress=min(99, int(progress)), status=status, updated_at=timezone.now())
+    return report
+
+
+def payload(job):
+    """작업 상태 응답 data (202 응답과 상태 조회 공용)"""
+    data = {
+        'job_id': job.job_id,
+        'kind': job.kind,
+        'state': job.state,
+        'progress': 100 if job.state == 'SUCCESS' else job.progress,
+        'status': job.status,
+        'status_url': reverse('api_job_status', args=[job.job_id]),
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.state == 'SUCCESS':
+        data['result'] = job.result
+    elif job.state == 'FAILURE':
+        data['error'] = job.error
+        data['http_status'] = job.http_status
+    return data
+
+
+def _queue(kind, user_id, size):
+    """단일 페이지 재생성/작은 등록은 regenerate 큐, 에피소드 단위 작업은 사용자의 bulk 샤드 (book.task_queues)"""
+    from book import task_queues
+
+    if kind == 'regenerate_page' or size <= getattr(settings, 'API_SYNC_MAX_PAGES', 3):
+        return task_queues.REGENERATE
+    return task_queues.bulk_queue(user_id)
+
+
+def submit(request, kind, params, size=1):
+    """
+    검증이 끝난 요청 실행 → 응답
+    - "sync": true + size <= API_SYNC_MAX_PAGES: 요청 안에서 실행 → 200 (기존 응답과 동일)
+    - 그 외: ApiJob 생성 + Celery → 202 (작업 상태 data)
+    """
+    if params.get('sync') and size <= getattr(settings, 'API_SYNC_MAX_PAGES', 3):
+        try:
+            return api_response(data=WORKERS[kind](request.api_user, params, _no_report))
+        except ApiJobError as e:
+            return api_response(error=e.message, status=e.status)
+
+    from book.models import ApiJob
+    from book.tasks import run_api_job
+
+    job = ApiJob.objects.create(
+        job_id=uuid4().hex, user=request.api_user, kind=kind, params=params, status='대기 중...')
+    run_api_job.apply_async((job.job_id,), queue=_queue(kind, request.api_user.pk, size))
+    print(f"📮 [API] 비동기 작업 등록: {kind} {job.job_id} (size={size})")
+    return api_response(data=payload(job), status=202)
+
+
+def run(job_id):
+    """Celery(run_api_job)에서 작업 실행 → 결과/오류를 ApiJob에 기록"""
+    import voxliber.api_views  # noqa: F401 — @worker 등록
+    from book.models import ApiJob
+
+    job = ApiJob.objects.select_related('user').get(job_id=job_id)
+    if job.state in ('SUCCESS', 'FAILURE'):
+        return job.state
+    ApiJob.objects.filter(pk=job.pk).update(state='PROGRESS', status='처리 중...')
+    fields = {}
+    try:
+        result = WORKERS[job.kind](job.user, job.params, _reporter(job_id))
+        fields.update(state='SUCCESS', progress=100, status='완료', result=result, http_status=200)
+    except ApiJobError as e:
+        fields.update(state='FAILURE', status='실패', error=e.message, http_status=e.status)
+    except Exception as e:
+        traceback.print_exc()
+        fields.update(state='FAILURE', status='실패', error=str(e), http_status=500)
+    fields['finished_at'] = timezone.now()
+    ApiJob.objects.filter(pk=job.pk).update(**fields)
+    print(f"{'✅' if fields['state'] == 'SUCCESS' else '❌'} [API] 비동기 작업 {job.kind} {job_id}: {fields['state']}")
+    return fields['state']
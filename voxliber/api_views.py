@@ -6,13 +6,13 @@ VOXLIBER 자동 오디오북 생성 API
 """
 import json
 import os
-import tempfile
 import traceback
 import random
 
 from django.db.models import Q
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
+from django.urls import reverse
 from django.core.files import File
 from django.core.files.base import ContentFile
 
@@ -21,7 +21,8 @@ from book.models import (
     SoundEffectLibrary, BackgroundMusicLibrary, BookSnap, PageAudio,
 )
 from book.api_utils import require_api_key_secure, api_response
-from book.utils import generate_tts, merge_audio_files, sound_effect, background_music, mix_audio_with_background
+from voxliber import api_jobs
+from book.utils import generate_tts, merge_audio_files, sound_effect, background_music, publish_content_audio
 
 
 # ==================== 1. 책 생성 API ====================
@@ -160,7 +161,10 @@ def api_create_episode(request):
         ]
     }
 
-    Returns:
+    "sync": true — 페이지 API_SYNC_MAX_PAGES개 이하일 때만 요청 안에서 실행 (아래 200 응답)
+    그 외에는 즉시 202 + 작업 정보 (voxliber.api_jobs) → GET /api/v1/jobs/<job_id>/의 result가 아래 data
+
+    Returns (sync):
     {
         "success": true,
         "data": {
@@ -180,6 +184,14 @@ def api_create_episode(request):
     except json.JSONDecodeError:
         return api_response(error="JSON 형식이 올바르지 않습니다.", status=400)
 
+    error = _validate_episode_request(request.api_user, data)
+    if error:
+        return error
+    return api_jobs.submit(request, 'create_episode', data, size=len(data["pages"]))
+
+
+def _validate_episode_request(api_user, data, replace=False):
+    """create/regenerate-episode 요청 검증 → 오류 응답 또는 None (replace면 같은 번호 에피소드 허용)"""
     book_uuid = data.get("book_uuid", "").strip()
     episode_number = data.get("episode_number")
     episode_title = data.get("episode_title", "").strip()
@@ -211,16 +223,36 @@ def api_create_episode(request):
             return api_response(error=f"페이지 {i+1}의 voice_id가 필요합니다.", status=400)
 
     # 책 조회 (본인 소유 확인)
-    book = Books.objects.filter(public_uuid=book_uuid, user=request.api_user, is_deleted=False).first()
+    book = Books.objects.filter(public_uuid=book_uuid, user=api_user, is_deleted=False).first()
     if not book:
         return api_response(error="책을 찾을 수 없거나 권한이 없습니다.", status=404)
 
     # 에피소드 번호 중복 체크
-    if Content.objects.filter(book=book, number=int(episode_number), is_deleted=False).exists():
+    if not replace and Content.objects.filter(book=book, number=int(episode_number), is_deleted=False).exists():
         return api_response(
             error=f"이미 {episode_number}화가 존재합니다.",
             status=409
         )
+    return None
+
+
+@api_jobs.worker('create_episode')
+def _create_episode_job(api_user, data, report, use_cache=True):
+    """
+    api_create_episode 본문: 페이지별 TTS → 병합 → 게시 → PageAudio (Celery 또는 sync 요청 안에서)
+    use_cache=False: 재생성 — TTS 캐시를 조회하지 않고 새 테이크 생성 (generate_tts)
+    """
+    book_uuid = data.get("book_uuid", "").strip()
+    episode_number = data.get("episode_number")
+    episode_title = data.get("episode_title", "").strip()
+    pages = data.get("pages", [])
+
+    book = Books.objects.filter(public_uuid=book_uuid, user=api_user, is_deleted=False).first()
+    if not book:
+        raise api_jobs.ApiJobError("책을 찾을 수 없거나 권한이 없습니다.", status=404)
+    # 대기 중에 같은 번호가 생겼을 수 있음
+    if Content.objects.filter(book=book, number=int(episode_number), is_deleted=False).exists():
+        raise api_jobs.ApiJobError(f"이미 {episode_number}화가 존재합니다.", status=409)
 
     try:
         # 전체 텍스트 합치기 (silence/voices 페이지는 빈 문자열)
@@ -242,12 +274,13 @@ def api_create_episode(request):
         page_infos = []  # PageAudio 저장용: (audio_path, page_number, text, voice_id, page_type, speed, style, sim)
 
         for i, page in enumerate(pages):
+            report(i * 90 / len(pages), f"TTS 생성 중: {i}/{len(pages)}")
             # ── 무음 페이지 ──────────────────────────────
             silence_seconds = page.get("silence_seconds")
             if silence_seconds is not None and float(silence_seconds) > 0:
                 try:
                     from book.utils import generate_silence
-                    silence_path = generate_silence(float(silence_seconds))
+                    silence_path = generate_silence(float(silence_seconds), lossless=True)
                     if silence_path and os.path.exists(silence_path):
                         audio_paths.append(silence_path)
                         pages_text.append('')
@@ -270,7 +303,7 @@ def api_create_episode(request):
                     if not v_text or not v_voice_id:
                         continue
                     try:
-                        v_tts = generate_tts(v_text, v_voice_id, "ko", 1.0, 0.0, 0.75)
+                        v_tts = generate_tts(v_text, v_voice_id, "ko", 1.0, 0.0, 0.75, use_cache=use_cache, lossless=True)
                         if v_tts:
                             v_path = v_tts if isinstance(v_tts, str) else v_tts.path
                             duet_paths.append(v_path)
@@ -314,6 +347,8 @@ def api_create_episode(request):
                 page_speed,
                 page_style,
                 page_similarity,
+                use_cache=use_cache,
+                lossless=True,
             )
 
             if audio_path and os.path.exists(audio_path):
@@ -332,32 +367,32 @@ def api_create_episode(request):
         timestamps = None
 
         if audio_paths:
-            # 3. 오디오 병합 (merge_audio_files)
+            # 3. 오디오 병합 (merge_audio_files) — 무손실 마스터, MP3 인코딩은 게시 시 1회
             print(f"🔀 [API] {len(audio_paths)}개 오디오 병합 중...")
-            merged_path, timestamps_info, _ = merge_audio_files(audio_paths, pages_text)
+            report(90, "오디오 병합 중...")
+            merged_path, timestamps_info, total_duration = merge_audio_files(audio_paths, pages_text, output_format='wav')
 
             if merged_path and os.path.exists(merged_path):
-                # 4. 병합된 오디오 저장
+                # 4. 무손실 마스터 저장 (re-mix base) + 게시용 MP3 인코딩
                 with open(merged_path, 'rb') as audio_file:
-                    content.audio_file.save(
+                    content.tts_audio_file.save(
                         os.path.basename(merged_path),
                         File(audio_file),
                         save=True
                     )
+                publish_content_audio(content, merged_path)
 
                 # 5. 타임스탬프 저장 (JSONField에 Python 객체 직접 저장 - json.dumps 불필요)
                 if timestamps_info:
                     content.audio_timestamps = timestamps_info
                     timestamps = timestamps_info
 
-                # 6. 오디오 길이 계산
-                from pydub import AudioSegment
-                audio_segment = AudioSegment.from_file(merged_path)
-                duration_seconds = int(len(audio_segment) / 1000)
+                # 6. 오디오 길이 (병합 시 계산된 값 사용)
+                duration_seconds = int(total_duration)
                 content.duration_seconds = duration_seconds
                 content.save()
 
-                audio_url = content.audio_file.url
+                audio_url = reverse('book:stream_audio', args=[content.id])
 
                 # 병합 파일 삭제
                 os.remove(merged_path)
@@ -399,7 +434,7 @@ def api_create_episode(request):
         else:
             print("⚠️ [API] 모든 페이지 TTS 생성 실패 - 에피소드는 저장됨 (오디오 없음)")
 
-        return api_response(data={
+        return {
             "content_uuid": str(content.public_uuid),
             "episode_number": content.number,
             "episode_title": content.title,
@@ -410,12 +445,12 @@ def api_create_episode(request):
             "timestamps": timestamps,
             "message": "에피소드가 생성되고 TTS 변환이 완료되었습니다." if audio_url
                        else "에피소드는 저장되었지만 TTS 변환에 실패했습니다."
-        })
+        }
 
     except Exception as e:
         print(f"❌ [API] 에피소드 생성 오류: {e}")
         traceback.print_exc()
-        return api_response(error=f"에피소드 생성 중 오류: {str(e)}", status=500)
+        raise api_jobs.ApiJobError(f"에피소드 생성 중 오류: {str(e)}", status=500)
 
 
 # ==================== 3. 음성 목록 API ====================
@@ -889,7 +924,8 @@ def api_regenerate_episode(request):
 
     POST /api/v1/regenerate-episode/
     Headers: X-API-Key: <your_api_key>
-    Body: api_create_episode와 동일 (book_uuid, episode_number, episode_title, pages)
+    Body: api_create_episode와 동일 (book_uuid, episode_number, episode_title, pages, sync)
+    응답도 api_create_episode와 동일 (기본 202 + 작업 정보)
     """
     try:
         data = json.loads(request.body)
@@ -902,9 +938,19 @@ def api_regenerate_episode(request):
     if not book_uuid or not episode_number:
         return api_response(error="book_uuid와 episode_number는 필수입니다.", status=400)
 
-    book = Books.objects.filter(public_uuid=book_uuid, user=request.api_user, is_deleted=False).first()
+    error = _validate_episode_request(request.api_user, data, replace=True)
+    if error:
+        return error
+    return api_jobs.submit(request, 'regenerate_episode', data, size=len(data["pages"]))
+
+
+@api_jobs.worker('regenerate_episode')
+def _regenerate_episode_job(api_user, data, report):
+    """기존 에피소드 soft delete → _create_episode_job (검증이 끝난 뒤라 잘못된 요청으로 에피소드가 사라지지 않음)"""
+    episode_number = data.get("episode_number")
+    book = Books.objects.filter(public_uuid=data.get("book_uuid", "").strip(), user=api_user, is_deleted=False).first()
     if not book:
-        return api_response(error="책을 찾을 수 없거나 권한이 없습니다.", status=404)
+        raise api_jobs.ApiJobError("책을 찾을 수 없거나 권한이 없습니다.", status=404)
 
     # 기존 에피소드 soft delete
     existing = Content.objects.filter(
@@ -916,8 +962,8 @@ def api_regenerate_episode(request):
         existing.save()
         print(f"🔄 [API] 기존 {episode_number}화 삭제 후 재생성 시작...")
 
-    # api_create_episode 로직 재사용
-    return api_create_episode(request)
+    # api_create_episode 로직 재사용 (재생성이므로 TTS 캐시 조회 없이 새 테이크)
+    return _create_episode_job(api_user, data, report, use_cache=False)
 
 
 # ==================== 14. 에피소드 + 배경음 믹싱 API ====================
@@ -946,20 +992,30 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
     """
     BGM + SFX 믹싱 실행 헬퍼.
     - content.tts_audio_file이 있으면 그것을 base로 사용 (re-mix 가능)
-    - 없으면 content.audio_file을 base로 사용하고 tts_audio_file에 백업
+    - 없으면 아직 믹싱되지 않은 content.audio_file만 base로 사용하고 tts_audio_file에 백업
+      (이미 믹싱된 오디오는 믹스가 겹치므로 거부 — book.batch_pipeline.mix_base_path)
     - bg_tracks: [{"music_id":N, "start_page":N, "end_page":N, "volume":0.3}, ...]
     - sfx_tracks: [{"effect_id":N, "page_number":N, "volume":0.7}, ...]
+    - 마스터 + BGM bed + SFX 오버레이를 EDL로 구성해 단일 패스 렌더링 (book.audio_engine.render_plan)
+      SFX 타임스탬프와 BGM 구간은 렌더러가 페이지 타임스탬프로 계산
+    - base/라이브러리 파일은 PCM 사이드카(book.pcm_cache)를 메모리 매핑해서 사용
+      → 볼륨/위치만 바꾸는 재믹싱은 디코딩 없이 합산 + MP3 인코딩 1회
+    - 설정된 렌디션(book.renditions — 모바일 저비트레이트 등)도 같은 렌더 패스에서 함께 인코딩
     반환: (result_data dict, error_str or None)
     """
     import math
-    from pydub import AudioSegment
+    from uuid import uuid4
+    from django.conf import settings
+    from book import pcm_cache, renditions
+    from book.audio_engine import master_sequence, render_plan
+    from book.batch_pipeline import mix_base_path
 
     # 원본 TTS 오디오 결정 (tts_audio_file 우선)
-    if content.tts_audio_file:
-        base_audio_path = content.tts_audio_file.path
-    else:
+    base_audio_path = mix_base_path(content)
+    if base_audio_path is None:
+        return None, "원본 TTS 오디오가 없고 이미 믹싱된 에피소드라 다시 믹싱할 수 없습니다. 에피소드를 재생성해 주세요."
+    if not content.tts_audio_file:
         # 최초 믹싱: 현재 audio_file을 tts_audio_file로 백업
-        base_audio_path = content.audio_file.path
         with open(base_audio_path, 'rb') as f:
             import os as _os
             content.tts_audio_file.save(
@@ -972,9 +1028,12 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
     timestamps = content.audio_timestamps or []
     if isinstance(timestamps, str):
         timestamps = json.loads(timestamps)
+    # 마스터 기준 페이지 타임스탬프 (배치 mix_bgm의 SFX 삽입으로 밀린 값이 아닌 원본)
+    master_ts = (content.mix_config or {}).get('master_timestamps') or \
+        [t for t in timestamps if t.get('type') != 'sfx']
+    page_count = len(master_ts)
 
-    background_tracks_info = []
-    temp_files = []
+    beds = []
     new_bgm_config = []
     new_sfx_config = []
 
@@ -982,7 +1041,7 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
     for track in bg_tracks:
         music_id = track.get("music_id")
         start_page = track.get("start_page", 0)
-        end_page = track.get("end_page", len(timestamps) - 1 if timestamps else 0)
+        end_page = track.get("end_page", page_count - 1 if page_count else 0)
         volume = track.get("volume", 0.3)
 
         bg_music = BackgroundMusicLibrary.objects.filter(id=music_id, user=api_user).first()
@@ -990,27 +1049,15 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
             print(f"⚠️ [MIX] BGM {music_id} 없음, 건너뜀")
             continue
 
-        start_time = 0
-        end_time = (content.duration_seconds or 0) * 1000
-        if timestamps:
-            if start_page > 0 and start_page - 1 < len(timestamps):
-                start_time = timestamps[start_page - 1].get("endTime", 0)
-            if end_page < len(timestamps):
-                end_time = timestamps[end_page].get("endTime", end_time)
-
-        volume_db = 20 * math.log10(max(volume, 0.01))
-
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
-            tmp.write(bg_music.audio_file.read())
-            temp_path = tmp.name
-            temp_files.append(temp_path)
-
-        background_tracks_info.append({
-            'audioPath': temp_path,
-            'startTime': start_time,
-            'endTime': end_time,
-            'volume': volume_db,
-        })
+        bed = {
+            'path': bg_music.audio_file.path,
+            'gain_db': 20 * math.log10(max(volume, 0.01)),
+            'start_page': start_page if start_page - 1 < page_count else 0,
+            'fade_ms': 500,
+        }
+        if 0 <= end_page < page_count:
+            bed['end_page'] = end_page  # 범위 밖이면 에피소드 끝까지
+        beds.append(bed)
         new_bgm_config.append({
             'id': music_id,
             'name': bg_music.music_name,
@@ -1020,8 +1067,7 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
             'end_page': end_page,
         })
 
-    # SFX 트랙 처리
-    sfx_timestamp_entries = []
+    # SFX 트랙 처리 (해당 페이지 시작 지점에 오버레이)
     for sfx in sfx_tracks:
         effect_id = sfx.get("effect_id")
         page = sfx.get("page_number") or sfx.get("page") or 1
@@ -1032,34 +1078,18 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
             print(f"⚠️ [MIX] SFX {effect_id} 없음, 건너뜀")
             continue
 
-        start_time = 0
-        if timestamps and 0 <= page - 1 < len(timestamps):
-            start_time = timestamps[page - 1].get("startTime", 0)
-
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
-            tmp.write(sfx_obj.audio_file.read())
-            temp_path = tmp.name
-            temp_files.append(temp_path)
-
-        sfx_audio = AudioSegment.from_file(temp_path)
-        sfx_duration = len(sfx_audio)
-        end_time = start_time + sfx_duration
-        volume_db = 20 * math.log10(max(volume, 0.01))
-
-        background_tracks_info.append({
-            'audioPath': temp_path,
-            'startTime': start_time,
-            'endTime': end_time,
-            'volume': volume_db,
-        })
-        sfx_timestamp_entries.append({
-            'pageIndex': -1,
-            'startTime': int(start_time),
-            'endTime': int(end_time),
-            'text': '',
-            'type': 'sfx',
-            'effectName': sfx_obj.effect_name,
-        })
+        bed = {
+            'path': sfx_obj.audio_file.path,
+            'gain_db': 20 * math.log10(max(volume, 0.01)),
+            'loop': False,
+            'fade_ms': 500,
+            'timestamp': {'pageIndex': -1, 'text': '', 'type': 'sfx', 'effectName': sfx_obj.effect_name},
+        }
+        if 0 <= page - 1 < page_count:
+            bed['at_page'] = page - 1
+        else:
+            bed['start_ms'] = 0
+        beds.append(bed)
         new_sfx_config.append({
             'id': effect_id,
             'name': sfx_obj.effect_name,
@@ -1067,40 +1097,43 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
             'volume': volume,
             'page_number': page,
         })
-        print(f"🔊 [MIX] SFX '{sfx_obj.effect_name}' → {start_time}ms~{end_time}ms ({volume_db:.1f}dB)")
+        print(f"🔊 [MIX] SFX '{sfx_obj.effect_name}' → 페이지 {page} ({bed['gain_db']:.1f}dB)")
 
-    if not background_tracks_info:
+    if not beds:
         return None, "유효한 BGM/SFX 트랙이 없습니다."
 
     print(f"🎼 [MIX] 믹싱 실행: BGM {len(new_bgm_config)}개 + SFX {len(new_sfx_config)}개")
-    mixed_path = mix_audio_with_background(base_audio_path, background_tracks_info)
-
-    for tmp_path in temp_files:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
-    if not mixed_path or mixed_path == base_audio_path:
-        return None, "믹싱에 실패했습니다."
+    mixed_path = os.path.join(settings.MEDIA_ROOT, 'audio', f'mixed_{uuid4().hex}.mp3')
+    rendition_outs = renditions.outputs('mixed')
+    try:
+        new_ts, total_ms = render_plan({
+            'sequence': master_sequence(base_audio_path, master_ts),
+            'beds': beds,
+        }, mixed_path, source_loader=pcm_cache.load if pcm_cache.is_enabled() else None,
+            renditions=renditions.encoder_targets(rendition_outs))
+    except Exception as e:
+        traceback.print_exc()
+        renditions.discard(rendition_outs)
+        return None, f"믹싱에 실패했습니다: {e}"
 
     try:
         with open(mixed_path, 'rb') as f:
-            content.audio_file.save(os.path.basename(mixed_path), File(f), save=True)
+            content.audio_file.save(os.path.basename(mixed_path), File(f), save=False)
 
-        audio_segment = AudioSegment.from_file(mixed_path)
-        content.duration_seconds = int(len(audio_segment) / 1000)
+        content.duration_seconds = int(total_ms / 1000)
 
-        # SFX 타임스탬프 업데이트
-        if sfx_timestamp_entries and timestamps:
-            clean_ts = [t for t in timestamps if t.get('type') != 'sfx']
-            merged_ts = sorted(clean_ts + sfx_timestamp_entries, key=lambda x: x.get('startTime', 0))
-            content.audio_timestamps = merged_ts
+        # 페이지 + SFX 타임스탬프 (렌더러가 계산)
+        if master_ts:
+            content.audio_timestamps = new_ts
 
         # mix_config 저장
         content.mix_config = {
             'bgm': new_bgm_config,
             'sfx': new_sfx_config,
+            'master_timestamps': master_ts,
         }
-        content.save()
+        content.save()  # 오디오 파일 + 길이/타임스탬프/mix_config 1회 저장
+        renditions.save(content, rendition_outs)
 
         os.remove(mixed_path)
         print(f"✅ [MIX] 완료: {content.duration_seconds}초")
@@ -1108,7 +1141,7 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
         return {
             "content_uuid": str(content.public_uuid),
             "episode_number": content.number,
-            "audio_url": content.audio_file.url,
+            "audio_url": reverse('book:stream_audio', args=[content.id]),
             "duration_seconds": content.duration_seconds,
             "mix_config": content.mix_config,
         }, None
@@ -1116,6 +1149,7 @@ def _do_episode_mix(content, bg_tracks, sfx_tracks, api_user):
     except Exception as e:
         if os.path.exists(mixed_path):
             os.remove(mixed_path)
+        renditions.discard(rendition_outs)
         raise
 
 
@@ -1876,6 +1910,7 @@ def api_regenerate_page(request):
         "speed_value": 1.0,      (선택, 기존값 유지)
         "style_value": 0.85,     (선택)
         "similarity_value": 0.75 (선택)
+        "sync": true             (선택, 요청 안에서 실행 → 200. 기본은 202 + 작업 정보)
     }
     """
     try:
@@ -1891,31 +1926,47 @@ def api_regenerate_page(request):
     if not content_uuid or page_number is None or not text or not voice_id:
         return api_response(error="content_uuid, page_number, text, voice_id는 필수입니다.", status=400)
 
+    try:
+        _find_page(request.api_user, content_uuid, page_number)
+    except api_jobs.ApiJobError as e:
+        return api_response(error=e.message, status=e.status)
+    return api_jobs.submit(request, 'regenerate_page', data)
+
+
+def _find_page(api_user, content_uuid, page_number):
     content = Content.objects.filter(
-        public_uuid=content_uuid, book__user=request.api_user, is_deleted=False
+        public_uuid=content_uuid, book__user=api_user, is_deleted=False
     ).first()
     if not content:
-        return api_response(error="에피소드를 찾을 수 없거나 권한이 없습니다.", status=404)
+        raise api_jobs.ApiJobError("에피소드를 찾을 수 없거나 권한이 없습니다.", status=404)
 
     pa = PageAudio.objects.filter(content=content, page_number=int(page_number)).first()
     if not pa:
-        return api_response(error=f"페이지 {page_number}을 찾을 수 없습니다.", status=404)
+        raise api_jobs.ApiJobError(f"페이지 {page_number}을 찾을 수 없습니다.", status=404)
+    return pa
+
+
+@api_jobs.worker('regenerate_page')
+def _regenerate_page_job(api_user, data, report):
+    """api_regenerate_page 본문: TTS 1회 → PageAudio 교체"""
+    page_number = data.get("page_number")
+    text = data.get("text", "").strip()
+    voice_id = data.get("voice_id", "").strip()
+    pa = _find_page(api_user, data.get("content_uuid", "").strip(), page_number)
 
     speed = float(data.get("speed_value", pa.speed_value))
     style = float(data.get("style_value", pa.style_value))
     similarity = float(data.get("similarity_value", pa.similarity_value))
 
     try:
-        audio_path = generate_tts(text, voice_id, pa.language_code, speed, style, similarity)
+        report(10, "TTS 생성 중...")
+        audio_path = generate_tts(text, voice_id, pa.language_code, speed, style, similarity, use_cache=False, lossless=True)
         if not audio_path:
-            return api_response(error="TTS 생성 실패", status=500)
+            raise api_jobs.ApiJobError("TTS 생성 실패", status=500)
 
         if pa.audio_file:
             try:
-                old_path = pa.audio_file.path
-                pa.audio_file.delete(save=False)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+                pa.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
 
@@ -1930,14 +1981,16 @@ def api_regenerate_page(request):
             os.remove(audio_path)
 
         print(f"✅ [API] 페이지 {page_number} TTS 재생성 완료")
-        return api_response(data={
+        return {
             "page_number": int(page_number),
             "audio_url": pa.audio_file.url,
             "message": f"페이지 {page_number} TTS 재생성 완료"
-        })
+        }
+    except api_jobs.ApiJobError:
+        raise
     except Exception as e:
         traceback.print_exc()
-        return api_response(error=f"TTS 재생성 오류: {str(e)}", status=500)
+        raise api_jobs.ApiJobError(f"TTS 재생성 오류: {str(e)}", status=500)
 
 
 @require_api_key_secure
@@ -1960,7 +2013,8 @@ def api_register_pages(request):
             {"text": "[formal] 대사", "voice_id": "9BWts...", "webaudio_effect": "normal"},
             {"silence_seconds": 1.0},
             {"voices": [{"text": "A 대사", "voice_id": "..."}, {"text": "B 대사", "voice_id": "..."}]}
-        ]
+        ],
+        "sync": true   // 선택 — 페이지 API_SYNC_MAX_PAGES개 이하일 때만 요청 안에서 실행 (기본 202 + 작업 정보)
     }
     """
     try:
@@ -1972,29 +2026,47 @@ def api_register_pages(request):
     if not pages_input:
         return api_response(error="pages 배열이 필요합니다.", status=400)
 
+    try:
+        _find_register_content(request.api_user, data)
+    except api_jobs.ApiJobError as e:
+        return api_response(error=e.message, status=e.status)
+    return api_jobs.submit(request, 'register_pages', data, size=len(pages_input))
+
+
+def _find_register_content(api_user, data):
     content_uuid = data.get("content_uuid", "").strip()
     book_uuid = data.get("book_uuid", "").strip()
     episode_number = data.get("episode_number")
 
     if content_uuid:
         content = Content.objects.filter(
-            public_uuid=content_uuid, book__user=request.api_user, is_deleted=False
+            public_uuid=content_uuid, book__user=api_user, is_deleted=False
         ).first()
     elif book_uuid and episode_number is not None:
-        book = Books.objects.filter(public_uuid=book_uuid, user=request.api_user, is_deleted=False).first()
+        book = Books.objects.filter(public_uuid=book_uuid, user=api_user, is_deleted=False).first()
         if not book:
-            return api_response(error="책을 찾을 수 없거나 권한이 없습니다.", status=404)
+            raise api_jobs.ApiJobError("책을 찾을 수 없거나 권한이 없습니다.", status=404)
         content = Content.objects.filter(book=book, number=int(episode_number), is_deleted=False).first()
     else:
-        return api_response(error="content_uuid 또는 book_uuid+episode_number가 필요합니다.", status=400)
+        raise api_jobs.ApiJobError("content_uuid 또는 book_uuid+episode_number가 필요합니다.", status=400)
 
     if not content:
-        return api_response(error="에피소드를 찾을 수 없습니다.", status=404)
+        raise api_jobs.ApiJobError("에피소드를 찾을 수 없습니다.", status=404)
+    return content
+
+
+@api_jobs.worker('register_pages')
+def _register_pages_job(api_user, data, report):
+    """api_register_pages 본문: 페이지마다 PageAudio 생성/수정"""
+    pages_input = data.get("pages", [])
+    content = _find_register_content(api_user, data)
 
     created, updated = 0, 0
     page_num = 0
     for page in pages_input:
         page_num += 1
+        if page_num % 20 == 0:
+            report(page_num * 100 / len(pages_input), f"페이지 등록 중: {page_num}/{len(pages_input)}")
 
         # 페이지 타입 결정
         if page.get("silence_seconds") is not None:
@@ -2044,13 +2116,42 @@ def api_register_pages(request):
             created += 1
 
     print(f"✅ [API] register-pages: created={created} updated={updated} total={page_num}")
-    return api_response(data={
+    return {
         "content_uuid": str(content.public_uuid),
         "total_pages": page_num,
         "created": created,
         "updated": updated,
         "message": f"PageAudio 등록 완료 ({created}개 생성, {updated}개 업데이트)"
-    })
+    }
+
+
+@require_api_key_secure
+@require_http_methods(["GET"])
+def api_job_status(request, job_id):
+    """
+    비동기 작업 상태/결과 조회 API (create-episode, regenerate-episode, regenerate-page, register-pages의 202 응답)
+
+    GET /api/v1/jobs/<job_id>/
+    Headers: X-API-Key: <your_api_key>
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "job_id": "...", "kind": "create_episode",
+            "state": "PENDING | PROGRESS | SUCCESS | FAILURE",
+            "progress": 45, "status": "TTS 생성 중: 9/20",
+            "result": {...},                      // SUCCESS — 동기 응답의 data와 동일
+            "error": "...", "http_status": 409    // FAILURE
+        }
+    }
+    """
+    from book.models import ApiJob
+
+    job = ApiJob.objects.filter(job_id=job_id, user=request.api_user).first()
+    if not job:
+        return api_response(error="작업을 찾을 수 없습니다.", status=404)
+    return api_response(data=api_jobs.payload(job))
 
 
 @require_api_key_secure
@@ -2091,10 +2192,7 @@ def api_regenerate_sfx(request):
 
         if sfx_obj.audio_file:
             try:
-                old = sfx_obj.audio_file.path
-                sfx_obj.audio_file.delete(save=False)
-                if os.path.exists(old):
-                    os.remove(old)
+                sfx_obj.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
 
@@ -2155,10 +2253,7 @@ def api_regenerate_bgm(request):
 
         if bgm_obj.audio_file:
             try:
-                old = bgm_obj.audio_file.path
-                bgm_obj.audio_file.delete(save=False)
-                if os.path.exists(old):
-                    os.remove(old)
+                bgm_obj.audio_file.delete(save=False)  # blob은 참조 수로 관리 (book.blobs.sweep이 삭제)
             except Exception:
                 pass
 
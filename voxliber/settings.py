@@ -66,6 +66,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "main.tasks.sync_notion_task",
         "schedule": crontab(hour=3, minute=0, day_of_week=1),  # 매주 월요일 새벽 3시
     },
+    "sweep-media-store-daily": {
+        "task": "book.tasks.sweep_media_store",
+        "schedule": crontab(hour=4, minute=30),  # 매일 새벽 4시 30분 (참조 없는 blob/임시 파일 정리)
+    },
 }
 
 
@@ -126,6 +130,83 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/0"
 CELERY_TIMEZONE = "Asia/Seoul"
 CELERY_RESULT_EXPIRES = 3600  # 결과를 1시간 동안 보관
+# 큐 라우팅 (book/task_queues.py) — interactive / regenerate / bulk.<N> / maintenance, 큐별로 워커를 따로 실행
+CELERY_TASK_ROUTES = ('book.task_queues.route',)
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # 워커가 메시지를 미리 쌓아 두지 않음 → bulk 샤드 간 공정성 유지
+# bulk 큐 샤드 수 — 사용자별로 한 샤드에 고정, 워커가 샤드를 돌아가며 소비 (bulk 워커의 -Q와 같아야 함)
+BULK_QUEUE_SHARDS = int(os.getenv('BULK_QUEUE_SHARDS', '8'))
+
+# 배치 에피소드 생성 시 페이지 TTS 동시 요청 수 (ElevenLabs 요금제 동시성 한도 이하로 설정)
+TTS_MAX_CONCURRENCY = int(os.getenv('TTS_MAX_CONCURRENCY', '4'))
+# ElevenLabs 클라이언트 (book/tts_client.py) — 모든 워커가 공유하는 Redis 토큰 버킷 (요금제 요청 한도 이하로 설정)
+TTS_RATE_PER_SECOND = float(os.getenv('TTS_RATE_PER_SECOND', '4'))  # 0이면 한도 없음
+TTS_RATE_BURST = int(os.getenv('TTS_RATE_BURST', '8'))
+TTS_POOL_CONNECTIONS = int(os.getenv('TTS_POOL_CONNECTIONS', '16'))  # 프로세스당 keep-alive 연결 수
+TTS_REQUEST_DEADLINE = float(os.getenv('TTS_REQUEST_DEADLINE', '120'))  # 요청당 마감(초, 한도 대기 + 재시도 포함)
+TTS_ATTEMPT_TIMEOUT = float(os.getenv('TTS_ATTEMPT_TIMEOUT', '60'))  # 시도 1회 응답 대기(초)
+TTS_GENERATION_TIMEOUT = float(os.getenv('TTS_GENERATION_TIMEOUT', '300'))  # SFX/BGM 생성 시도 1회 응답 대기(초, 응답 대기 타임아웃은 재시도 안 함)
+TTS_MAX_RETRIES = int(os.getenv('TTS_MAX_RETRIES', '4'))  # 429/5xx/연결 오류 재시도 횟수
+# 차단기: 연속 실패가 이 횟수면 TTS_BREAKER_RESET_SECONDS 동안 요청 없이 바로 실패 (장애 중 워커/과금 보호)
+TTS_BREAKER_THRESHOLD = int(os.getenv('TTS_BREAKER_THRESHOLD', '5'))
+TTS_BREAKER_RESET_SECONDS = float(os.getenv('TTS_BREAKER_RESET_SECONDS', '30'))
+
+# 배치 JSON을 Celery canvas로 분산 실행 (book/batch_canvas.py) — False면 단일 워커 process_batch_audiobook
+BATCH_CANVAS_ENABLED = os.getenv('BATCH_CANVAS_ENABLED', 'True') == 'True'
+# 배치 체크포인트 (book/batch_checkpoints.py) — 진행 기록이 이 시간 넘게 없으면 중단된 것으로 보고 재개 허용
+BATCH_RESUME_STALE_MINUTES = int(os.getenv('BATCH_RESUME_STALE_MINUTES', '15'))
+# 재개되지 않은 실패 작업의 체크포인트(렌더된 페이지 임시 파일 포함) 보관 시간
+BATCH_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv('BATCH_CHECKPOINT_MAX_AGE_HOURS', '72'))
+
+# 외부 API(create-episode 등)는 기본 비동기(202 + job_id). "sync": true는 페이지가 이 개수 이하일 때만 요청 안에서 실행
+API_SYNC_MAX_PAGES = int(os.getenv('API_SYNC_MAX_PAGES', '3'))
+
+# 작업 진행률 SSE 푸시 (book/progress_stream.py) — 워커가 Redis pub/sub으로 발행, ASGI 서버에서만 스트리밍 (그 외는 폴링)
+PROGRESS_STREAM_ENABLED = os.getenv('PROGRESS_STREAM_ENABLED', 'True') == 'True'
+PROGRESS_REDIS_URL = os.getenv('PROGRESS_REDIS_URL') or CELERY_BROKER_URL
+PROGRESS_STREAM_MAX_SECONDS = int(os.getenv('PROGRESS_STREAM_MAX_SECONDS', '600'))  # 연결 최대 유지 시간 (이후 브라우저가 재연결)
+
+# TTS 렌더 캐시 (book/tts_cache.py) — 동일 대사/보이스/설정 재합성 방지
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', 'True') == 'True'
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', str(BASE_DIR / 'cache' / 'tts'))
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
+# 에피소드 파이프라인 페이지를 ElevenLabs에서 PCM(pcm_44100)으로 직접 받음 (MP3 디코딩 생략, 요금제 지원 필요)
+TTS_REQUEST_PCM = os.getenv('TTS_REQUEST_PCM', 'False') == 'True'
+
+# 재믹싱용 PCM 사이드카 캐시 (book/pcm_cache.py) — 믹싱 base/BGM/SFX 디코딩 결과를 메모리 매핑으로 재사용
+PCM_CACHE_ENABLED = os.getenv('PCM_CACHE_ENABLED', 'True') == 'True'
+PCM_CACHE_DIR = os.getenv('PCM_CACHE_DIR', str(BASE_DIR / 'cache' / 'pcm'))
+PCM_CACHE_MAX_BYTES = int(os.getenv('PCM_CACHE_MAX_MB', '8192')) * 1024 * 1024
+
+# 오디오 코덱 (book/codec.py) — 'auto': libsndfile 인프로세스 디코딩/인코딩, 'pydub': 항상 ffmpeg 프로세스 사용
+AUDIO_CODEC_BACKEND = os.getenv('AUDIO_CODEC_BACKEND', 'auto')
+# MP3 인코더 — 'ffmpeg': 출력 파일당 ffmpeg 1개(파이프, 더 빠름), 'soundfile': 인프로세스 LAME (ffmpeg 없는 환경)
+AUDIO_CODEC_MP3_ENCODER = os.getenv('AUDIO_CODEC_MP3_ENCODER', 'ffmpeg')
+
+# 에피소드 오디오 렌디션 (book/renditions.py) — "이름:포맷(mp3|opus|m4a):비트레이트[:채널]" 쉼표 구분, 비우면 standard만
+# standard(128k MP3)는 Content.audio_file. 렌더/게시 인코딩 시 같은 PCM에서 함께 기록
+AUDIO_RENDITIONS = os.getenv('AUDIO_RENDITIONS', 'low:mp3:48k:1,medium:mp3:96k')
+
+# HLS 패키징 (book/hls.py) — 게시된 MP3를 세그먼트 + m3u8로 오디오 옆 '<파일명>.hls/'에 기록 (서명 URL로 제공, CDN 캐시용)
+AUDIO_HLS_ENABLED = os.getenv('AUDIO_HLS_ENABLED', 'False') == 'True'
+AUDIO_HLS_SEGMENT_SECONDS = float(os.getenv('AUDIO_HLS_SEGMENT_SECONDS', '6'))
+
+# 미디어 전송 (book/media_delivery.py) — 'sendfile': Django가 Range 처리 후 os.sendfile(gunicorn file_wrapper),
+# 'accel': 권한 확인 후 nginx X-Accel-Redirect (MEDIA_ACCEL_PREFIX는 nginx internal location)
+MEDIA_DELIVERY = os.getenv('MEDIA_DELIVERY', 'sendfile')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# 구독 전용 회차: True면 MEDIA_FREE_EPISODES화 이후 에피소드 오디오는 구독 중인 사용자만
+MEDIA_SUBSCRIPTION_REQUIRED = os.getenv('MEDIA_SUBSCRIPTION_REQUIRED', 'False') == 'True'
+MEDIA_FREE_EPISODES = int(os.getenv('MEDIA_FREE_EPISODES', '1'))
+
+# 서명된 만료 미디어 URL (book/media_signing.py) — 비우면 SECRET_KEY에서 파생
+MEDIA_SIGNING_KEY = os.getenv('MEDIA_SIGNING_KEY', '')
+MEDIA_SIGNED_URL_TTL = int(os.getenv('MEDIA_SIGNED_URL_TTL', str(6 * 3600)))  # 유효 시간(초)
+MEDIA_SIGNED_URL_BUCKET = 600  # 만료 시각 올림 단위(초) — 같은 구간 발급 URL 동일 → 캐시 재사용
+
+# 중복 제거 blob 저장소 (book/blobs.py) — 참조 수 0이 된 blob은 유예 시간 뒤 삭제, MEDIA_ROOT/audio 임시 파일 보관 시간
+BLOB_SWEEP_GRACE_HOURS = float(os.getenv('BLOB_SWEEP_GRACE_HOURS', '24'))
+MEDIA_SCRATCH_MAX_AGE_HOURS = float(os.getenv('MEDIA_SCRATCH_MAX_AGE_HOURS', '24'))
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS - 최상단에 위치
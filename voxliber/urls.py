@@ -24,6 +24,7 @@ from django.contrib.sitemaps.views import sitemap
 from book.sitemaps import BookSitemap, StaticViewSitemap
 from django.http import FileResponse
 from voxliber import api_views as voxliber_api
+from book.audio_streaming import signed_media
 import os
 from book.admin import EpisodeRankingView, ListeningStatsView, ListeningCalendarView, SnapStatsView
 from register.admin import VisitStatsView
@@ -67,6 +68,9 @@ urlpatterns = [
     path("sitemap.xml", sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
     path('naver68afd1621fdbfa5d1c2dc3728aa152e8.html', TemplateView.as_view(template_name='naver68afd1621fdbfa5d1c2dc3728aa152e8.html')),
 
+    # 서명된 만료 미디어 URL (DB 조회 없이 HMAC 검증 → sendfile/X-Accel-Redirect)
+    path("api/media/<int:expires>/<slug:tier>/<str:sig>/<path:path>", signed_media, name="signed_media"),
+
     # ==================== 자동 오디오북 생성 API ====================
     # 기본 CRUD
     path("api/v1/create-book/", voxliber_api.api_create_book, name="api_create_book"),
@@ -76,6 +80,7 @@ urlpatterns = [
     path("api/v1/episode-detail/", voxliber_api.api_episode_detail, name="api_episode_detail"),
     path("api/v1/regenerate-page/", voxliber_api.api_regenerate_page, name="api_regenerate_page"),
     path("api/v1/register-pages/", voxliber_api.api_register_pages, name="api_register_pages"),
+    path("api/v1/jobs/<str:job_id>/", voxliber_api.api_job_status, name="api_job_status"),
     path("api/v1/regenerate-sfx/", voxliber_api.api_regenerate_sfx, name="api_regenerate_sfx"),
     path("api/v1/regenerate-bgm/", voxliber_api.api_regenerate_bgm, name="api_regenerate_bgm"),
     path("api/v1/my-books/", voxliber_api.api_my_books, name="api_my_books"),